@@ -285,6 +285,24 @@ class Camera(EventListener):
 
         return light_intensity
 
+    def _qr_track_key(self):
+        """Klucz śledzenia tagów QR między ramkami (`QrTracker`).
+
+        Tagi są śledzone tylko dla tego samego supervisora i tej samej pozycji
+        robota (zaokrąglonej do 1 mm / 0.1 stopnia) - po ruchu robota
+        pierwsza ramka jest pełną detekcją.
+
+        Returns:
+            tuple | None: Klucz dla take_photo_qr, None dla pozostałych zdarzeń.
+        """
+        event = getattr(self, "_current_event", None)
+        if event is None or event.event_type != "take_photo_qr":
+            return None
+        return (
+            self.current_supervisor_number,
+            *(round(float(value), 1) for value in self.supervisor_position),
+        )
+
     async def _send_light_event_to_supervisor(self, light_intensity: float):
         """Wysyła zdarzenie kontroli światła do supervisora.
 
@@ -389,7 +407,9 @@ class Camera(EventListener):
                         self._message_logger,
                     )
                     debug(f"Supervisor position: {self.supervisor_position}")
-                    confirmed = self.camera.run_postprocess_workers(last_frame)
+                    confirmed = self.camera.run_postprocess_workers(
+                        last_frame, track_key=self._qr_track_key()
+                    )
                     if not confirmed:
                         error(
                             f"Błąd w run_postprocess_workers",
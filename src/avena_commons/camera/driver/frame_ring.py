@@ -0,0 +1,325 @@
+"""Pierścień ramek kamery w pamięci współdzielonej.
+
+Worker kamery zapisuje ramki (np. 'color' i 'depth') do prealokowanych slotów
+w segmencie pamięci współdzielonej POSIX. Przez pipe i do procesów detektorów
+przekazywany jest tylko `FrameHandle` (nazwa pierścienia, slot, numer
+sekwencji), a odbiorcy odczytują ramki bezpośrednio z pamięci.
+
+Układ segmentu: dla każdego slotu nagłówek (sekwencja, licznik referencji,
+numer ramki, znacznik czasu), a za nagłówkami dane tablic kolejnych slotów.
+Sekwencja działa jak seqlock (nieparzysta w trakcie zapisu), a licznik
+referencji chroni slot przed nadpisaniem, dopóki ramka jest przetwarzana.
+Sekwencje i liczniki modyfikuje wyłącznie proces właściciela (worker kamery),
+także z wątków callbacków futures puli procesów - stąd blokada wątków.
+"""
+
+import itertools
+import mmap
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+import posix_ipc
+
+# Nagłówek slotu: sekwencja, licznik referencji, numer ramki, znacznik czasu
+_SLOT_HEADER_DTYPE = np.dtype([
+    ("sequence", np.uint64),
+    ("refcount", np.int64),
+    ("number", np.int64),
+    ("timestamp", np.float64),
+])
+_ALIGNMENT = 64
+_ring_counter = itertools.count()
+# Pierścienie dołączone w tym procesie (np. w procesach puli detektorów)
+_attached_rings: Dict[str, "FrameRing"] = {}
+
+
+class StaleFrameError(RuntimeError):
+    """Slot ramki został nadpisany lub pierścień zamknięty przed odczytem."""
+
+
+@dataclass(frozen=True)
+class FrameLayout:
+    """Układ pierścienia: liczba slotów i tablice (nazwa, kształt, dtype) ramki."""
+
+    slots: int
+    arrays: Tuple[Tuple[str, Tuple[int, ...], str], ...]
+
+    @classmethod
+    def from_frames(cls, frames: Dict[str, Any], slots: int) -> "FrameLayout":
+        """Tworzy układ z tablic numpy zawartych w słowniku ramek."""
+        arrays = tuple(
+            (key, tuple(value.shape), value.dtype.str)
+            for key, value in frames.items()
+            if isinstance(value, np.ndarray)
+        )
+        return cls(slots=slots, arrays=arrays)
+
+    def matches(self, frames: Dict[str, Any]) -> bool:
+        """Sprawdza, czy ramki mieszczą się w tym układzie."""
+        return self.arrays == FrameLayout.from_frames(frames, self.slots).arrays
+
+    @property
+    def slot_size(self) -> int:
+        size = 0
+        for _, shape, dtype in self.arrays:
+            size += _aligned(int(np.prod(shape)) * np.dtype(dtype).itemsize)
+        return size
+
+    @property
+    def data_offset(self) -> int:
+        return _aligned(self.slots * _SLOT_HEADER_DTYPE.itemsize)
+
+    @property
+    def total_size(self) -> int:
+        return self.data_offset + self.slots * self.slot_size
+
+
+@dataclass(frozen=True)
+class FrameHandle:
+    """Uchwyt ramki zapisanej w pierścieniu - mały i tani w pickle.
+
+    Attributes:
+        ring_name: Nazwa segmentu pamięci współdzielonej.
+        layout: Układ pierścienia (pozwala dołączyć się bez odczytu nagłówka).
+        slot: Indeks slotu.
+        sequence: Sekwencja slotu po zapisie tej ramki (parzysta).
+        number: Numer ramki z kamery.
+        timestamp: Znacznik czasu ramki.
+    """
+
+    ring_name: str
+    layout: FrameLayout
+    slot: int
+    sequence: int
+    number: int = 0
+    timestamp: float = 0.0
+
+
+def _aligned(size: int) -> int:
+    return (size + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+class FrameRing:
+    """Pierścień prealokowanych slotów ramek w pamięci współdzielonej POSIX.
+
+    Właściciel (`FrameRing.create`) zapisuje ramki i zarządza licznikami
+    referencji, pozostałe procesy dołączają się przez `FrameRing.attach_cached`
+    i tylko czytają.
+
+    Przykład:
+        >>> ring = FrameRing.create({"color": color, "depth": depth}, slots=4)
+        >>> handle = ring.write({"color": color, "depth": depth, "number": 1})
+        >>> frame = FrameRing.attach_cached(handle).read(handle)
+        >>> ring.close()
+    """
+
+    def __init__(self, name: str, layout: FrameLayout, owner: bool):
+        self.name = name
+        self.layout = layout
+        self.owner = owner
+        self.dropped_frames = 0
+        self._next_slot = 0
+        self._lock = threading.Lock()
+
+        if owner:
+            shm = posix_ipc.SharedMemory(
+                name, posix_ipc.O_CREX, size=layout.total_size, mode=0o600
+            )
+        else:
+            shm = posix_ipc.SharedMemory(name)
+        try:
+            self._mmap = mmap.mmap(shm.fd, layout.total_size)
+        finally:
+            os.close(shm.fd)
+
+        self._headers = np.frombuffer(
+            self._mmap, dtype=_SLOT_HEADER_DTYPE, count=layout.slots, offset=0
+        )
+        self._views = [self._slot_views(slot) for slot in range(layout.slots)]
+
+    @classmethod
+    def create(
+        cls, frames: Dict[str, Any], slots: int = 4, prefix: str = "avena_frames"
+    ) -> "FrameRing":
+        """Tworzy pierścień o układzie dopasowanym do podanych ramek.
+
+        Args:
+            frames (dict): Przykładowe ramki (tablice numpy określają układ).
+            slots (int): Liczba slotów pierścienia.
+            prefix (str): Prefiks nazwy segmentu pamięci współdzielonej.
+
+        Returns:
+            FrameRing: Pierścień właściciela.
+        """
+        name = f"/{prefix}_{os.getpid()}_{next(_ring_counter)}"
+        return cls(name, FrameLayout.from_frames(frames, slots), owner=True)
+
+    @classmethod
+    def attach_cached(cls, handle: FrameHandle) -> "FrameRing":
+        """Zwraca pierścień uchwytu dołączony w tym procesie (raz na nazwę)."""
+        ring = _attached_rings.get(handle.ring_name)
+        if ring is None or ring.layout != handle.layout:
+            try:
+                ring = cls(handle.ring_name, handle.layout, owner=False)
+            except posix_ipc.ExistentialError as e:
+                raise StaleFrameError(
+                    f"Pierścień {handle.ring_name} nie istnieje"
+                ) from e
+            _attached_rings[handle.ring_name] = ring
+        return ring
+
+    def _slot_views(self, slot: int) -> Dict[str, np.ndarray]:
+        offset = self.layout.data_offset + slot * self.layout.slot_size
+        views = {}
+        for key, shape, dtype in self.layout.arrays:
+            dtype = np.dtype(dtype)
+            count = int(np.prod(shape))
+            views[key] = np.frombuffer(
+                self._mmap, dtype=dtype, count=count, offset=offset
+            ).reshape(shape)
+            offset += _aligned(count * dtype.itemsize)
+        return views
+
+    # MARK: Właściciel
+    def write(self, frames: Dict[str, Any]) -> Optional[FrameHandle]:
+        """Kopiuje ramki do wolnego slotu i zwraca jego uchwyt.
+
+        Sloty z licznikiem referencji > 0 są pomijane. Gdy wszystkie sloty są
+        zajęte, ramka jest odrzucana (zwraca None, rośnie `dropped_frames`).
+
+        Args:
+            frames (dict): Ramki zgodne z układem pierścienia oraz opcjonalnie
+                'number' i 'timestamp'.
+
+        Returns:
+            Optional[FrameHandle]: Uchwyt zapisanej ramki lub None.
+        """
+        slots = self.layout.slots
+        with self._lock:
+            for step in range(slots):
+                slot = (self._next_slot + step) % slots
+                if self._headers[slot]["refcount"] == 0:
+                    break
+            else:
+                self.dropped_frames += 1
+                return None
+            self._next_slot = (slot + 1) % slots
+
+            # Nieparzysta sekwencja unieważnia stare uchwyty slotu (acquire zawiedzie)
+            header = self._headers[slot : slot + 1]
+            sequence = int(header["sequence"][0])
+            header["sequence"] = sequence + 1
+        for key, view in self._views[slot].items():
+            np.copyto(view, frames[key], casting="no")
+        number = int(frames.get("number") or 0)
+        timestamp = float(frames.get("timestamp") or 0.0)
+        header["number"] = number
+        header["timestamp"] = timestamp
+        header["sequence"] = sequence + 2
+        return FrameHandle(
+            ring_name=self.name,
+            layout=self.layout,
+            slot=slot,
+            sequence=sequence + 2,
+            number=number,
+            timestamp=timestamp,
+        )
+
+    def acquire(self, handle: FrameHandle) -> bool:
+        """Zwiększa licznik referencji slotu, jeśli wciąż zawiera ramkę uchwytu."""
+        with self._lock:
+            header = self._headers[handle.slot : handle.slot + 1]
+            if int(header["sequence"][0]) != handle.sequence:
+                return False
+            header["refcount"] += 1
+            return True
+
+    def release(self, handle: FrameHandle) -> None:
+        """Zmniejsza licznik referencji slotu uchwytu."""
+        with self._lock:
+            if self._headers is None:
+                return
+            header = self._headers[handle.slot : handle.slot + 1]
+            if header["refcount"][0] > 0:
+                header["refcount"] -= 1
+
+    def refcount(self, slot: int) -> int:
+        return int(self._headers[slot]["refcount"])
+
+    # MARK: Odczyt
+    def read(self, handle: FrameHandle, copy: bool = False) -> Dict[str, Any]:
+        """Zwraca ramki uchwytu jako słownik jak z `grab_frames_from_camera`.
+
+        Args:
+            handle (FrameHandle): Uchwyt ramki.
+            copy (bool): False - widoki tylko do odczytu na pamięć współdzieloną
+                (ważne, dopóki właściciel trzyma referencję slotu), True - kopie.
+
+        Returns:
+            dict: Tablice ramki oraz 'number' i 'timestamp'.
+
+        Raises:
+            StaleFrameError: Gdy slot został w międzyczasie nadpisany.
+        """
+        header = self._headers[handle.slot : handle.slot + 1]
+        if int(header["sequence"][0]) != handle.sequence:
+            raise StaleFrameError(f"Ramka {handle.number} została nadpisana")
+        frames: Dict[str, Any] = {
+            "timestamp": handle.timestamp,
+            "number": handle.number,
+        }
+        for key, view in self._views[handle.slot].items():
+            if copy:
+                frames[key] = view.copy()
+            else:
+                frames[key] = view.view()
+                frames[key].flags.writeable = False
+        if int(header["sequence"][0]) != handle.sequence:
+            raise StaleFrameError(f"Ramka {handle.number} została nadpisana")
+        return frames
+
+    def close(self) -> None:
+        """Zwalnia mapowanie; właściciel usuwa też segment pamięci."""
+        with self._lock:
+            self._views = []
+            self._headers = None
+        try:
+            self._mmap.close()
+        except BufferError:
+            # Widoki ramek wciąż używane - mapowanie zwolni GC
+            pass
+        if self.owner:
+            try:
+                posix_ipc.unlink_shared_memory(self.name)
+            except posix_ipc.ExistentialError:
+                pass
+        _attached_rings.pop(self.name, None)
+
+
+def run_detector_on_frame(
+    detector: Callable,
+    *,
+    frame_handle: FrameHandle,
+    camera_config: Dict[str, Any],
+    config: Dict[str, Any],
+):
+    """Uruchamia detektor na ramce z pierścienia (funkcja dla procesów puli).
+
+    Proces puli dołącza się do pierścienia po nazwie (raz) i przekazuje
+    detektorowi widoki tylko do odczytu zamiast kopii ramek.
+
+    Args:
+        detector (Callable): Funkcja detektora (np. `qr_detector`).
+        frame_handle (FrameHandle): Uchwyt ramki trzymanej przez workera kamery.
+        camera_config (dict): Konfiguracja kamery.
+        config (dict): Konfiguracja detektora.
+
+    Returns:
+        Any: Wynik detektora.
+    """
+    ring = FrameRing.attach_cached(frame_handle)
+    frame = ring.read(frame_handle)
+    return detector(frame=frame, camera_config=camera_config, config=config)
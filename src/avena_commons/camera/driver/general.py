@@ -1,7 +1,10 @@
 import asyncio
+import functools
 import importlib
+import itertools
 import threading
 import traceback
+from collections import OrderedDict
 from concurrent.futures import (
     ProcessPoolExecutor,
     TimeoutError,
@@ -12,6 +15,12 @@ from typing import Optional
 
 import avena_commons.vision.merge as merge
 import avena_commons.vision.sorter as sorter
+from avena_commons.camera.driver.frame_ring import (
+    FrameHandle,
+    FrameRing,
+    StaleFrameError,
+    run_detector_on_frame,
+)
 from avena_commons.util.catchtime import Catchtime
 from avena_commons.util.logger import (
     LoggerPolicyPeriod,
@@ -19,9 +28,15 @@ from avena_commons.util.logger import (
     debug,
     error,
     info,
+    warning,
 )
 from avena_commons.util.worker import Connector, Worker
-from avena_commons.vision.camera import create_camera_matrix
+from avena_commons.vision.camera import create_camera_matrix, get_undistort_maps
+from avena_commons.vision.detector.compact_result import (
+    DetectorResult,
+    run_compact_detector,
+)
+from avena_commons.vision.detector.qr_tracker import QrTracker
 from avena_commons.vision.vision import calculate_pose_pnp
 
 # Dodać import kompatybilny z różnymi wersjami Pythona
@@ -70,6 +85,16 @@ class GeneralCameraWorker(Worker):
     pobierania ramek. Może uruchamiać przetwarzanie obrazu w wielu
     procesach poprzez `ProcessPoolExecutor`.
 
+    Pobrane ramki trafiają do pierścienia w pamięci współdzielonej
+    (`FrameRing`), a przez pipe i do procesów detektorów przekazywany jest
+    tylko `FrameHandle`. Liczbę slotów ustawia klucz konfiguracji kamery
+    'frame_ring_slots' (0 - dawny tryb z kopiowaniem ramek przez pickle).
+
+    Zadania puli zwracają `DetectorResult` bez `debug_data` (klucz
+    'compact_results', domyślnie True). Przy 'debug_frames' > 0 (diagnostyka,
+    domyślnie 0) ostatnie ramki są kopiowane z pierścienia i zachowywane,
+    a GET_DEBUG_DATA liczy dla nich pełne wyniki detektorów.
+
     Przykład:
         import asyncio
         from avena_commons.util.logger import MessageLogger
@@ -105,6 +130,9 @@ class GeneralCameraWorker(Worker):
         self.state = CameraState.IDLE
 
         self.last_frame = None
+        self.frame_ring = None
+        self.frame_ring_slots = 4
+        self._lent_frame = None  # Ramka przypięta dla ostatniego GET_LAST_FRAME
         self.postprocess_configuration = None
         self.detector = None
         self.detector_name = (
@@ -113,7 +141,13 @@ class GeneralCameraWorker(Worker):
         self.executor = None
         self.last_result = None
         self.current_expected_qr = 0
+        self.qr_tracker = QrTracker()  # ROI tagów QR między ramkami
         self.image_processing_workers = []
+        self.compact_results = True  # Wyniki puli bez debug_data
+        self.debug_frames_limit = 0  # > 0 kopiuje każdą ramkę (diagnostyka)
+        self.debug_frames = OrderedDict()  # numer ramki -> (ramki, track_rois)
+        self.last_frame_id = None
+        self._frame_counter = itertools.count()
 
     @property
     def state(self) -> CameraState:
@@ -246,6 +280,18 @@ class GeneralCameraWorker(Worker):
         """
         try:
             self.state = CameraState.INITIALIZING
+            self.frame_ring_slots = int(
+                camera_settings.get("frame_ring_slots", self.frame_ring_slots)
+            )
+            self.qr_tracker = QrTracker.from_settings(
+                camera_settings.get("qr_tracking")
+            )
+            self.compact_results = bool(
+                camera_settings.get("compact_results", self.compact_results)
+            )
+            self.debug_frames_limit = int(
+                camera_settings.get("debug_frames", self.debug_frames_limit)
+            )
             await self.init(camera_settings)
             self.state = CameraState.INITIALIZED
             return True
@@ -300,15 +346,223 @@ class GeneralCameraWorker(Worker):
             error(f"{self.device_name} - Stopping failed: {e}", self._message_logger)
             return False
 
-    async def _run_image_processing_workers(self, frame: dict):
+    # MARK: Pierścień ramek
+    def _publish_frame(self, frames: dict):
+        """Zapisz pobrane ramki w pierścieniu pamięci współdzielonej.
+
+        Pierścień jest tworzony przy pierwszej ramce i odtwarzany, gdy zmieni
+        się rozdzielczość lub typ obrazów. Gdy wszystkie sloty są zajęte przez
+        detektory, ramka jest pomijana i zostaje poprzednia.
+
+        Args:
+            frames (dict): Ramki z `grab_frames_from_camera`.
+
+        Returns:
+            FrameHandle | dict: Uchwyt ramki lub same ramki, gdy pierścień
+            jest wyłączony albo nie udało się go utworzyć.
+        """
+        if self.frame_ring_slots <= 0:
+            return frames
+        try:
+            if self.frame_ring is None or not self.frame_ring.layout.matches(frames):
+                self._close_frame_ring()
+                self.frame_ring = FrameRing.create(frames, slots=self.frame_ring_slots)
+                debug(
+                    f"{self.device_name} - Utworzono pierścień ramek {self.frame_ring.name} ({self.frame_ring_slots} slotów, {self.frame_ring.layout.total_size} B)",
+                    self._message_logger,
+                )
+            handle = self.frame_ring.write(frames)
+            if handle is None:
+                debug(
+                    f"{self.device_name} - Wszystkie sloty pierścienia zajęte, pominięto ramkę {frames.get('number')}",
+                    self._message_logger,
+                )
+                return self.last_frame
+            return handle
+        except Exception as e:
+            error(
+                f"{self.device_name} - Błąd pierścienia ramek, powrót do przesyłania ramek przez pipe: {e}",
+                self._message_logger,
+            )
+            self._close_frame_ring()
+            self.frame_ring_slots = 0
+            return frames
+
+    def _acquire_frame(self, handle: FrameHandle) -> bool:
+        """Zablokuj slot uchwytu przed nadpisaniem (False, gdy ramka już nieaktualna)."""
+        ring = self.frame_ring
+        return (
+            ring is not None and handle.ring_name == ring.name and ring.acquire(handle)
+        )
+
+    def _release_frame(self, handle: FrameHandle) -> None:
+        """Zwolnij slot uchwytu (bezpieczne także z wątków callbacków futures)."""
+        ring = self.frame_ring
+        if ring is not None and handle.ring_name == ring.name:
+            ring.release(handle)
+
+    def _lend_last_frame(self):
+        """Zwróć ostatnią ramkę dla GET_LAST_FRAME, przypinając jej slot.
+
+        Slot pozostaje zablokowany do kolejnego GET_LAST_FRAME, aby konektor
+        zdążył go odczytać, a RUN_POSTPROCESS mógł przekazać ten sam uchwyt.
+        """
+        frame = self.last_frame
+        if not isinstance(frame, FrameHandle):
+            return frame
+        if frame != self._lent_frame:
+            if not self._acquire_frame(frame):
+                return None
+            if self._lent_frame is not None:
+                self._release_frame(self._lent_frame)
+            self._lent_frame = frame
+        return frame
+
+    def _close_frame_ring(self) -> None:
+        """Zamknij pierścień ramek i usuń segment pamięci współdzielonej."""
+        if self.frame_ring is not None:
+            self.frame_ring.close()
+            self.frame_ring = None
+        self._lent_frame = None
+        if isinstance(self.last_frame, FrameHandle):
+            self.last_frame = None
+
+    def _submit_detector(self, worker: dict, frame, track_rois=None, compact=True):
+        """Wyślij zadanie detektora do puli procesów.
+
+        Dla `FrameHandle` proces puli dołącza się do pierścienia i czyta ramkę
+        z pamięci współdzielonej, a slot jest zablokowany do końca zadania.
+
+        Args:
+            worker (dict): Detektor i jego konfiguracja.
+            frame (FrameHandle | dict): Uchwyt ramki lub same ramki.
+            track_rois (list | None): ROI z `QrTracker.plan` - detektor
+                przeszukuje tylko te obszary (klucz 'track_rois' konfiguracji).
+                Dla 'qr_detector' konfiguracja dostaje też 'expected_count'
+                (`current_expected_qr` z SET_POSTPROCESS_CONFIGURATION).
+            compact (bool): Zwarty wynik (`DetectorResult`) przy włączonym
+                'compact_results'; False - pełny wynik z `debug_data`.
+
+        Returns:
+            Future: Zadanie w `ProcessPoolExecutor`.
+
+        Raises:
+            StaleFrameError: Gdy slot uchwytu został już nadpisany.
+        """
+        config = worker.get("config")
+        if track_rois is not None:
+            config = {**(config or {}), "track_rois": track_rois}
+        if self.detector_name == "qr_detector" and self.current_expected_qr:
+            # Kaskada trybów kończy się po tylu tagach, ile jest na zdjęciu
+            config = {**(config or {}), "expected_count": self.current_expected_qr}
+        detector = worker.get("detector")
+        if compact and self.compact_results:
+            detector = functools.partial(run_compact_detector, detector)
+        if not isinstance(frame, FrameHandle):
+            return self.executor.submit(
+                detector,
+                frame=frame,
+                camera_config=self.camera_configuration,
+                config=config,
+            )
+
+        if not self._acquire_frame(frame):
+            raise StaleFrameError(f"Ramka {frame.number} została nadpisana")
+        try:
+            future = self.executor.submit(
+                run_detector_on_frame,
+                detector,
+                frame_handle=frame,
+                camera_config=self.camera_configuration,
+                config=config,
+            )
+        except Exception:
+            self._release_frame(frame)
+            raise
+        future.add_done_callback(lambda _: self._release_frame(frame))
+        return future
+
+    async def _submit_detectors(self, frame, track_rois=None, compact=True):
+        """Wyślij zadania wszystkich workerów detektora dla jednej ramki.
+
+        Przy uszkodzonej puli procesów (przed pierwszym udanym submit)
+        executor jest odtwarzany i submit ponawiany.
+
+        Args:
+            frame (FrameHandle | dict): Uchwyt ramki lub same ramki.
+            track_rois (list | None): ROI z `QrTracker.plan` (None - cała ramka).
+            compact (bool): False - pełne wyniki z `debug_data`.
+
+        Returns:
+            tuple[dict, int]: Zadania {future: indeks workera} i liczba
+            nieudanych submit-ów.
+        """
+        futures = {}
+        failed_submits = 0
+
+        for i, worker in enumerate(self.image_processing_workers):
+            try:
+                future = self._submit_detector(worker, frame, track_rois, compact)
+                futures[future] = i
+
+            except (BrokenProcessPool, RuntimeError) as e:
+                if any(
+                    keyword in str(e).lower()
+                    for keyword in [
+                        "process pool",
+                        "terminated abruptly",
+                        "child process",
+                    ]
+                ):
+                    error(
+                        f"Process pool uszkodzony podczas submit worker_{i}: {e}",
+                        self._message_logger,
+                    )
+                    failed_submits += 1
+
+                    if len(futures) == 0:
+                        if await self._recreate_executor_if_broken():
+                            debug(
+                                "Odtworzono executor, ponawianie submit",
+                                self._message_logger,
+                            )
+                            try:
+                                future = self._submit_detector(
+                                    worker, frame, track_rois, compact
+                                )
+                                futures[future] = i
+                                failed_submits -= 1
+                            except Exception as retry_e:
+                                error(
+                                    f"Ponowny submit worker_{i} nieudany: {retry_e}",
+                                    self._message_logger,
+                                )
+                        else:
+                            break
+                    continue
+                else:
+                    error(f"Błąd podczas submit worker_{i}: {e}", self._message_logger)
+                    continue
+
+            except Exception as e:
+                error(
+                    f"Nieoczekiwany błąd podczas submit worker_{i}: {e}",
+                    self._message_logger,
+                )
+                continue
+        return futures, failed_submits
+
+    async def _run_image_processing_workers(self, frame: dict, track_key=None):
         """Asynchronicznie uruchamia workery przetwarzania obrazu w oddzielnych procesach z obsługą QR i BOX.
 
         Metoda zarządza wykonywaniem zadań przetwarzania obrazu za pomocą executora puli procesów.
         Obsługuje awarie executora, wysyłanie zadań i przetwarzanie wyników dla różnych typów detektorów.
 
         Args:
-            frame (dict): Słownik zawierający dane ramek przetwarzanych przez workery.
-                Oczekiwane zawartość danych obrazu i metadanych wymaganych przez detektory.
+            frame (FrameHandle | dict): Uchwyt ramki w pierścieniu lub słownik
+                z danymi ramek (obrazy i metadane wymagane przez detektory).
+            track_key (Hashable | None): Klucz śledzenia tagów QR między
+                ramkami (`QrTracker`); None - pełna detekcja bez śledzenia.
 
         Raises:
             BrokenProcessPool: Gdy pula procesów zostanie uszkodzona podczas wysyłania zadań.
@@ -330,7 +584,7 @@ class GeneralCameraWorker(Worker):
         """
         """Uruchom zadania przetwarzania obrazu w procesach z obsługą QR i BOX."""
         debug(
-            f"Starting _run_image_processing_workers with frame keys: {list(frame.keys()) if frame else 'None'}",
+            f"Starting _run_image_processing_workers with frame: {frame if isinstance(frame, FrameHandle) else list(frame.keys()) if frame else 'None'}",
             self._message_logger,
         )
 
@@ -348,70 +602,11 @@ class GeneralCameraWorker(Worker):
                 self.last_result = None
 
         try:
-            # Submit zadań
-            futures = {}
-            failed_submits = 0
-
-            for i, worker in enumerate(self.image_processing_workers):
-                try:
-                    future = self.executor.submit(
-                        worker.get("detector"),
-                        frame=frame,
-                        camera_config=self.camera_configuration,
-                        config=worker.get("config"),
-                    )
-                    futures[future] = i
-
-                except (BrokenProcessPool, RuntimeError) as e:
-                    if any(
-                        keyword in str(e).lower()
-                        for keyword in [
-                            "process pool",
-                            "terminated abruptly",
-                            "child process",
-                        ]
-                    ):
-                        error(
-                            f"Process pool uszkodzony podczas submit worker_{i}: {e}",
-                            self._message_logger,
-                        )
-                        failed_submits += 1
-
-                        if len(futures) == 0:
-                            if await self._recreate_executor_if_broken():
-                                debug(
-                                    "Odtworzono executor, ponawianie submit",
-                                    self._message_logger,
-                                )
-                                try:
-                                    future = self.executor.submit(
-                                        worker.get("detector"),
-                                        frame=frame,
-                                        camera_config=self.camera_configuration,
-                                        config=worker.get("config"),
-                                    )
-                                    futures[future] = i
-                                    failed_submits -= 1
-                                except Exception as retry_e:
-                                    error(
-                                        f"Ponowny submit worker_{i} nieudany: {retry_e}",
-                                        self._message_logger,
-                                    )
-                            else:
-                                break
-                        continue
-                    else:
-                        error(
-                            f"Błąd podczas submit worker_{i}: {e}", self._message_logger
-                        )
-                        continue
-
-                except Exception as e:
-                    error(
-                        f"Nieoczekiwany błąd podczas submit worker_{i}: {e}",
-                        self._message_logger,
-                    )
-                    continue
+            track_rois = None
+            if self.detector_name == "qr_detector":
+                track_rois = self.qr_tracker.plan(track_key)
+            self.last_frame_id = self._remember_frame(frame, track_rois)
+            futures, failed_submits = await self._submit_detectors(frame, track_rois)
 
             if not futures:
                 if failed_submits > 0:
@@ -431,7 +626,9 @@ class GeneralCameraWorker(Worker):
             # Zbieranie wyników w zależności od typu detektora
             if self.detector_name == "qr_detector":
                 with Catchtime() as t:
-                    self.last_result = await self._process_qr_detection_results(futures)
+                    self.last_result = await self._run_qr_tracking(
+                        frame, futures, track_rois, track_key
+                    )
                 debug(f"QR detection took {t.ms} ms", self._message_logger)
             elif self.detector_name == "box_detector":
                 with Catchtime() as t:
@@ -450,6 +647,39 @@ class GeneralCameraWorker(Worker):
             self.last_result = None
 
     # MARK: Przetwarzanie QR
+    async def _run_qr_tracking(self, frame, futures, track_rois, track_key) -> dict:
+        """Zbierz detekcje QR ramki z uwzględnieniem śledzenia tagów.
+
+        Gdy zadania przeszukiwały tylko ROI trackera, a któryś ze śledzonych
+        tagów nie został pewnie wykryty, ta sama ramka jest przetwarzana
+        jeszcze raz w całości.
+
+        Args:
+            frame (FrameHandle | dict): Przetwarzana ramka.
+            futures: Zadania wysłane z `track_rois`.
+            track_rois (list | None): ROI użyte przy wysyłce (None - cała ramka).
+            track_key (Hashable | None): Klucz śledzenia.
+
+        Returns:
+            dict: Pozycje QR kodów {1:(x,y,z,rx,ry,rz), 2:..., 3:..., 4:None}.
+        """
+        detections = await self._collect_qr_detections(futures)
+        if track_rois is not None and self.qr_tracker.check_lost(track_key, detections):
+            debug(
+                f"QR: Śledzenie zgubiło tag ({track_key}), pełna detekcja ramki",
+                self._message_logger,
+            )
+            futures, _ = await self._submit_detectors(frame)
+            detections = await self._collect_qr_detections(futures)
+            track_rois = None
+            if self.last_frame_id in self.debug_frames:
+                kept_frame, _ = self.debug_frames[self.last_frame_id]
+                self.debug_frames[self.last_frame_id] = (kept_frame, None)
+        self.qr_tracker.update(track_key, detections, tracked=track_rois is not None)
+        if self.qr_tracker.enabled:
+            debug(f"QR: Śledzenie {self.qr_tracker.stats}", self._message_logger)
+        return self._qr_detections_to_positions(detections, track_key)
+
     async def _process_qr_detection_results(self, futures: dict) -> dict:
         """Przetwórz wyniki detekcji QR kodów.
 
@@ -459,6 +689,19 @@ class GeneralCameraWorker(Worker):
         Returns:
             dict: Pozycje QR kodów {1:(x,y,z,rx,ry,rz), 2:..., 3:..., 4:None}.
         """
+        return self._qr_detections_to_positions(
+            await self._collect_qr_detections(futures)
+        )
+
+    async def _collect_qr_detections(self, futures: dict) -> dict:
+        """Zbierz i połącz detekcje QR z zadań wszystkich workerów.
+
+        Args:
+            futures: Słownik zadań do przetworzenia.
+
+        Returns:
+            dict: Detekcje po pozycjach siatki {1: Detection, ..., 4: None}.
+        """
         results = {}
         completed_count = 0
 
@@ -477,16 +720,19 @@ class GeneralCameraWorker(Worker):
 
                     result = future.result(timeout=10.0)
                     if result is not None:
-                        # result[0] to Detection object list
-                        # result[1] to debug data dict
+                        # DetectorResult albo (lista Detection, debug_data)
+                        if isinstance(result, DetectorResult):
+                            detections = result.tags
+                        else:
+                            detections = result[0]
                         debug(
-                            f"QR: Otrzymano wynik z config_{config_id}, detekcji: {len(result[0]) if result[0] else 0}",
+                            f"QR: Otrzymano wynik z config_{config_id}, detekcji: {len(detections) if detections else 0}",
                             self._message_logger,
                         )
 
                         sorted_detections = sorter.sort_qr_by_center_position(
                             expected_count=4,
-                            detections=result[0],
+                            detections=detections,
                         )
 
                         results = merge.merge_qr_detections_with_confidence(
@@ -562,21 +808,39 @@ class GeneralCameraWorker(Worker):
             f"QR: Zakończono przetwarzanie: {completed_count}/{len(futures)} zadań",
             self._message_logger,
         )
+        return results
+
+    def _qr_detections_to_positions(self, results: dict, track_key=None) -> dict:
+        """Przelicz detekcje QR na pozycje (PnP).
+
+        Dla aktywnego śledzenia głębia i poza są wygładzane medianą
+        z ostatnich ramek klucza (`QrTracker.smooth_depth/smooth_pose`).
 
-        # Konwersja Detection objektów na pozycje QR kodów
+        Args:
+            results: Detekcje po pozycjach siatki.
+            track_key (Hashable | None): Klucz śledzenia.
+
+        Returns:
+            dict: Pozycje QR kodów {1:(x,y,z,rx,ry,rz), 2:..., 3:..., 4:None}.
+        """
         qr_positions = {}
         for position_id, detection in results.items():
             if detection:
                 try:
-                    qr_positions[position_id] = calculate_pose_pnp(
+                    pose = calculate_pose_pnp(
                         corners=detection.corners,
                         a=self.postprocess_configuration["a"]["qr_size"] * 1000,
                         b=self.postprocess_configuration["a"]["qr_size"] * 1000,
-                        z=detection.z,
+                        z=self.qr_tracker.smooth_depth(
+                            track_key, position_id, detection
+                        ),
                         camera_matrix=create_camera_matrix(
                             self.camera_configuration["camera_params"]
                         ),
                     )
+                    qr_positions[position_id] = self.qr_tracker.smooth_pose(
+                        track_key, position_id, pose
+                    )
                 except Exception as e:
                     error(
                         f"QR: Błąd konwersji pozycji {position_id}: {e}",
@@ -619,13 +883,19 @@ class GeneralCameraWorker(Worker):
                     result = future.result(timeout=10.0)
                     if result is not None:
                         debug(
-                            f"BOX: Otrzymano wynik z config_{config_id}, result type: {type(result)}, result len: {len(result) if isinstance(result, (list, tuple)) else 'N/A'}, types of result data: {[type(r) for r in result]}",
+                            f"BOX: Otrzymano wynik z config_{config_id}, result type: {type(result)}",
                             self._message_logger,
                         )
-                        # result to (center, sorted_corners, angle, z, detect_image, debug_data)
-                        center, sorted_corners, angle, z, detect_image, debug_data = (
-                            result
-                        )
+                        if isinstance(result, DetectorResult):
+                            box = result.box
+                            center, sorted_corners, angle, z = (
+                                (box.center, box.corners, box.angle, box.z)
+                                if box is not None
+                                else (None,) * 4
+                            )
+                        else:
+                            # (center, sorted_corners, angle, z, detect_image, debug_data)
+                            center, sorted_corners, angle, z = result[:4]
 
                         if center is not None:
                             debug(
@@ -713,6 +983,76 @@ class GeneralCameraWorker(Worker):
         debug(f"BOX: Finalny wynik: {box_result}", self._message_logger)
         return box_result
 
+    # MARK: Dane debug
+    def _remember_frame(self, frame, track_rois=None):
+        """Zachowaj ramkę do ponownej detekcji z danymi debug (GET_DEBUG_DATA).
+
+        Ramki z pierścienia są kopiowane (slot zostanie nadpisany). Trzymanych
+        jest `debug_frames_limit` ostatnich ramek (0 - żadna).
+
+        Args:
+            frame (FrameHandle | dict): Przetwarzana ramka.
+            track_rois (list | None): ROI trackera użyte przy detekcji.
+
+        Returns:
+            int: Numer ramki (z kamery albo kolejny numer workera).
+        """
+        if isinstance(frame, FrameHandle):
+            frame_id = frame.number
+        elif isinstance(frame, dict) and frame.get("number") is not None:
+            frame_id = frame["number"]
+        else:
+            frame_id = next(self._frame_counter)
+        if self.debug_frames_limit <= 0:
+            return frame_id
+
+        if isinstance(frame, FrameHandle):
+            try:
+                frame = self.frame_ring.read(frame, copy=True)
+            except (StaleFrameError, AttributeError) as e:
+                debug(
+                    f"Ramka {frame_id} nie zostanie zachowana dla debug: {e}",
+                    self._message_logger,
+                )
+                return frame_id
+        self.debug_frames[frame_id] = (frame, track_rois)
+        self.debug_frames.move_to_end(frame_id)
+        while len(self.debug_frames) > self.debug_frames_limit:
+            self.debug_frames.popitem(last=False)
+        return frame_id
+
+    async def _fetch_debug_data(self, frame_id=None):
+        """Policz ponownie pełne wyniki detektorów (z `debug_data`) dla ramki.
+
+        Detekcja jest powtarzana na zachowanej ramce z tymi samymi
+        konfiguracjami i ROI trackera, więc obrazy pośrednie przechodzą przez
+        granicę procesów tylko na żądanie.
+
+        Args:
+            frame_id (int | None): Numer ramki (None - ostatnio przetwarzana).
+
+        Returns:
+            dict | None: {'frame_id': numer, 'results': [wynik detektora
+            dla każdego workera]} albo None, gdy ramki już nie ma.
+        """
+        if frame_id is None:
+            frame_id = self.last_frame_id
+        entry = self.debug_frames.get(frame_id)
+        if entry is None or not self.executor:
+            return None
+        frame, track_rois = entry
+        futures, _ = await self._submit_detectors(frame, track_rois, compact=False)
+        results = [None] * len(self.image_processing_workers)
+        for future, i in futures.items():
+            try:
+                results[i] = future.result(timeout=30.0)
+            except Exception as e:
+                error(
+                    f"Błąd detekcji debug ramki {frame_id} (worker_{i}): {e}",
+                    self._message_logger,
+                )
+        return {"frame_id": frame_id, "results": results}
+
     def _cancel_pending_futures(self, futures: dict):
         """Anuluj pending futures w przypadku błędu.
 
@@ -822,6 +1162,38 @@ class GeneralCameraWorker(Worker):
             self.executor = None
             return False
 
+    def _warm_undistort_maps(self):
+        """Policz mapy undistort detektorów przed utworzeniem puli procesów.
+
+        Mapy trafiają do cache procesu (`get_undistort_maps`), a procesy puli
+        tworzone przez fork dziedziczą je, więc pierwsza ramka nie płaci za
+        `cv2.initUndistortRectifyMap`. Bez parametrów kamery lub rozdzielczości
+        mapy zostaną policzone przy pierwszej ramce w procesie puli.
+        """
+        camera_configuration = getattr(self, "camera_configuration", None) or {}
+        try:
+            color = camera_configuration["color"]
+            with Catchtime() as t:
+                get_undistort_maps(
+                    camera_configuration["camera_params"],
+                    camera_configuration["distortion_coefficients"],
+                    (color["width"], color["height"]),
+                )
+            debug(
+                f"{self.device_name} - Undistort maps ready in {t.ms:.1f} ms",
+                self._message_logger,
+            )
+        except (KeyError, IndexError, TypeError) as e:
+            debug(
+                f"{self.device_name} - Undistort maps not warmed, missing camera parameter: {e}",
+                self._message_logger,
+            )
+        except Exception as e:
+            error(
+                f"{self.device_name} - Error warming undistort maps: {e}",
+                self._message_logger,
+            )
+
     def _run(self, pipe_in):
         """Synchroniczna pętla pipe"""
         loop = asyncio.new_event_loop()
@@ -934,7 +1306,7 @@ class GeneralCameraWorker(Worker):
 
                         case "GET_LAST_FRAME":
                             try:
-                                pipe_in.send(self.last_frame)
+                                pipe_in.send(self._lend_last_frame())
                             except Exception as e:
                                 error(
                                     f"{self.device_name} - Error getting last frame: {e}",
@@ -954,6 +1326,17 @@ class GeneralCameraWorker(Worker):
                                 )
                                 pipe_in.send(None)
 
+                        case "GET_DEBUG_DATA":
+                            try:
+                                frame_id = data[1] if len(data) > 1 else None
+                                pipe_in.send(await self._fetch_debug_data(frame_id))
+                            except Exception as e:
+                                error(
+                                    f"{self.device_name} - Error getting debug data: {e}",
+                                    message_logger=self._message_logger,
+                                )
+                                pipe_in.send(None)
+
                         case "SET_POSTPROCESS_CONFIGURATION":
                             try:
                                 debug(
@@ -962,22 +1345,29 @@ class GeneralCameraWorker(Worker):
                                 )
 
                                 # Dynamiczny import funkcji detektora z avena_commons.vision.detector
+                                # (albo z modułu podanego w nazwie, np. "pakiet.modul.box_detector")
                                 detector_name = data[1]
                                 self.detector_name = (
                                     detector_name  # Zapisz nazwę detektora
                                 )
                                 if detector_name:
                                     try:
+                                        module_name, _, function_name = (
+                                            detector_name.rpartition(".")
+                                        )
                                         # Import modułu detector z avena_commons.vision
                                         detector_module = importlib.import_module(
-                                            "avena_commons.vision.detector"
+                                            module_name
+                                            or "avena_commons.vision.detector"
                                         )
 
                                         # Pobierz funkcję detektora na podstawie nazwy
-                                        if hasattr(detector_module, detector_name):
+                                        if hasattr(detector_module, function_name):
                                             self.detector = getattr(
-                                                detector_module, detector_name
+                                                detector_module, function_name
                                             )
+                                            # Wybór obsługi wyników po nazwie funkcji
+                                            self.detector_name = function_name
                                             debug(
                                                 f"{self.device_name} - Successfully imported detector function: {detector_name}",
                                                 self._message_logger,
@@ -1011,6 +1401,10 @@ class GeneralCameraWorker(Worker):
                                         self._message_logger,
                                     )
 
+                                # Liczba tagów QR oczekiwana na zdjęciu (0 - nieznana)
+                                self.current_expected_qr = (
+                                    data[3] if len(data) > 3 else 0
+                                )
                                 self.pipeline_configuration = data[2][
                                     "configuration"
                                 ]  # ustawienie konfiguracji pipeline
@@ -1021,6 +1415,7 @@ class GeneralCameraWorker(Worker):
                                     f"{self.device_name} - Detector: {self.detector_name}, Postprocess configs: {len(self.postprocess_configuration)}",
                                     message_logger=self._message_logger,
                                 )
+                                self._warm_undistort_maps()
                                 await self._setup_image_processing_workers()
 
                                 pipe_in.send(True)
@@ -1038,10 +1433,25 @@ class GeneralCameraWorker(Worker):
                                     self._message_logger,
                                 )
                                 frames = data[1]
+                                if isinstance(
+                                    frames, FrameHandle
+                                ) and not self._acquire_frame(frames):
+                                    raise StaleFrameError(
+                                        f"Ramka {frames.number} została nadpisana"
+                                    )
                                 # Użyj current event loop zamiast tworzenia nowego
+                                track_key = data[2] if len(data) > 2 else None
                                 task = asyncio.create_task(
-                                    self._run_image_processing_workers(frames)
+                                    self._run_image_processing_workers(
+                                        frames, track_key=track_key
+                                    )
                                 )
+                                if isinstance(frames, FrameHandle):
+                                    task.add_done_callback(
+                                        lambda _, handle=frames: self._release_frame(
+                                            handle
+                                        )
+                                    )
                                 self.state = CameraState.RUNNING
                                 pipe_in.send(True)
                             except Exception as e:
@@ -1061,7 +1471,7 @@ class GeneralCameraWorker(Worker):
                         frames = await self.grab_frames_from_camera()
                         if frames is None:
                             continue
-                        self.last_frame = frames
+                        self.last_frame = self._publish_frame(frames)
 
                 await asyncio.sleep(0)  # yield control to event loop
 
@@ -1080,6 +1490,7 @@ class GeneralCameraWorker(Worker):
                 message_logger=self._message_logger,
             )
         finally:
+            self._close_frame_ring()
             info(
                 f"{self.device_name} - Worker has shut down",
                 message_logger=self._message_logger,
@@ -1192,6 +1603,10 @@ class GeneralCameraConnector(Connector):
     def get_last_frame(self):
         """Pobierz ostatnio odebrane ramki.
 
+        Worker zwraca uchwyt slotu pierścienia ramek; obrazy są kopiowane
+        z pamięci współdzielonej, a uchwyt zostaje pod kluczem 'handle'
+        (`run_postprocess_workers` przekaże go zamiast obrazów).
+
         Returns:
             Any: Struktura ramek (np. dict) lub None.
 
@@ -1201,7 +1616,15 @@ class GeneralCameraConnector(Connector):
         """
         with self.__lock:
             value = super()._send_thru_pipe(self._pipe_out, ["GET_LAST_FRAME"])
+        if not isinstance(value, FrameHandle):
             return value
+        try:
+            frame = FrameRing.attach_cached(value).read(value, copy=True)
+        except StaleFrameError as e:
+            warning(f"Nie udało się odczytać ramki: {e}", self._message_logger)
+            return None
+        frame["handle"] = value
+        return frame
 
     def set_postprocess_configuration(
         self, *, detector: str = None, configuration: list = None, qr_number: int = 0
@@ -1211,6 +1634,9 @@ class GeneralCameraConnector(Connector):
         Args:
             detector (str, optional): Nazwa detektora/postprocessu.
             configuration (list, optional): Lista słowników konfiguracji.
+            qr_number (int, optional): Numer zdjęcia QR - wyznacza liczbę
+                tagów oczekiwanych przez worker (wcześniejsze zakończenie
+                zbierania wyników i kaskady trybów).
 
         Returns:
             Any: Wartość z procesu workera (zwykle bool).
@@ -1238,15 +1664,23 @@ class GeneralCameraConnector(Connector):
 
             value = super()._send_thru_pipe(
                 self._pipe_out,
-                ["SET_POSTPROCESS_CONFIGURATION", detector, configuration],
+                [
+                    "SET_POSTPROCESS_CONFIGURATION",
+                    detector,
+                    configuration,
+                    self.current_expected_qr,
+                ],
             )
             return value
 
-    def run_postprocess_workers(self, frame: dict):
+    def run_postprocess_workers(self, frame: dict, track_key=None):
         """Uruchom postprocess na podanych ramkach.
 
         Args:
-            frames (dict): Ramki do przetworzenia.
+            frames (dict): Ramki do przetworzenia (z `get_last_frame` - wtedy
+                przez pipe idzie tylko uchwyt slotu).
+            track_key (Hashable | None): Klucz śledzenia tagów QR między
+                ramkami (np. pozycja robota); None - bez śledzenia.
 
         Returns:
             Any: Wyniki postprocessu lub None.
@@ -1255,10 +1689,12 @@ class GeneralCameraConnector(Connector):
             >>> GeneralCameraConnector().run_postprocess({}) is None
             True
         """
+        if isinstance(frame, dict) and isinstance(frame.get("handle"), FrameHandle):
+            frame = frame["handle"]
         with self.__lock:
             value = super()._send_thru_pipe(
                 self._pipe_out,
-                ["RUN_POSTPROCESS", frame],
+                ["RUN_POSTPROCESS", frame, track_key],
             )
             return value
 
@@ -1275,3 +1711,29 @@ class GeneralCameraConnector(Connector):
         with self.__lock:
             value = super()._send_thru_pipe(self._pipe_out, ["GET_LAST_RESULT"])
             return value
+
+    def get_debug_data(self, frame_id=None):
+        """Pobierz pełne wyniki detektorów (z `debug_data`) dla ramki.
+
+        Worker powtarza detekcję na zachowanej ramce - wywołanie jest drogie
+        i służy do diagnostyki, nie do normalnej pracy. Wymaga ustawienia
+        'debug_frames' > 0 w konfiguracji kamery (domyślnie ramki nie są
+        zachowywane).
+
+        Args:
+            frame_id (int | None): Numer ramki (np. `frame["handle"].number`);
+                None - ostatnio przetwarzana ramka.
+
+        Returns:
+            dict | None: {'frame_id', 'results'} albo None, gdy worker nie
+            trzyma już tej ramki.
+
+        Przykład:
+            >>> GeneralCameraConnector().get_debug_data() is None
+            True
+        """
+        with self.__lock:
+            value = super()._send_thru_pipe(
+                self._pipe_out, ["GET_DEBUG_DATA", frame_id]
+            )
+            return value
@@ -0,0 +1,141 @@
+import asyncio
+import time
+from typing import Optional
+
+import numpy as np
+
+from avena_commons.camera.driver.general import (
+    GeneralCameraConnector,
+    GeneralCameraWorker,
+)
+from avena_commons.util.logger import MessageLogger, debug
+
+
+class VirtualCameraWorker(GeneralCameraWorker):
+    """Worker wirtualnej kamery generującej syntetyczne ramki koloru i głębi.
+
+    Zastępuje sprzęt w testach i benchmarkach: ramki mają rozdzielczość
+    i częstotliwość z konfiguracji ('color'/'depth': width, height, fps)
+    i przechodzą tę samą ścieżkę co ramki z prawdziwej kamery.
+
+    Przykład:
+        >>> import asyncio
+        >>> w = VirtualCameraWorker()
+        >>> async def demo():
+        ...     await w.init({"color": {"width": 640, "height": 400, "fps": 30}})
+        ...     await w.start()
+        ...     return await w.grab_frames_from_camera()
+        >>> asyncio.run(demo())["color"].shape
+        (400, 640, 3)
+
+    See Also:
+        - `GeneralCameraWorker`: bazowa implementacja cyklu życia kamery.
+    """
+
+    def __init__(self, message_logger: Optional[MessageLogger] = None):
+        """Utwórz workera wirtualnej kamery.
+
+        Args:
+            message_logger (Optional[MessageLogger]): Logger wiadomości.
+        """
+        self._message_logger = None
+        super().__init__(message_logger=None)
+
+        self.device_name = "VirtualCamera"
+        self.frame_number = 0
+        self.frame_period = 1 / 30
+        self._next_frame_time = 0.0
+        self._patterns = []
+
+    async def init(self, camera_settings: dict):
+        """Przygotuj wzorce ramek o rozdzielczości z konfiguracji.
+
+        Args:
+            camera_settings (dict): Konfiguracja kamery; 'color' i 'depth'
+                z kluczami width, height, fps (domyślnie 1280x800, 30 fps).
+
+        Returns:
+            bool: True.
+        """
+        color_settings = camera_settings.get("color", {})
+        depth_settings = camera_settings.get("depth", color_settings)
+        width = color_settings.get("width", 1280)
+        height = color_settings.get("height", 800)
+        fps = color_settings.get("fps", 30)
+        self.frame_period = 1 / fps if fps else 0.0
+
+        # Kilka różnych wzorców, żeby kolejne ramki nie były identyczne
+        rng = np.random.default_rng(0)
+        depth_shape = (
+            depth_settings.get("height", height),
+            depth_settings.get("width", width),
+        )
+        gradient = np.linspace(300, 1500, depth_shape[1], dtype=np.uint16)
+        self._patterns = [
+            (
+                rng.integers(0, 256, (height, width, 3), dtype=np.uint8),
+                np.broadcast_to(gradient + 10 * i, depth_shape).astype(np.uint16),
+            )
+            for i in range(4)
+        ]
+        debug(
+            f"{self.device_name} - Wirtualna kamera {width}x{height} @ {fps} fps",
+            self._message_logger,
+        )
+        return True
+
+    async def start(self):
+        """Rozpocznij generowanie ramek."""
+        self.frame_number = 0
+        self._next_frame_time = time.perf_counter()
+        return True
+
+    async def stop(self):
+        """Zakończ generowanie ramek."""
+        return True
+
+    async def grab_frames_from_camera(self):
+        """Zwróć kolejną syntetyczną ramkę w tempie ustawionego fps.
+
+        Returns:
+            Optional[dict]: Ramki 'color' (uint8 HxWx3) i 'depth' (uint16 HxW)
+            z 'timestamp' i 'number' albo None, gdy nie minął okres ramki.
+        """
+        now = time.perf_counter()
+        if now < self._next_frame_time:
+            await asyncio.sleep(min(self._next_frame_time - now, 0.001))
+            return None
+        self._next_frame_time = max(self._next_frame_time + self.frame_period, now)
+
+        self.frame_number += 1
+        color, depth = self._patterns[self.frame_number % len(self._patterns)]
+        return {
+            "timestamp": time.time() * 1000,
+            "number": self.frame_number,
+            "color": color,
+            "depth": depth,
+        }
+
+
+class VirtualCamera(GeneralCameraConnector):
+    """Konektor wirtualnej kamery uruchamiający `VirtualCameraWorker`.
+
+    Przykład:
+        >>> camera = VirtualCamera(core=0)
+        >>> camera.init({"color": {"width": 640, "height": 400, "fps": 30}})
+        True
+    """
+
+    def __init__(self, core: int = 8, message_logger: Optional[MessageLogger] = None):
+        """Utwórz konektor i uruchom proces workera.
+
+        Args:
+            core (int): Rdzeń CPU procesu workera.
+            message_logger (Optional[MessageLogger]): Logger wiadomości.
+        """
+        super().__init__(core=core, message_logger=message_logger)
+
+    def _run(self, pipe_in, message_logger=None):
+        """Uruchom pętlę wirtualnego workera w procesie potomnym."""
+        worker = VirtualCameraWorker(message_logger=message_logger)
+        worker._run(pipe_in)
@@ -20,6 +20,13 @@ config.read_from_file()
 controller_config = ControllerConfig("controller.conf")
 max_velocity = controller_config.get("MAX_VELOCITY")  # float
 servo_count = controller_config.get("SERVO_COUNT")    # int
+
+# Skompilowany, niezmienny widok sekcji - odczyt jako atrybut (pętle sterujące)
+snapshot = controller_config.snapshot
+max_velocity = snapshot.max_velocity
+
+# Przeładowanie po zmianie pliku (atomowa podmiana snapshotu)
+controller_config.reload_if_changed()
 ```
 
 #### Funkcjonalności:
@@ -28,9 +35,17 @@ servo_count = controller_config.get("SERVO_COUNT")    # int
 - Interpolacja zmiennych %(zmienna)s
 - Walidacja i bezpieczne zapisywanie
 - Wbudowane wartości domyślne dla kontrolerów
+- Schemat z typami i wartościami domyślnymi (`ConfigField`), walidacja (`ConfigSchemaError`)
+- Typowany snapshot konfiguracji (`ConfigSnapshot`) i przeładowanie po zmianie pliku
 """
 
-from .common import Config
+from .common import Config, ConfigField, ConfigSchemaError, ConfigSnapshot
 from .controller import ControllerConfig
 
-__all__ = ["Config", "ControllerConfig"]
+__all__ = [
+    "Config",
+    "ConfigField",
+    "ConfigSchemaError",
+    "ConfigSnapshot",
+    "ControllerConfig",
+]
@@ -1,14 +1,214 @@
+import configparser
+import keyword
 import os
 import traceback
+from configparser import ConfigParser
+
+_REQUIRED = object()
+
+
+class ConfigSchemaError(ValueError):
+    """Raised when configuration file does not match the declared schema."""
+
+    def __init__(self, errors):
+        self.errors = list(errors)
+        super().__init__("; ".join(self.errors))
+
+
+class ConfigField:
+    """Declared configuration entry - type and default value.
+
+    type: int, float, bool or str (any callable converting the raw string)
+    default: value used when the key is missing, no default = required key
+    """
+
+    __slots__ = ("type", "default")
+
+    def __init__(self, type=str, default=_REQUIRED):
+        self.type = type
+        self.default = default
+
+    @property
+    def required(self) -> bool:
+        return self.default is _REQUIRED
+
+    def convert(self, raw: str):
+        if self.type is bool:
+            state = ConfigParser.BOOLEAN_STATES.get(raw.strip().lower())
+            if state is None:
+                raise ValueError(f"not a boolean: {raw!r}")
+            return state
+        return self.type(raw)
+
+
+def infer_value(raw: str):
+    """Conversion used for keys without schema: float, then int, else string."""
+    try:
+        return float(raw)
+    except ValueError:
+        pass
+    try:
+        return int(raw)
+    except ValueError:
+        pass
+    return raw
+
+
+class ConfigSnapshot:
+    """Immutable, typed view of one configuration section.
+
+    Values are parsed once and read as attributes (lowercase key names):
+    snapshot.max_velocity, or snapshot["MAX_VELOCITY"] for any key.
+    Keys in `errors` (undeclared keys that failed to parse) raise their
+    error when read, like ConfigParser.get did.
+    """
+
+    def __init__(self, values: dict, errors: dict = None):
+        object.__setattr__(self, "_values", dict(values))
+        object.__setattr__(self, "_errors", dict(errors or {}))
+        for key, value in values.items():
+            if key.isidentifier() and not keyword.iskeyword(key):
+                self.__dict__[key] = value
+
+    def __getattr__(self, name):
+        error = self.__dict__.get("_errors", {}).get(name)
+        if error is not None:
+            raise error
+        raise AttributeError(name)
+
+    def __getitem__(self, key: str):
+        key = key.lower()
+        if key in self._errors:
+            raise self._errors[key]
+        return self._values[key]
+
+    def __contains__(self, key: str) -> bool:
+        key = key.lower()
+        return key in self._values or key in self._errors
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ConfigSnapshot is read-only")
+
+    def __delattr__(self, name):
+        raise AttributeError("ConfigSnapshot is read-only")
+
+    def as_dict(self) -> dict:
+        return dict(self._values)
+
+    def __repr__(self) -> str:
+        return f"ConfigSnapshot({self._values!r})"
 
 
 class Config:
+    """Base configuration stored in INI file.
+
+    The section SECTION is compiled once into a typed ConfigSnapshot using SCHEMA
+    (dict key -> ConfigField). Hot reload: reload_if_changed() re-reads the file
+    when its modification time or size changed and swaps the snapshot atomically;
+    readers should take `config.snapshot` once per cycle and use that object.
+    """
+
+    SECTION = None  # None - ConfigParser DEFAULT section
+    SCHEMA = {}
+
     def __init__(self, config_file, read_only=True):
         # self.config_file= config_file
         self._read_only = read_only
         self._config_file_base, self._config_file_extenstion = os.path.splitext(
             config_file
         )
+        self.config = self._create_parser()
+        self._snapshot = None
+        self._file_stamp = None
+
+    def _create_parser(self) -> ConfigParser:
+        return ConfigParser()
+
+    def _section_name(self, parser) -> str:
+        if self.SECTION is not None and parser.has_section(self.SECTION):
+            return self.SECTION
+        return parser.default_section
+
+    def compile(self, parser=None) -> ConfigSnapshot:
+        """Parse the section into a typed snapshot.
+
+        Interpolation errors of keys not declared in SCHEMA are deferred:
+        the snapshot raises them when that key is read.
+
+        Raises:
+            ConfigSchemaError: When a required key is missing or a value cannot
+                be converted to the declared type.
+        """
+        parser = self.config if parser is None else parser
+        section = parser[self._section_name(parser)]
+        schema = {key.lower(): field for key, field in self.SCHEMA.items()}
+        values = {}
+        deferred = {}
+        errors = []
+        for key in section:
+            field = schema.get(key)
+            try:
+                raw = section.get(key)
+            except configparser.Error as e:
+                if field is None:
+                    deferred[key] = e
+                else:
+                    errors.append(f"{key}: {e}")
+                continue
+            if field is None:
+                values[key] = infer_value(raw)
+                continue
+            try:
+                values[key] = field.convert(raw)
+            except (TypeError, ValueError) as e:
+                errors.append(f"{key}: invalid value {raw!r} ({e})")
+        for key, field in schema.items():
+            if key in section:
+                continue
+            if field.required:
+                errors.append(f"{key}: missing required key")
+            else:
+                values[key] = field.default
+        if errors:
+            raise ConfigSchemaError(errors)
+        return ConfigSnapshot(values, deferred)
+
+    @property
+    def snapshot(self) -> ConfigSnapshot:
+        """Current typed snapshot (compiled on first use)."""
+        if self._snapshot is None:
+            self._snapshot = self.compile()
+        return self._snapshot
+
+    def _read_file_stamp(self):
+        try:
+            stat = os.stat(self.config_file())
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def reload_if_changed(self) -> bool:
+        """Re-read the file when it changed and swap the snapshot.
+
+        On schema errors the previous snapshot and parser stay in use until
+        the file changes again.
+
+        Returns:
+            bool: True if a new snapshot was installed.
+
+        Raises:
+            ConfigSchemaError: When the changed file does not match the schema.
+        """
+        stamp = self._read_file_stamp()
+        if stamp == self._file_stamp:
+            return False
+        self._file_stamp = stamp
+        parser = self._create_parser()
+        parser.read(self.config_file())
+        snapshot = self.compile(parser)
+        self.config = parser
+        self._snapshot = snapshot
+        return True
 
     def __remove_content_up_to_first_blank_line(self):
         # Odczytaj zawartość pliku i znajdź indeks pierwszej pustej linii
@@ -34,7 +234,9 @@ class Config:
 
     def read_from_file(self):
         # Reading the config file
+        self._file_stamp = self._read_file_stamp()
         self.config.read(self.config_file())
+        self._snapshot = self.compile()
         return self
 
     def save_to_file(self):
@@ -42,6 +244,8 @@ class Config:
             with open(self.config_file(), "w", encoding="utf-8") as file:
                 self.config.write(file)
             self.__remove_content_up_to_first_blank_line()
+            self._file_stamp = self._read_file_stamp()
+            self._snapshot = self.compile()
 
     def _dump_all(self):
         if not self._read_only:
@@ -1,14 +1,27 @@
 import os
-from configparser import ConfigParser
+from configparser import ConfigParser, NoOptionError
 
-from .common import Config
+from .common import Config, ConfigField
 
 
 class ControllerConfig(Config):
+    SECTION = "CONTROLLER"
+    SCHEMA = {
+        "CONTROLLER_PATH": ConfigField(str),
+        "RESOURCES_PATH": ConfigField(str),
+        "URDF_PATH": ConfigField(str),
+        "LOG_LEVEL": ConfigField(str),
+        "APS": ConfigField(str),
+    }
+
     def __init__(self, config_file, read_only=True):
         super().__init__(config_file, read_only)
-        self.__section = "CONTROLLER"
-        self.config = ConfigParser(
+        self.__section = self.SECTION
+        super().read_from_file()
+        # print(self)
+
+    def _create_parser(self) -> ConfigParser:
+        return ConfigParser(
             defaults={
                 "CONTROLLER_PATH": os.path.expanduser("~") + "/controller",
                 "RESOURCES_PATH": "%(CONTROLLER_PATH)s/resources",
@@ -17,37 +30,13 @@ class ControllerConfig(Config):
                 "APS": "APS00",
             }
         )
-        super().read_from_file()
-        # print(self)
 
     def get(self, key):
-        element = self.config.get(self.__section, key)
-        # print(f"CONFIG:{type(self).__name__}.{key.lower()} = {element}")
-        try:
-            value = float(element)
-            # print(f"{element} is float")
-            return value
-        except ValueError:
-            pass
-            # print("Not a float")
-
+        """Value from the compiled snapshot (float, int or string for undeclared keys)."""
         try:
-            value = int(element)
-            # print(f"{element} is int")
-            return value
-        except ValueError:
-            pass
-            # print("Not a int")
-
-        # try:
-        #     value = bool(element)
-        #     print(f"{element} is bool (value: {value})")
-        #     return value
-        # except ValueError:
-        #     print("Not a bool")
-
-        # print(f"{element} is string")
-        return element
+            return self.snapshot[key]
+        except KeyError:
+            raise NoOptionError(key, self.__section) from None
 
     def get_controller_configuration(self):
         params = dict(self.config[self.__section])
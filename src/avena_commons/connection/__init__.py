@@ -22,11 +22,18 @@ sender.save_and_unlock(data)
 # Proces odbiorczy
 receiver = AvenaComm(comm_name="sensor_data")
 success, data = receiver.lock_and_read()
+
+# Tryb strukturalny (seqlock) - stały układ danych, bez pickle i semafora
+schema = np.dtype([("x", np.float64), ("y", np.float64), ("seq", np.uint32)])
+writer = AvenaComm(comm_name="pose", schema=schema)
+writer.update_fields(x=1.0, y=2.0)
+success, record = AvenaComm(comm_name="pose", schema=schema).lock_and_read()
 ```
 
 #### Funkcjonalności:
 - Pamięć współdzielona POSIX z synchronizacją semaforami
 - Automatyczna serializacja danych przez pickle
+- Tryb strukturalny (schemat numpy dtype / ctypes) z blokadą sekwencyjną (seqlock)
 - Thread-safe operacje z konfigurowalnymi timeout'ami
 - Monitorowanie błędów i statystyk komunikacji
 """
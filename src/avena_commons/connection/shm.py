@@ -1,9 +1,14 @@
+import ctypes
 import mmap
 import os
 import pickle
 
+import numpy as np
 import posix_ipc
 
+# Header of the structured (seqlock) layout: uint64 sequence + uint64 payload size
+_SEQLOCK_HEADER_SIZE = 16
+
 
 class AvenaComm:
     """
@@ -19,6 +24,19 @@ class AvenaComm:
     lock_and_read(): -> returns boolean, data
 
     print_errors(): -> prints lock, and other errors
+
+    Structured mode (schema != None):
+    schema: np.dtype | ctypes.Structure subclass = fixed layout of the data.
+    The buffer holds a sequence counter followed by one record of the schema.
+    Writer updates fields in place (odd sequence while writing), readers copy the
+    record and retry when the sequence changed in the meantime (torn read).
+    No semaphore and no pickling is used. Only one writer per buffer is supported.
+
+    save_and_unlock(data): -> writes whole record (dict / record / ctypes instance)
+
+    update_fields(**fields): -> writes only given fields
+
+    lock_and_read(): -> returns boolean, np.ndarray (0-d structured copy)
     """
 
     def __init__(
@@ -30,6 +48,8 @@ class AvenaComm:
         message_logger=None,
         use_pickle=1,
         debug=False,
+        schema=None,
+        max_read_retries=1000,
     ):
         self.comm_name = "/" + comm_name
         self.comm_name_lock = self.comm_name + "_semaphore"
@@ -43,8 +63,16 @@ class AvenaComm:
         # self.use_pickle = use_pickle
         self.data = data
         self._debug = debug
+        self.retry_counter = 0
+        self.max_read_retries = max_read_retries
+        self.schema = self._schema_to_dtype(schema) if schema is not None else None
         format_shm = False
 
+        if self.schema is not None:
+            self.semaphore = None
+            self._init_structured(data)
+            return
+
         try:
             self.semaphore = posix_ipc.Semaphore(self.comm_name_lock)
             self._info(f"An existing semaphore has been found: {self.comm_name_lock}")
@@ -80,6 +108,115 @@ class AvenaComm:
                 self._send_to_shm(data)
                 self.semaphore_unlock()
 
+    @staticmethod
+    def _schema_to_dtype(schema):
+        if isinstance(schema, type) and issubclass(schema, ctypes.Structure):
+            return np.dtype(schema)
+        dtype = np.dtype(schema)
+        if dtype.fields is None:
+            raise ValueError(f"Schema must be a structured dtype, got {dtype}")
+        return dtype
+
+    def _init_structured(self, data):
+        """
+        Open or create shared memory buffer with the seqlock layout.
+        """
+        required_size = _SEQLOCK_HEADER_SIZE + self.schema.itemsize
+        self.shm_size = max(self.shm_size, required_size)
+        format_shm = False
+
+        try:
+            self.shm = posix_ipc.SharedMemory(self.comm_name_shm)
+            self._info(
+                "An existing shared memory has been found: " + self.comm_name_shm
+            )
+            if self.shm.size < required_size:
+                os.close(self.shm.fd)
+                raise ValueError(
+                    f"Shared memory {self.comm_name_shm} is too small for schema: {self.shm.size} < {required_size}"
+                )
+            self.shm_size = self.shm.size
+        except posix_ipc.ExistentialError:
+            self.shm = posix_ipc.SharedMemory(
+                self.comm_name_shm, posix_ipc.O_CREX, size=self.shm_size, mode=0o777
+            )
+            self._info("new shared memory created: " + self.comm_name_shm)
+            format_shm = True
+
+        self.mmap = mmap.mmap(self.shm.fd, self.shm_size)
+        os.close(self.shm.fd)
+
+        self._seq = np.frombuffer(self.mmap, dtype=np.uint64, count=2, offset=0)
+        self._record = np.frombuffer(
+            self.mmap, dtype=self.schema, count=1, offset=_SEQLOCK_HEADER_SIZE
+        ).reshape(())
+
+        if int(self._seq[1]) == 0:
+            format_shm = True
+        elif int(self._seq[1]) != self.schema.itemsize:
+            raise ValueError(
+                f"Schema size mismatch in {self.comm_name_shm}: {int(self._seq[1])} != {self.schema.itemsize}"
+            )
+
+        if format_shm:
+            self._info(f"No data in {self.comm_name_shm} shared memory, formating...")
+            self._seq[1] = self.schema.itemsize
+            if data is not None and not (isinstance(data, list) and not data):
+                self.save_and_unlock(data)
+
+    def _write_record(self, data):
+        if isinstance(data, dict):
+            for name, value in data.items():
+                self._record[name] = value
+        elif isinstance(data, ctypes.Structure):
+            self._record[...] = np.frombuffer(bytes(data), dtype=self.schema)[0]
+        else:
+            self._record[...] = data
+
+    def _structured_write(self, data):
+        seq = int(self._seq[0])
+        self._seq[0] = seq + 1
+        try:
+            self._write_record(data)
+        except (KeyError, ValueError, TypeError) as e:
+            self.error_counter += 1
+            self._error(f"Error while writing data to {self.comm_name_shm}: {e}")
+            return False
+        finally:
+            self._seq[0] = seq + 2
+        return True
+
+    def _structured_read(self):
+        out = np.empty((), dtype=self.schema)
+        for _ in range(self.max_read_retries):
+            seq_before = int(self._seq[0])
+            if seq_before & 1:
+                self.retry_counter += 1
+                continue
+            out[...] = self._record
+            if int(self._seq[0]) == seq_before:
+                return True, out
+            self.retry_counter += 1
+        self.lock_counter += 1
+        return False, None
+
+    def update_fields(self, **fields):
+        """
+        Update selected fields of the structured record in place.
+
+        return bool
+        """
+        if self.schema is None:
+            raise RuntimeError("update_fields() requires structured mode (schema)")
+        return self._structured_write(fields)
+
+    @property
+    def sequence(self) -> int:
+        """Current sequence number of the structured buffer (even = stable)."""
+        if self.schema is None:
+            raise RuntimeError("sequence requires structured mode (schema)")
+        return int(self._seq[0])
+
     def _check_length(self, length):
         if length > self.shm_size:
             self.error_counter += 1
@@ -159,6 +296,8 @@ class AvenaComm:
 
         return bool, data
         """
+        if self.schema is not None:
+            return self._structured_read()
         if self.semaphore_lock():
             read_ok, data = self._recv_from_shm()
             return read_ok, data
@@ -169,11 +308,18 @@ class AvenaComm:
         """
         Save data to shared memory buffer and unlock semaphore.
         """
+        if self.schema is not None:
+            return self._structured_write(data)
         save_ok = self._send_to_shm(data)
         self.semaphore_unlock()
         return save_ok
 
     def clear(self):
+        if self.schema is not None:
+            del self._seq, self._record
+            self.mmap.close()
+            posix_ipc.unlink_shared_memory(self.comm_name_shm)
+            return
         self.mmap.close()
         posix_ipc.unlink_shared_memory(self.comm_name_shm)
         self.semaphore.release()
@@ -24,6 +24,7 @@ from avena_commons.util.control_loop import ControlLoop
 from avena_commons.util.logger import MessageLogger, debug, error, info, warning
 
 from .event import Event, Result
+from .state_subscription import StatePublisher
 
 TEMP_DIR = Path("temp")  # Relatywna ścieżka do bieżącego katalogu roboczego
 
@@ -67,6 +68,7 @@ class EventListener:
     __lock_for_processing_events = threading.Lock()
     __lock_for_events_to_send = threading.Lock()
     __lock_for_state_data = threading.Lock()
+    __lock_for_state_publisher = threading.Lock()
 
     __send_queue_frequency: int = 50
     __analyze_queue_frequency: int = 100
@@ -163,6 +165,9 @@ class EventListener:
         self.__main_process.cpu_percent()  # Inicjalizacja
         self.__health_status = {}
 
+        # Subskrybenci stanu (CMD_SUBSCRIBE_STATE) - wysyłanie tylko zmian stanu
+        self.__state_publisher = StatePublisher()
+
         # Wczytanie konfiguracji
         self.__load_configuration()
 
@@ -1069,6 +1074,17 @@ class EventListener:
                         else:
                             should_remove = await self.__analyze_event_with_fsm(event)
 
+                    case "CMD_SUBSCRIBE_STATE":
+                        if event.result is None:
+                            await self._handle_subscribe_state_command(event)
+                        else:
+                            should_remove = await self.__analyze_event_with_fsm(event)
+
+                    case "STATE_UPDATE" | "STATE_KEEPALIVE":
+                        # Zmiany stanu subskrybowanych klientów - niezależnie od FSM,
+                        # aby nie buforować ich w stanie PAUSE
+                        await self._handle_state_push(event)
+
                     case "CMD_HEALTH_CHECK":
                         if event.result is None:
                             try:
@@ -1287,10 +1303,41 @@ class EventListener:
                 error(f"Error in check_local_data: {e}")
                 self._change_fsm_state(EventListenerState.ON_ERROR)
 
+            try:
+                await self.__publish_state()
+            except Exception as e:
+                error(
+                    f"Error publishing state to subscribers: {e}",
+                    message_logger=self._message_logger,
+                )
+
             loop.loop_end()
 
         debug("Check_local_data loop ended", message_logger=self._message_logger)
 
+    async def __publish_state(self):
+        """
+        Wysyła subskrybentom zmiany stanu (STATE_UPDATE) lub keepalive.
+
+        Snapshot budowany jest tylko wtedy, gdy są subskrybenci i minął
+        najkrótszy żądany przez nich odstęp między aktualizacjami.
+        """
+        now = time.monotonic()
+        with self.__lock_for_state_publisher:
+            if not self.__state_publisher.is_due(now):
+                return
+            messages = self.__state_publisher.publish(self._build_state_snapshot(), now)
+        for subscriber, event_type, data in messages:
+            await self._event(
+                destination=subscriber.name,
+                destination_address=subscriber.address,
+                destination_port=subscriber.port,
+                event_type=event_type,
+                data=data,
+                to_be_processed=False,
+                is_system_event=True,
+            )
+
     def __start_local_check(self):
         self.local_check_thread = threading.Thread(
             target=lambda: asyncio.run(self.__check_local_data_loop()),
@@ -2219,21 +2266,55 @@ class EventListener:
                     message_logger=self._message_logger,
                 )
 
+    def _build_state_snapshot(self) -> dict:
+        """Buduje stan klienta wysyłany w CMD_GET_STATE i subskrypcji stanu."""
+        return {
+            "fsm_state": self.__fsm_state.name,
+            # Pola błędu (jeśli klasa potomna je definiuje)
+            "error": getattr(self, "_error", False),
+            "error_code": getattr(self, "_error_code", False),
+            "error_message": getattr(self, "_error_message", None),
+            "state": self._serialize_value((getattr(self, "_state", {}))),
+        }
+
     async def _handle_get_state_command(self, event: Event):
         # debug(
         #     f"Processing CMD_GET_STATE event ({event}), sending state: {self._state}",
         #     message_logger=self._message_logger,
         # )
-        event.data = {}
-        event.data["fsm_state"] = self.__fsm_state.name
-        # Pola błędu (jeśli klasa potomna je definiuje)
-        event.data["error"] = getattr(self, "_error", False)
-        event.data["error_code"] = getattr(self, "_error_code", False)
-        event.data["error_message"] = getattr(self, "_error_message", None)
-        event.data["state"] = self._serialize_value((getattr(self, "_state", {})))
+        event.data = self._build_state_snapshot()
         event.result = Result(result="success")
         await self._reply(event)
 
+    async def _handle_subscribe_state_command(self, event: Event):
+        """Obsługa CMD_SUBSCRIBE_STATE - rejestracja subskrybenta i snapshot stanu.
+
+        Odpowiedź zawiera wersję stanu oraz pełny snapshot (lub samą wersję przy
+        odnowieniu subskrypcji ze znaną wersją). Kolejne zmiany wysyłane są jako
+        STATE_UPDATE, a przy braku zmian - STATE_KEEPALIVE.
+        """
+        with self.__lock_for_state_publisher:
+            event.data = self.__state_publisher.subscribe(
+                event.source,
+                event.source_address,
+                event.source_port,
+                event.data,
+                self._build_state_snapshot,
+                time.monotonic(),
+            )
+        event.result = Result(result="success")
+        await self._reply(event)
+
+    async def _handle_state_push(self, event: Event):
+        """Metoda do przedefiniowania w klasach subskrybujących stan klientów.
+
+        Wywoływana dla STATE_UPDATE i STATE_KEEPALIVE w każdym stanie FSM.
+
+        Args:
+            event (Event): Zmiana stanu lub keepalive subskrybowanego klienta
+        """
+        pass
+
     def _has_config_changes(self, old_config: dict, new_config: dict) -> bool:
         """
         Checks if there are any changes between two configuration dictionaries.
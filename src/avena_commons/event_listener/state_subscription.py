@@ -0,0 +1,265 @@
+"""
+Subskrypcja stanu klienta - wersjonowany snapshot i przyrostowe zmiany.
+
+Zastępuje cykliczne odpytywanie `CMD_GET_STATE`: subskrybent (np. Orchestrator)
+wysyła raz `CMD_SUBSCRIBE_STATE`, otrzymuje pełny snapshot stanu z numerem wersji,
+a następnie klient sam wysyła tylko zmiany (`STATE_UPDATE`). Gdy stan się nie
+zmienia, klient co `keepalive_interval` wysyła `STATE_KEEPALIVE`, co pozwala
+subskrybentowi wykryć utratę klienta.
+
+Protokół:
+- `CMD_SUBSCRIBE_STATE` (subskrybent -> klient), data:
+  `keepalive_interval`, `lease`, `min_interval`, `known_version`.
+  Odpowiedź: `{"version": v, "snapshot": {...}}` lub `{"version": v}`, gdy
+  subskrybent zna już wersję `v` (odnowienie subskrypcji). Subskrypcja
+  nieodnowiona w ciągu `lease` sekund wygasa.
+- `STATE_UPDATE` (klient -> subskrybent), data:
+  `{"version": v, "base_version": v - 1, "changes": [[ścieżka, wartość], ...],
+  "removed": [ścieżka, ...]}` - ścieżka to lista kluczy w zagnieżdżonym słowniku.
+- `STATE_KEEPALIVE` (klient -> subskrybent), data: `{"version": v}`.
+
+Eksponuje:
+- `StatePublisher` - strona klienta (wersjonowanie, różnice, keepalive, lease),
+- `diff_state` / `apply_state_diff` - wyznaczanie i nakładanie różnic.
+"""
+
+import math
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+SUBSCRIBE_STATE_EVENT = "CMD_SUBSCRIBE_STATE"
+STATE_UPDATE_EVENT = "STATE_UPDATE"
+STATE_KEEPALIVE_EVENT = "STATE_KEEPALIVE"
+
+
+def diff_state(
+    old: dict, new: dict, path: Optional[list] = None
+) -> tuple[list[list], list[list]]:
+    """
+    Wyznacza różnicę między dwoma snapshotami stanu.
+
+    Zagnieżdżone słowniki porównywane są rekurencyjnie, więc zmiana jednego
+    pola głęboko w `state` przesyła tylko to pole.
+
+    Args:
+        old (dict): Poprzedni snapshot.
+        new (dict): Nowy snapshot.
+        path (list | None): Ścieżka bieżącego poziomu (użycie wewnętrzne).
+
+    Returns:
+        tuple[list, list]: (`changes` jako pary [ścieżka, wartość], `removed` jako ścieżki).
+    """
+    path = path or []
+    changes: list[list] = []
+    removed: list[list] = []
+    for key, value in new.items():
+        if key not in old:
+            changes.append([path + [key], value])
+            continue
+        previous = old[key]
+        if previous is value:
+            continue
+        if isinstance(previous, dict) and isinstance(value, dict):
+            nested_changes, nested_removed = diff_state(previous, value, path + [key])
+            changes.extend(nested_changes)
+            removed.extend(nested_removed)
+        elif previous != value:
+            changes.append([path + [key], value])
+    for key in old:
+        if key not in new:
+            removed.append(path + [key])
+    return changes, removed
+
+
+def apply_state_diff(snapshot: dict, changes: list, removed: list) -> dict:
+    """
+    Nakłada różnicę na snapshot bez modyfikowania oryginału.
+
+    Kopiowane są tylko słowniki leżące na zmienionych ścieżkach - pozostałe
+    gałęzie są współdzielone z poprzednim snapshotem (copy-on-write).
+
+    Args:
+        snapshot (dict): Snapshot w wersji `base_version`.
+        changes (list): Pary [ścieżka, wartość] z `STATE_UPDATE`.
+        removed (list): Ścieżki usuniętych kluczy z `STATE_UPDATE`.
+
+    Returns:
+        dict: Nowy snapshot.
+    """
+    result = dict(snapshot)
+    copied = {id(result)}
+
+    def container(path: list) -> dict:
+        node = result
+        for key in path:
+            child = node.get(key)
+            if not isinstance(child, dict):
+                child = {}
+            elif id(child) not in copied:
+                child = dict(child)
+            else:
+                node = child
+                continue
+            copied.add(id(child))
+            node[key] = child
+            node = child
+        return node
+
+    for path, value in changes:
+        container(path[:-1])[path[-1]] = value
+    for path in removed:
+        container(path[:-1]).pop(path[-1], None)
+    return result
+
+
+@dataclass
+class StateSubscriber:
+    """
+    Subskrybent stanu zarejestrowany u klienta.
+
+    Attributes:
+        name: Nazwa subskrybenta (źródło `CMD_SUBSCRIBE_STATE`).
+        address: Adres, na który wysyłane są zmiany.
+        port: Port, na który wysyłane są zmiany.
+        keepalive_interval: Maksymalny odstęp między wiadomościami do subskrybenta.
+        min_interval: Minimalny odstęp między kolejnymi `STATE_UPDATE`.
+        expires_at: Chwila (monotoniczna) wygaśnięcia nieodnowionej subskrypcji.
+        last_sent: Chwila wysłania ostatniej wiadomości.
+    """
+
+    name: str
+    address: str
+    port: int
+    keepalive_interval: float
+    min_interval: float
+    expires_at: float
+    last_sent: float
+
+
+class StatePublisher:
+    """
+    Publikuje wersjonowany stan klienta do subskrybentów.
+
+    Klient wywołuje `subscribe` przy `CMD_SUBSCRIBE_STATE` oraz `publish`
+    w pętli lokalnej, gdy `is_due` zwraca True. Wszyscy subskrybenci dostają
+    te same różnice, liczone względem ostatnio opublikowanego snapshotu.
+    """
+
+    def __init__(self):
+        self.version = 0
+        self._snapshot: Optional[dict] = None
+        self._subscribers: dict[str, StateSubscriber] = {}
+        self._published_at = -math.inf
+
+    @property
+    def subscribers(self) -> dict[str, StateSubscriber]:
+        return self._subscribers
+
+    def subscribe(
+        self,
+        name: str,
+        address: str,
+        port: int,
+        data: dict,
+        snapshot_factory: Callable[[], dict],
+        now: float,
+    ) -> dict:
+        """
+        Rejestruje lub odnawia subskrypcję i zwraca dane odpowiedzi.
+
+        Args:
+            name (str): Nazwa subskrybenta.
+            address (str): Adres subskrybenta.
+            port (int): Port subskrybenta.
+            data (dict): Dane `CMD_SUBSCRIBE_STATE`.
+            snapshot_factory (Callable): Buduje bieżący snapshot, gdy nie ma
+                opublikowanego (pierwszy subskrybent).
+            now (float): Bieżący czas monotoniczny.
+
+        Returns:
+            dict: `{"version": v}` przy odnowieniu znanej wersji, w przeciwnym
+            razie `{"version": v, "snapshot": {...}}`.
+        """
+        if not self._subscribers:
+            # Nikt nie śledził zmian - opublikowany snapshot może być nieaktualny
+            snapshot = snapshot_factory()
+            if self._snapshot is None or snapshot != self._snapshot:
+                self._snapshot = snapshot
+                self.version += 1
+            self._published_at = now
+
+        renewal = (
+            name in self._subscribers and data.get("known_version") == self.version
+        )
+        lease = float(data.get("lease", 10.0))
+        self._subscribers[name] = StateSubscriber(
+            name=name,
+            address=address,
+            port=port,
+            keepalive_interval=float(data.get("keepalive_interval", 1.0)),
+            min_interval=float(data.get("min_interval", 0.0)),
+            expires_at=now + lease,
+            last_sent=now,
+        )
+        if renewal:
+            return {"version": self.version}
+        return {"version": self.version, "snapshot": self._snapshot}
+
+    def unsubscribe(self, name: str) -> None:
+        self._subscribers.pop(name, None)
+
+    def is_due(self, now: float) -> bool:
+        """Czy należy zbudować snapshot i wywołać `publish`."""
+        if not self._subscribers:
+            return False
+        min_interval = min(s.min_interval for s in self._subscribers.values())
+        return now - self._published_at >= min_interval
+
+    def publish(
+        self, snapshot: dict, now: float
+    ) -> list[tuple[StateSubscriber, str, dict]]:
+        """
+        Porównuje snapshot z opublikowanym i zwraca wiadomości do wysłania.
+
+        Usuwa subskrybentów z wygasłym lease. Przy zmianie stanu zwiększa wersję
+        i zwraca `STATE_UPDATE` dla wszystkich subskrybentów, w przeciwnym razie
+        `STATE_KEEPALIVE` dla tych, do których dawno nic nie wysłano.
+
+        Args:
+            snapshot (dict): Bieżący snapshot stanu klienta (nie może być później modyfikowany).
+            now (float): Bieżący czas monotoniczny.
+
+        Returns:
+            list[tuple[StateSubscriber, str, dict]]: (odbiorca, typ zdarzenia, data).
+        """
+        self._published_at = now
+        for name in [n for n, s in self._subscribers.items() if s.expires_at <= now]:
+            del self._subscribers[name]
+        if not self._subscribers:
+            return []
+
+        changes, removed = diff_state(self._snapshot or {}, snapshot)
+        messages = []
+        if changes or removed:
+            data = {
+                "version": self.version + 1,
+                "base_version": self.version,
+                "changes": changes,
+                "removed": removed,
+            }
+            self.version += 1
+            self._snapshot = snapshot
+            for subscriber in self._subscribers.values():
+                subscriber.last_sent = now
+                messages.append((subscriber, STATE_UPDATE_EVENT, data))
+            return messages
+
+        for subscriber in self._subscribers.values():
+            if now - subscriber.last_sent >= subscriber.keepalive_interval:
+                subscriber.last_sent = now
+                messages.append((
+                    subscriber,
+                    STATE_KEEPALIVE_EVENT,
+                    {"version": self.version},
+                ))
+        return messages
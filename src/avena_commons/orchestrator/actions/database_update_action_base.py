@@ -6,12 +6,15 @@ Obsługuje dwa warianty:
 2) Kopia kolumna→kolumna (z rzutowaniem enum gdy trzeba): podaj {"to_column", "from_column"}
 
 WHERE przekazywany wprost z konfiguracji (bez automatycznych filtrów).
+Po zmianie rekordów unieważnia cache wyników warunków bazodanowych dla tabeli
+(wyłączane przez "invalidate_cache": false).
 """
 
 from typing import Any, Dict
 
 from avena_commons.util.logger import debug, error, info, warning
 
+from ..components.database_result_cache import result_cache_for
 from ..models.scenario_models import ScenarioContext
 from .base_action import ActionExecutionError, BaseAction
 
@@ -40,6 +43,8 @@ class DatabaseUpdateAction(BaseAction):
                 - value (Any): Wartość do ustawienia (wariant 1).
                 - to_column (str): Kolumna docelowa (wariant 2).
                 - from_column (str): Kolumna źródłowa (wariant 2).
+                - invalidate_cache (bool): Unieważnij cache warunków dla tabeli
+                  po zmianie rekordów (domyślnie True).
             context (ScenarioContext): Kontekst wykonania z dostępem do komponentów DB.
 
         Returns:
@@ -112,6 +117,9 @@ class DatabaseUpdateAction(BaseAction):
                     "Niepoprawna konfiguracja: podaj (column,value) lub (to_column,from_column)",
                 )
 
+            if affected and action_config.get("invalidate_cache", True):
+                result_cache_for(db_component).invalidate(table)
+
             if affected == 0:
                 warning(
                     "database_update: Brak zaktualizowanych rekordów (WHERE nie zwrócił wyników)",
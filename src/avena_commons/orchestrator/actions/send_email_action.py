@@ -11,6 +11,7 @@ Przykład użycia w JSON scenariusza:
   "to": ["ops@example.com"],
   "subject": "BŁĄD w {{ trigger.source }}",
   "body": "Komponent {{ trigger.source }} zgłosił FAULT (kod: {{ trigger.payload.error_code }})",
+  "wait_for_delivery": true,
   "smtp": {
     "host": "smtp.example.com",
     "port": 587,
@@ -44,6 +45,9 @@ class SendEmailAction(BaseAction):
                 - subject (str): Temat wiadomości (wspiera {{ }} szablony).
                 - body (str): Treść wiadomości (wspiera {{ }} szablony).
                 - smtp (Dict[str, Any]): Konfiguracja SMTP (opcjonalnie, nadpisuje globalną).
+                - wait_for_delivery (bool): Czekaj na dostarczenie przez serwer SMTP
+                  (domyślnie True; False - akcja kończy się po dodaniu do kolejki
+                  wysyłki, a błędy dostarczenia nie trafiają do licznika błędów akcji).
             context (ScenarioContext): Kontekst wykonania z dostępem do orchestratora i triggera.
 
         Raises:
@@ -114,8 +118,12 @@ class SendEmailAction(BaseAction):
 
             # Wysyłka e-maila przez komponent
             try:
-                await email_component.send_email(to_addresses, subject, body)
-                success = True
+                accepted = await email_component.send_email(
+                    to_addresses,
+                    subject,
+                    body,
+                    wait=bool(action_config.get("wait_for_delivery", True)),
+                )
             except Exception as e:
                 had_action_error = True
                 error(
@@ -123,6 +131,16 @@ class SendEmailAction(BaseAction):
                     message_logger=context.message_logger,
                 )
                 raise ActionExecutionError("send_email", f"Błąd wysyłki e-mail: {e}", e)
+
+            if not accepted:
+                # Wszyscy odbiorcy przekroczyli limit - nic nie wysłano, ale to
+                # nie błąd SMTP, więc licznik błędów akcji pozostaje bez zmian
+                warning(
+                    f"send_email: e-mail '{subject}' nie został wysłany (limit wiadomości dla {to_addresses})",
+                    message_logger=context.message_logger,
+                )
+                return
+            success = True
         finally:
             try:
                 if success:
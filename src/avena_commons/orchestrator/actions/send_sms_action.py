@@ -10,8 +10,13 @@ Przykład użycia w JSON scenariusza:
 {
   "type": "send_sms",
   "to": ["+48123123123", "+48555111222"],
-  "text": "BŁĄD w {{ trigger.source }}. Status: {{ clients_in_fault }}"
+  "text": "BŁĄD w {{ trigger.source }}. Status: {{ clients_in_fault }}",
+  "wait_for_delivery": true
 }
+
+Domyślnie akcja czeka na odpowiedź bramki i zgłasza błąd wysyłki (liczony
+do max_error_attempts); "wait_for_delivery": false kończy akcję po dodaniu
+SMS-ów do kolejki wysyłki komponentu, bez raportowania błędów bramki.
 """
 
 from __future__ import annotations
@@ -105,7 +110,10 @@ class SendSmsAction(BaseAction):
             # Wysyłka SMS przez komponent
             ignore_errors = bool(action_config.get("ignore_errors", False))
             all_ok, sent_count, errors = await sms_component.send_sms(
-                recipients, text, ignore_errors
+                recipients,
+                text,
+                ignore_errors,
+                wait=bool(action_config.get("wait_for_delivery", True)),
             )
 
             if not all_ok and not ignore_errors:
@@ -18,6 +18,8 @@ class SendSmsToCustomerAction(BaseAction):
 
     Pobiera numery telefonów z danych triggera i wysyła wiadomości SMS.
     Wymaga konfiguracji SMS w orchestratorze: url, login, password, serviceId, source.
+    Opcja "wait_for_delivery" (domyślnie True) czeka na wynik wysyłki; False
+    kończy akcję po dodaniu SMS-ów do kolejki komponentu.
     """
 
     action_type = "send_sms_to_customer"
@@ -165,7 +167,10 @@ class SendSmsToCustomerAction(BaseAction):
             # Wysyłka SMS przez komponent
             ignore_errors = bool(action_config.get("ignore_errors", False))
             all_ok, sent_count, errors = await sms_component.send_sms(
-                recipients_phone_numbers, text, ignore_errors
+                recipients_phone_numbers,
+                text,
+                ignore_errors,
+                wait=bool(action_config.get("wait_for_delivery", True)),
             )
 
             if not all_ok and not ignore_errors:
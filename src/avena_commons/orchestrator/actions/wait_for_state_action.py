@@ -249,9 +249,14 @@ class WaitForStateAction(BaseAction):
         """
         Czeka aż wszystkie serwisy osiągną określony stan.
 
+        Stan jest sprawdzany ponownie tylko po zmianie stanu któregoś
+        z serwisów, zgłoszonej przez orchestrator
+        (`wait_for_client_state_change`). Orchestrator bez tej metody jest
+        odpytywany co sekundę.
+
         Args:
             clients: Lista nazw serwisów
-            target_state: Oczekiwany stan
+            target_states: Oczekiwane stany
             context: Kontekst wykonania
         """
         info(
@@ -264,6 +269,12 @@ class WaitForStateAction(BaseAction):
             message_logger=context.message_logger,
         )
 
+        orchestrator = context.orchestrator
+        wait_for_change = getattr(
+            type(orchestrator), "wait_for_client_state_change", None
+        )
+        expected = set(target_states)
+
         iteration = 0
         while True:
             iteration += 1
@@ -274,12 +285,12 @@ class WaitForStateAction(BaseAction):
 
             for client_name in clients:
                 # Pobierz aktualny stan serwisu z orchestratora
-                client_state = context.orchestrator._state.get(client_name, {})
+                client_state = orchestrator._state.get(client_name, {})
                 current_fsm_state = client_state.get("fsm_state", "UNKNOWN")
 
                 states_info.append(f"{client_name}={current_fsm_state}")
 
-                if current_fsm_state not in set(target_states):
+                if current_fsm_state not in expected:
                     all_ready = False
 
             debug(
@@ -294,8 +305,16 @@ class WaitForStateAction(BaseAction):
                 )
                 break
 
-            # Czekaj krótko przed następnym sprawdzeniem
-            await asyncio.sleep(1.0)
+            if wait_for_change is None:
+                await asyncio.sleep(1.0)
+                continue
+
+            # Czekaj na zmianę stanu; anulowanie (timeout) wyrejestrowuje future
+            change = orchestrator.wait_for_client_state_change(clients)
+            try:
+                await change
+            finally:
+                change.cancel()
 
     async def _handle_timeout(
         self,
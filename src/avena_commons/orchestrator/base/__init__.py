@@ -2,6 +2,6 @@
 Bazowe klasy dla orkiestracji.
 """
 
-from .base_condition import BaseCondition
+from .base_condition import BaseCondition, LogicCondition
 
-__all__ = ["BaseCondition"]
+__all__ = ["BaseCondition", "LogicCondition"]
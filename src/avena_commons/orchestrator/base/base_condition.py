@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set
 
 from avena_commons.util.logger import MessageLogger
 
@@ -29,6 +29,8 @@ class BaseCondition(ABC):
         self.message_logger = message_logger
         self.condition_factory = condition_factory
         self.condition_type = self.__class__.__name__.replace("Condition", "").lower()
+        # Cache warunków zagnieżdżonych (indeks -> instancja) - drzewo budowane raz
+        self._child_conditions: Dict[int, "BaseCondition"] = {}
 
     def _resolve_template_variables(self, text: str, context) -> Any:
         """
@@ -171,3 +173,152 @@ class BaseCondition(ABC):
         return self.condition_factory.create_condition(
             condition_config, self.message_logger
         )
+
+    def _get_child_condition(
+        self, index: int, condition_config: Dict[str, Any]
+    ) -> "BaseCondition":
+        """
+        Zwraca instancję warunku zagnieżdżonego, tworząc ją tylko przy pierwszym użyciu.
+
+        Konfiguracja warunku nie zmienia się po załadowaniu scenariusza, więc
+        pod-warunki mogą być współdzielone między kolejnymi ewaluacjami.
+        Błędy tworzenia nie są cache'owane - wyjątek pojawi się przy każdej próbie.
+
+        Args:
+            index (int): Pozycja warunku w konfiguracji rodzica.
+            condition_config (Dict[str, Any]): Konfiguracja pojedynczego warunku.
+
+        Returns:
+            BaseCondition: Instancja warunku zagnieżdżonego.
+        """
+        children = self.__dict__.setdefault("_child_conditions", {})
+        condition = children.get(index)
+        if condition is None:
+            condition = self._create_condition(condition_config)
+            children[index] = condition
+        return condition
+
+    def get_referenced_clients(self) -> Optional[Set[str]]:
+        """
+        Zwraca nazwy klientów, których stan jest czytany przez warunek.
+
+        Orchestrator wykorzystuje tę informację, aby budować kontekst ewaluacji
+        tylko z potrzebnych klientów i ponownie ewaluować scenariusz tylko po
+        zmianie stanu tych klientów.
+
+        Returns:
+            Optional[Set[str]]: Zbiór nazw klientów albo None, gdy warunek może
+            czytać stan dowolnego klienta (wartość domyślna).
+        """
+        return None
+
+    def get_referenced_fields(self) -> Optional[Set[str]]:
+        """
+        Zwraca pola stanu klienta czytane przez warunek (np. "fsm_state", "state").
+
+        Returns:
+            Optional[Set[str]]: Zbiór nazw pól albo None, gdy warunek może czytać
+            dowolne pole (wartość domyślna).
+        """
+        return None
+
+    def get_poll_interval(self) -> Optional[float]:
+        """
+        Zwraca okres ponownej ewaluacji niezależnej od zmian stanu klientów.
+
+        Warunki zależne od czasu lub źródeł zewnętrznych (baza danych) nie są
+        wyzwalane zmianą stanu klienta, więc Orchestrator budzi je co podany okres.
+
+        Returns:
+            Optional[float]: None - warunek zależy wyłącznie od stanu klientów;
+            0.0 - ewaluacja w każdym cyklu (wartość domyślna, bezpieczna dla
+            warunków użytkownika); wartość dodatnia - okres w sekundach.
+        """
+        return 0.0
+
+    def iter_conditions(self) -> Iterator["BaseCondition"]:
+        """
+        Zwraca warunek i wszystkie jego pod-warunki (drzewo spłaszczone).
+
+        Returns:
+            Iterator[BaseCondition]: Warunki drzewa, zaczynając od tego.
+        """
+        yield self
+
+    async def prefetch(self, context) -> None:
+        """
+        Pobiera z wyprzedzeniem dane zewnętrzne warunku (domyślnie nic).
+
+        Orchestrator wywołuje `prefetch` wszystkich warunków cyklu współbieżnie
+        przed ich ewaluacją, aby komponenty mogły połączyć zapytania (np.
+        wyszukiwania w jednej tabeli bazy danych w jedno zapytanie).
+
+        Args:
+            context: Kontekst z komponentami orchestratora.
+        """
+        return None
+
+
+class LogicCondition(BaseCondition):
+    """
+    Bazowa klasa warunków logicznych.
+
+    Zależności warunku logicznego (klienci, pola stanu, okres odpytywania)
+    wynikają z zależności jego pod-warunków.
+    """
+
+    def _child_configs(self) -> List[Dict[str, Any]]:
+        """Zwraca konfiguracje pod-warunków (domyślnie klucz "conditions")."""
+        return self.config.get("conditions", [])
+
+    def _child_conditions_list(self) -> Optional[List[BaseCondition]]:
+        """Zwraca instancje pod-warunków lub None, gdy któregoś nie da się utworzyć."""
+        try:
+            return [
+                self._get_child_condition(i, condition_config)
+                for i, condition_config in enumerate(self._child_configs())
+            ]
+        except Exception:
+            return None
+
+    @staticmethod
+    def _union(values: Iterable[Optional[Set[str]]]) -> Optional[Set[str]]:
+        """Suma zbiorów; None (dowolny element) pochłania pozostałe."""
+        result: Set[str] = set()
+        for value in values:
+            if value is None:
+                return None
+            result |= value
+        return result
+
+    def iter_conditions(self) -> Iterator[BaseCondition]:
+        """Zwraca warunek i rekurencyjnie wszystkie pod-warunki."""
+        yield self
+        for child in self._child_conditions_list() or []:
+            yield from child.iter_conditions()
+
+    def get_referenced_clients(self) -> Optional[Set[str]]:
+        """Zwraca sumę klientów czytanych przez pod-warunki."""
+        children = self._child_conditions_list()
+        if children is None:
+            return None
+        return self._union(child.get_referenced_clients() for child in children)
+
+    def get_referenced_fields(self) -> Optional[Set[str]]:
+        """Zwraca sumę pól stanu czytanych przez pod-warunki."""
+        children = self._child_conditions_list()
+        if children is None:
+            return None
+        return self._union(child.get_referenced_fields() for child in children)
+
+    def get_poll_interval(self) -> Optional[float]:
+        """Zwraca najkrótszy okres odpytywania pod-warunków (None, gdy żaden go nie wymaga)."""
+        children = self._child_conditions_list()
+        if children is None:
+            return 0.0
+        intervals = [
+            interval
+            for interval in (child.get_poll_interval() for child in children)
+            if interval is not None
+        ]
+        return min(intervals) if intervals else None
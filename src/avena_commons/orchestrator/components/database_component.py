@@ -7,7 +7,8 @@ do wykonywania zapytań SQL dla warunków.
 
 import asyncio
 import os
-from typing import Any, Dict, Optional
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
 import asyncpg
 
@@ -15,6 +16,14 @@ from avena_commons.util.logger import debug, error, info, warning
 
 # Lokalny import enumów nie jest już wymagany przy generycznej normalizacji wartości
 
+# Błędy wskazujące na zmianę schematu - unieważniają cache typów i zapytań
+_SCHEMA_ERRORS = (
+    asyncpg.exceptions.UndefinedColumnError,
+    asyncpg.exceptions.UndefinedTableError,
+    asyncpg.exceptions.DatatypeMismatchError,
+    asyncpg.exceptions.InvalidCachedStatementError,
+)
+
 
 class DatabaseComponent:
     """
@@ -30,6 +39,14 @@ class DatabaseComponent:
     - DB_PASSWORD: Hasło użytkownika
     - APS_ID: Identyfikator aplikacji
     - APS_NAME: Nazwa aplikacji
+
+    Opcjonalne parametry konfiguracji:
+    - pool_min_size / pool_max_size: Rozmiar puli połączeń (domyślnie 1 / 4)
+    - statement_cache_size: Rozmiar cache przygotowanych zapytań na połączenie
+      oraz cache tekstów SQL komponentu (domyślnie 256)
+    - batch_lookups: Łączenie współbieżnych `check_table_value` dla jednej
+      tabeli w jedno zapytanie (domyślnie True; warunki `database` jednego
+      cyklu orchestratora są pobierane współbieżnie przez `prefetch`)
     """
 
     def __init__(self, name: str, config: Dict[str, Any], message_logger=None):
@@ -44,13 +61,24 @@ class DatabaseComponent:
         self.name = name
         self.config = config
         self._message_logger = message_logger
-        self._connection: Optional[asyncpg.Connection] = None
+        self._pool: Optional[asyncpg.Pool] = None
         self._connection_params: Dict[str, Any] = {}
         self._is_connected = False
         self._is_initialized = False
-        self._conn_lock: asyncio.Lock = asyncio.Lock()
         self._column_type_cache: Dict[str, Dict[str, Any]] = {}
 
+        self._pool_min_size = int(config.get("pool_min_size", 1))
+        self._pool_max_size = int(config.get("pool_max_size", 4))
+        self._statement_cache_size = int(config.get("statement_cache_size", 256))
+        self._batch_lookups = bool(config.get("batch_lookups", True))
+        # Tekst SQL per kształt zapytania: klucz (rodzaj, tabela, ...)
+        self._query_cache: OrderedDict[tuple, str] = OrderedDict()
+        self._query_cache_size = max(self._statement_cache_size, 1)
+        self._query_count = 0
+        # Oczekujące wyszukiwania per tabela: (kolumna, where, future)
+        self._pending_lookups: Dict[str, List[tuple]] = {}
+        self._flush_tasks: Set[asyncio.Task] = set()
+
     def _to_db_value_for_column(self, column: str, value: Any) -> Any:
         """
         Generyczna normalizacja wartości parametru do wysyłki przez asyncpg.
@@ -188,10 +216,14 @@ class DatabaseComponent:
 
     async def connect(self) -> bool:
         """
-        Nawiązuje połączenie z bazą danych PostgreSQL.
+        Tworzy pulę połączeń z bazą danych PostgreSQL.
+
+        Rozmiar puli i cache przygotowanych zapytań (po stronie asyncpg, per
+        połączenie) ustawiają klucze konfiguracji `pool_min_size`,
+        `pool_max_size` i `statement_cache_size`.
 
         Returns:
-            True jeśli połączenie zostało nawiązane pomyślnie
+            True jeśli pula została utworzona i test połączenia się powiódł
         """
         if not self._is_initialized:
             error(
@@ -210,16 +242,21 @@ class DatabaseComponent:
             safe_params = self._connection_params.copy()
             safe_params["password"] = "***"
             debug(
-                f"Parametry połączenia: {safe_params}",
+                f"Parametry połączenia: {safe_params}, pula: "
+                f"{self._pool_min_size}-{self._pool_max_size}",
                 message_logger=self._message_logger,
             )
 
-            # Nawiąż połączenie
-            async with self._conn_lock:
-                self._connection = await asyncpg.connect(**self._connection_params)
+            # Utwórz pulę połączeń
+            self._pool = await asyncpg.create_pool(
+                **self._connection_params,
+                min_size=self._pool_min_size,
+                max_size=self._pool_max_size,
+                statement_cache_size=self._statement_cache_size,
+            )
 
-                # Sprawdź połączenie prostym zapytaniem
-                result = await self._connection.fetchval("SELECT 1")
+            # Sprawdź połączenie prostym zapytaniem
+            result = await self._pool.fetchval("SELECT 1")
             if result == 1:
                 self._is_connected = True
                 info(
@@ -236,26 +273,27 @@ class DatabaseComponent:
                 message_logger=self._message_logger,
             )
             self._is_connected = False
-            self._connection = None
+            if self._pool is not None:
+                self._pool.terminate()
+            self._pool = None
             return False
 
     async def disconnect(self) -> bool:
         """
-        Rozłącza połączenie z bazą danych.
+        Zamyka pulę połączeń z bazą danych.
 
         Returns:
             True jeśli rozłączenie przebiegło pomyślnie
         """
         try:
-            async with self._conn_lock:
-                if self._connection and not self._connection.is_closed():
-                    info(
-                        f"🔌 Rozłączanie z bazą danych: {self.name}",
-                        message_logger=self._message_logger,
-                    )
-                    await self._connection.close()
-
-            self._connection = None
+            if self._pool is not None and not self._pool.is_closing():
+                info(
+                    f"🔌 Rozłączanie z bazą danych: {self.name}",
+                    message_logger=self._message_logger,
+                )
+                await self._pool.close()
+
+            self._pool = None
             self._is_connected = False
 
             debug(
@@ -279,18 +317,17 @@ class DatabaseComponent:
         Returns:
             True jeśli połączenie działa poprawnie
         """
-        if not self._is_connected or not self._connection:
+        if not self._is_connected or self._pool is None:
             return False
 
         try:
-            if self._connection.is_closed():
+            if self._pool.is_closing():
                 self._is_connected = False
                 return False
 
             # Sprawdź połączenie prostym zapytaniem
-            async with self._conn_lock:
-                result = await self._connection.fetchval("SELECT 1")
-                return result == 1
+            result = await self._pool.fetchval("SELECT 1")
+            return result == 1
 
         except Exception as e:
             warning(
@@ -310,12 +347,128 @@ class DatabaseComponent:
         """Zwraca True jeśli komponent jest zainicjalizowany."""
         return self._is_initialized
 
+    @property
+    def query_count(self) -> int:
+        """Liczba zapytań wysłanych do bazy od utworzenia komponentu."""
+        return self._query_count
+
+    def _ensure_connected(self) -> None:
+        if not self._is_connected or self._pool is None:
+            raise RuntimeError(f"Komponent bazodanowy '{self.name}' nie jest połączony")
+
+    def _build_where(
+        self, where_conditions: Dict[str, Any]
+    ) -> Tuple[Tuple[Tuple[str, str], ...], list]:
+        """
+        Rozkłada warunki WHERE na kształt zapytania i wartości parametrów.
+
+        Kształt - krotka par (kolumna, rodzaj) - nie zależy od wartości, więc
+        jest kluczem cache tekstu SQL. Lista wielu wartości jest przekazywana
+        jako jeden parametr tablicowy (`= ANY($n)`), dzięki czemu liczba
+        elementów listy nie tworzy nowego przygotowanego zapytania.
+
+        Args:
+            where_conditions: Słownik z warunkami WHERE {kolumna: wartość}
+
+        Returns:
+            (kształt, wartości), rodzaj to "eq", "any" lub "false" (pusta lista)
+        """
+        shape = []
+        values = []
+        for col, val in self._convert_where_conditions(where_conditions).items():
+            if isinstance(val, list):
+                if len(val) == 0:
+                    # Pusta lista - warunek niemożliwy do spełnienia
+                    shape.append((col, "false"))
+                elif len(val) == 1:
+                    shape.append((col, "eq"))
+                    values.append(val[0])
+                else:
+                    shape.append((col, "any"))
+                    values.append(val)
+            else:
+                shape.append((col, "eq"))
+                values.append(val)
+        return tuple(shape), values
+
+    @staticmethod
+    def _where_sql(shape: Tuple[Tuple[str, str], ...], param_index: int = 1) -> str:
+        """Buduje klauzulę WHERE dla kształtu z `_build_where`."""
+        where_parts = []
+        for col, kind in shape:
+            if kind == "false":
+                where_parts.append("FALSE")
+                continue
+            if kind == "any":
+                where_parts.append(f"{col} = ANY(${param_index})")
+            else:
+                where_parts.append(f"{col} = ${param_index}")
+            param_index += 1
+        return " AND ".join(where_parts)
+
+    def _cached_query(self, key: tuple, build: Callable[[], str]) -> str:
+        """
+        Zwraca tekst SQL dla kształtu zapytania z cache LRU.
+
+        Stały tekst SQL pozwala asyncpg użyć przygotowanego zapytania z cache
+        połączenia zamiast ponownego PREPARE. Klucz zaczyna się od
+        (rodzaj, tabela) - patrz `invalidate_column_type_cache`.
+        """
+        query = self._query_cache.get(key)
+        if query is None:
+            query = build()
+            self._query_cache[key] = query
+            if len(self._query_cache) > self._query_cache_size:
+                self._query_cache.popitem(last=False)
+        else:
+            self._query_cache.move_to_end(key)
+        return query
+
+    async def _run(self, method: str, table: str, query: str, *args) -> Any:
+        """
+        Wykonuje zapytanie na połączeniu z puli.
+
+        Błąd wskazujący na zmianę schematu tabeli unieważnia cache typów
+        kolumn i zapytań tej tabeli oraz przygotowane zapytania w puli.
+        """
+        self._query_count += 1
+        try:
+            return await getattr(self._pool, method)(query, *args)
+        except _SCHEMA_ERRORS:
+            self.invalidate_column_type_cache(table)
+            await self._pool.expire_connections()
+            raise
+
+    def invalidate_column_type_cache(self, table: Optional[str] = None) -> None:
+        """
+        Unieważnia cache typów kolumn i tekstów zapytań.
+
+        Wywoływane automatycznie po błędzie schematu; po świadomej migracji
+        schematu (np. ALTER TABLE) można wywołać je ręcznie.
+
+        Args:
+            table: Nazwa tabeli lub None, aby wyczyścić cały cache
+        """
+        if table is None:
+            self._column_type_cache.clear()
+            self._query_cache.clear()
+            return
+        prefix = f"{table}."
+        for key in [k for k in self._column_type_cache if k.startswith(prefix)]:
+            del self._column_type_cache[key]
+        for key in [k for k in self._query_cache if k[1] == table]:
+            del self._query_cache[key]
+
     async def check_table_value(
         self, table: str, column: str, where_conditions: Dict[str, Any]
     ) -> Optional[Any]:
         """
         Sprawdza wartość w tabeli na podstawie warunków WHERE.
 
+        Przy `batch_lookups` (domyślnie włączone) współbieżne wywołania dla tej
+        samej tabeli w jednej iteracji pętli zdarzeń są łączone w jedno
+        zapytanie (`check_table_values`).
+
         Args:
             table: Nazwa tabeli
             column: Nazwa kolumny do pobrania
@@ -327,44 +480,23 @@ class DatabaseComponent:
         Raises:
             RuntimeError: Jeśli komponent nie jest połączony
         """
-        if not self._is_connected or not self._connection:
-            raise RuntimeError(f"Komponent bazodanowy '{self.name}' nie jest połączony")
+        self._ensure_connected()
 
         if not where_conditions:
             raise ValueError("where_conditions nie może być pusty")
 
-        # Buduj zapytanie WHERE
-        where_parts = []
-        values = []
-        param_index = 1
+        if self._batch_lookups:
+            return await self._enqueue_lookup(table, column, where_conditions)
+        return await self._fetch_value(table, column, where_conditions)
 
-        for col, val in where_conditions.items():
-            if isinstance(val, list):
-                # Obsługa list - użyj operatora IN
-                if len(val) == 0:
-                    # Pusta lista - warunek niemożliwy do spełnienia
-                    where_parts.append("FALSE")
-                elif len(val) == 1:
-                    # Jeden element - użyj prostego równania
-                    where_parts.append(f"{col} = ${param_index}")
-                    values.append(val[0])
-                    param_index += 1
-                else:
-                    # Wiele elementów - użyj IN
-                    placeholders = []
-                    for item in val:
-                        placeholders.append(f"${param_index}")
-                        values.append(item)
-                        param_index += 1
-                    where_parts.append(f"{col} IN ({', '.join(placeholders)})")
-            else:
-                # Pojedyncza wartość - użyj prostego równania
-                where_parts.append(f"{col} = ${param_index}")
-                values.append(val)
-                param_index += 1
-
-        where_clause = " AND ".join(where_parts)
-        query = f"SELECT {column} FROM {table} WHERE {where_clause}"
+    async def _fetch_value(
+        self, table: str, column: str, where_conditions: Dict[str, Any]
+    ) -> Optional[Any]:
+        shape, values = self._build_where(where_conditions)
+        query = self._cached_query(
+            ("value", table, column, shape),
+            lambda: f"SELECT {column} FROM {table} WHERE {self._where_sql(shape)}",
+        )
 
         try:
             debug(
@@ -372,8 +504,7 @@ class DatabaseComponent:
                 message_logger=self._message_logger,
             )
 
-            async with self._conn_lock:
-                return await self._connection.fetchval(query, *values)
+            return await self._run("fetchval", table, query, *values)
 
         except Exception as e:
             error(
@@ -382,6 +513,159 @@ class DatabaseComponent:
             )
             raise
 
+    async def _enqueue_lookup(
+        self, table: str, column: str, where_conditions: Dict[str, Any]
+    ) -> Optional[Any]:
+        """Dołącza wyszukiwanie do oczekujących dla tabeli i czeka na wynik."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        pending = self._pending_lookups.setdefault(table, [])
+        pending.append((column, where_conditions, future))
+        if len(pending) == 1:
+            # Pozostałe współbieżne wywołania dołączą przed następną iteracją
+            loop.call_soon(self._start_flush, table)
+        return await future
+
+    def _start_flush(self, table: str) -> None:
+        task = asyncio.ensure_future(self._flush_lookups(table))
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def _flush_lookups(self, table: str) -> None:
+        pending = self._pending_lookups.pop(table, [])
+        if len(pending) > 1:
+            try:
+                values = await self.check_table_values(
+                    table, [(column, where) for column, where, _ in pending]
+                )
+            except Exception:
+                # Błędne wyszukiwanie nie może zablokować pozostałych - pojedynczo
+                pass
+            else:
+                for (_, _, future), value in zip(pending, values):
+                    if not future.done():
+                        future.set_result(value)
+                return
+
+        for column, where_conditions, future in pending:
+            try:
+                value = await self._fetch_value(table, column, where_conditions)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result(value)
+
+    async def check_table_values(
+        self, table: str, lookups: List[Tuple[str, Dict[str, Any]]]
+    ) -> List[Optional[Any]]:
+        """
+        Pobiera wartości wielu wyszukiwań w jednej tabeli.
+
+        Wyszukiwania z tym samym zestawem kolumn WHERE (same równości) są
+        wykonywane jednym zapytaniem: wartości WHERE trafiają do tablic
+        rozwijanych przez `unnest`, a każdy wiersz jest dopasowany przez
+        `LEFT JOIN LATERAL ... LIMIT 1`. Wyszukiwania z listami wartości
+        są wykonywane pojedynczo.
+
+        Args:
+            table: Nazwa tabeli
+            lookups: Lista par (kolumna, warunki WHERE) jak w `check_table_value`
+
+        Returns:
+            Wartości w kolejności `lookups` (None jeśli nie znaleziono)
+
+        Raises:
+            RuntimeError: Jeśli komponent nie jest połączony
+            ValueError: Jeśli któreś where_conditions jest puste
+        """
+        self._ensure_connected()
+
+        results: List[Optional[Any]] = [None] * len(lookups)
+        groups: Dict[Tuple[str, ...], List[int]] = {}
+        singles: List[int] = []
+        shapes = []
+        for i, (column, where_conditions) in enumerate(lookups):
+            if not where_conditions:
+                raise ValueError("where_conditions nie może być pusty")
+            shape, values = self._build_where(where_conditions)
+            shapes.append((column, values))
+            if all(kind == "eq" for _, kind in shape):
+                groups.setdefault(tuple(col for col, _ in shape), []).append(i)
+            else:
+                singles.append(i)
+
+        for where_columns, indexes in groups.items():
+            if len(indexes) == 1:
+                singles.extend(indexes)
+                continue
+            values = await self._fetch_values_batch(
+                table, where_columns, [shapes[i] for i in indexes]
+            )
+            for i, value in zip(indexes, values):
+                results[i] = value
+
+        for i in singles:
+            results[i] = await self._fetch_value(table, *lookups[i])
+        return results
+
+    async def _fetch_values_batch(
+        self,
+        table: str,
+        where_columns: Tuple[str, ...],
+        items: List[Tuple[str, list]],
+    ) -> List[Optional[Any]]:
+        columns = list(dict.fromkeys(column for column, _ in items))
+        array_types = []
+        for col in where_columns:
+            type_info = await self._get_column_type_info(table, col)
+            array_types.append(f'"{type_info["schema"]}"."{type_info["type"]}"[]')
+
+        def build() -> str:
+            arrays = ", ".join(
+                f"${i + 2}::{array_type}" for i, array_type in enumerate(array_types)
+            )
+            aliases = ", ".join(f"w{i}" for i in range(len(where_columns)))
+            where_clause = " AND ".join(
+                f"{col} = k.w{i}" for i, col in enumerate(where_columns)
+            )
+            selected = ", ".join(f"{col} AS v{i}" for i, col in enumerate(columns))
+            outer = ", ".join(f"t.v{i}" for i in range(len(columns)))
+            return (
+                f"SELECT k.i, {outer} "
+                f"FROM unnest($1::int4[], {arrays}) AS k(i, {aliases}) "
+                f"LEFT JOIN LATERAL (SELECT {selected} FROM {table} "
+                f"WHERE {where_clause} LIMIT 1) AS t ON TRUE"
+            )
+
+        query = self._cached_query(
+            ("batch", table, tuple(columns), where_columns, tuple(array_types)), build
+        )
+        params = [list(range(len(items)))] + [
+            [values[n] for _, values in items] for n in range(len(where_columns))
+        ]
+
+        try:
+            debug(
+                f"🔍 Zapytanie zbiorcze ({len(items)} wyszukiwań) w bazie '{self.name}': "
+                f"{query[:100]}{'...' if len(query) > 100 else ''}",
+                message_logger=self._message_logger,
+            )
+            rows = await self._run("fetch", table, query, *params)
+        except Exception as e:
+            error(
+                f"❌ Błąd zapytania zbiorczego w bazie '{self.name}': {e}",
+                message_logger=self._message_logger,
+            )
+            raise
+
+        by_index = {row[0]: row for row in rows}
+        return [
+            by_index[i][1 + columns.index(column)] if i in by_index else None
+            for i, (column, _) in enumerate(items)
+        ]
+
     async def fetch_records(
         self,
         table: str,
@@ -407,8 +691,7 @@ class DatabaseComponent:
             RuntimeError: Jeśli komponent nie jest połączony
             ValueError: Jeśli where_conditions lub columns są puste
         """
-        if not self._is_connected or not self._connection:
-            raise RuntimeError(f"Komponent bazodanowy '{self.name}' nie jest połączony")
+        self._ensure_connected()
 
         if not where_conditions:
             raise ValueError("where_conditions nie może być pusty")
@@ -416,54 +699,21 @@ class DatabaseComponent:
         if not columns:
             raise ValueError("Lista columns nie może być pusta")
 
-        # Konwertuj wartości WHERE (obsługa enumów)
-        converted_where = self._convert_where_conditions(where_conditions)
+        shape, values = self._build_where(where_conditions)
 
-        # Buduj zapytanie WHERE
-        where_parts = []
-        values = []
-        param_index = 1
+        def build() -> str:
+            query = f"SELECT {', '.join(columns)} FROM {table} WHERE {self._where_sql(shape)}"
+            # Dodaj sortowanie jeśli określone
+            if order_by:
+                query += f" ORDER BY {order_by}"
+            # Dodaj limit jeśli określony
+            if limit is not None:
+                query += f" LIMIT {int(limit)}"
+            return query
 
-        for col, val in converted_where.items():
-            if isinstance(val, list):
-                # Obsługa list - użyj operatora IN
-                if len(val) == 0:
-                    # Pusta lista - warunek niemożliwy do spełnienia
-                    where_parts.append("FALSE")
-                elif len(val) == 1:
-                    # Jeden element - użyj prostego równania
-                    where_parts.append(f"{col} = ${param_index}")
-                    values.append(val[0])
-                    param_index += 1
-                else:
-                    # Wiele elementów - użyj IN
-                    placeholders = []
-                    for item in val:
-                        placeholders.append(f"${param_index}")
-                        values.append(item)
-                        param_index += 1
-                    where_parts.append(f"{col} IN ({', '.join(placeholders)})")
-            else:
-                # Pojedyncza wartość - użyj prostego równania
-                where_parts.append(f"{col} = ${param_index}")
-                values.append(val)
-                param_index += 1
-
-        where_clause = " AND ".join(where_parts)
-
-        # Buduj listę kolumn
-        columns_str = ", ".join(columns)
-
-        # Buduj zapytanie
-        query = f"SELECT {columns_str} FROM {table} WHERE {where_clause}"
-
-        # Dodaj sortowanie jeśli określone
-        if order_by:
-            query += f" ORDER BY {order_by}"
-
-        # Dodaj limit jeśli określony
-        if limit is not None:
-            query += f" LIMIT {limit}"
+        query = self._cached_query(
+            ("records", table, tuple(columns), shape, order_by, limit), build
+        )
 
         try:
             debug(
@@ -471,14 +721,10 @@ class DatabaseComponent:
                 message_logger=self._message_logger,
             )
 
-            async with self._conn_lock:
-                rows = await self._connection.fetch(query, *values)
+            rows = await self._run("fetch", table, query, *values)
 
             # Konwertuj wyniki na listę słowników
-            results = []
-            for row in rows:
-                record = dict(row)
-                results.append(record)
+            results = [dict(row) for row in rows]
 
             debug(
                 f"✅ Pobrano {len(results)} rekordów z tabeli '{table}'",
@@ -517,65 +763,27 @@ class DatabaseComponent:
             RuntimeError: Jeśli komponent nie jest połączony
             ValueError: Jeśli where_conditions jest puste
         """
-        if not self._is_connected or not self._connection:
-            raise RuntimeError(f"Komponent bazodanowy '{self.name}' nie jest połączony")
+        self._ensure_connected()
 
         if not where_conditions:
             raise ValueError("where_conditions nie może być pusty")
 
-        # Buduj SET i WHERE
-        param_index = 1
-        values = []
-
-        # Konwertuj wartość SET na string (jeśli to Enum)
+        # Wartość SET jako parametr $1 (Enum → .value), WHERE od $2
         set_value = self._to_db_value_for_column(column, value)
-        if hasattr(set_value, "value"):
-            set_value = set_value.value  # Pobierz .value z enuma dla asyncpg
-
-        set_clause = f"{column} = ${param_index}"
-        values.append(set_value)
-        param_index += 1
-
-        where_parts = []
-        converted_where = self._convert_where_conditions(where_conditions)
-        for col, val in converted_where.items():
-            if hasattr(val, "value"):
-                val = val.value  # Pobierz .value z enuma dla asyncpg
-
-            if isinstance(val, list):
-                # Obsługa list - użyj operatora IN
-                if len(val) == 0:
-                    # Pusta lista - warunek niemożliwy do spełnienia
-                    where_parts.append("FALSE")
-                elif len(val) == 1:
-                    # Jeden element - użyj prostego równania
-                    where_parts.append(f"{col} = ${param_index}")
-                    values.append(val[0])
-                    param_index += 1
-                else:
-                    # Wiele elementów - użyj IN
-                    placeholders = []
-                    for item in val:
-                        placeholders.append(f"${param_index}")
-                        values.append(item)
-                        param_index += 1
-                    where_parts.append(f"{col} IN ({', '.join(placeholders)})")
-            else:
-                # Pojedyncza wartość - użyj prostego równania
-                where_parts.append(f"{col} = ${param_index}")
-                values.append(val)
-                param_index += 1
-
-        where_clause = " AND ".join(where_parts)
-        query = f"UPDATE {table} SET {set_clause} WHERE {where_clause}"
+        shape, values = self._build_where(where_conditions)
+        query = self._cached_query(
+            ("update", table, column, shape),
+            lambda: (
+                f"UPDATE {table} SET {column} = $1 WHERE {self._where_sql(shape, 2)}"
+            ),
+        )
 
         try:
             debug(
                 f"✏️ UPDATE w bazie '{self.name}': {query[:100]}{'...' if len(query) > 100 else ''}",
                 message_logger=self._message_logger,
             )
-            async with self._conn_lock:
-                status = await self._connection.execute(query, *values)
+            status = await self._run("execute", table, query, set_value, *values)
             # status ma postać np. 'UPDATE 3'
             try:
                 affected = int(status.split()[-1])
@@ -593,6 +801,9 @@ class DatabaseComponent:
         """
         Zwraca informacje o typie kolumny (pełna nazwa typu i czy to enum).
 
+        Wynik jest zapamiętywany per tabela/kolumna do czasu unieważnienia
+        (`invalidate_column_type_cache`).
+
         Args:
             table: nazwa tabeli (może być kwalifikowana schematem)
             column: nazwa kolumny
@@ -600,8 +811,7 @@ class DatabaseComponent:
         Returns:
             Słownik {"schema": str, "type": str, "fq_type": str, "is_enum": bool}
         """
-        if not self._is_connected or not self._connection:
-            raise RuntimeError(f"Komponent bazodanowy '{self.name}' nie jest połączony")
+        self._ensure_connected()
 
         cache_key = f"{table}.{column}"
         cached = self._column_type_cache.get(cache_key)
@@ -614,11 +824,10 @@ class DatabaseComponent:
             "JOIN pg_catalog.pg_class c ON c.oid = a.attrelid "
             "JOIN pg_catalog.pg_type t ON t.oid = a.atttypid "
             "JOIN pg_catalog.pg_namespace n ON n.oid = t.typnamespace "
-            "WHERE c.oid = $1::regclass AND a.attname = $2"
+            "WHERE c.oid = $1::regclass AND a.attname = $2 AND NOT a.attisdropped"
         )
 
-        async with self._conn_lock:
-            row = await self._connection.fetchrow(sql, table, column)
+        row = await self._run("fetchrow", table, sql, table, column)
 
         if not row:
             raise ValueError(f"Nie znaleziono kolumny {column} w tabeli {table}")
@@ -647,8 +856,7 @@ class DatabaseComponent:
 
         Jeśli kolumny są różnych typów enum, zastosuje rzutowanie: source::text::target_type.
         """
-        if not self._is_connected or not self._connection:
-            raise RuntimeError(f"Komponent bazodanowy '{self.name}' nie jest połączony")
+        self._ensure_connected()
 
         if not where_conditions:
             raise ValueError("where_conditions nie może być pusty")
@@ -667,49 +875,21 @@ class DatabaseComponent:
         else:
             set_expr = f"{source_column}"
 
-        # WHERE z konwersją wartości (obsługa enumów w where)
-        param_index = 1
-        values = []
-        where_parts = []
-        converted_where = self._convert_where_conditions(where_conditions)
-        for col, val in converted_where.items():
-            if hasattr(val, "value"):
-                val = val.value
-
-            if isinstance(val, list):
-                # Obsługa list - użyj operatora IN
-                if len(val) == 0:
-                    # Pusta lista - warunek niemożliwy do spełnienia
-                    where_parts.append("FALSE")
-                elif len(val) == 1:
-                    # Jeden element - użyj prostego równania
-                    where_parts.append(f"{col} = ${param_index}")
-                    values.append(val[0])
-                    param_index += 1
-                else:
-                    # Wiele elementów - użyj IN
-                    placeholders = []
-                    for item in val:
-                        placeholders.append(f"${param_index}")
-                        values.append(item)
-                        param_index += 1
-                    where_parts.append(f"{col} IN ({', '.join(placeholders)})")
-            else:
-                # Pojedyncza wartość - użyj prostego równania
-                where_parts.append(f"{col} = ${param_index}")
-                values.append(val)
-                param_index += 1
-
-        where_clause = " AND ".join(where_parts)
-        query = f"UPDATE {table} SET {target_column} = {set_expr} WHERE {where_clause}"
+        shape, values = self._build_where(where_conditions)
+        query = self._cached_query(
+            ("copy", table, target_column, set_expr, shape),
+            lambda: (
+                f"UPDATE {table} SET {target_column} = {set_expr} "
+                f"WHERE {self._where_sql(shape)}"
+            ),
+        )
 
         try:
             debug(
                 f"✏️ UPDATE (copy) w bazie '{self.name}': {query[:120]}{'...' if len(query) > 120 else ''}",
                 message_logger=self._message_logger,
             )
-            async with self._conn_lock:
-                status = await self._connection.execute(query, *values)
+            status = await self._run("execute", table, query, *values)
             try:
                 affected = int(status.split()[-1])
             except Exception:
@@ -738,6 +918,9 @@ class DatabaseComponent:
             "database_name": self._connection_params.get("database", "unknown"),
             "database_port": self._connection_params.get("port", "unknown"),
             "name": self._connection_params.get("name", "unknown"),
+            "pool_size": self._pool.get_size() if self._pool is not None else 0,
+            "pool_idle": self._pool.get_idle_size() if self._pool is not None else 0,
+            "query_count": self._query_count,
         }
 
     def to_dict(self) -> Dict[str, Any]:
@@ -763,5 +946,6 @@ class DatabaseComponent:
             "is_initialized": self._is_initialized,
             "is_connected": self._is_connected,
             "column_type_cache_keys": list(self._column_type_cache.keys()),
+            "query_cache_size": len(self._query_cache),
             "status": self.get_status(),
         }
@@ -0,0 +1,193 @@
+"""
+Cache wyników zapytań warunków bazodanowych.
+
+Wiele scenariuszy obserwujących ten sam wiersz korzysta z jednego zapytania:
+wynik jest zapamiętywany na `cache_ttl` sekund (konfiguracja warunku), a
+identyczne zapytania wykonywane w tym samym czasie czekają na pierwsze z nich.
+Akcje `database_update` unieważniają wpisy tabeli, do której piszą.
+
+Orchestrator przed ewaluacją scenariuszy w cyklu pobiera wartości wszystkich
+warunków `database` współbieżnie (`prefetch`), więc komponent łączy je
+w zapytania per tabela; kolejne `get` w tym cyklu czytają pobrane wartości
+także przy `cache_ttl` = 0, aż do `clear_prefetched`.
+
+Liczba zapamiętanych wyników jest ograniczona (`max_entries`, domyślnie 1024) -
+warunki z WHERE z szablonów (np. identyfikatory zamówień) tworzą ciągle nowe
+klucze, więc najdawniej używane wpisy są usuwane (LRU).
+
+Granica nieaktualności: wartość zwrócona z cache pochodzi z zapytania
+rozpoczętego nie wcześniej niż `cache_ttl` sekund temu i nie sprzed ostatniego
+unieważnienia tabeli.
+
+Cache jest współdzielony per komponent bazodanowy (`result_cache_for`).
+"""
+
+import asyncio
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+
+DEFAULT_MAX_ENTRIES = 1024
+
+
+def freeze(value: Any) -> Any:
+    """Zamienia słowniki i listy na krotki, aby wartość mogła być kluczem cache."""
+    if isinstance(value, dict):
+        return tuple(sorted((key, freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def _consume_exception(task: asyncio.Task) -> None:
+    """Odczytuje wyjątek zapytania, na które nikt już nie czeka."""
+    if not task.cancelled():
+        task.exception()
+
+
+class DatabaseResultCache:
+    """
+    Cache wyników z TTL i łączeniem identycznych zapytań w locie.
+
+    Klucz ma postać (rodzaj, tabela, ...) - drugi element wskazuje tabelę
+    używaną przy unieważnianiu. Najwyżej `max_entries` wyników (LRU).
+    """
+
+    def __init__(
+        self,
+        clock: Callable[[], float] = time.monotonic,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        self._clock = clock
+        self._max_entries = max(int(max_entries), 1)
+        self._entries: OrderedDict[tuple, Tuple[float, Any]] = OrderedDict()
+        self._in_flight: Dict[tuple, asyncio.Task] = {}
+        self._generations: Dict[str, int] = {}
+        # Wartości pobrane przez `prefetch` w bieżącym cyklu orchestratora
+        self._prefetched: Dict[tuple, Any] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    async def get(
+        self, key: tuple, ttl: float, fetch: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        Zwraca wynik z cache lub wykonuje `fetch`.
+
+        Args:
+            key: Klucz (rodzaj, tabela, ...) z wartościami zamrożonymi przez `freeze`.
+            ttl: Maksymalny wiek wyniku w sekundach; 0 wyłącza zapamiętywanie,
+                ale identyczne zapytania w locie nadal są łączone.
+            fetch: Funkcja wykonująca zapytanie.
+
+        Returns:
+            Wynik zapytania (współdzielony - nie należy go modyfikować).
+        """
+        if key in self._prefetched:
+            self.hits += 1
+            return self._prefetched[key]
+        started = self._clock()
+        entry = self._entries.get(key)
+        if entry is not None:
+            if ttl > 0 and started - entry[0] <= ttl:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return entry[1]
+            del self._entries[key]
+
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+
+        self.misses += 1
+        table = key[1]
+        generation = self._generations.get(table, 0)
+
+        async def run() -> Any:
+            try:
+                value = await fetch()
+            finally:
+                if self._in_flight.get(key) is task:
+                    del self._in_flight[key]
+            if ttl > 0 and self._generations.get(table, 0) == generation:
+                self._entries[key] = (started, value)
+                self._entries.move_to_end(key)
+                if len(self._entries) > self._max_entries:
+                    self._entries.popitem(last=False)
+            return value
+
+        # Zapytanie w osobnym zadaniu: anulowanie wywołującego, który je
+        # rozpoczął, nie anuluje go pozostałym oczekującym
+        task = asyncio.ensure_future(run())
+        task.add_done_callback(_consume_exception)
+        self._in_flight[key] = task
+        return await asyncio.shield(task)
+
+    async def prefetch(
+        self, key: tuple, ttl: float, fetch: Callable[[], Awaitable[Any]]
+    ) -> None:
+        """
+        Pobiera wartość jak `get` i udostępnia ją do końca cyklu (`clear_prefetched`).
+
+        Błędy zapytania są pomijane - ewaluacja warunku wykona je ponownie
+        i obsłuży błąd jak wcześniej.
+        """
+        table = key[1]
+        generation = self._generations.get(table, 0)
+        try:
+            value = await self.get(key, ttl, fetch)
+        except Exception:
+            return
+        if self._generations.get(table, 0) == generation:
+            self._prefetched[key] = value
+
+    def clear_prefetched(self) -> None:
+        """Kończy cykl: kolejne `get` znów korzystają tylko z TTL."""
+        self._prefetched.clear()
+
+    def invalidate(self, table: Optional[str] = None) -> None:
+        """
+        Unieważnia wyniki tabeli (lub wszystkie, gdy `table` jest None).
+
+        Zapytania w locie rozpoczęte przed unieważnieniem nie zapiszą wyniku,
+        a nowe wywołania nie będą na nie czekać.
+        """
+        if table is None:
+            tables = {
+                key[1]
+                for mapping in (self._entries, self._in_flight, self._prefetched)
+                for key in mapping
+            }
+        else:
+            tables = {table}
+        for name in tables:
+            self._generations[name] = self._generations.get(name, 0) + 1
+        for mapping in (self._entries, self._in_flight, self._prefetched):
+            for key in [k for k in mapping if table is None or k[1] == table]:
+                del mapping[key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_caches: "weakref.WeakKeyDictionary[Any, DatabaseResultCache]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def result_cache_for(db_component: Any) -> DatabaseResultCache:
+    """Zwraca cache wyników współdzielony przez warunki danego komponentu."""
+    cache = _caches.get(db_component)
+    if cache is None:
+        cache = _caches[db_component] = DatabaseResultCache()
+    return cache
+
+
+def clear_prefetched_results() -> None:
+    """Kończy cykl prefetch we wszystkich cache (wywołuje Orchestrator)."""
+    for cache in list(_caches.values()):
+        cache.clear_prefetched()
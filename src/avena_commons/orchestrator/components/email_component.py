@@ -4,16 +4,35 @@ Komponent email dla orchestratora.
 Obsługuje wysyłanie e-maili przez SMTP. Centralizuje konfigurację
 i funkcjonalności wspólne dla wszystkich akcji email. Wspiera podstawowe
 uwierzytelnianie i TLS/STARTTLS.
+
+Wysyłka odbywa się w tle: `send_email` dodaje wiadomość do ograniczonej
+kolejki, a worker dostarcza ją przez trwałą sesję SMTP (wywołania `smtplib`
+w wątku przez `asyncio.to_thread`), więc wolny serwer SMTP nie blokuje pętli
+zdarzeń orchestratora.
 """
 
+import asyncio
 import os
 import smtplib
+import time
+from collections import deque
+from dataclasses import dataclass, field
 from email.message import EmailMessage
-from typing import Any, Dict, List
+from typing import Any, Deque, Dict, List, Optional
 
 from avena_commons.util.logger import debug, error, info, warning
 
 
+@dataclass
+class _OutgoingEmail:
+    """Wiadomość w kolejce wysyłki."""
+
+    message: EmailMessage
+    recipients: List[str]
+    attempts: int = 0
+    delivered: Optional[asyncio.Future] = field(default=None, repr=False)
+
+
 class EmailComponent:
     """
     Komponent do obsługi wysyłania e-maili przez SMTP.
@@ -31,6 +50,18 @@ class EmailComponent:
     - tls: Czy używać TLS (alternatywa dla STARTTLS, domyślnie False)
     - enabled: Czy email jest włączony (bool)
     - max_error_attempts: Maksymalna liczba kolejnych błędów przed wyłączeniem (domyślnie 0)
+
+    Parametry opcjonalne wysyłki w tle:
+    - queue_size: Pojemność kolejki wysyłki (domyślnie 1000)
+    - timeout: Timeout operacji SMTP w sekundach (domyślnie 30)
+    - session_idle_timeout: Po tylu sekundach bezczynności sesja SMTP jest
+      otwierana od nowa (domyślnie 60)
+    - max_retries: Liczba ponowień przy błędach przejściowych (domyślnie 3)
+    - retry_backoff / retry_backoff_max: Opóźnienie pierwszego ponowienia i jego
+      górna granica w sekundach, opóźnienie rośnie dwukrotnie (domyślnie 1 / 30)
+    - rate_limit_count / rate_limit_window: Maksymalna liczba wiadomości do
+      jednego odbiorcy w oknie sekund; nadmiarowe są pomijane (domyślnie
+      0 - limit wyłączony / 60)
     """
 
     def __init__(self, name: str, config: Dict[str, Any], message_logger=None):
@@ -58,6 +89,29 @@ class EmailComponent:
         self._use_tls = False
         self._max_error_attempts = 0
 
+        # Wysyłka w tle
+        self._queue_size = 1000
+        self._timeout = 30.0
+        self._session_idle_timeout = 60.0
+        self._max_retries = 3
+        self._retry_backoff = 1.0
+        self._retry_backoff_max = 30.0
+        self._rate_limit_count = 0
+        self._rate_limit_window = 60.0
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._delivery: Optional[asyncio.Future] = None  # wysyłka w wątku
+        self._session: Optional[smtplib.SMTP] = None
+        self._session_used_at = 0.0
+        self._recipient_history: Dict[str, Deque[float]] = {}
+        self._stats = {
+            "sent": 0,
+            "failed": 0,
+            "retried": 0,
+            "rate_limited": 0,
+            "sessions_opened": 0,
+        }
+
     def validate_config(self) -> bool:
         """
         Waliduje konfigurację komponentu email.
@@ -146,6 +200,18 @@ class EmailComponent:
             except (ValueError, TypeError):
                 self._max_error_attempts = 0
 
+            # Parametry wysyłki w tle
+            self._queue_size = int(self.config.get("queue_size", 1000))
+            self._timeout = float(self.config.get("timeout", 30.0))
+            self._session_idle_timeout = float(
+                self.config.get("session_idle_timeout", 60.0)
+            )
+            self._max_retries = int(self.config.get("max_retries", 3))
+            self._retry_backoff = float(self.config.get("retry_backoff", 1.0))
+            self._retry_backoff_max = float(self.config.get("retry_backoff_max", 30.0))
+            self._rate_limit_count = int(self.config.get("rate_limit_count", 0))
+            self._rate_limit_window = float(self.config.get("rate_limit_window", 60.0))
+
             self._is_initialized = True
 
             info(
@@ -164,10 +230,10 @@ class EmailComponent:
 
     async def connect(self) -> bool:
         """
-        Nawiązuje połączenie SMTP z serwerem email.
+        Uruchamia worker wysyłki i sprawdza dostępność serwera SMTP.
 
         Returns:
-            True jeśli połączenie zostało nawiązane pomyślnie
+            True jeśli serwer SMTP odpowiada (lub komponent jest wyłączony)
         """
         if not self._is_initialized:
             error(
@@ -183,23 +249,58 @@ class EmailComponent:
             )
             return True  # Uznajemy za sukces jeśli komponent jest wyłączony
 
+        self._ensure_worker()
         return await self.health_check()
 
-    async def disconnect(self) -> bool:
+    async def disconnect(self, drain_timeout: float = 10.0) -> bool:
         """
-        Rozłącza połączenie z serwerem SMTP.
+        Zatrzymuje worker wysyłki i zamyka sesję SMTP.
 
-        Dla komponentu email nie ma trwałego połączenia do rozłączenia,
-        więc metoda zawsze zwraca True.
+        Wiadomości z kolejki są dostarczane przez najwyżej `drain_timeout`
+        sekund, pozostałe są porzucane.
 
         Returns:
-            True zawsze (metoda dla kompatybilności z interfejsem)
+            True jeśli rozłączenie przebiegło pomyślnie
         """
-        debug(
-            f"🔌 Rozłączanie komponentu email '{self.name}' (brak trwałego połączenia)",
-            message_logger=self._message_logger,
-        )
-        return True
+        try:
+            if self._worker is not None and not self._worker.done():
+                try:
+                    await asyncio.wait_for(self._queue.join(), timeout=drain_timeout)
+                except asyncio.TimeoutError:
+                    warning(
+                        f"Komponent email '{self.name}': porzucono {self._queue.qsize()} "
+                        f"wiadomości z kolejki przy rozłączaniu",
+                        message_logger=self._message_logger,
+                    )
+                self._worker.cancel()
+                try:
+                    await self._worker
+                except asyncio.CancelledError:
+                    pass
+                if self._delivery is not None and not self._delivery.done():
+                    await asyncio.wait(
+                        [asyncio.shield(self._delivery)], timeout=self._timeout
+                    )
+                while not self._queue.empty():
+                    outgoing = self._queue.get_nowait()
+                    if outgoing.delivered is not None and not outgoing.delivered.done():
+                        outgoing.delivered.set_exception(
+                            RuntimeError(f"Komponent email '{self.name}' rozłączony")
+                        )
+            self._worker = None
+            self._queue = None
+            await asyncio.to_thread(self._close_session)
+            debug(
+                f"🔌 Rozłączono komponent email '{self.name}'",
+                message_logger=self._message_logger,
+            )
+            return True
+        except Exception as e:
+            error(
+                f"❌ Błąd rozłączania komponentu email '{self.name}': {e}",
+                message_logger=self._message_logger,
+            )
+            return False
 
     async def health_check(self) -> bool:
         """
@@ -218,19 +319,16 @@ class EmailComponent:
             )
             return False
 
-        # Opcjonalnie: spróbuj nawiązać połączenie SMTP jako test zdrowia
+        # Nawiązanie połączenia SMTP jako test zdrowia (w wątku - nie blokuje pętli)
+        def probe() -> None:
+            smtp = self._open_smtp(timeout=5, login=False)
+            try:
+                smtp.quit()
+            except smtplib.SMTPException:
+                smtp.close()
+
         try:
-            if self._use_tls:
-                with smtplib.SMTP_SSL(
-                    host=self._host, port=self._port, timeout=5
-                ) as smtp:
-                    smtp.ehlo()
-            else:
-                with smtplib.SMTP(host=self._host, port=self._port, timeout=5) as smtp:
-                    smtp.ehlo()
-                    if self._use_starttls:
-                        smtp.starttls()
-                        smtp.ehlo()
+            await asyncio.to_thread(probe)
             return True
         except Exception as e:
             warning(
@@ -281,21 +379,29 @@ class EmailComponent:
 
         return recipients
 
-    async def send_email(self, recipients: List[str], subject: str, body: str) -> bool:
+    async def send_email(
+        self, recipients: List[str], subject: str, body: str, wait: bool = False
+    ) -> bool:
         """
-        Wysyła e-mail do listy odbiorców.
+        Dodaje e-mail do kolejki wysyłki.
+
+        Odbiorcy, którzy przekroczyli limit wiadomości w oknie
+        (`rate_limit_count` / `rate_limit_window`), są pomijani.
 
         Args:
             recipients: Lista adresów email
             subject: Temat wiadomości
             body: Treść wiadomości
+            wait: Czekaj na dostarczenie i zgłoś błąd wysyłki jako wyjątek
 
         Returns:
-            True jeśli wysyłka zakończona sukcesem
+            True jeśli wiadomość została przyjęta (lub dostarczona przy `wait`),
+            False jeśli wszyscy odbiorcy przekroczyli limit
 
         Raises:
-            RuntimeError: Jeśli komponent nie jest zainicjalizowany
+            RuntimeError: Jeśli komponent nie jest zainicjalizowany lub kolejka jest pełna
             ValueError: Jeśli brakuje wymaganych danych
+            smtplib.SMTPException: Błąd wysyłki (tylko przy `wait`)
         """
         if not self._is_initialized:
             raise RuntimeError(
@@ -316,72 +422,204 @@ class EmailComponent:
         if not body:
             raise ValueError("Brak treści wiadomości")
 
+        allowed = self._apply_rate_limit(recipients)
+        if not allowed:
+            warning(
+                f"📧 Pomijam e-mail '{subject}' - limit wiadomości dla {recipients}",
+                message_logger=self._message_logger,
+            )
+            return False
+
         # Zbuduj wiadomość
         message = EmailMessage()
         message["From"] = self._mail_from
-        message["To"] = ", ".join(recipients)
+        message["To"] = ", ".join(allowed)
         message["Subject"] = subject
         message.set_content(body)
 
-        # Połączenie SMTP i wysyłka
+        self._ensure_worker()
+        outgoing = _OutgoingEmail(message=message, recipients=allowed)
+        if wait:
+            outgoing.delivered = asyncio.get_running_loop().create_future()
         try:
-            if self._use_tls:
-                # SMTPS (implicit TLS), zwykle port 465
-                with smtplib.SMTP_SSL(host=self._host, port=self._port) as smtp:
-                    smtp.ehlo()
-                    if self._username and self._password and smtp.has_extn("auth"):
-                        smtp.login(self._username, self._password)
-                    elif self._username and self._password:
-                        warning(
-                            f"Serwer SMTP '{self._host}' nie wspiera AUTH - pomijam logowanie",
-                            message_logger=self._message_logger,
-                        )
-                    smtp.send_message(message)
-            else:
-                with smtplib.SMTP(host=self._host, port=self._port) as smtp:
-                    smtp.ehlo()
-                    if self._use_starttls:
-                        smtp.starttls()
-                        smtp.ehlo()
-                    if self._username and self._password and smtp.has_extn("auth"):
-                        smtp.login(self._username, self._password)
-                    elif self._username and self._password:
-                        warning(
-                            f"Serwer SMTP '{self._host}' nie wspiera AUTH - pomijam logowanie",
-                            message_logger=self._message_logger,
-                        )
-                    smtp.send_message(message)
+            self._queue.put_nowait(outgoing)
+        except asyncio.QueueFull:
+            raise RuntimeError(
+                f"Komponent email '{self.name}': kolejka wysyłki pełna "
+                f"({self._queue_size} wiadomości)"
+            )
+
+        debug(
+            f"📧 E-mail do {allowed} w kolejce (oczekuje: {self._queue.qsize()})",
+            message_logger=self._message_logger,
+        )
+        if wait:
+            await outgoing.delivered
+        return True
+
+    def _apply_rate_limit(self, recipients: List[str]) -> List[str]:
+        """Zwraca odbiorców mieszczących się w limicie i odnotowuje wysyłkę."""
+        if self._rate_limit_count <= 0:
+            return list(recipients)
+        now = time.monotonic()
+        allowed = []
+        for recipient in recipients:
+            history = self._recipient_history.setdefault(recipient.lower(), deque())
+            while history and now - history[0] >= self._rate_limit_window:
+                history.popleft()
+            if len(history) >= self._rate_limit_count:
+                self._stats["rate_limited"] += 1
+                continue
+            history.append(now)
+            allowed.append(recipient)
+        return allowed
+
+    def _ensure_worker(self) -> None:
+        """Tworzy kolejkę i uruchamia worker wysyłki, jeśli nie działa."""
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self._queue_size)
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(
+                self._delivery_worker(), name=f"email_worker_{self.name}"
+            )
 
+    async def _delivery_worker(self) -> None:
+        """Dostarcza wiadomości z kolejki po kolei, ponawiając błędy przejściowe."""
+        while True:
+            outgoing = await self._queue.get()
+            try:
+                await self._deliver_with_retry(outgoing)
+            except asyncio.CancelledError:
+                if outgoing.delivered is not None and not outgoing.delivered.done():
+                    outgoing.delivered.cancel()
+                raise
+            finally:
+                self._queue.task_done()
+
+    async def _deliver_with_retry(self, outgoing: _OutgoingEmail) -> None:
+        subject = outgoing.message["Subject"]
+        while True:
+            outgoing.attempts += 1
+            try:
+                # Anulowanie workera nie przerywa wysyłki w wątku - disconnect
+                # czeka na nią przed zamknięciem sesji
+                self._delivery = asyncio.ensure_future(
+                    asyncio.to_thread(self._deliver, outgoing.message)
+                )
+                await asyncio.shield(self._delivery)
+            except Exception as e:
+                if self._is_transient(e) and outgoing.attempts <= self._max_retries:
+                    delay = min(
+                        self._retry_backoff * 2 ** (outgoing.attempts - 1),
+                        self._retry_backoff_max,
+                    )
+                    self._stats["retried"] += 1
+                    warning(
+                        f"📧 Błąd wysyłki '{subject}' (próba {outgoing.attempts}): {e} - "
+                        f"ponowienie za {delay:.1f} s",
+                        message_logger=self._message_logger,
+                    )
+                    await asyncio.sleep(delay)
+                    continue
+
+                self._stats["failed"] += 1
+                error(
+                    f"❌ Nie wysłano e-maila '{subject}' do {outgoing.recipients}: {e}",
+                    message_logger=self._message_logger,
+                )
+                if outgoing.delivered is not None and not outgoing.delivered.done():
+                    outgoing.delivered.set_exception(e)
+                return
+
+            self._stats["sent"] += 1
             info(
-                f"📧 E-mail wysłany do {recipients} z tematem '{subject}'",
+                f"📧 E-mail wysłany do {outgoing.recipients} z tematem '{subject}'",
                 message_logger=self._message_logger,
             )
+            if outgoing.delivered is not None and not outgoing.delivered.done():
+                outgoing.delivered.set_result(True)
+            return
+
+    @staticmethod
+    def _is_transient(exc: Exception) -> bool:
+        """Czy warto ponowić wysyłkę: zerwane połączenie lub odpowiedź 4xx."""
+        if isinstance(exc, smtplib.SMTPRecipientsRefused):
+            return all(400 <= code < 500 for code, _ in exc.recipients.values())
+        if isinstance(exc, smtplib.SMTPResponseException):
+            return 400 <= exc.smtp_code < 500
+        if isinstance(exc, smtplib.SMTPServerDisconnected):
             return True
+        if isinstance(exc, smtplib.SMTPException):
+            return False
+        return isinstance(exc, OSError)
 
-        except smtplib.SMTPAuthenticationError as e:
-            error(
-                f"Błąd uwierzytelniania SMTP: {e}",
-                message_logger=self._message_logger,
-            )
-            raise
-        except smtplib.SMTPRecipientsRefused as e:
-            error(
-                f"Odbiorcy odrzuceni przez serwer SMTP: {e}",
-                message_logger=self._message_logger,
-            )
-            raise
-        except smtplib.SMTPException as e:
-            error(
-                f"Błąd SMTP: {e}",
-                message_logger=self._message_logger,
-            )
-            raise
-        except Exception as e:
-            error(
-                f"Nieoczekiwany błąd przy wysyłce e-mail: {e}",
-                message_logger=self._message_logger,
-            )
+    def _open_smtp(self, timeout: float, login: bool = True) -> smtplib.SMTP:
+        """Otwiera połączenie SMTP (TLS/STARTTLS, logowanie). Wywoływane w wątku."""
+        if self._use_tls:
+            # SMTPS (implicit TLS), zwykle port 465
+            smtp = smtplib.SMTP_SSL(host=self._host, port=self._port, timeout=timeout)
+        else:
+            smtp = smtplib.SMTP(host=self._host, port=self._port, timeout=timeout)
+        try:
+            smtp.ehlo()
+            if not self._use_tls and self._use_starttls:
+                smtp.starttls()
+                smtp.ehlo()
+            if login and self._username and self._password:
+                if smtp.has_extn("auth"):
+                    smtp.login(self._username, self._password)
+                else:
+                    warning(
+                        f"Serwer SMTP '{self._host}' nie wspiera AUTH - pomijam logowanie",
+                        message_logger=self._message_logger,
+                    )
+        except Exception:
+            smtp.close()
             raise
+        return smtp
+
+    def _close_session(self) -> None:
+        """Zamyka trwałą sesję SMTP. Wywoływane w wątku."""
+        smtp, self._session = self._session, None
+        if smtp is None:
+            return
+        try:
+            smtp.quit()
+        except Exception:
+            smtp.close()
+
+    def _deliver(self, message: EmailMessage) -> None:
+        """
+        Wysyła wiadomość przez trwałą sesję SMTP. Wywoływane w wątku.
+
+        Sesja bezczynna dłużej niż `session_idle_timeout` jest otwierana od
+        nowa, zerwana sesja jest odnawiana jednokrotnie przed zgłoszeniem błędu.
+        """
+        if (
+            self._session is not None
+            and time.monotonic() - self._session_used_at > self._session_idle_timeout
+        ):
+            self._close_session()
+
+        for reconnect in (False, True):
+            if self._session is None:
+                self._session = self._open_smtp(timeout=self._timeout)
+                self._stats["sessions_opened"] += 1
+            try:
+                self._session.send_message(message)
+                self._session_used_at = time.monotonic()
+                return
+            except smtplib.SMTPServerDisconnected:
+                self._session = None
+                if reconnect:
+                    raise
+            except smtplib.SMTPRecipientsRefused:
+                # Sesja pozostaje poprawna (smtplib wykonał RSET)
+                self._session_used_at = time.monotonic()
+                raise
+            except Exception:
+                self._close_session()
+                raise
 
     def get_status(self) -> Dict[str, Any]:
         """
@@ -401,6 +639,9 @@ class EmailComponent:
             "use_starttls": self._use_starttls,
             "use_tls": self._use_tls,
             "max_error_attempts": self._max_error_attempts,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "session_open": self._session is not None,
+            **self._stats,
         }
 
     def to_dict(self) -> Dict[str, Any]:
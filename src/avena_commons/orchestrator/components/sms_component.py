@@ -4,16 +4,40 @@ Komponent SMS dla orchestratora.
 Obsługuje wysyłanie SMS-ów przez MultiInfo Plus API (Api61).
 Centralizuje konfigurację i funkcjonalności wspólne dla wszystkich akcji SMS.
 Zawiera metody normalizacji numerów, segmentacji wiadomości i wysyłki SMS.
+
+Wysyłka odbywa się w tle: `send_sms` dodaje wiadomości do ograniczonej
+kolejki, a workery wysyłają je przez jedną sesję aiohttp (z pulą połączeń
+keep-alive), więc wolna bramka SMS nie blokuje pętli zdarzeń orchestratora.
 """
 
+import asyncio
 import os
+import ssl
+import time
+from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional, Tuple
 
-import requests
+import aiohttp
 
 from avena_commons.util.logger import debug, error, info, warning
 
 
+@dataclass
+class _OutgoingSms:
+    """SMS do jednego odbiorcy (wszystkie segmenty) w kolejce wysyłki."""
+
+    dest: str
+    text: str
+    segments: List[str]
+    ignore_errors: bool = False
+    errors: List[str] = field(default_factory=list)
+    delivered: Optional[asyncio.Future] = field(default=None, repr=False)
+
+
+class _TransientSmsError(Exception):
+    """Błąd bramki, po którym warto ponowić wysyłkę (5xx, 429)."""
+
+
 class SmsComponent:
     """
     Komponent do obsługi wysyłania SMS-ów przez MultiInfo Plus API.
@@ -32,6 +56,16 @@ class SmsComponent:
     - cert_path: Ścieżka do certyfikatu TLS (opcjonalnie)
     - max_length: Maksymalna długość segmentu SMS (domyślnie 160)
     - max_error_attempts: Maksymalna liczba kolejnych błędów przed wyłączeniem (domyślnie 0)
+
+    Parametry opcjonalne wysyłki w tle:
+    - queue_size: Pojemność kolejki wysyłki w SMS-ach do odbiorcy (domyślnie 1000)
+    - concurrency: Liczba równoległych żądań do bramki (domyślnie 4)
+    - timeout: Timeout żądania HTTP w sekundach (domyślnie 30)
+    - max_retries: Liczba ponowień przy błędach przejściowych (domyślnie 3)
+    - retry_backoff / retry_backoff_max: Opóźnienie pierwszego ponowienia i jego
+      górna granica w sekundach, opóźnienie rośnie dwukrotnie (domyślnie 1 / 30)
+    - dedup_window: Identyczny SMS do tego samego odbiorcy w ciągu tylu sekund
+      jest pomijany (domyślnie 60, 0 wyłącza deduplikację)
     """
 
     def __init__(self, name: str, config: Dict[str, Any], message_logger=None):
@@ -59,6 +93,25 @@ class SmsComponent:
         self._max_length = 160
         self._max_error_attempts = 0
 
+        # Wysyłka w tle
+        self._queue_size = 1000
+        self._concurrency = 4
+        self._timeout = 30.0
+        self._max_retries = 3
+        self._retry_backoff = 1.0
+        self._retry_backoff_max = 30.0
+        self._dedup_window = 60.0
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._recent: Dict[Tuple[str, str], float] = {}  # (numer, treść) -> czas
+        self._stats = {
+            "sent": 0,
+            "failed": 0,
+            "retried": 0,
+            "deduplicated": 0,
+        }
+
     def validate_config(self) -> bool:
         """
         Waliduje konfigurację komponentu SMS.
@@ -144,6 +197,15 @@ class SmsComponent:
             except (ValueError, TypeError):
                 self._max_error_attempts = 0
 
+            # Parametry wysyłki w tle
+            self._queue_size = int(self.config.get("queue_size", 1000))
+            self._concurrency = max(1, int(self.config.get("concurrency", 4)))
+            self._timeout = float(self.config.get("timeout", 30.0))
+            self._max_retries = int(self.config.get("max_retries", 3))
+            self._retry_backoff = float(self.config.get("retry_backoff", 1.0))
+            self._retry_backoff_max = float(self.config.get("retry_backoff_max", 30.0))
+            self._dedup_window = float(self.config.get("dedup_window", 60.0))
+
             self._is_initialized = True
 
             info(
@@ -162,7 +224,7 @@ class SmsComponent:
 
     async def connect(self) -> bool:
         """
-        Nawiązuje połączenie z serwisem SMS API.
+        Uruchamia workery wysyłki i sprawdza połączenie z serwisem SMS API.
 
         Returns:
             True jeśli połączenie zostało nawiązane pomyślnie
@@ -186,43 +248,41 @@ class SmsComponent:
                 f"🔌 Sprawdzanie połączenia z API SMS: {self.name}",
                 message_logger=self._message_logger,
             )
-
-            # Test połączenia z API SMS przez prosty request
-            test_url = (
-                self._url_base.rstrip("/") + "/ping"
-            )  # Próba ping endpointu (jeśli istnieje)
+            self._ensure_workers()
 
             try:
                 # Spróbuj prostego requestu do API (z timeoutem)
-                response = requests.head(
-                    self._url_base.rstrip("/"), cert=self._cert_path, timeout=10
-                )
+                async with self._get_session().head(
+                    self._url_base.rstrip("/"),
+                    timeout=aiohttp.ClientTimeout(total=10),
+                ) as response:
+                    status_code = response.status
                 # Akceptuj różne kody odpowiedzi jako znak że serwer odpowiada
-                if response.status_code < 500:  # Nie błąd serwera
+                if status_code < 500:  # Nie błąd serwera
                     info(
-                        f"✅ Połączenie z API SMS '{self.name}' sprawdzone pomyślnie (status: {response.status_code})",
+                        f"✅ Połączenie z API SMS '{self.name}' sprawdzone pomyślnie (status: {status_code})",
                         message_logger=self._message_logger,
                     )
                     return True
                 else:
                     warning(
-                        f"⚠️ API SMS '{self.name}' odpowiada błędem serwera (status: {response.status_code}), ale połączenie możliwe",
+                        f"⚠️ API SMS '{self.name}' odpowiada błędem serwera (status: {status_code}), ale połączenie możliwe",
                         message_logger=self._message_logger,
                     )
                     return True  # Nawet błąd serwera oznacza że można się połączyć
-            except requests.exceptions.Timeout:
+            except asyncio.TimeoutError:
                 warning(
                     f"⚠️ Timeout przy sprawdzaniu połączenia z API SMS '{self.name}' - może być niedostępne",
                     message_logger=self._message_logger,
                 )
                 return False
-            except requests.exceptions.ConnectionError:
+            except aiohttp.ClientConnectionError:
                 error(
                     f"❌ Nie można nawiązać połączenia z API SMS '{self.name}'",
                     message_logger=self._message_logger,
                 )
                 return False
-            except requests.exceptions.RequestException as e:
+            except aiohttp.ClientError as e:
                 warning(
                     f"⚠️ Błąd przy sprawdzaniu połączenia z API SMS '{self.name}': {e}",
                     message_logger=self._message_logger,
@@ -236,21 +296,51 @@ class SmsComponent:
             )
             return False
 
-    async def disconnect(self) -> bool:
+    async def disconnect(self, drain_timeout: float = 10.0) -> bool:
         """
-        Rozłącza połączenie z serwisem SMS API.
+        Zatrzymuje workery wysyłki i zamyka sesję HTTP.
 
-        Dla komponentu SMS nie ma trwałego połączenia do rozłączenia,
-        więc metoda zawsze zwraca True.
+        SMS-y z kolejki są wysyłane przez najwyżej `drain_timeout` sekund,
+        pozostałe są porzucane.
 
         Returns:
-            True zawsze (metoda dla kompatybilności z interfejsem)
+            True jeśli rozłączenie przebiegło pomyślnie
         """
-        debug(
-            f"🔌 Rozłączanie komponentu SMS '{self.name}' (brak trwałego połączenia)",
-            message_logger=self._message_logger,
-        )
-        return True
+        try:
+            if self._queue is not None and self._workers:
+                try:
+                    await asyncio.wait_for(self._queue.join(), timeout=drain_timeout)
+                except asyncio.TimeoutError:
+                    warning(
+                        f"Komponent SMS '{self.name}': porzucono {self._queue.qsize()} "
+                        f"SMS-ów z kolejki przy rozłączaniu",
+                        message_logger=self._message_logger,
+                    )
+                for worker in self._workers:
+                    worker.cancel()
+                await asyncio.gather(*self._workers, return_exceptions=True)
+                while not self._queue.empty():
+                    outgoing = self._queue.get_nowait()
+                    if outgoing.delivered is not None and not outgoing.delivered.done():
+                        outgoing.delivered.set_exception(
+                            RuntimeError(f"Komponent SMS '{self.name}' rozłączony")
+                        )
+            self._workers = []
+            self._queue = None
+            if self._session is not None:
+                await self._session.close()
+                self._session = None
+            debug(
+                f"🔌 Rozłączono komponent SMS '{self.name}'",
+                message_logger=self._message_logger,
+            )
+            return True
+        except Exception as e:
+            error(
+                f"❌ Błąd rozłączania komponentu SMS '{self.name}': {e}",
+                message_logger=self._message_logger,
+            )
+            return False
 
     async def health_check(self) -> bool:
         """
@@ -334,21 +424,30 @@ class SmsComponent:
         return segments
 
     async def send_sms(
-        self, recipients: List[str], message: str, ignore_errors: bool = False
+        self,
+        recipients: List[str],
+        message: str,
+        ignore_errors: bool = False,
+        wait: bool = False,
     ) -> Tuple[bool, int, List[str]]:
         """
-        Wysyła SMS do listy odbiorców.
+        Dodaje SMS do listy odbiorców do kolejki wysyłki.
+
+        Identyczny SMS do tego samego odbiorcy wysłany w ciągu `dedup_window`
+        sekund jest pomijany.
 
         Args:
             recipients: Lista numerów telefonów
             message: Treść wiadomości
-            ignore_errors: Czy ignorować błędy wysyłki
+            ignore_errors: Czy ignorować błędy wysyłki (kontynuuj kolejne segmenty)
+            wait: Czekaj na wysyłkę i zwróć jej wynik
 
         Returns:
-            Tuple (wszystkie_ok, liczba_wysłanych, lista_błędów)
+            Tuple (wszystkie_ok, liczba_wysłanych, lista_błędów); bez `wait`
+            liczba_wysłanych to liczba odbiorców przyjętych do kolejki
 
         Raises:
-            RuntimeError: Jeśli komponent nie jest zainicjalizowany lub włączony
+            RuntimeError: Jeśli komponent nie jest zainicjalizowany lub kolejka jest pełna
         """
         if not self._is_initialized:
             raise RuntimeError(f"Komponent SMS '{self.name}' nie jest zainicjalizowany")
@@ -362,101 +461,225 @@ class SmsComponent:
 
         # Podziel wiadomość na segmenty
         segments = self.split_text_into_segments(message)
-        endpoint = "sendsms.aspx"
-        full_url = self._url_base.rstrip("/") + "/" + endpoint
-
-        all_ok = True
-        sent_count = 0
-        errors = []
+        dests = self._filter_duplicates(
+            [self.normalize_phone_number(raw_dest) for raw_dest in recipients],
+            message,
+        )
 
-        for raw_dest in recipients:
-            dest = self.normalize_phone_number(raw_dest)
-            recipient_ok = True
+        self._ensure_workers()
+        if self._queue.maxsize - self._queue.qsize() < len(dests):
+            raise RuntimeError(
+                f"Komponent SMS '{self.name}': kolejka wysyłki pełna "
+                f"({self._queue_size} SMS-ów)"
+            )
 
-            for idx, segment in enumerate(segments, start=1):
-                try:
-                    params = {
-                        "login": self._login,
-                        "password": self._password,
-                        "serviceId": self._service_id,
-                        "orig": self._source,
-                        "dest": dest,
-                        "text": segment,
-                    }
-
-                    response = requests.get(
-                        full_url, params=params, cert=self._cert_path, timeout=30
-                    )
+        loop = asyncio.get_running_loop()
+        now = time.monotonic()
+        queued: List[_OutgoingSms] = []
+        for dest in dests:
+            outgoing = _OutgoingSms(
+                dest=dest,
+                text=message,
+                segments=segments,
+                ignore_errors=ignore_errors,
+            )
+            if wait:
+                outgoing.delivered = loop.create_future()
+            self._queue.put_nowait(outgoing)
+            queued.append(outgoing)
+            if self._dedup_window > 0:
+                self._recent[(dest, message)] = now
 
-                    # Ocena sukcesu (dostosowana do MultiInfo Plus)
-                    ok, sms_id_info = self._evaluate_sms_response(response)
+        debug(
+            f"📱 SMS do {dests} w kolejce (oczekuje: {self._queue.qsize()})",
+            message_logger=self._message_logger,
+        )
+        if not wait:
+            return True, len(queued), []
 
-                    if ok:
-                        info(
-                            f"📱 SMS wysłany do {dest} (segment {idx}/{len(segments)})"
-                            f"{(' (id: ' + sms_id_info + ')') if sms_id_info else ''}. "
-                            f"Treść: {segment}",
-                            message_logger=self._message_logger,
-                        )
-                    else:
-                        recipient_ok = False
-                        all_ok = False
-                        error_msg = f"Niepowodzenie wysyłki do {dest} (segment {idx}/{len(segments)}): {response.status_code} - {response.text}"
-                        errors.append(error_msg)
-                        error(
-                            error_msg,
-                            message_logger=self._message_logger,
-                        )
-                        if not ignore_errors:
-                            break
-
-                except requests.exceptions.Timeout:
-                    recipient_ok = False
-                    all_ok = False
-                    error_msg = (
-                        f"Timeout wysyłki SMS do {dest} (segment {idx}/{len(segments)})"
-                    )
-                    errors.append(error_msg)
-                    error(error_msg, message_logger=self._message_logger)
-                    if not ignore_errors:
-                        break
-
-                except requests.exceptions.RequestException as e:
-                    recipient_ok = False
-                    all_ok = False
-                    error_msg = f"Błąd HTTP przy wysyłce SMS do {dest} (segment {idx}/{len(segments)}): {e}"
-                    errors.append(error_msg)
-                    error(error_msg, message_logger=self._message_logger)
-                    if not ignore_errors:
-                        break
-
-                except Exception as e:
-                    recipient_ok = False
-                    all_ok = False
-                    error_msg = f"Nieoczekiwany błąd przy wysyłce SMS do {dest} (segment {idx}/{len(segments)}): {e}"
-                    errors.append(error_msg)
-                    error(error_msg, message_logger=self._message_logger)
-                    if not ignore_errors:
-                        break
-
-            if recipient_ok:
-                sent_count += 1
+        results = await asyncio.gather(*(outgoing.delivered for outgoing in queued))
+        sent_count = sum(1 for ok in results if ok)
+        errors = [e for outgoing in queued for e in outgoing.errors]
 
         info(
             f"Zakończono wysyłkę SMS - pomyślnie wysłano do {sent_count}/{len(recipients)} adresatów",
             message_logger=self._message_logger,
         )
 
-        return all_ok, sent_count, errors
+        return not errors, sent_count, errors
+
+    def _filter_duplicates(self, dests: List[str], message: str) -> List[str]:
+        """Zwraca odbiorców, którzy nie dostali tej treści w oknie deduplikacji."""
+        if self._dedup_window <= 0:
+            return dests
+        now = time.monotonic()
+        if len(self._recent) > self._queue_size:
+            self._recent = {
+                key: queued_at
+                for key, queued_at in self._recent.items()
+                if now - queued_at < self._dedup_window
+            }
+        allowed: List[str] = []
+        for dest in dests:
+            queued_at = self._recent.get((dest, message))
+            if dest in allowed or (
+                queued_at is not None and now - queued_at < self._dedup_window
+            ):
+                self._stats["deduplicated"] += 1
+                debug(
+                    f"📱 Pomijam powtórzony SMS do {dest}",
+                    message_logger=self._message_logger,
+                )
+                continue
+            allowed.append(dest)
+        return allowed
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Zwraca współdzieloną sesję HTTP (tworzy ją przy pierwszym użyciu)."""
+        if self._session is None or self._session.closed:
+            ssl_context: Any = True  # domyślna weryfikacja certyfikatu serwera
+            if self._cert_path:
+                # Certyfikat klienta (odpowiednik `cert=` w requests)
+                ssl_context = ssl.create_default_context()
+                ssl_context.load_cert_chain(self._cert_path)
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self._concurrency, ssl=ssl_context
+                ),
+                timeout=aiohttp.ClientTimeout(total=self._timeout),
+            )
+        return self._session
+
+    def _ensure_workers(self) -> None:
+        """Tworzy kolejkę i uruchamia workery wysyłki, jeśli nie działają."""
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self._queue_size)
+        self._workers = [worker for worker in self._workers if not worker.done()]
+        while len(self._workers) < self._concurrency:
+            self._workers.append(
+                asyncio.create_task(
+                    self._delivery_worker(),
+                    name=f"sms_worker_{self.name}_{len(self._workers)}",
+                )
+            )
+
+    async def _delivery_worker(self) -> None:
+        """Wysyła SMS-y z kolejki; kilka workerów działa równolegle."""
+        while True:
+            outgoing = await self._queue.get()
+            try:
+                ok = await self._deliver(outgoing)
+                if outgoing.delivered is not None and not outgoing.delivered.done():
+                    outgoing.delivered.set_result(ok)
+            except asyncio.CancelledError:
+                if outgoing.delivered is not None and not outgoing.delivered.done():
+                    outgoing.delivered.cancel()
+                raise
+            finally:
+                self._queue.task_done()
+
+    async def _deliver(self, outgoing: _OutgoingSms) -> bool:
+        """Wysyła kolejne segmenty SMS do jednego odbiorcy."""
+        dest = outgoing.dest
+        total = len(outgoing.segments)
+        recipient_ok = True
+
+        for idx, segment in enumerate(outgoing.segments, start=1):
+            try:
+                (
+                    ok,
+                    sms_id_info,
+                    status_code,
+                    body,
+                ) = await self._send_segment_with_retry(dest, segment)
+                if ok:
+                    info(
+                        f"📱 SMS wysłany do {dest} (segment {idx}/{total})"
+                        f"{(' (id: ' + sms_id_info + ')') if sms_id_info else ''}. "
+                        f"Treść: {segment}",
+                        message_logger=self._message_logger,
+                    )
+                    continue
+                error_msg = f"Niepowodzenie wysyłki do {dest} (segment {idx}/{total}): {status_code} - {body}"
+
+            except asyncio.TimeoutError:
+                error_msg = f"Timeout wysyłki SMS do {dest} (segment {idx}/{total})"
+
+            except (aiohttp.ClientError, _TransientSmsError) as e:
+                error_msg = (
+                    f"Błąd HTTP przy wysyłce SMS do {dest} (segment {idx}/{total}): {e}"
+                )
+
+            except Exception as e:
+                error_msg = f"Nieoczekiwany błąd przy wysyłce SMS do {dest} (segment {idx}/{total}): {e}"
+
+            recipient_ok = False
+            outgoing.errors.append(error_msg)
+            error(error_msg, message_logger=self._message_logger)
+            if not outgoing.ignore_errors:
+                break
+
+        self._stats["sent" if recipient_ok else "failed"] += 1
+        if not recipient_ok:
+            # Nieudana wysyłka nie blokuje ponownej próby tej samej treści
+            self._recent.pop((dest, outgoing.text), None)
+        return recipient_ok
+
+    async def _send_segment_with_retry(
+        self, dest: str, segment: str
+    ) -> Tuple[bool, Optional[str], int, str]:
+        """
+        Wysyła jeden segment, ponawiając błędy przejściowe z backoffem.
+
+        Ponawiane są błędy połączenia, timeouty oraz odpowiedzi 5xx i 429.
+        Odrzucenie wiadomości przez bramkę (np. ujemny kod) nie jest ponawiane.
+
+        Returns:
+            Tuple (sukces, sms_id, status_http, treść_odpowiedzi)
+        """
+        params = {
+            "login": self._login,
+            "password": self._password,
+            "serviceId": str(self._service_id),
+            "orig": self._source,
+            "dest": dest,
+            "text": segment,
+        }
+        full_url = self._url_base.rstrip("/") + "/sendsms.aspx"
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                async with self._get_session().get(full_url, params=params) as response:
+                    status_code = response.status
+                    body = await response.text()
+                if status_code >= 500 or status_code == 429:
+                    raise _TransientSmsError(f"{status_code} - {body}")
+                ok, sms_id_info = self._evaluate_sms_response(status_code, body)
+                return ok, sms_id_info, status_code, body
+            except (aiohttp.ClientError, asyncio.TimeoutError, _TransientSmsError) as e:
+                if attempt > self._max_retries:
+                    raise
+                delay = min(
+                    self._retry_backoff * 2 ** (attempt - 1), self._retry_backoff_max
+                )
+                self._stats["retried"] += 1
+                warning(
+                    f"📱 Błąd wysyłki SMS do {dest} (próba {attempt}): "
+                    f"{str(e) or type(e).__name__} - ponowienie za {delay:.1f} s",
+                    message_logger=self._message_logger,
+                )
+                await asyncio.sleep(delay)
 
     def _evaluate_sms_response(
-        self, response: requests.Response
+        self, status_code: int, text: str
     ) -> Tuple[bool, Optional[str]]:
         """
         Ocenia odpowiedź z API SMS i zwraca status oraz ID wiadomości.
 
         Args:
-            response: Odpowiedź HTTP z API SMS
+            status_code: Kod statusu HTTP odpowiedzi
+            text: Treść odpowiedzi
 
         Returns:
             Tuple (sukces, sms_id)
@@ -464,8 +687,8 @@ class SmsComponent:
         ok = False
         sms_id_info = None
 
-        if response.status_code == 200:
-            body = (response.text or "").strip()
+        if status_code == 200:
+            body = (text or "").strip()
             tokens = [t for t in body.replace(";", " ").split() if t]
             if tokens:
                 first = tokens[0]
@@ -501,6 +724,8 @@ class SmsComponent:
             "source": self._source if self._is_initialized else None,
             "max_length": self._max_length,
             "max_error_attempts": self._max_error_attempts,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            **self._stats,
         }
 
     def to_dict(self) -> Dict[str, Any]:
@@ -7,6 +7,64 @@ from ..models.scenario_models import ScenarioContext
 class ClientStateCondition(BaseCondition):
     """Sprawdza stan klienta."""
 
+    def __init__(
+        self, config: Dict[str, Any], message_logger=None, condition_factory=None
+    ):
+        """
+        Inicjalizuje warunek i normalizuje konfigurację raz, przy tworzeniu.
+
+        Args:
+            config: Konfiguracja warunku (patrz `evaluate`).
+            message_logger: Logger wiadomości.
+            condition_factory: Fabryka warunków.
+        """
+        super().__init__(config, message_logger, condition_factory)
+        self._any_service_in_state = self._as_list(
+            self.config.get("any_service_in_state")
+        )
+        self._no_service_in_state = self._as_list(
+            self.config.get("no_service_in_state")
+        )
+        # all_services_in_state rozróżnia string i listę - zostaje bez zmian
+        self._all_services_in_state = self.config.get("all_services_in_state")
+        # Opcjonalna lista klientów do wykluczenia z ewaluacji
+        exclude_clients = self._as_list(self.config.get("exclude_clients"))
+        self._exclude_set: set[str] | None = (
+            set(exclude_clients) if exclude_clients else None
+        )
+        self._client_name = self.config.get("client")
+        self._expected_state = self.config.get("state")
+
+    @staticmethod
+    def _as_list(value: Any) -> Any:
+        """Normalizuje pojedynczy string do listy jednoelementowej."""
+        if isinstance(value, str):
+            return [value]
+        return value
+
+    def get_referenced_clients(self):
+        """
+        Zwraca klientów czytanych przez warunek.
+
+        Tryby any/no/all_services_in_state przeglądają wszystkich klientów,
+        więc dla nich zwracane jest None.
+        """
+        if (
+            self._any_service_in_state
+            or self._no_service_in_state
+            or self._all_services_in_state
+        ):
+            return None
+        return {self._client_name} if self._client_name else set()
+
+    def get_referenced_fields(self):
+        """Warunek czyta tylko pole fsm_state klientów."""
+        return {"fsm_state"}
+
+    def get_poll_interval(self):
+        """Wynik zależy wyłącznie od stanu klientów - bez odpytywania."""
+        return None
+
     async def evaluate(self, context: ScenarioContext) -> bool:
         """
         Ewaluacja warunku na podstawie stanów klientów w kontekście.
@@ -24,47 +82,31 @@ class ClientStateCondition(BaseCondition):
         Returns:
             bool: Wynik ewaluacji warunku.
         """
-        # Sprawdź czy mamy parametry any_service_in_state lub no_service_in_state
-        any_service_in_state = self.config.get("any_service_in_state")
-        no_service_in_state = self.config.get("no_service_in_state")
-        all_services_in_state = self.config.get("all_services_in_state")
-        # Opcjonalna lista klientów do wykluczenia z ewaluacji
-        exclude_clients = self.config.get("exclude_clients")
-        if isinstance(exclude_clients, str):
-            exclude_clients = [exclude_clients]
-        exclude_set: set[str] | None = set(exclude_clients) if exclude_clients else None
-
         # Pobierz aktualny stan klientów z kontekstu
         clients_state = context.clients
 
-        if any_service_in_state:
-            # Normalizuj do listy
-            if isinstance(any_service_in_state, str):
-                any_service_in_state = [any_service_in_state]
+        if self._any_service_in_state:
             # Sprawdź czy przynajmniej jeden klient jest w jednym z wymaganych stanów
             return self._check_any_service_in_state(
-                clients_state, any_service_in_state, exclude_set
+                clients_state, self._any_service_in_state, self._exclude_set
             )
 
-        elif no_service_in_state:
-            # Normalizuj do listy
-            if isinstance(no_service_in_state, str):
-                no_service_in_state = [no_service_in_state]
+        elif self._no_service_in_state:
             # Sprawdź czy żaden klient nie jest w żadnym z zabronionych stanów
             return self._check_no_service_in_state(
-                clients_state, no_service_in_state, exclude_set
+                clients_state, self._no_service_in_state, self._exclude_set
             )
 
-        elif all_services_in_state:
-            # Normalizuj: dopuszczamy string lub listę
+        elif self._all_services_in_state:
+            # Dopuszczamy string lub listę
             return self._check_all_services_in_state(
-                clients_state, all_services_in_state, exclude_set
+                clients_state, self._all_services_in_state, self._exclude_set
             )
 
         else:
             # Standardowe sprawdzenie pojedynczego klienta
-            client_name = self.config.get("client")
-            expected_state = self.config.get("state")
+            client_name = self._client_name
+            expected_state = self._expected_state
 
             if not client_name or expected_state is None:
                 if self.message_logger:
@@ -10,6 +10,7 @@ from typing import Any, Dict
 from avena_commons.util.logger import debug, error
 
 from ..base.base_condition import BaseCondition
+from ..components.database_result_cache import freeze, result_cache_for
 from ..models.scenario_models import ScenarioContext
 
 
@@ -31,8 +32,13 @@ class DatabaseCondition(BaseCondition):
             "active": true
         },
         "expected_value": "pending_verification",
-        "operator": "equals"  # equals, not_equals, in, not_in, greater, less, is_null, is_not_null
+        "operator": "equals",  # equals, not_equals, in, not_in, greater, less, is_null, is_not_null
+        "cache_ttl": 0.5  # opcjonalnie: wynik współdzielony przez warunki przez 0.5 s
     }
+
+    Przy `cache_ttl` > 0 warunki czytające tę samą kolumnę z tymi samymi
+    filtrami korzystają z jednego zapytania na okres `cache_ttl`; identyczne
+    zapytania wykonywane współbieżnie są łączone zawsze.
     """
 
     SUPPORTED_OPERATORS = [
@@ -74,6 +80,7 @@ class DatabaseCondition(BaseCondition):
         self.where_conditions = self.config["where"]
         self.expected_value = self.config.get("expected_value")
         self.operator = self.config.get("operator", "equals")
+        self.cache_ttl = float(self.config.get("cache_ttl", 0.0))
 
     def _validate_config(self) -> None:
         """
@@ -106,6 +113,57 @@ class DatabaseCondition(BaseCondition):
         if operator not in null_operators and "expected_value" not in self.config:
             raise ValueError(f"Operator '{operator}' wymaga pola 'expected_value'")
 
+        self._validate_cache_ttl()
+
+    def _validate_cache_ttl(self) -> None:
+        """Sprawdza, czy `cache_ttl` jest nieujemną liczbą sekund."""
+        cache_ttl = self.config.get("cache_ttl", 0.0)
+        if (
+            isinstance(cache_ttl, bool)
+            or not isinstance(cache_ttl, (int, float))
+            or cache_ttl < 0
+        ):
+            raise ValueError("Pole 'cache_ttl' musi być nieujemną liczbą sekund")
+
+    def get_referenced_clients(self):
+        """Warunek bazodanowy czyta tylko komponenty, nie stan klientów."""
+        return set()
+
+    def get_referenced_fields(self):
+        """Warunek bazodanowy nie czyta pól stanu klientów."""
+        return set()
+
+    def get_poll_interval(self):
+        """Zwraca okres odpytywania bazy (klucz poll_interval, domyślnie co cykl)."""
+        return float(self.config.get("poll_interval", 0.0))
+
+    def _lookup(self, db_component):
+        """Zwraca klucz cache i funkcję zapytania warunku."""
+        # Pozwól klasom pochodnym rozszerzyć WHERE (domyślnie bez zmian)
+        enhanced_where_conditions = self._augment_where(
+            self.where_conditions, self.table, db_component
+        )
+        key = ("value", self.table, self.column, freeze(enhanced_where_conditions))
+        return key, lambda: db_component.check_table_value(
+            table=self.table,
+            column=self.column,
+            where_conditions=enhanced_where_conditions,
+        )
+
+    async def prefetch(self, context: ScenarioContext) -> None:
+        """
+        Pobiera wartość warunku przed ewaluacją (współbieżnie z innymi warunkami).
+
+        Wyszukiwania wielu warunków w jednej tabeli trafiają do komponentu
+        w tej samej iteracji pętli zdarzeń, więc przy `batch_lookups` są
+        wykonywane jednym zapytaniem. Wynik odczytuje `evaluate` z cache.
+        """
+        db_component = context.components.get(self.component_name)
+        if db_component is None or not db_component.is_connected:
+            return
+        key, fetch = self._lookup(db_component)
+        await result_cache_for(db_component).prefetch(key, self.cache_ttl, fetch)
+
     async def evaluate(self, context: ScenarioContext) -> bool:
         """
         Ewaluuje warunek bazodanowy.
@@ -142,15 +200,9 @@ class DatabaseCondition(BaseCondition):
                 message_logger=self._message_logger,
             )
 
-            # Pozwól klasom pochodnym rozszerzyć WHERE (domyślnie bez zmian)
-            enhanced_where_conditions = self._augment_where(
-                self.where_conditions, self.table, db_component
-            )
-
-            actual_value = await db_component.check_table_value(
-                table=self.table,
-                column=self.column,
-                where_conditions=enhanced_where_conditions,
+            key, fetch = self._lookup(db_component)
+            actual_value = await result_cache_for(db_component).get(
+                key, self.cache_ttl, fetch
             )
 
             debug(
@@ -9,6 +9,7 @@ from typing import Any, Dict
 
 from avena_commons.util.logger import debug, error
 
+from ..components.database_result_cache import freeze, result_cache_for
 from ..models.scenario_models import ScenarioContext
 from .database_condition_base import DatabaseCondition
 
@@ -31,7 +32,8 @@ class DatabaseListCondition(DatabaseCondition):
         },
         "result_key": "zamowienia_do_zwrotu",
         "limit": 100,
-        "order_by": "data_utworzenia DESC"
+        "order_by": "data_utworzenia DESC",
+        "cache_ttl": 1.0  # opcjonalnie, jak w DatabaseCondition
     }
     """
 
@@ -62,6 +64,7 @@ class DatabaseListCondition(DatabaseCondition):
         self.result_key = self.config.get("result_key", "database_records")
         self.limit = self.config.get("limit")
         self.order_by = self.config.get("order_by")
+        self.cache_ttl = float(self.config.get("cache_ttl", 0.0))
 
     def _validate_list_config(self) -> None:
         """
@@ -100,6 +103,12 @@ class DatabaseListCondition(DatabaseCondition):
             if not isinstance(result_key, str) or not result_key.strip():
                 raise ValueError("Pole 'result_key' musi być niepustym stringiem")
 
+        self._validate_cache_ttl()
+
+    async def prefetch(self, context: ScenarioContext) -> None:
+        """Listy rekordów nie są łączone w zapytania - pobiera je `evaluate`."""
+        return None
+
     async def evaluate(self, context: ScenarioContext) -> bool:
         """
         Ewaluuje warunek bazodanowy i pobiera listę rekordów.
@@ -154,13 +163,27 @@ class DatabaseListCondition(DatabaseCondition):
             )
 
             # Pobierz rekordy z bazy danych
-            records = await db_component.fetch_records(
-                table=self.table,
-                columns=self.columns,
-                where_conditions=resolved_where_conditions,
-                limit=self.limit,
-                order_by=self.order_by,
+            key = (
+                "records",
+                self.table,
+                tuple(self.columns),
+                freeze(resolved_where_conditions),
+                self.limit,
+                self.order_by,
+            )
+            records = await result_cache_for(db_component).get(
+                key,
+                self.cache_ttl,
+                lambda: db_component.fetch_records(
+                    table=self.table,
+                    columns=self.columns,
+                    where_conditions=resolved_where_conditions,
+                    limit=self.limit,
+                    order_by=self.order_by,
+                ),
             )
+            # Wynik jest współdzielony z innymi warunkami - akcje dostają kopie
+            records = [dict(record) for record in records]
             # Zapisz wyniki w kontekście pod określonym kluczem
             context.set(self.result_key, records)
 
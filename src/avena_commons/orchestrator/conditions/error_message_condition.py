@@ -94,6 +94,10 @@ class ErrorMessageCondition(BaseCondition):
     }
     """
 
+    def get_poll_interval(self):
+        """Wynik zależy wyłącznie od stanu klientów - bez odpytywania."""
+        return None
+
     async def evaluate(self, context: Dict[str, Any]) -> bool:
         """
         Ewaluuje warunek na podstawie komunikatów błędów klientów.
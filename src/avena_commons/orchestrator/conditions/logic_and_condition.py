@@ -1,8 +1,8 @@
-from ..base.base_condition import BaseCondition
+from ..base.base_condition import LogicCondition
 from ..models.scenario_models import ScenarioContext
 
 
-class LogicAndCondition(BaseCondition):
+class LogicAndCondition(LogicCondition):
     """Warunek logiczny AND - wszystkie warunki muszą być spełnione."""
 
     async def evaluate(self, context: ScenarioContext) -> bool:
@@ -26,7 +26,7 @@ class LogicAndCondition(BaseCondition):
         # Rekurencyjnie sprawdź wszystkie warunki
         for i, condition_config in enumerate(conditions_config):
             try:
-                condition = self._create_condition(condition_config)
+                condition = self._get_child_condition(i, condition_config)
                 result = await condition.evaluate(context)
                 if not result:
                     if self.message_logger:
@@ -1,8 +1,8 @@
-from ..base.base_condition import BaseCondition
+from ..base.base_condition import LogicCondition
 from ..models.scenario_models import ScenarioContext
 
 
-class LogicNandCondition(BaseCondition):
+class LogicNandCondition(LogicCondition):
     """Warunek logiczny NAND - nie wszystkie warunki mogą być spełnione."""
 
     async def evaluate(self, context: ScenarioContext) -> bool:
@@ -18,7 +18,7 @@ class LogicNandCondition(BaseCondition):
         all_true = True
         for i, condition_config in enumerate(conditions_config):
             try:
-                condition = self._create_condition(condition_config)
+                condition = self._get_child_condition(i, condition_config)
                 result = await condition.evaluate(context)
                 if not result:
                     all_true = False
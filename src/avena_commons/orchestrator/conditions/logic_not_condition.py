@@ -1,10 +1,15 @@
-from ..base.base_condition import BaseCondition
+from ..base.base_condition import LogicCondition
 from ..models.scenario_models import ScenarioContext
 
 
-class LogicNotCondition(BaseCondition):
+class LogicNotCondition(LogicCondition):
     """Warunek logiczny NOT - neguje wynik warunku."""
 
+    def _child_configs(self):
+        """Zwraca konfigurację negowanego warunku jako listę jednoelementową."""
+        condition_config = self.config.get("condition")
+        return [condition_config] if condition_config else []
+
     async def evaluate(self, context: ScenarioContext) -> bool:
         """
         Zwraca negację wyniku zagnieżdżonego warunku.
@@ -24,7 +29,7 @@ class LogicNotCondition(BaseCondition):
             return True
 
         try:
-            condition = self._create_condition(condition_config)
+            condition = self._get_child_condition(0, condition_config)
             result = await condition.evaluate(context)
             negated_result = not result
             if self.message_logger:
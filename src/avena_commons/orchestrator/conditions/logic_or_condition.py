@@ -1,8 +1,8 @@
-from ..base.base_condition import BaseCondition
+from ..base.base_condition import LogicCondition
 from ..models.scenario_models import ScenarioContext
 
 
-class LogicOrCondition(BaseCondition):
+class LogicOrCondition(LogicCondition):
     """Warunek logiczny OR - przynajmniej jeden warunek musi być spełniony."""
 
     async def evaluate(self, context: ScenarioContext) -> bool:
@@ -26,7 +26,7 @@ class LogicOrCondition(BaseCondition):
         # Sprawdź czy przynajmniej jeden warunek jest spełniony
         for i, condition_config in enumerate(conditions_config):
             try:
-                condition = self._create_condition(condition_config)
+                condition = self._get_child_condition(i, condition_config)
                 result = await condition.evaluate(context)
                 if result:
                     if self.message_logger:
@@ -1,8 +1,8 @@
-from ..base.base_condition import BaseCondition
+from ..base.base_condition import LogicCondition
 from ..models.scenario_models import ScenarioContext
 
 
-class LogicXorCondition(BaseCondition):
+class LogicXorCondition(LogicCondition):
     """Warunek logiczny XOR - dokładnie jeden warunek musi być spełniony."""
 
     async def evaluate(self, context: ScenarioContext) -> bool:
@@ -28,7 +28,7 @@ class LogicXorCondition(BaseCondition):
         # Policz ile warunków jest spełnionych
         for i, condition_config in enumerate(conditions_config):
             try:
-                condition = self._create_condition(condition_config)
+                condition = self._get_child_condition(i, condition_config)
                 result = await condition.evaluate(context)
                 if result:
                     true_count += 1
@@ -7,6 +7,18 @@ from ..models.scenario_models import ScenarioContext
 class TimeCondition(BaseCondition):
     """Sprawdza warunki czasowe."""
 
+    def get_referenced_clients(self):
+        """Warunek czasowy nie czyta stanu klientów."""
+        return set()
+
+    def get_referenced_fields(self):
+        """Warunek czasowy nie czyta pól stanu klientów."""
+        return set()
+
+    def get_poll_interval(self):
+        """Zwraca okres ponownej ewaluacji (klucz poll_interval, domyślnie 1 s)."""
+        return float(self.config.get("poll_interval", 1.0))
+
     async def evaluate(self, context: ScenarioContext) -> bool:
         """
         Ewaluacja warunków czasowych względem bieżącego czasu.
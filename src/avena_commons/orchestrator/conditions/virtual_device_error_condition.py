@@ -57,6 +57,19 @@ class VirtualDeviceErrorCondition(BaseCondition):
         - context.device_type = "TLC57R24V08"
     """
 
+    def get_referenced_clients(self):
+        """Zwraca klienta IO wskazanego w konfiguracji."""
+        client_name = self.config.get("client")
+        return {client_name} if client_name else set()
+
+    def get_referenced_fields(self):
+        """Warunek czyta pole state (io_server.failed_virtual_devices)."""
+        return {"state"}
+
+    def get_poll_interval(self):
+        """Wynik zależy wyłącznie od stanu klienta - bez odpytywania."""
+        return None
+
     async def evaluate(self, context) -> bool:
         """Ewaluuje warunek sprawdzając błędy urządzeń wirtualnych.
 
@@ -10,27 +10,36 @@ Eksponuje:
 """
 
 import asyncio
+import heapq
 import importlib
 import inspect
 import json
 import os
+import time
 import traceback
 from collections import OrderedDict
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, FrozenSet, Iterable, Optional, Tuple
 
 from avena_commons.event_listener.event import Event
 from avena_commons.event_listener.event_listener import (
     EventListener,
     EventListenerState,
 )
+from avena_commons.event_listener.state_subscription import (
+    STATE_KEEPALIVE_EVENT,
+    SUBSCRIBE_STATE_EVENT,
+    apply_state_diff,
+)
 from avena_commons.util.logger import MessageLogger, debug, error, info, warning
 
 # Import nowego systemu akcji
 from .actions import ActionExecutionError, ActionExecutor
 from .actions.base_action import BaseAction
 from .base.base_condition import BaseCondition
+from .components.database_result_cache import clear_prefetched_results
 
 # Import nowego systemu warunków
 from .factories.condition_factory import ConditionFactory
@@ -39,6 +48,60 @@ from .factories.condition_factory import ConditionFactory
 from .models import ScenarioContext
 
 
+# Pola stanu klienta aktualizowane odpowiedzią CMD_GET_STATE i subskrypcją stanu
+_CLIENT_STATE_FIELDS = ("fsm_state", "error", "error_message", "state")
+_MISSING = object()
+
+
+@dataclass
+class _CompiledConditions:
+    """
+    Skompilowane warunki triggera scenariusza.
+
+    Attributes:
+        source: Słownik `trigger.conditions`, z którego zbudowano drzewo (porównanie po tożsamości).
+        fingerprint: Kanoniczny JSON konfiguracji - pozwala zachować drzewo przy przeładowaniu plików.
+        condition: Zbudowane drzewo warunków lub None, gdy kompilacja się nie powiodła.
+        clients: Klienci czytani przez warunki (None = wszyscy skonfigurowani klienci).
+        fields: Pola stanu klienta czytane przez warunki (None = dowolne pole).
+        poll_interval: Okres ewaluacji niezależnej od stanu klientów
+            (None = tylko po zmianie stanu, 0.0 = w każdym cyklu).
+        error: Komunikat błędu kompilacji.
+        context: Kontekst z ostatniej niespełnionej ewaluacji - używany ponownie,
+            dopóki scenariusz nie zostanie uruchomiony.
+    """
+
+    source: Dict[str, Any]
+    fingerprint: str
+    condition: Optional[BaseCondition] = None
+    clients: Optional[FrozenSet[str]] = None
+    fields: Optional[FrozenSet[str]] = None
+    poll_interval: Optional[float] = 0.0
+    error: Optional[str] = None
+    context: Optional[ScenarioContext] = None
+
+
+@dataclass
+class _ClientStateSync:
+    """
+    Subskrypcja stanu klienta (CMD_SUBSCRIBE_STATE) po stronie Orchestratora.
+
+    Attributes:
+        subscribed: Klient potwierdził subskrypcję - nie jest odpytywany CMD_GET_STATE.
+        version: Wersja stanu odzwierciedlona w `snapshot`
+            (None = brak spójnego stanu, oczekiwanie na snapshot).
+        snapshot: Ostatni znany stan klienta w postaci wysłanej przez klienta.
+        last_seen: Chwila (monotoniczna) ostatniej spójnej wiadomości od klienta.
+        requested_at: Chwila wysłania ostatniego CMD_SUBSCRIBE_STATE (None = nie wysłano).
+    """
+
+    subscribed: bool = False
+    version: Optional[int] = None
+    snapshot: Optional[Dict[str, Any]] = None
+    last_seen: float = 0.0
+    requested_at: Optional[float] = None
+
+
 class Orchestrator(EventListener):
     """
     Orchestrator sterujący wykonywaniem scenariuszy zdarzeniowych.
@@ -94,15 +157,52 @@ class Orchestrator(EventListener):
             "conditions_directory": None,  # Użytkownik może nadpisać w JSON
             # Limity wykonywania scenariuszy
             "max_concurrent_scenarios": 1,  # Maksymalna liczba jednoczesnych scenariuszy (domyślnie 1)
+            # Co ile sekund sprawdzać zmiany plików scenariuszy (0 lub None = bez przeładowania)
+            "scenarios_reload_interval": 1.0,
+            # Ewaluuj ponownie tylko scenariusze, których zależności się zmieniły
+            # (False = ewaluacja wszystkich scenariuszy w każdym cyklu)
+            "event_driven_scenarios": True,
+            # Subskrypcja stanu klientów: snapshot + zmiany zamiast CMD_GET_STATE
+            # w każdym cyklu (False = odpytywanie wszystkich klientów)
+            "state_subscription": True,
+            "state_keepalive_interval": 1.0,  # Keepalive klienta przy braku zmian [s]
+            "state_keepalive_timeout": 3.0,  # Cisza dłuższa = powrót do odpytywania [s]
+            "state_subscription_lease": 10.0,  # Klient usuwa nieodnowioną subskrypcję [s]
+            # Co ile sekund ponawiać subskrypcję klientów bez jej obsługi (legacy)
+            "state_subscription_retry_interval": 30.0,
         }
 
         self._scenarios = OrderedDict()
+        # Drzewa warunków kompilowane raz przy ładowaniu scenariuszy
+        self._compiled_conditions: Dict[str, _CompiledConditions] = {}
+        # Znaczniki (mtime_ns, size) plików scenariuszy (None = nie wczytano z plików)
+        self._scenario_files_stamp: Optional[Dict[str, Tuple[int, int]]] = None
+        self._scenario_files_checked_at = 0.0
+        # Ewaluacja sterowana zdarzeniami: scenariusze z niespełnionymi warunkami,
+        # których zależności się nie zmieniły, graf klient -> scenariusze
+        # i terminy wybudzeń warunków czasowych/bazodanowych
+        self._clean_scenarios: set[str] = set()
+        self._condition_graph: Optional[Dict[Optional[str], set[str]]] = None
+        self._scenario_wakeups: Dict[str, float] = {}
+        # Oczekujący na zmianę stanu klienta (np. akcja wait_for_state)
+        self._state_waiters: Dict[str, set[asyncio.Future]] = {}
+        # Subskrypcje stanu klientów (klienci bez subskrypcji są odpytywani)
+        self._client_state_sync: Dict[str, _ClientStateSync] = {}
         self._scenario_last_execution = {}
         self._autonomous_execution_history = []
 
         # Tracking aktywnych scenariuszy - zabezpieczenie przed wielokrotnym uruchamianiem
         self._running_scenarios: Dict[str, asyncio.Task] = {}
         self._scenario_execution_count: Dict[str, int] = {}
+        # Indeksy aktualizowane przyrostowo, by _check_scenarios nie przeliczał
+        # ich dla każdego scenariusza w każdym cyklu: liczba niezakończonych
+        # tasków, zakończone taski do sprzątnięcia, koniec cooldown (monotonic)
+        # z kopcem terminów oraz scenariusze, które wyczerpały limit wykonań
+        self._active_scenarios_count = 0
+        self._finished_scenarios: list[str] = []
+        self._cooldown_until: Dict[str, float] = {}
+        self._cooldown_heap: list[Tuple[float, str]] = []
+        self._exhausted_scenarios: set[str] = set()
 
         # NOWE: Liczniki wykonań scenariuszy dla systemu blokowania po przekroczeniu limitu
         self._scenario_execution_counters: Dict[str, int] = {}
@@ -149,12 +249,16 @@ class Orchestrator(EventListener):
         """Zwiększa licznik wykonań scenariusza i zwraca aktualną wartość."""
         current = self._scenario_execution_counters.get(scenario_name, 0) + 1
         self._scenario_execution_counters[scenario_name] = current
+        max_executions = self._scenarios.get(scenario_name, {}).get("max_executions")
+        if max_executions is not None and 0 < max_executions <= current:
+            self._exhausted_scenarios.add(scenario_name)
         return current
 
     def reset_scenario_execution_count(self, scenario_name: str) -> None:
         """Resetuje licznik wykonań scenariusza po ACK."""
         if scenario_name in self._scenario_execution_counters:
             del self._scenario_execution_counters[scenario_name]
+        self._exhausted_scenarios.discard(scenario_name)
         if scenario_name in self._blocked_scenarios:
             del self._blocked_scenarios[scenario_name]
         info(
@@ -168,6 +272,7 @@ class Orchestrator(EventListener):
             self._blocked_scenarios
         )
         self._scenario_execution_counters.clear()
+        self._exhausted_scenarios.clear()
         self._blocked_scenarios.clear()
         if reset_count > 0:
             info(
@@ -175,6 +280,18 @@ class Orchestrator(EventListener):
                 message_logger=self._message_logger,
             )
 
+    def _refresh_exhausted_scenarios(self) -> None:
+        """Przelicza scenariusze z wyczerpanym limitem wykonań (np. po przeładowaniu)."""
+        self._exhausted_scenarios = {
+            scenario_name
+            for scenario_name, count in self._scenario_execution_counters.items()
+            if (
+                (limit := self._scenarios.get(scenario_name, {}).get("max_executions"))
+                is not None
+                and 0 < limit <= count
+            )
+        }
+
     def is_scenario_blocked(self, scenario_name: str) -> bool:
         """Sprawdza czy scenariusz jest zablokowany z powodu przekroczenia limitu."""
         return self._blocked_scenarios.get(scenario_name, False)
@@ -288,6 +405,12 @@ class Orchestrator(EventListener):
                     message_logger=self._message_logger,
                 )
 
+            # Skompiluj warunki raz - ewaluacja w pętli używa gotowych drzew
+            self._scenario_files_stamp = self._read_scenario_files_stamp()
+            self._scenario_files_checked_at = time.monotonic()
+            self._compile_scenario_conditions()
+            self._refresh_exhausted_scenarios()
+
         except Exception as e:
             error(
                 f"❌ Błąd ładowania scenariuszy: {e}",
@@ -298,6 +421,273 @@ class Orchestrator(EventListener):
                 message_logger=self._message_logger,
             )
 
+    def _scenario_directories(self) -> list[Path]:
+        """Zwraca istniejące katalogi scenariuszy (systemowy i użytkownika)."""
+        directories = []
+        for key in ("builtin_scenarios_directory", "scenarios_directory"):
+            directory = self._configuration.get(key)
+            if directory and Path(directory).exists():
+                directories.append(Path(directory))
+        return directories
+
+    def _read_scenario_files_stamp(self) -> Dict[str, Tuple[int, int]]:
+        """
+        Zbiera znaczniki (mtime_ns, size) wszystkich plików scenariuszy.
+
+        Returns:
+            Dict[str, Tuple[int, int]]: Mapa ścieżka pliku -> znacznik.
+        """
+        stamp = {}
+        for directory in self._scenario_directories():
+            for json_file in directory.glob("*.json"):
+                try:
+                    stat = json_file.stat()
+                except OSError:
+                    continue
+                stamp[str(json_file)] = (stat.st_mtime_ns, stat.st_size)
+        return stamp
+
+    def _reload_scenarios_if_changed(self, force: bool = False) -> bool:
+        """
+        Przeładowuje scenariusze, jeśli zmieniły się pliki w katalogach scenariuszy.
+
+        Sprawdzenie plików jest wykonywane co `scenarios_reload_interval` sekund.
+        Po przeładowaniu ponownie kompilowane są tylko warunki scenariuszy, których
+        konfiguracja `trigger.conditions` faktycznie się zmieniła.
+
+        Args:
+            force (bool): Pomija limit częstotliwości sprawdzania.
+
+        Returns:
+            bool: True, jeśli scenariusze zostały przeładowane.
+        """
+        if self._scenario_files_stamp is None:
+            return False
+        interval = self._configuration.get("scenarios_reload_interval", 1.0)
+        if not interval and not force:
+            return False
+
+        now = time.monotonic()
+        if not force and now - self._scenario_files_checked_at < interval:
+            return False
+        self._scenario_files_checked_at = now
+
+        stamp = self._read_scenario_files_stamp()
+        if stamp == self._scenario_files_stamp:
+            return False
+
+        info(
+            "🔄 Wykryto zmianę plików scenariuszy - przeładowuję",
+            message_logger=self._message_logger,
+        )
+        # Zachowaj wewnętrzne flagi (np. manual_run_requested) między przeładowaniami
+        internal_flags = {
+            name: scenario["_internal"]
+            for name, scenario in self._scenarios.items()
+            if "_internal" in scenario
+        }
+        self._load_scenarios()
+        for name, internal in internal_flags.items():
+            if name in self._scenarios:
+                self._scenarios[name]["_internal"] = internal
+        return True
+
+    def _compile_scenario_conditions(self) -> None:
+        """
+        Kompiluje warunki triggerów wszystkich załadowanych scenariuszy.
+
+        Drzewa warunków scenariuszy o niezmienionej konfiguracji są zachowywane,
+        a wpisy scenariuszy usuniętych - kasowane.
+        """
+        compiled = {}
+        for scenario_name, scenario in self._scenarios.items():
+            conditions = (scenario.get("trigger", {}) or {}).get("conditions", {})
+            if not conditions:
+                continue
+            compiled[scenario_name] = self._get_compiled_conditions(
+                scenario_name, conditions
+            )
+        self._compiled_conditions = compiled
+        self._invalidate_scenario_conditions()
+
+    def _get_compiled_conditions(
+        self, scenario_name: str, conditions: Dict[str, Any]
+    ) -> _CompiledConditions:
+        """
+        Zwraca skompilowane warunki scenariusza, kompilując je tylko gdy to konieczne.
+
+        Args:
+            scenario_name (str): Nazwa scenariusza.
+            conditions (Dict[str, Any]): Konfiguracja `trigger.conditions`.
+
+        Returns:
+            _CompiledConditions: Wpis z drzewem warunków i listą czytanych klientów.
+        """
+        entry = self._compiled_conditions.get(scenario_name)
+        if entry is not None and entry.source is conditions:
+            return entry
+
+        fingerprint = json.dumps(conditions, sort_keys=True, default=str)
+        if entry is not None and entry.fingerprint == fingerprint:
+            entry.source = conditions
+            return entry
+
+        entry = _CompiledConditions(source=conditions, fingerprint=fingerprint)
+        try:
+            entry.condition = ConditionFactory.create_condition(
+                conditions, self._message_logger
+            )
+            clients = entry.condition.get_referenced_clients()
+            entry.clients = frozenset(clients) if clients is not None else None
+            fields = entry.condition.get_referenced_fields()
+            entry.fields = frozenset(fields) if fields is not None else None
+            entry.poll_interval = entry.condition.get_poll_interval()
+        except Exception as e:
+            entry.condition = None
+            entry.error = str(e)
+            error(
+                f"❌ Błąd kompilacji warunków dla scenariusza {scenario_name}: {e}",
+                message_logger=self._message_logger,
+            )
+        self._compiled_conditions[scenario_name] = entry
+        self._condition_graph = None
+        self._clean_scenarios.discard(scenario_name)
+        self._scenario_wakeups.pop(scenario_name, None)
+        return entry
+
+    def _invalidate_scenario_conditions(self) -> None:
+        """Wymusza ponowną ewaluację wszystkich scenariuszy w kolejnym cyklu."""
+        self._clean_scenarios.clear()
+        self._scenario_wakeups.clear()
+        self._condition_graph = None
+
+    def _build_condition_graph(self) -> Dict[Optional[str], set[str]]:
+        """
+        Buduje graf zależności: nazwa klienta -> scenariusze czytające jego stan.
+
+        Klucz None grupuje scenariusze, które mogą czytać stan dowolnego klienta.
+        """
+        graph: Dict[Optional[str], set[str]] = {}
+        for scenario_name, entry in self._compiled_conditions.items():
+            if entry.condition is None:
+                continue
+            for client_name in entry.clients if entry.clients is not None else (None,):
+                graph.setdefault(client_name, set()).add(scenario_name)
+        return graph
+
+    def _notify_client_state_changed(
+        self, client_name: str, changed_fields: Optional[set[str]] = None
+    ) -> None:
+        """
+        Oznacza do ponownej ewaluacji scenariusze zależne od zmienionego stanu klienta.
+
+        Args:
+            client_name (str): Klient, którego stan się zmienił.
+            changed_fields (set[str] | None): Zmienione pola stanu (None = dowolne).
+        """
+        waiters = self._state_waiters.get(client_name)
+        if waiters:
+            for waiter in list(waiters):
+                if not waiter.done():
+                    waiter.set_result(client_name)
+
+        if not self._clean_scenarios:
+            return
+        if self._condition_graph is None:
+            self._condition_graph = self._build_condition_graph()
+
+        affected = self._condition_graph.get(client_name, set()) | (
+            self._condition_graph.get(None, set())
+        )
+        for scenario_name in affected:
+            if scenario_name not in self._clean_scenarios:
+                continue
+            fields = self._compiled_conditions[scenario_name].fields
+            if changed_fields is None or fields is None or fields & changed_fields:
+                self._clean_scenarios.discard(scenario_name)
+
+    def wait_for_client_state_change(
+        self, client_names: Iterable[str]
+    ) -> asyncio.Future:
+        """
+        Zwraca future rozwiązywany przy najbliższej zmianie stanu jednego z klientów.
+
+        Future otrzymuje nazwę klienta, którego stan się zmienił. Anulowanie
+        (np. przez timeout oczekującego) wyrejestrowuje go.
+
+        Args:
+            client_names: Klienci, których zmiany stanu są obserwowane.
+
+        Returns:
+            asyncio.Future: Future do oczekiwania na zmianę stanu.
+        """
+        waiter = asyncio.get_running_loop().create_future()
+        names = set(client_names)
+        for client_name in names:
+            self._state_waiters.setdefault(client_name, set()).add(waiter)
+
+        def unregister(_: asyncio.Future) -> None:
+            for client_name in names:
+                waiters = self._state_waiters.get(client_name)
+                if waiters is not None:
+                    waiters.discard(waiter)
+                    if not waiters:
+                        del self._state_waiters[client_name]
+
+        waiter.add_done_callback(unregister)
+        return waiter
+
+    def _mark_scenario_clean(
+        self, scenario_name: str, compiled: _CompiledConditions
+    ) -> None:
+        """
+        Zapamiętuje, że warunki scenariusza nie są spełnione przy bieżącym stanie.
+
+        Scenariusz nie będzie ewaluowany, dopóki nie zmieni się stan klienta,
+        od którego zależy, lub nie minie okres odpytywania jego warunków.
+        """
+        if not self._configuration.get("event_driven_scenarios", True):
+            return
+        if compiled.poll_interval is None:
+            self._clean_scenarios.add(scenario_name)
+        elif compiled.poll_interval > 0:
+            self._clean_scenarios.add(scenario_name)
+            self._scenario_wakeups[scenario_name] = (
+                time.monotonic() + compiled.poll_interval
+            )
+
+    def _wake_due_scenarios(self) -> None:
+        """Przywraca do ewaluacji scenariusze, których okres odpytywania minął."""
+        if not self._scenario_wakeups:
+            return
+        now = time.monotonic()
+        for scenario_name, wakeup in list(self._scenario_wakeups.items()):
+            if wakeup <= now:
+                del self._scenario_wakeups[scenario_name]
+                self._clean_scenarios.discard(scenario_name)
+
+    def _build_clients_state(
+        self, client_names: Optional[FrozenSet[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Łączy konfigurację klientów z ich aktualnym stanem z `self._state`.
+
+        Args:
+            client_names: Klienci do uwzględnienia (None = wszyscy skonfigurowani).
+
+        Returns:
+            Dict[str, Any]: Mapa nazwa klienta -> konfiguracja + stan.
+        """
+        configured_clients = self._configuration.get("clients", {})
+        if client_names is None:
+            names = configured_clients.keys()
+        else:
+            names = [name for name in client_names if name in configured_clients]
+        return {
+            name: {**configured_clients[name], **self._state.get(name, {})}
+            for name in names
+        }
+
     def _load_conditions(self):
         """
         Ładuje warunki z dwóch źródeł:
@@ -875,7 +1265,7 @@ class Orchestrator(EventListener):
                     if (
                         inspect.isclass(attr)
                         and issubclass(attr, BaseCondition)
-                        and attr != BaseCondition
+                        and not inspect.isabstract(attr)
                     ):
                         # Zarejestruj w fabryce
                         condition_name = attr_name.replace("Condition", "").lower()
@@ -1236,6 +1626,7 @@ class Orchestrator(EventListener):
             # Zapisz wyniki
             execution_time = datetime.now()
             self._scenario_last_execution[scenario_name] = execution_time
+            self._start_scenario_cooldown(scenario_name)
             self._autonomous_execution_history.append({
                 "scenario_name": scenario_name,
                 "execution_time": execution_time.isoformat(),
@@ -1420,6 +1811,180 @@ class Orchestrator(EventListener):
         """
         return await self._action_executor.execute_action(action_config, context)
 
+    def _store_client_state(
+        self,
+        client_name: str,
+        data: Dict[str, Any],
+        fields: Tuple[str, ...] | set[str] = _CLIENT_STATE_FIELDS,
+    ) -> set[str]:
+        """
+        Zapisuje pola stanu klienta i oznacza zależne scenariusze do ewaluacji.
+
+        Args:
+            client_name (str): Nazwa klienta.
+            data (dict): Stan w postaci odpowiedzi CMD_GET_STATE (lub snapshotu subskrypcji).
+            fields: Pola do zaktualizowania (domyślnie wszystkie pola stanu klienta).
+
+        Returns:
+            set[str]: Pola, których wartość się zmieniła.
+        """
+        client_state = self._state[client_name]
+        changed_fields = set()
+        for field in fields:
+            value = data.get(field)
+            if field == "error":
+                value = bool(value)
+            elif field == "state" and value is None:
+                value = {}
+            if client_state.get(field, _MISSING) != value:
+                changed_fields.add(field)
+            client_state[field] = value
+
+        # Ewaluuj ponownie tylko scenariusze zależne od zmienionych pól
+        if changed_fields:
+            self._notify_client_state_changed(client_name, changed_fields)
+        return changed_fields
+
+    async def _request_state_subscription(
+        self, client_name: str, sync: _ClientStateSync, now: float
+    ) -> None:
+        """
+        Wysyła do klienta CMD_SUBSCRIBE_STATE (nowa subskrypcja lub odnowienie).
+
+        Odnowienie podaje znaną wersję stanu - klient odpowiada wtedy bez snapshotu.
+        """
+        client = self._configuration["clients"].get(client_name)
+        if client is None:
+            return
+        sync.requested_at = now
+        await self._event(
+            destination=client_name,
+            destination_address=client["address"],
+            destination_port=client["port"],
+            event_type=SUBSCRIBE_STATE_EVENT,
+            data={
+                "keepalive_interval": self._configuration["state_keepalive_interval"],
+                "lease": self._configuration["state_subscription_lease"],
+                # Orchestrator czyta stan raz na cykl - częstsze zmiany są zbędne
+                "min_interval": 1 / self.check_local_data_frequency,
+                "known_version": sync.version if sync.subscribed else None,
+            },
+            to_be_processed=False,
+            is_system_event=True,
+        )
+
+    async def _update_state_subscription(self, client_name: str, now: float) -> bool:
+        """
+        Pilnuje subskrypcji stanu klienta w cyklu `_check_local_data`.
+
+        Wykrywa utratę klienta (brak wiadomości przez `state_keepalive_timeout`),
+        odnawia aktywną subskrypcję przed upływem lease i ponawia próbę
+        subskrypcji klientów, które jej nie potwierdziły.
+
+        Returns:
+            bool: True, jeśli klient ma aktywną subskrypcję i nie wymaga CMD_GET_STATE.
+        """
+        sync = self._client_state_sync.setdefault(client_name, _ClientStateSync())
+        if (
+            sync.subscribed
+            and now - sync.last_seen > self._configuration["state_keepalive_timeout"]
+        ):
+            warning(
+                f"Brak stanu od klienta {client_name} przez "
+                f"{now - sync.last_seen:.1f}s - powrót do odpytywania CMD_GET_STATE",
+                message_logger=self._message_logger,
+            )
+            self._client_state_sync[client_name] = sync = _ClientStateSync()
+
+        if sync.subscribed:
+            if now - sync.requested_at >= (
+                self._configuration["state_subscription_lease"] / 2
+            ):
+                await self._request_state_subscription(client_name, sync, now)
+            return True
+
+        retry_interval = self._configuration["state_subscription_retry_interval"]
+        if sync.requested_at is None or now - sync.requested_at >= retry_interval:
+            await self._request_state_subscription(client_name, sync, now)
+        return False
+
+    async def _resync_client_state(self, client_name: str, sync: _ClientStateSync):
+        """Porzuca niespójny stan klienta i prosi o nowy snapshot."""
+        debug(
+            f"Utracona ciągłość wersji stanu klienta {client_name} - ponowny snapshot",
+            message_logger=self._message_logger,
+        )
+        sync.version = None
+        await self._request_state_subscription(client_name, sync, time.monotonic())
+
+    async def _handle_state_subscription_reply(self, event: Event) -> None:
+        """
+        Obsługuje odpowiedź na CMD_SUBSCRIBE_STATE.
+
+        Odpowiedź bez numeru wersji oznacza klienta bez obsługi subskrypcji -
+        pozostaje on odpytywany przez CMD_GET_STATE.
+        """
+        sync = self._client_state_sync.get(event.source)
+        data = event.data or {}
+        if sync is None or event.result.result != "success" or "version" not in data:
+            return
+
+        version = data["version"]
+        if sync.version is not None and version < sync.version:
+            return  # Spóźniona odpowiedź - stan jest już nowszy
+        if "snapshot" in data:
+            sync.snapshot = data["snapshot"]
+            sync.version = version
+            self._store_client_state(event.source, sync.snapshot)
+        elif version != sync.version:
+            await self._resync_client_state(event.source, sync)
+            return
+
+        if not sync.subscribed:
+            info(
+                f"Klient {event.source} subskrybuje stan (wersja {version})",
+                message_logger=self._message_logger,
+            )
+        sync.subscribed = True
+        sync.last_seen = time.monotonic()
+
+    async def _handle_state_push(self, event: Event):
+        """
+        Nakłada zmiany stanu (STATE_UPDATE) lub potwierdza keepalive klienta.
+
+        Wiadomość z nieciągłą wersją wymusza ponowny snapshot; do czasu jego
+        otrzymania zmiany są pomijane, a klient nie jest uznawany za aktywnego.
+        """
+        sync = self._client_state_sync.get(event.source)
+        if sync is None or not sync.subscribed or sync.version is None:
+            return
+        data = event.data
+        version = data.get("version", -1)
+
+        if event.event_type == STATE_KEEPALIVE_EVENT:
+            if version == sync.version:
+                sync.last_seen = time.monotonic()
+            elif version > sync.version:
+                await self._resync_client_state(event.source, sync)
+            return
+
+        if version <= sync.version:
+            return  # Duplikat lub spóźniona zmiana
+        if data.get("base_version") != sync.version:
+            await self._resync_client_state(event.source, sync)
+            return
+
+        changes = data.get("changes", [])
+        removed = data.get("removed", [])
+        sync.snapshot = apply_state_diff(sync.snapshot, changes, removed)
+        sync.version = version
+        sync.last_seen = time.monotonic()
+
+        fields = {path[0] for path, _ in changes} | {path[0] for path in removed}
+        self._store_client_state(
+            event.source, sync.snapshot, fields.intersection(_CLIENT_STATE_FIELDS)
+        )
+
     async def _analyze_event(self, event: Event) -> bool:
         """
         Analizuje i obsługuje zdarzenia przychodzące do Orchestratora.
@@ -1440,28 +2005,24 @@ class Orchestrator(EventListener):
                     old_state = self._state.get(event.source, {}).get(
                         "fsm_state", "UNKNOWN"
                     )
-                    new_state = event.data["fsm_state"]
-                    self._state[event.source]["fsm_state"] = new_state
-
-                    # Zapisz pola błędu raportowane przez klienta
-                    self._state[event.source]["error"] = bool(
-                        event.data.get("error", False)
-                    )
-                    self._state[event.source]["error_message"] = event.data.get(
-                        "error_message"
-                    )
-
-                    self._state[event.source]["state"] = event.data.get("state", {})
+                    self._store_client_state(event.source, event.data)
 
                     debug(
-                        f"📊 _state update: {event.source} FSM: {old_state} → {new_state}",
+                        f"📊 _state update: {event.source} FSM: {old_state} → {event.data['fsm_state']}",
                         message_logger=self._message_logger,
                     )
 
                     # Event ma result - usuń go z processing
                     self._find_and_remove_processing_event(event)
+            case "CMD_SUBSCRIBE_STATE":
+                if event.result is not None:
+                    await self._handle_state_subscription_reply(event)
             case "CMD_HEALTH_CHECK":
                 if event.result is not None:
+                    if self._state[event.source].get("health_check") != event.data:
+                        self._notify_client_state_changed(
+                            event.source, {"health_check"}
+                        )
                     self._state[event.source]["health_check"] = event.data
                     # Event ma result - usuń go z processing
                     self._find_and_remove_processing_event(event)
@@ -1613,54 +2174,53 @@ class Orchestrator(EventListener):
             )
             return False
 
-        # KROK 2: Utwórz ScenarioContext
-        # Przefiltruj stan klientów do znanych klientów
-        configured_clients = self._configuration.get("clients", {})
-        # Uzupełnij dane klientów z konfiguracji i ich stan z self._state
-        clients_state = {}
-        for client_name, client_config in configured_clients.items():
-            clients_state[client_name] = {
-                **client_config,  # Dane z konfiguracji (port, address, itp.)
-                **self._state.get(
-                    client_name, {}
-                ),  # Stan aktualny (fsm_state, error, itp.)
-            }
-
-        # Utwórz kontekst scenariusza
-        scenario_context = ScenarioContext(
-            scenario_name=scenario_name,
-            orchestrator=self,
-            action_executor=self._action_executor,
-            message_logger=self._message_logger,
-            clients=clients_state,
-            components=self._components,
-            context={},  # Pusty słownik na zmienne
-        )
-
-        # KROK 3: Sprawdź warunki triggera
+        # KROK 2: Pobierz skompilowane warunki triggera
         trigger = scenario.get("trigger", {})
         conditions = trigger.get("conditions", {})
 
-        self.scenario_data[scenario_name] = scenario_context
-
         if not conditions:
             # Brak warunków = zawsze wykonuj, zachowaj kontekst
+            self.scenario_data[scenario_name] = self._create_scenario_context(
+                scenario_name, self._build_clients_state()
+            )
             return True
 
-        try:
-            # Użyj nowego systemu warunków
-            condition = ConditionFactory.create_condition(
-                conditions, self._message_logger
+        compiled = self._get_compiled_conditions(scenario_name, conditions)
+        if compiled.condition is None:
+            error(
+                f"❌ Błąd ewaluacji warunków dla scenariusza {scenario_name}: {compiled.error}",
+                message_logger=self._message_logger,
+            )
+            self.scenario_data.pop(scenario_name, None)
+            return False
+
+        # KROK 3: Kontekst tylko z klientami czytanymi przez warunki. Kontekst
+        # niespełnionej ewaluacji jest używany ponownie zamiast tworzenia nowego.
+        clients_state = self._build_clients_state(compiled.clients)
+        scenario_context = compiled.context
+        compiled.context = None
+        if scenario_context is None:
+            scenario_context = self._create_scenario_context(
+                scenario_name, clients_state
             )
+        else:
+            scenario_context.clients = clients_state
+            scenario_context.context = {}
+        self.scenario_data[scenario_name] = scenario_context
 
-            # Ewaluuj warunek
-            should_trigger = await condition.evaluate(self.scenario_data[scenario_name])
+        try:
+            should_trigger = await compiled.condition.evaluate(scenario_context)
 
             if should_trigger:
+                if compiled.clients is not None:
+                    # Akcje potrzebują pełnego stanu wszystkich klientów
+                    scenario_context.clients = self._build_clients_state()
                 return True
             else:
                 # Usuń kontekst jeśli scenariusz nie będzie wykonywany
                 self.scenario_data.pop(scenario_name, None)
+                compiled.context = scenario_context
+                self._mark_scenario_clean(scenario_name, compiled)
                 return False
 
         except Exception as e:
@@ -1672,41 +2232,107 @@ class Orchestrator(EventListener):
             self.scenario_data.pop(scenario_name, None)
             return False
 
-    def _is_scenario_in_cooldown(self, scenario_name: str, scenario: dict) -> bool:
+    def _create_scenario_context(
+        self, scenario_name: str, clients_state: Dict[str, Any]
+    ) -> ScenarioContext:
         """
-        Sprawdza czy scenariusz jest w okresie cooldown.
+        Tworzy ScenarioContext bez walidacji pydantic (dane pochodzą z Orchestratora).
 
         Args:
-            scenario_name: Nazwa scenariusza
-            scenario: Konfiguracja scenariusza
+            scenario_name (str): Nazwa scenariusza.
+            clients_state (Dict[str, Any]): Stan klientów widoczny w kontekście.
 
         Returns:
-            True jeśli scenariusz jest w cooldown, False w przeciwnym razie
+            ScenarioContext: Nowy kontekst z pustym słownikiem zmiennych.
         """
-        # Sprawdź cooldown na poziomie głównym (nowy format)
+        return ScenarioContext.model_construct(
+            scenario_name=scenario_name,
+            orchestrator=self,
+            action_executor=self._action_executor,
+            message_logger=self._message_logger,
+            clients=clients_state,
+            components=self._components,
+            context={},  # Pusty słownik na zmienne
+        )
+
+    @staticmethod
+    def _get_scenario_cooldown(scenario: dict) -> float:
+        """Zwraca cooldown scenariusza w sekundach (główny poziom lub stary format)."""
         cooldown_seconds = scenario.get("cooldown")
         if cooldown_seconds is None:
             # Sprawdź cooldown w trigger.conditions (stary format - dla kompatybilności)
             trigger = scenario.get("trigger", {})
             conditions = trigger.get("conditions", {})
             cooldown_seconds = conditions.get("cooldown_seconds", 60)  # Domyślnie 60s
+        return cooldown_seconds
 
-        if scenario_name not in self._scenario_last_execution:
-            return False  # Pierwszy raz - nie ma cooldown
-
-        last_execution = self._scenario_last_execution[scenario_name]
-        time_since_last = datetime.now() - last_execution
-
-        is_in_cooldown = time_since_last.total_seconds() < cooldown_seconds
+    def _start_scenario_cooldown(self, scenario_name: str) -> None:
+        """
+        Rozpoczyna cooldown scenariusza liczony od zakończenia jego wykonania.
 
-        if is_in_cooldown:
-            remaining = cooldown_seconds - time_since_last.total_seconds()
-            debug(
-                f"⏱️ Scenariusz {scenario_name} w cooldown, pozostało: {remaining:.1f}s",
-                message_logger=self._message_logger,
-            )
+        Koniec cooldown trafia do kopca terminów - _check_scenarios pomija
+        scenariusz bez sprawdzania czasu, dopóki termin nie zostanie zdjęty.
+        """
+        scenario = self._scenarios.get(scenario_name)
+        if scenario is None:
+            return
+        cooldown_seconds = self._get_scenario_cooldown(scenario)
+        if not cooldown_seconds or cooldown_seconds <= 0:
+            self._cooldown_until.pop(scenario_name, None)
+            return
+        until = time.monotonic() + cooldown_seconds
+        self._cooldown_until[scenario_name] = until
+        heapq.heappush(self._cooldown_heap, (until, scenario_name))
+
+    def _expire_scenario_cooldowns(self) -> None:
+        """Zdejmuje z kopca terminy cooldown, które już minęły."""
+        heap = self._cooldown_heap
+        if not heap:
+            return
+        now = time.monotonic()
+        while heap and heap[0][0] <= now:
+            until, scenario_name = heapq.heappop(heap)
+            # Wpis nieaktualny, jeśli cooldown rozpoczęto ponownie
+            if self._cooldown_until.get(scenario_name) == until:
+                del self._cooldown_until[scenario_name]
+
+    async def _run_tracked_scenario(self, scenario_name: str) -> bool:
+        """
+        Task scenariusza w tle - aktualizuje licznik aktywnych scenariuszy.
 
-        return is_in_cooldown
+        Licznik jest zmniejszany w samym tasku (a nie w callbacku), więc
+        zakończenie jest widoczne w tym samym cyklu _check_scenarios.
+        """
+        task = asyncio.current_task()
+        try:
+            return await self._execute_scenario_with_tracking(scenario_name)
+        finally:
+            if self._running_scenarios.get(scenario_name) is task:
+                self._active_scenarios_count -= 1
+                self._finished_scenarios.append(scenario_name)
+
+    def _reap_finished_scenarios(self) -> None:
+        """Usuwa zakończone taski z `_running_scenarios` i loguje ich wynik."""
+        finished, self._finished_scenarios = self._finished_scenarios, []
+        for scenario_name in finished:
+            task = self._running_scenarios.pop(scenario_name, None)
+            if task is None:
+                continue
+            if task.cancelled():
+                debug(
+                    f"⏹️ Task scenariusza {scenario_name} anulowany",
+                    message_logger=self._message_logger,
+                )
+            elif task.exception() is not None:
+                error(
+                    f"❌ Task scenariusza {scenario_name} zakończony błędem: {task.exception()}",
+                    message_logger=self._message_logger,
+                )
+            else:
+                debug(
+                    f"✅ Task scenariusza {scenario_name} zakończony: {task.result()}",
+                    message_logger=self._message_logger,
+                )
 
     async def _check_scenarios(self):
         """
@@ -1718,11 +2344,16 @@ class Orchestrator(EventListener):
         - Execution limits
         - Automatic cleanup
         """
+        self._reload_scenarios_if_changed()
+        self._wake_due_scenarios()
+        self._expire_scenario_cooldowns()
+        self._reap_finished_scenarios()
+
         if not self._scenarios:
             return
 
         debug(
-            f"🔍 Sprawdzam {len(self._scenarios)} scenariuszy, aktywnych: {len(self._running_scenarios)}, limit: {self._configuration.get('max_concurrent_scenarios', 1)}",
+            f"🔍 Sprawdzam {len(self._scenarios)} scenariuszy, aktywnych: {self._active_scenarios_count}, limit: {self._configuration.get('max_concurrent_scenarios', 1)}",
             message_logger=self._message_logger,
         )
 
@@ -1730,37 +2361,34 @@ class Orchestrator(EventListener):
         max_concurrent_scenarios = self._configuration.get(
             "max_concurrent_scenarios", 1
         )
-        active_scenarios_count = len([
-            task for task in self._running_scenarios.values() if not task.done()
-        ])
-
-        if active_scenarios_count >= max_concurrent_scenarios:
+        if self._active_scenarios_count >= max_concurrent_scenarios:
             debug(
-                f"🚫 Osiągnięto globalny limit jednoczesnych scenariuszy: {active_scenarios_count}/{max_concurrent_scenarios}",
+                f"🚫 Osiągnięto globalny limit jednoczesnych scenariuszy: {self._active_scenarios_count}/{max_concurrent_scenarios}",
                 message_logger=self._message_logger,
             )
-            # Tylko cleanup zakończonych tasków, nie uruchamiaj nowych
-            for scenario_name, task in list(self._running_scenarios.items()):
-                if task.done():
-                    try:
-                        result = await task
-                        debug(
-                            f"✅ Task scenariusza {scenario_name} zakończony: {result}",
-                            message_logger=self._message_logger,
-                        )
-                    except Exception as e:
-                        error(
-                            f"❌ Task scenariusza {scenario_name} zakończony błędem: {e}",
-                            message_logger=self._message_logger,
-                        )
-                    finally:
-                        del self._running_scenarios[scenario_name]
-                await asyncio.sleep(0)
             return
 
+        # Dane zewnętrzne warunków (baza danych) pobierane współbieżnie -
+        # komponenty łączą wyszukiwania jednego cyklu w zapytania
+        await self._prefetch_scenario_conditions()
+
         # Iteruj przez scenariusze (już posortowane według priorytetu)
         for scenario_name, scenario in self._scenarios.items():
+            # Warunki niespełnione i bez zmian w zależnościach, cooldown
+            # lub wyczerpany limit wykonań - pomiń bez ewaluacji
+            if (
+                scenario_name in self._clean_scenarios
+                or scenario_name in self._cooldown_until
+            ):
+                continue
             try:
+                if scenario_name in self._exhausted_scenarios:
+                    if not self.is_scenario_blocked(scenario_name):
+                        self.should_block_scenario_due_to_limit(
+                            scenario_name, scenario.get("max_executions")
+                        )
+                    continue
+
                 # KROK 0: Pomijaj scenariusze manualne w trybie autonomicznym,
                 # chyba że mają ustawioną wewnętrzną flagę manual_run_requested=True
                 trigger_cfg = scenario.get("trigger", {}) or {}
@@ -1780,33 +2408,19 @@ class Orchestrator(EventListener):
                             message_logger=self._message_logger,
                         )
 
-                # KROK 1: Cleanup zakończonych tasków
+                # KROK 1: Scenariusz wciąż działa (zakończony w tym cyklu - sprzątnij)
                 if scenario_name in self._running_scenarios:
-                    task = self._running_scenarios[scenario_name]
-                    if task.done():
-                        # Pobierz wynik i usuń
-                        try:
-                            result = await task
-                            debug(
-                                f"✅ Task scenariusza {scenario_name} zakończony: {result}",
-                                message_logger=self._message_logger,
-                            )
-                        except Exception as e:
-                            error(
-                                f"❌ Task scenariusza {scenario_name} zakończony błędem: {e}",
-                                message_logger=self._message_logger,
-                            )
-                        finally:
-                            del self._running_scenarios[scenario_name]
-                    else:
+                    if self._finished_scenarios:
+                        self._reap_finished_scenarios()
+                    if scenario_name in self._running_scenarios:
                         debug(
                             f"⏳ Scenariusz {scenario_name} wciąż działa - pomijam",
                             message_logger=self._message_logger,
                         )
                         continue
 
-                # KROK 2: Sprawdź cooldown
-                if self._is_scenario_in_cooldown(scenario_name, scenario):
+                # KROK 2: Cooldown mógł się rozpocząć po zakończeniu w tym cyklu
+                if scenario_name in self._cooldown_until:
                     continue
 
                 # KROK 3: Sprawdź warunki
@@ -1816,14 +2430,7 @@ class Orchestrator(EventListener):
 
                 # KROK 4: Sprawdź limity wykonań (opcjonalne)
                 max_concurrent = scenario.get("max_concurrent_executions", 1)
-                if (
-                    len([
-                        task
-                        for task in self._running_scenarios.values()
-                        if not task.done()
-                    ])
-                    >= max_concurrent
-                ):
+                if self._active_scenarios_count >= max_concurrent:
                     debug(
                         f"🚫 Scenariusz {scenario_name} osiągnął limit: {max_concurrent}",
                         message_logger=self._message_logger,
@@ -1848,12 +2455,11 @@ class Orchestrator(EventListener):
                     message_logger=self._message_logger,
                 )
 
-                task = asyncio.create_task(
-                    self._execute_scenario_with_tracking(scenario_name)
-                )
+                task = asyncio.create_task(self._run_tracked_scenario(scenario_name))
 
                 # Dodaj do tracking
                 self._running_scenarios[scenario_name] = task
+                self._active_scenarios_count += 1
                 self._scenario_execution_count[scenario_name] = (
                     self._scenario_execution_count.get(scenario_name, 0) + 1
                 )
@@ -1880,6 +2486,54 @@ class Orchestrator(EventListener):
                     message_logger=self._message_logger,
                 )
 
+        clear_prefetched_results()
+
+    async def _prefetch_scenario_conditions(self) -> None:
+        """
+        Wywołuje `prefetch` warunków scenariuszy ewaluowanych w tym cyklu.
+
+        Scenariusze są ewaluowane kolejno, więc bez tego każdy warunek
+        bazodanowy wysyłałby osobne zapytanie. Wszystkie warunki są tu
+        zbierane z drzew (także zagnieżdżone w warunkach logicznych)
+        i pobierane jednym `asyncio.gather`; wyniki odczytuje ewaluacja.
+        """
+        clear_prefetched_results()
+        conditions = []
+        for scenario_name, compiled in self._compiled_conditions.items():
+            if (
+                compiled.condition is None
+                or scenario_name in self._clean_scenarios
+                or scenario_name in self._cooldown_until
+                or scenario_name in self._exhausted_scenarios
+                or scenario_name in self._running_scenarios
+            ):
+                continue
+            scenario = self._scenarios.get(scenario_name) or {}
+            trigger_cfg = scenario.get("trigger", {}) or {}
+            if str(trigger_cfg.get("type", "")).lower() == "manual" and not (
+                scenario.get("_internal", {}) or {}
+            ).get("manual_run_requested", False):
+                continue
+            conditions.extend(
+                condition
+                for condition in compiled.condition.iter_conditions()
+                if type(condition).prefetch is not BaseCondition.prefetch
+            )
+        if not conditions:
+            return
+
+        context = self._create_scenario_context("prefetch", {})
+        results = await asyncio.gather(
+            *(condition.prefetch(context) for condition in conditions),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                debug(
+                    f"Prefetch warunku nie powiódł się: {result}",
+                    message_logger=self._message_logger,
+                )
+
     async def _serialize_completed_scenario_context(
         self, scenario_context: ScenarioContext
     ) -> None:
@@ -1920,11 +2574,17 @@ class Orchestrator(EventListener):
         """
         Odpytuje zdalnych klientów o stan lokalny i uruchamia kontrolę scenariuszy.
 
-        Wysyła zdarzenia `CMD_GET_STATE` do wszystkich skonfigurowanych klientów,
-        dodając je do kolejki „processing”, a następnie wywołuje sprawdzenie
-        warunków scenariuszy w trybie autonomicznym.
+        Klienci obsługujący subskrypcję stanu (`CMD_SUBSCRIBE_STATE`) sami
+        przysyłają zmiany stanu i keepalive - pozostali klienci (oraz klienci,
+        którzy przestali się odzywać) otrzymują `CMD_GET_STATE`, dodawane do
+        kolejki „processing”. Następnie wywołuje sprawdzenie warunków scenariuszy
+        w trybie autonomicznym.
         """
+        now = time.monotonic()
+        subscription = self._configuration.get("state_subscription", True)
         for key, client in self._configuration["clients"].items():
+            if subscription and await self._update_state_subscription(key, now):
+                continue
             client_port = client["port"]
             client_address = client["address"]
             event = await self._event(
@@ -1987,11 +2647,16 @@ class Orchestrator(EventListener):
 
             # Wyczyść tracking
             self._running_scenarios.clear()
+            self._finished_scenarios.clear()
+            self._active_scenarios_count = 0
             self._scenario_execution_count.clear()
 
-            # Wyczyść liczniki wykonań scenariuszy
+            # Wyczyść liczniki wykonań scenariuszy i zapisane cooldowny
             self._scenario_execution_counters.clear()
+            self._exhausted_scenarios.clear()
             self._blocked_scenarios.clear()
+            self._cooldown_until.clear()
+            self._cooldown_heap.clear()
 
             info(
                 "🧹 Cleanup aktywnych scenariuszy zakończony",
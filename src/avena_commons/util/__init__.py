@@ -22,6 +22,7 @@ Moduł zawierający narzędzia matematyczne i pomocnicze funkcje do obliczeń 3D
 
 from .utils import (
     angle_axis_to_quaternion,
+    build_pose_index,
     calculate_derivative,
     calculate_factor,
     calculate_factors,
@@ -39,6 +40,7 @@ from .utils import (
     joints_set_current_position_to_goal_position,
     limit_acc,
     limit_vel,
+    limit_vel_acc,
     moving_average_filter,
     pose_from_transformation_matrix,
     quaternion_angle_diff,
@@ -57,6 +59,7 @@ from .utils import (
 
 __all__ = [
     "angle_axis_to_quaternion",
+    "build_pose_index",
     "calculate_derivative",
     "calculate_factor",
     "calculate_factors",
@@ -74,6 +77,7 @@ __all__ = [
     "joints_set_current_position_to_goal_position",
     "limit_acc",
     "limit_vel",
+    "limit_vel_acc",
     "moving_average_filter",
     "pose_from_transformation_matrix",
     "quaternion_angle_diff",
@@ -27,6 +27,10 @@ This module provides a utility for managing error levels and taking actions base
     1.7 Get error history:
         error_history = error_manager.get_error_history()
 
+    1.8 Check if shared errors changed (cheap, no deserialization):
+        if error_manager.shared_version() != last_version:
+            last_version = error_manager.shared_version()
+
 2. ErrorInfo - every error is stored as an ErrorInfo object:
     2.1 Initialization:
         error = ErrorInfo(ErrorCodes.CONNECTION_ERROR, ErrorGroups.CRITICAL, "Failed to connect to the server")
@@ -108,12 +112,13 @@ finally:
 
 """
 
-import copy
 import os
 import threading
+from collections import deque
 from enum import Enum, auto
 
-from .control_loop import ControlLoop
+import numpy as np
+
 from .logger import error, info, warning
 
 # Check if running on Windows
@@ -129,7 +134,9 @@ if IS_WINDOWS:
     class ErrorManager:
         """Dummy ErrorManager for Windows systems - IPC functionality disabled"""
 
-        def __init__(self, suffix, message_logger=None, debug=False):
+        def __init__(
+            self, suffix, message_logger=None, debug=False, publish_period=1 / 100
+        ):
             warning(
                 "ErrorManager is not supported on Windows - using dummy implementation"
             )
@@ -156,6 +163,13 @@ if IS_WINDOWS:
         def get_error_history(self):
             return []
 
+        @property
+        def version(self):
+            return 0
+
+        def shared_version(self):
+            return 0
+
         def stop(self):
             pass
 
@@ -164,14 +178,24 @@ else:
     class ErrorManager:
         """Error manager class.
 
+        The shared ErrorInterface is published to shared memory only when it changes.
+        Every publish increments a version counter kept in a separate structured
+        (seqlock) buffer, so other managers check the version without locking and
+        deserialize the interface only when the version differs from the local one.
+
         :param suffix: Suffix - number for the shared memory
         :param message_logger: Message logger
+        :param publish_period: Max time [s] between checks of the shared version
 
         :param current_error: Current error
         :type current_error: list
         """
 
-        def __init__(self, suffix, message_logger=None, debug=False):
+        _VERSION_SCHEMA = np.dtype([("version", np.uint64)])
+
+        def __init__(
+            self, suffix, message_logger=None, debug=False, publish_period=1 / 100
+        ):
             self.__message_logger = message_logger
 
             self.__error_interface = ErrorInterface(log=False)
@@ -184,22 +208,22 @@ else:
                 message_logger=self.__message_logger,
                 debug=debug,
             )
-
-            self.__cl = ControlLoop(
-                name="manager_loop",
-                warning_printer=False,
-                period=1 / 1000,
+            self.__version_comm = shm(
+                comm_name=f"error_manager_{suffix}_version",
+                schema=self._VERSION_SCHEMA,
                 message_logger=self.__message_logger,
-            )  # 1000hz
-            self.__shm_freq = 1000 / 100  # 50hz/100hz
+                debug=debug,
+            )
 
-            self.__set_error = False
-            self.__ack_errors = False
-            self.__ack_error = None
+            self.__publish_period = publish_period  # 100hz
+            self.__version = None  # last shared version applied locally
 
+            self.__pending = deque()  # local operations waiting for publish
+            self.__local_lock = threading.Lock()
+            self.__wake_event = threading.Event()
             self.__stop_event = threading.Event()
-            self.__connect()
             self.__update_msg_logger()
+            self.__connect()
 
         def __connect(self):
             self._t1 = threading.Thread(target=self.__run)
@@ -209,32 +233,14 @@ else:
             os.nice(15)
             try:
                 while not self.__stop_event.is_set():
-                    self.__cl.loop_begin()  # 1000hz
-                    if self.__cl.loop_counter % self.__shm_freq == 0:  # 50hz
-                        check, interface = self.__comm.lock_and_read()
-                        if check:
-                            if self.__set_error:
-                                self.__set_error = False
-                                try:
-                                    interface.set_error(
-                                        self.__error_interface.current_error.pop()
-                                    )
-                                except IndexError:
-                                    pass
-
-                            elif self.__ack_errors:
-                                self.__ack_errors = False
-                                interface.ack_errors()
-
-                            elif self.__ack_error is not None:
-                                interface.ack_error(self.__ack_error)
-                                self.__ack_error = None
-
-                            self.__comm.save_and_unlock(interface)
-                            self.__error_interface = copy.deepcopy(interface)
-                            self.__update_msg_logger()
-
-                    self.__cl.loop_end()
+                    self.__wake_event.wait(timeout=self.__publish_period)
+                    self.__wake_event.clear()
+                    if self.__pending:
+                        if not self.__publish():
+                            self.__stop_event.wait(self.__publish_period)
+                            self.__wake_event.set()  # retry after lock timeout
+                    elif self.shared_version() != self.__version:
+                        self.__sync()
             except KeyboardInterrupt:
                 pass
             except Exception as e:
@@ -244,9 +250,74 @@ else:
                 )
                 raise
             finally:
-                self.__comm.save_and_unlock(interface)
+                if self.__pending:
+                    self.__publish()
                 # print(f"Closing error manager interface")
 
+        def __read_shared(self):
+            """Lock the semaphore and read the interface with its version.
+
+            Returns:
+                tuple: (interface, version) or (None, None) if lock/read failed.
+                The semaphore stays locked only on success.
+            """
+            check, interface = self.__comm.lock_and_read()
+            if not check:
+                self.__comm.semaphore_unlock()
+                return None, None
+            return interface, self.shared_version()
+
+        def __publish(self) -> bool:
+            """Apply pending operations to the shared interface and save it."""
+            interface, version = self.__read_shared()
+            if interface is None:
+                return False
+
+            while self.__pending:
+                operation, argument = self.__pending.popleft()
+                if operation == "set":
+                    interface.set_error(argument)
+                elif operation == "ack_errors":
+                    interface.ack_errors()
+                else:
+                    interface.ack_error(argument)
+
+            version += 1
+            self.__version_comm.update_fields(version=version)
+            self.__comm.save_and_unlock(interface)
+            self.__adopt(interface, version)
+            return True
+
+        def __sync(self):
+            """Load the shared interface published by another manager."""
+            interface, version = self.__read_shared()
+            if interface is None:
+                return
+            self.__comm.semaphore_unlock()
+            self.__adopt(interface, version)
+
+        def __adopt(self, interface, version):
+            """Use the deserialized interface as local copy (no deepcopy needed)."""
+            with self.__local_lock:
+                if self.__pending:
+                    return  # newer local changes, adopt after next publish
+                self.__error_interface = interface
+                self.__version = version
+                self.__update_msg_logger()
+
+        @property
+        def version(self):
+            """Version of the shared interface currently mirrored locally."""
+            return self.__version
+
+        def shared_version(self) -> int:
+            """Cheap check of the published version, without lock and pickle.
+
+            Compare with a previously seen value to skip reading unchanged data.
+            """
+            check, record = self.__version_comm.lock_and_read()
+            return int(record["version"]) if check else self.__version
+
         @property
         def current_error(self):
             return self.__error_interface.current_error
@@ -256,14 +327,24 @@ else:
             raise AttributeError("Cannot set current_error attribute")
 
         def set_error(self, error_code, msg=""):
-            self.__error_interface.set_error(error_code, msg)
-            self.__set_error = True
+            with self.__local_lock:
+                self.__error_interface.set_error(error_code, msg)
+                try:
+                    self.__pending.append((
+                        "set",
+                        self.__error_interface.current_error[-1],
+                    ))
+                except IndexError:
+                    pass
+            self.__wake_event.set()
 
         def ack_errors(self):
-            self.__ack_errors = True
+            self.__pending.append(("ack_errors", None))
+            self.__wake_event.set()
 
         def ack_error(self, error_code):
-            self.__ack_error = error_code
+            self.__pending.append(("ack_error", error_code))
+            self.__wake_event.set()
 
         def check_current_group(self, group):
             """Check if error group in current error.
@@ -291,6 +372,7 @@ else:
 
         def stop(self):
             self.__stop_event.set()
+            self.__wake_event.set()
             self._t1.join()
 
 
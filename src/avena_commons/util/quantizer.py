@@ -1,5 +1,71 @@
+import bisect
+import struct
+
 import numpy as np
 
+_SIGN_MASK = 0x8000000000000000
+_ABS_MASK = 0x7FFFFFFFFFFFFFFF
+
+
+def _float_to_key(x: float) -> int:
+    """Maps float to int so that the order of floats is kept (-0.0 == 0.0)."""
+    bits = struct.unpack("<Q", struct.pack("<d", x))[0]
+    return bits if bits < _SIGN_MASK else -(bits & _ABS_MASK)
+
+
+def _key_to_float(key: int) -> float:
+    bits = key if key >= 0 else (-key) | _SIGN_MASK
+    return struct.unpack("<d", struct.pack("<Q", bits))[0]
+
+
+def _find_boundaries(quantize, num_intervals: int) -> list:
+    """Finds exact change points of a monotonic (non-decreasing) quantize function.
+
+    boundaries[j - 1] is the smallest float x for which quantize(x) >= j, so
+    quantize(x) == bisect_right(boundaries, x) for every float x (except NaN).
+    Bisection runs over the ordered bit representation of floats, so the
+    boundaries match the scalar formula to the last bit.
+    """
+    lo_key = _float_to_key(-np.inf)
+    hi_key = _float_to_key(np.inf)
+    boundaries = []
+    max_quant = quantize(np.inf)
+    for quant in range(1, num_intervals):
+        if max_quant < quant:
+            boundaries.append(np.inf)
+            continue
+        lo, hi = lo_key, hi_key
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if quantize(_key_to_float(mid)) >= quant:
+                hi = mid
+            else:
+                lo = mid + 1
+        boundaries.append(_key_to_float(lo))
+        lo_key = lo
+    return boundaries
+
+
+def _quantize_array(quantizer, x) -> np.ndarray:
+    x = np.asarray(x, dtype=np.float64)
+    if quantizer._boundaries_array is None:
+        # brak monotonicznosci - kaskada skalarna dla kazdego elementu
+        return np.fromiter(
+            map(quantizer._quantize_cascade, x.ravel().tolist()),
+            dtype=np.intp,
+            count=x.size,
+        ).reshape(x.shape)
+    return np.searchsorted(quantizer._boundaries_array, x, side="right")
+
+
+def _dequantize_table_lookup(table: np.ndarray, quants) -> np.ndarray:
+    quants = np.asarray(quants)
+    if quants.size and (
+        not np.issubdtype(quants.dtype, np.integer) or quants.min() < 0
+    ):
+        raise ValueError(f"quant must be int from 0 to {len(table) - 1}")
+    return table[quants]
+
 
 class QuantizerLogPower:
     def __init__(
@@ -17,6 +83,14 @@ class QuantizerLogPower:
             raise ValueError("num_intervals must be int greater than 0")
         if self.power < 1 or not isinstance(self.power, int):
             raise ValueError("power must be int greater than 0")
+        # log10(x)**power rosnie z x tylko dla nieparzystej potegi (lub x_min >= 1)
+        self._monotonic = self.power % 2 == 1 or self.x_min >= 1
+        self._boundaries = (
+            _find_boundaries(self._quantize_cascade, self.num_intervals)
+            if self._monotonic
+            else None
+        )
+        self._boundaries_array = np.array(self._boundaries) if self._monotonic else None
         self.dequantize_list, self.mid_point_list = self._generate_dequantize_list()
 
     def _find_change_points_linspace(self):
@@ -24,18 +98,11 @@ class QuantizerLogPower:
             self.x_min, self.x_max, 100000
         )  # Using linspace for a more uniform distribution
 
-        # Initialize previous value and change points list
-        prev_value = self.quantize(x_values[0])
-        change_points = [self.x_min]
-
-        # Iterate through x_values and identify change points
-        for x in x_values[1:]:
-            curr_value = self.quantize(x)
-            if curr_value != prev_value:
-                change_points.append(x)
-            prev_value = curr_value
+        # Points of the grid where quant differs from the previous point
+        quants = self.quantize_array(x_values)
+        change_points = x_values[np.flatnonzero(np.diff(quants)) + 1]
 
-        return np.array(change_points)
+        return np.concatenate([[self.x_min], change_points])
 
     def _generate_dequantize_list(self) -> np.array:
         if self.num_intervals == 1:
@@ -72,18 +139,11 @@ class QuantizerLogPower:
             self.x_min, self.x_max, 100000
         )  # Using linspace for a more uniform distribution
 
-        # Initialize previous value and change points list
-        prev_value = self.quantize(x_values[0])
-        # change_points = [self.x_min]
-        change_points = [self.x_min] if ilosc_sektorow_parzysta == 0 else []
-
-        # Iterate through x_values and identify change points
-        for x in x_values[1:]:
-            curr_value = self.quantize(x)
-            if curr_value != prev_value:
-                change_points.append(x)
-            prev_value = curr_value
-        change_points = np.array(change_points)
+        # Points of the grid where quant differs from the previous point
+        quants = self.quantize_array(x_values)
+        change_points = x_values[np.flatnonzero(np.diff(quants)) + 1]
+        if ilosc_sektorow_parzysta == 0:
+            change_points = np.concatenate([[self.x_min], change_points])
 
         midpoints_np = np.convolve(change_points, [0.5, 0.5], mode="valid")
 
@@ -102,6 +162,15 @@ class QuantizerLogPower:
         return dequantize_list, mid_point_list
 
     def quantize(self, x: float) -> int:
+        if self._boundaries is None:
+            return self._quantize_cascade(x)
+        return bisect.bisect_right(self._boundaries, x)
+
+    def quantize_array(self, x) -> np.ndarray:
+        """Quantizes an array of values, equivalent to quantize() per element."""
+        return _quantize_array(self, x)
+
+    def _quantize_cascade(self, x: float) -> int:
         # sytuacja num_intervals = 1 - zawsze zwracaj 0
         if self.num_intervals == 1:
             return 0
@@ -174,6 +243,10 @@ class QuantizerLogPower:
             raise ValueError(f"quant must be int from 0 to {self.num_intervals - 1}")
         return self.mid_point_list[quant]
 
+    def dequantize_array(self, quants) -> np.ndarray:
+        """Dequantizes an array of quants, equivalent to dequantize() per element."""
+        return _dequantize_table_lookup(self.mid_point_list, quants)
+
 
 class QuantizerTanh:
     def __init__(
@@ -183,9 +256,33 @@ class QuantizerTanh:
         self.x_max = x_max
         self.num_intervals = num_intervals
         self.power = power
+        self._boundaries = (
+            _find_boundaries(self._quantize_cascade, self.num_intervals)
+            if self.power > 0 and self.x_max > self.x_min
+            else None
+        )
+        self._boundaries_array = (
+            np.array(self._boundaries) if self._boundaries is not None else None
+        )
+        self._dequantize_table = np.array([
+            self.dequantize(quant) for quant in range(self.num_intervals)
+        ])
 
-    # Function to quantize the value, n- number of intervals, k- quantization factor
     def quantize(self, x: float) -> int:
+        if self._boundaries is None:
+            return self._quantize_cascade(x)
+        return bisect.bisect_right(self._boundaries, x)
+
+    def quantize_array(self, x) -> np.ndarray:
+        """Quantizes an array of values, equivalent to quantize() per element."""
+        return _quantize_array(self, x)
+
+    def dequantize_array(self, quants) -> np.ndarray:
+        """Dequantizes an array of quants, equivalent to dequantize() per element."""
+        return _dequantize_table_lookup(self._dequantize_table, quants)
+
+    # Function to quantize the value, n- number of intervals, k- quantization factor
+    def _quantize_cascade(self, x: float) -> int:
         # Normalizing the value
         x_norm = ((x - self.x_min) / (self.x_max - self.x_min)) * 2 - 1
         # Applying tanh function
@@ -215,8 +312,34 @@ class QuantizerLinear:
         self.x_min = x_min
         self.x_max = x_max
         self.num_intervals = num_intervals
+        self._boundaries = (
+            _find_boundaries(self._quantize_cascade, self.num_intervals)
+            if self.num_intervals > 1 and self.x_max > self.x_min
+            else None
+        )
+        self._boundaries_array = (
+            np.array(self._boundaries) if self._boundaries is not None else None
+        )
+        self._dequantize_table = (
+            np.array([self.dequantize(quant) for quant in range(self.num_intervals)])
+            if self.num_intervals > 1
+            else np.array([])
+        )
 
     def quantize(self, x: float) -> int:
+        if self._boundaries is None:
+            return self._quantize_cascade(x)
+        return bisect.bisect_right(self._boundaries, x)
+
+    def quantize_array(self, x) -> np.ndarray:
+        """Quantizes an array of values, equivalent to quantize() per element."""
+        return _quantize_array(self, x)
+
+    def dequantize_array(self, quants) -> np.ndarray:
+        """Dequantizes an array of quants, equivalent to dequantize() per element."""
+        return _dequantize_table_lookup(self._dequantize_table, quants)
+
+    def _quantize_cascade(self, x: float) -> int:
         # Step 1: Value below range
         if x <= self.x_min:
             return 0
@@ -250,8 +373,32 @@ class QuantizerPolynomial:
         self.power = power
         self.middle_quant = (self.num_intervals - 1) // 2
         self.poly_max = self.x_max**self.power
+        self._boundaries = (
+            _find_boundaries(self._quantize_cascade, self.num_intervals)
+            if self.power > 0 and self.x_max > 0 and self.x_min >= -self.x_max
+            else None
+        )
+        self._boundaries_array = (
+            np.array(self._boundaries) if self._boundaries is not None else None
+        )
+        self._dequantize_table = np.array([
+            self.dequantize(quant) for quant in range(self.num_intervals)
+        ])
 
     def quantize(self, x: float) -> int:
+        if self._boundaries is None:
+            return self._quantize_cascade(x)
+        return bisect.bisect_right(self._boundaries, x)
+
+    def quantize_array(self, x) -> np.ndarray:
+        """Quantizes an array of values, equivalent to quantize() per element."""
+        return _quantize_array(self, x)
+
+    def dequantize_array(self, quants) -> np.ndarray:
+        """Dequantizes an array of quants, equivalent to dequantize() per element."""
+        return _dequantize_table_lookup(self._dequantize_table, quants)
+
+    def _quantize_cascade(self, x: float) -> int:
         middle_quant = (self.num_intervals - 1) // 2
 
         # Jeśli x jest poza zakresem x_min i x_max, zwróć odpowiednio 0 lub ilosc_kwantow - 1
@@ -2,6 +2,7 @@ import math
 
 import cv2
 import numpy as np
+from scipy.spatial import cKDTree
 from scipy.spatial.transform import Rotation
 
 
@@ -34,6 +35,38 @@ def interpolate(x, y, new_x):
     return interpolated
 
 
+def _interpolate_many(x, y, new_x):
+    """
+    Vectorized version of interpolate() for an array of new x values.
+
+    Gives the same values as calling interpolate() for every element.
+
+    :param x: list of x values (sorted)
+    :param y: list of y values (1D or 2D, first axis matches x)
+    :param new_x: array of new x values
+    :return: array of interpolated y values, shape (len(new_x),) + y.shape[1:]
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y)
+    new_x = np.asarray(new_x, dtype=np.float64)
+    idx = np.searchsorted(x, new_x)
+    lower = np.clip(idx - 1, 0, len(x) - 1)
+    upper = np.clip(idx, 0, len(x) - 1)
+
+    x1, x2 = x[lower], x[upper]
+    y1, y2 = y[lower], y[upper]
+    # Poza zakresem x2 == x1 - wartosci nadpisywane ponizej
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fraction = (new_x - x1) / (x2 - x1)
+        fraction = fraction.reshape(fraction.shape + (1,) * (y.ndim - 1))
+        interpolated = y1 + fraction * (y2 - y1)
+
+    # Poza zakresem - wartosci skrajne (jak w interpolate)
+    interpolated[idx == 0] = y[0]
+    interpolated[idx == len(x)] = y[len(x) - 1]
+    return interpolated
+
+
 def moving_average_filter(data, window_size):
     """
     Apply a moving average filter to smooth data.
@@ -64,23 +97,21 @@ def ramp_smoothing(data, alpha):
     :return: smoothed data
     """
     smoothed_data = np.copy(data)
+    if len(smoothed_data) < 2:
+        return smoothed_data
+
+    # Rampa w przod: s[i] = min(s[i], s[i - 1] + alpha) = min_j(s[j] + (i - j) * alpha)
+    ramp = np.arange(len(smoothed_data)) * alpha
+    values = smoothed_data.astype(np.float64)
+    values = np.minimum(values, np.minimum.accumulate(values - ramp) + ramp)
 
-    # Left to right iteration
-    for i in range(1, len(data)):
-        if (smoothed_data[i] - smoothed_data[i - 1]) > alpha:
-            smoothed_data[i] = (
-                smoothed_data[i - 1]
-                + np.sign(smoothed_data[i] - smoothed_data[i - 1]) * alpha
-            )
-
-    # Right to left iteration
-    for i in range(len(data) - 2, -1, -1):
-        if (smoothed_data[i] - smoothed_data[i + 1]) > alpha:
-            smoothed_data[i] = (
-                smoothed_data[i + 1]
-                + np.sign(smoothed_data[i] - smoothed_data[i + 1]) * alpha
-            )
+    # Rampa w tyl: to samo na odwroconej tablicy
+    reversed_values = values[::-1]
+    values = np.minimum(
+        reversed_values, np.minimum.accumulate(reversed_values - ramp) + ramp
+    )[::-1]
 
+    smoothed_data[:] = values
     return smoothed_data
 
 
@@ -95,18 +126,51 @@ def interpolate_rconfigs(times, rconfigs, factors, dt):
     :return: o_times, o_rconfigs: interpolated times and robot configurations
     """
     duration = dt * len(rconfigs)
-    _current_time = 0.0
-    o_times = np.empty(shape=[0, 1], dtype=np.float64)
-    o_rconfigs = np.empty(shape=[0, 6], dtype=np.float64)  # konfiguracja jointow
-    while duration > _current_time:
-        # if duration > _current_time: break
-        _rconfig = interpolate(times, rconfigs, _current_time)
-        o_rconfigs = np.append(o_rconfigs, [_rconfig], axis=0)
-        o_times = np.append(o_times, len(o_times) * dt)
-        _factor = interpolate(times, factors, _current_time)
-        _current_time = _current_time + dt * _factor
-    del _rconfig
-    return o_times, o_rconfigs
+    source_times = _scaled_sample_times(times, factors, dt, duration)
+
+    o_times = np.arange(len(source_times)) * dt
+    if len(source_times) == 0:
+        o_rconfigs = np.empty(shape=[0, np.shape(rconfigs)[-1]], dtype=np.float64)
+    else:
+        o_rconfigs = _interpolate_many(times, rconfigs, source_times)
+    return o_times, np.asarray(o_rconfigs, dtype=np.float64)
+
+
+def _scaled_sample_times(times, factors, dt, duration):
+    """
+    Source-time samples of the scaled trajectory: t[k + 1] = t[k] + dt * factor(t[k]).
+
+    The recurrence is inherently sequential, so it runs as a scalar loop over plain
+    floats with a monotonic segment pointer instead of np.searchsorted per sample.
+    Arithmetic is the same as in interpolate(), so the samples are identical.
+
+    :param times: list of times (sorted)
+    :param factors: list of factors
+    :param dt: time step
+    :param duration: time at which the sampling stops
+    :return: array of sample times
+    """
+    x = np.asarray(times, dtype=np.float64).tolist()
+    y = np.asarray(factors, dtype=np.float64).tolist()
+    last = len(x)
+    samples = []
+    append = samples.append
+    idx = 0
+    current_time = 0.0
+    while duration > current_time:
+        append(current_time)
+        while idx < last and x[idx] < current_time:
+            idx += 1
+        if idx == 0:
+            factor = y[0]
+        elif idx == last:
+            factor = y[idx - 1]
+        else:
+            x1 = x[idx - 1]
+            y1 = y[idx - 1]
+            factor = y1 + (current_time - x1) / (x[idx] - x1) * (y[idx] - y1)
+        current_time = current_time + dt * factor
+    return np.array(samples, dtype=np.float64)
 
 
 def calculate_factor(x, y, new_x, limit, power):
@@ -142,18 +206,26 @@ def calculate_factors(times, data, dt, limit, power):
     """
     _time = times[-1] - times[0]
     _begin = times[0]
-    _current_time = _begin
 
-    _factors = np.empty(shape=[0, 1], dtype=np.float64)
-    while _begin + _time > _current_time:
-        if times[-1] < _current_time:
+    # Kolejne czasy jak przy sumowaniu _current_time += dt (add.accumulate jest sekwencyjne)
+    count = max(int(np.ceil(_time / dt)), 0) + 2
+    while True:
+        steps = np.full(count, dt, dtype=np.float64)
+        steps[0] = _begin
+        sample_times = np.add.accumulate(steps)
+        valid = (_begin + _time > sample_times) & ~(times[-1] < sample_times)
+        if not valid[-1]:
             break
+        count *= 2
+    sample_times = sample_times[: int(np.argmin(valid))]
 
-        _factor_2 = calculate_factor(times, data, _current_time, limit, power)
-        _factor = min(1.0, _factor_2)
-        _current_time += dt
-
-        _factors = np.append(_factors, _factor)
+    _interpolate = _interpolate_many(times, data, sample_times)
+    _max_abs = (
+        np.abs(_interpolate).reshape(len(sample_times), -1).max(axis=1, initial=0.0)
+    )
+    with np.errstate(divide="ignore"):
+        _base = np.where(_max_abs == 0, 1.0, limit / _max_abs)
+    _factors = np.minimum(1.0, _base**power)  # mnoznik przekroczenia
 
     return _factors
 
@@ -169,17 +241,7 @@ def limit_acc(times, rconfigs, ang_acc, dt, acc_limit):
     :param acc_limit: acceleration limit
     :return: times_1, rconfigs_1, ang_vel_1, ang_acc_1: limited times, robot configurations, angular velocities, and angular accelerations
     """
-    # f_a = calculate_factors_acc(times, ang_acc, dt, acc_limit)
-    f_a = calculate_factors(times, ang_acc, dt, acc_limit, 1 / 2)
-    f_ramp_a = ramp_smoothing(f_a, 0.005)
-    f_ramp_a = np.append(f_ramp_a, 1.0)
-    # print(len(f_a))
-    # print(len(f_ramp_a))
-    # print(len(times))
-    times_1, rconfigs_1 = interpolate_rconfigs(times, rconfigs, f_ramp_a, dt)
-    ang_vel_1 = calculate_derivative(rconfigs_1, dt)
-    ang_acc_1 = calculate_derivative(ang_vel_1, dt)
-    return times_1, rconfigs_1, ang_vel_1, ang_acc_1
+    return _limit_pass(times, rconfigs, ang_acc, dt, acc_limit, 1 / 2)
 
 
 def limit_vel(times, rconfigs, ang_vel, dt, vel_limit):
@@ -193,11 +255,43 @@ def limit_vel(times, rconfigs, ang_vel, dt, vel_limit):
     :param vel_limit: velocity limit
     :return: times_1, rconfigs_1, ang_vel_1, ang_acc_1: limited times, robot configurations, angular velocities, and angular accelerations
     """
-    # f_v = calculate_factors_acc(times, ang_vel, dt, vel_limit)
-    f_v = calculate_factors(times, ang_vel, dt, vel_limit, 1)
-    f_ramp_v = ramp_smoothing(f_v, 0.005)
-    f_ramp_v = np.append(f_ramp_v, 1.0)
-    times_1, rconfigs_1 = interpolate_rconfigs(times, rconfigs, f_ramp_v, dt)
+    return _limit_pass(times, rconfigs, ang_vel, dt, vel_limit, 1)
+
+
+def limit_vel_acc(
+    times, rconfigs, dt, vel_limit, acc_limit, ang_vel=None, ramp_alpha=0.005
+):
+    """
+    Limit velocity and then acceleration in one call.
+
+    Equivalent to limit_vel() followed by limit_acc() on its result. The velocity
+    and acceleration computed after the first pass are reused by the second pass.
+
+    :param times: list of times
+    :param rconfigs: list of robot configurations
+    :param dt: time step
+    :param vel_limit: velocity limit
+    :param acc_limit: acceleration limit
+    :param ang_vel: list of angular velocities, calculated from rconfigs if None
+    :param ramp_alpha: maximum change of the factor between two samples
+    :return: times_1, rconfigs_1, ang_vel_1, ang_acc_1: limited times, robot configurations, angular velocities, and angular accelerations
+    """
+    if ang_vel is None:
+        ang_vel = calculate_derivative(np.asarray(rconfigs, dtype=np.float64), dt)
+    times_v, rconfigs_v, _, ang_acc_v = _limit_pass(
+        times, rconfigs, ang_vel, dt, vel_limit, 1, ramp_alpha
+    )
+    return _limit_pass(times_v, rconfigs_v, ang_acc_v, dt, acc_limit, 1 / 2, ramp_alpha)
+
+
+def _limit_pass(times, rconfigs, data, dt, limit, power, ramp_alpha=0.005):
+    """
+    Single time-scaling pass shared by limit_vel(), limit_acc() and limit_vel_acc().
+    """
+    factors = calculate_factors(times, data, dt, limit, power)
+    factors = ramp_smoothing(factors, ramp_alpha)
+    factors = np.append(factors, 1.0)
+    times_1, rconfigs_1 = interpolate_rconfigs(times, rconfigs, factors, dt)
     ang_vel_1 = calculate_derivative(rconfigs_1, dt)
     ang_acc_1 = calculate_derivative(ang_vel_1, dt)
     return times_1, rconfigs_1, ang_vel_1, ang_acc_1
@@ -211,13 +305,13 @@ def calculate_derivative(arguments, dt):
     :param dt: time step
     :return: derivatives: list of derivatives
     """
+    arguments = np.asarray(arguments)
     derivatives = np.zeros_like(
         arguments
     )  # Macierz wyników o tym samym kształcie co rconfigs
 
-    # Zakładamy, że times i rconfigs są wektorami o tej samej długości
-    for i in range(1, len(arguments) - 1):
-        derivatives[i] = (arguments[i + 1] - arguments[i - 1]) / (2 * dt)
+    # Różnica centralna dla punktów wewnętrznych
+    derivatives[1:-1] = (arguments[2:] - arguments[:-2]) / (2 * dt)
 
     # Opcjonalnie: Obsługa krańców przedziałów
     # Przykładowo, można użyć różnic do przodu i do tyłu
@@ -232,33 +326,44 @@ def calculate_derivative(arguments, dt):
     return derivatives
 
 
-def find_closest_pose(searched_pose, poses):
+def _pose_positions(poses):
+    if isinstance(poses, np.ndarray):
+        return np.asarray(poses[:, :3], dtype=np.float64)
+    return np.asarray([pose[:3] for pose in poses], dtype=np.float64).reshape(-1, 3)
+
+
+def build_pose_index(poses):
+    """
+    Build a KD-tree index over pose positions for repeated find_closest_pose() queries.
+
+    :param poses: list of poses (x, y, z, ...)
+    :return: index to be passed to find_closest_pose()
+    """
+    return cKDTree(_pose_positions(poses))
+
+
+def find_closest_pose(searched_pose, poses, index=None):
     """
     Find the closest pose to a given target pose.
 
     :param searched_pose: target pose (x, y, z, qx, qy, qz, qw)
     :param poses: list of poses
-    :return: closest_pose: closest pose
-    """
-    # Ustaw początkową minimalną odległość na bardzo dużą wartość
-    min_distance = float("inf")
-
-    for step, pose in enumerate(poses):
-        # Oblicz odległość Euklidesową między punktem odniesienia a aktualnym punktem
-        distance = (
-            (searched_pose[0] - pose[0]) ** 2
-            + (searched_pose[1] - pose[1]) ** 2
-            + (searched_pose[2] - pose[2]) ** 2
-        ) ** 0.5
-
-        # Aktualizuj najbliższy punkt i minimalną odległość, jeśli to konieczne
-        if distance < min_distance:
-            min_distance = distance
-            closest_pose = pose
-            closest_step = step
-
-    # return closest_pose
-    return closest_pose, closest_step
+    :param index: optional KD-tree from build_pose_index(poses), for repeated queries
+    :return: closest_pose, closest_step: closest pose and its index in poses
+    """
+    if index is not None:
+        _, closest_step = index.query(np.asarray(searched_pose[:3], dtype=np.float64))
+        closest_step = int(closest_step)
+        return poses[closest_step], closest_step
+
+    positions = _pose_positions(poses)
+    if len(positions) == 0:
+        raise ValueError("poses must not be empty")
+    # Kwadrat odległości Euklidesowej (argmin jak przy odległości, pierwsze minimum)
+    diff = np.asarray(searched_pose[:3], dtype=np.float64) - positions
+    distances = diff[:, 0] ** 2 + diff[:, 1] ** 2 + diff[:, 2] ** 2
+    closest_step = int(np.argmin(distances))
+    return poses[closest_step], closest_step
 
 
 def clip_goal_position(value):
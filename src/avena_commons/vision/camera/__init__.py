@@ -5,8 +5,10 @@ Moduł wizyjny avena_commons
 # Importuj funkcje z modułu vision
 from .create_camera_distortion import create_camera_distortion
 from .create_camera_matrix import create_camera_matrix
+from .get_undistort_maps import get_undistort_maps
 
 __all__ = [
     "create_camera_distortion",
     "create_camera_matrix",
+    "get_undistort_maps",
 ]
@@ -0,0 +1,62 @@
+import cv2
+import numpy as np
+
+from .create_camera_distortion import create_camera_distortion
+from .create_camera_matrix import create_camera_matrix
+
+# Cache map undistort w obrębie procesu (także procesu puli detektorów)
+_UNDISTORT_MAPS_CACHE = {}
+_UNDISTORT_MAPS_CACHE_SIZE = 8
+
+
+def get_undistort_maps(camera_params, distortion_coefficients, image_size, alpha=None):
+    """Zwraca mapy korekcji zniekształceń z cache procesu.
+
+    Mapy `cv2.initUndistortRectifyMap` są liczone raz dla klucza (parametry
+    kamery, współczynniki zniekształcenia, rozmiar obrazu, alpha), a kolejne
+    ramki korygowane są tanim `cv2.remap` (patrz `undistort_remap`). Cache jest
+    globalny dla procesu - procesy puli utworzone przez fork dziedziczą mapy
+    policzone wcześniej w procesie workera kamery.
+
+    Args:
+        camera_params: Parametry kamery [fx, fy, cx, cy].
+        distortion_coefficients: Współczynniki zniekształcenia [k1, k2, p1, p2, k3].
+        image_size: Rozmiar obrazu (szerokość, wysokość).
+        alpha: None - macierz kamery bez zmian (jak `cv2.undistort`), 0..1 -
+            nowa macierz z `cv2.getOptimalNewCameraMatrix` (0 - tylko poprawne
+            piksele, 1 - wszystkie piksele źródłowe).
+
+    Returns:
+        tuple: Mapy (map1, map2) w formacie CV_16SC2 dla `cv2.remap`.
+
+    Example:
+        >>> maps = get_undistort_maps([900, 900, 640, 400], [0.1, -0.2, 0, 0, 0.1], (1280, 800))
+        >>> corrected_image = undistort_remap(image, maps)
+    """
+    # Klucz z wartości float32 - takich używają create_camera_matrix/_distortion
+    key = (
+        tuple(np.asarray(camera_params[:4], dtype=np.float32).tolist()),
+        tuple(np.asarray(distortion_coefficients, dtype=np.float32).ravel().tolist()),
+        (int(image_size[0]), int(image_size[1])),
+        None if alpha is None else float(alpha),
+    )
+    maps = _UNDISTORT_MAPS_CACHE.get(key)
+    if maps is not None:
+        return maps
+
+    camera_matrix = create_camera_matrix(camera_params)
+    camera_distortion = create_camera_distortion(distortion_coefficients)
+    if alpha is None:
+        new_camera_matrix = camera_matrix
+    else:
+        new_camera_matrix, _ = cv2.getOptimalNewCameraMatrix(
+            camera_matrix, camera_distortion, key[2], key[3]
+        )
+    maps = cv2.initUndistortRectifyMap(
+        camera_matrix, camera_distortion, None, new_camera_matrix, key[2], cv2.CV_16SC2
+    )
+
+    if len(_UNDISTORT_MAPS_CACHE) >= _UNDISTORT_MAPS_CACHE_SIZE:
+        _UNDISTORT_MAPS_CACHE.pop(next(iter(_UNDISTORT_MAPS_CACHE)))
+    _UNDISTORT_MAPS_CACHE[key] = maps
+    return maps
@@ -1,6 +1,3 @@
-import os
-from datetime import datetime
-
 import cv2
 import numpy as np
 
@@ -8,6 +5,8 @@ import avena_commons.vision.camera as camera
 import avena_commons.vision.image_preprocess as preprocess
 import avena_commons.vision.validation as validation
 from avena_commons.util.catchtime import Catchtime
+from avena_commons.util.logger import error
+from avena_commons.vision.detector.debug_sink import get_debug_sink
 from avena_commons.vision.vision import (
     create_box_color_mask,
     create_box_depth_mask,
@@ -29,7 +28,9 @@ def box_detector(*, frame, camera_config, config):
 
     Analizuje ramki kolorowe i głębi aby wykryć prostokątne pudełka na podstawie
     konfiguracji HSV i parametrów głębi. Zwraca pozycję, narożniki, kąt i głębię
-    wykrytego pudełka wraz z danymi debugowania.
+    wykrytego pudełka wraz z danymi debugowania. Ramki wejściowe i wizualizacja
+    trafiają na dysk tylko wtedy, gdy wybierze je sink debug (klucz
+    'debug_artifacts' w `camera_config`) - zapis odbywa się w tle.
 
     Args:
         frame (dict): Słownik zawierający ramki 'color' i 'depth'.
@@ -56,45 +57,53 @@ def box_detector(*, frame, camera_config, config):
         >>> center, corners, angle, z, viz, debug = box_detector(
         ...     frame=frame, camera_config=camera_cfg, config=config)
     """
-    color_image = frame["color"]
-    depth_image = frame["depth"]
-
-    # Zapisz ramki do debugowania
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")[:-3]
-    debug_dir = "temp/debug_frames"
-    os.makedirs(debug_dir, exist_ok=True)
-
-    # # Zapisz obraz kolorowy
-    color_filename = f"{debug_dir}/{timestamp}_box_color_frame.jpg"
-    cv2.imwrite(color_filename, color_image)
+    with Catchtime() as detection_time:
+        result = _box_detector(frame=frame, camera_config=camera_config, config=config)
+    center, sorted_corners, angle, _, _, debug_data = result
+
+    try:
+        sink = get_debug_sink((camera_config or {}).get("debug_artifacts"))
+        if sink.sample(
+            failed=center is None,
+            anomaly=debug_data.get("box_valid") is False,
+            elapsed_ms=detection_time.ms,
+        ):
+            # Wizualizacja tylko dla zapisywanych ramek (także nieudanej walidacji)
+            if center is None:
+                center = debug_data.get("box_failed_center")
+                sorted_corners = debug_data.get("box_failed_corners")
+                angle = debug_data.get("box_failed_angle")
+            visualization = None
+            if center is not None:
+                visualization = create_detection_visualization(
+                    frame["color"], center, sorted_corners, angle
+                )
+            sink.submit(
+                "box",
+                {
+                    "color_frame": frame["color"],
+                    "depth_frame": frame["depth"],
+                    "detection_visualization": visualization,
+                },
+            )
+    except Exception as e:
+        error(f"BOX DETECTOR: Błąd zapisu artefaktów debug: {e}")
 
-    # Zapisz obraz głębi (skonwertowany do 8-bit dla lepszej wizualizacji)
-    # depth_normalized = cv2.normalize(
-    #     depth_image, None, 0, 255, cv2.NORM_MINMAX, dtype=cv2.CV_8U
-    # )
-    # depth_filename = f"{debug_dir}/depth_frame_{timestamp}.jpg"
-    # cv2.imwrite(depth_filename, depth_normalized)
+    return result
 
-    # Zapisz także raw depth jako numpy array
-    depth_raw_filename = f"{debug_dir}/{timestamp}_box_depth_frame_.npy"
-    np.save(depth_raw_filename, depth_image)
 
-    # print(f"DEBUG: Zapisano ramki do {debug_dir}/")
-    # print(
-    #     f"DEBUG: Kolor: {color_image.shape}, min={color_image.min()}, max={color_image.max()}"
-    # )
-    # print(
-    #     f"DEBUG: Głębia: {depth_image.shape}, min={depth_image.min()}, max={depth_image.max()}"
-    # )
-    # print(f"DEBUG: Config HSV: {config.get('hsv', {})}")
-    # print(f"DEBUG: Config depth: {config.get('depth', {})}")
-    # print(f"DEBUG: Center point: {config.get('center_point', None)}")
+def _box_detector(*, frame, camera_config, config):
+    """Właściwa detekcja pudełka dla `box_detector` (bez zapisu artefaktów)."""
+    color_image = frame["color"]
+    depth_image = frame["depth"]
 
     debug_data = {}
     with Catchtime() as t1:
-        camera_matrix = camera.create_camera_matrix(camera_config["camera_params"])
-        camera_distortion = camera.create_camera_distortion(
-            camera_config["distortion_coefficients"]
+        # Mapy undistort z cache procesu (liczone raz na kamerę i rozdzielczość)
+        undistort_maps = camera.get_undistort_maps(
+            camera_config["camera_params"],
+            camera_config["distortion_coefficients"],
+            (color_image.shape[1], color_image.shape[0]),
         )
 
     with Catchtime() as t2:
@@ -152,9 +161,7 @@ def box_detector(*, frame, camera_config, config):
         debug_data["debug_preprocess"] = debug_preprocess
 
     with Catchtime() as t7:
-        mask_undistorted = preprocess.undistort(
-            mask_preprocessed, camera_matrix, camera_distortion
-        )
+        mask_undistorted = preprocess.undistort_remap(mask_preprocessed, undistort_maps)
         debug_data["box_mask_undistorted"] = mask_undistorted
 
     with Catchtime() as t8:
@@ -209,7 +216,7 @@ def box_detector(*, frame, camera_config, config):
 
     if not valid:
         print("DEBUG: Prosta nie przeszła walidacji - zwracam None")
-        # Nawet jeśli walidacja się nie powiodła, stwórz wizualizację tego co zostało wykryte
+        # Zachowaj to, co zostało wykryte - sink debug narysuje z tego wizualizację,
         # aby zobaczyć dlaczego nie przeszło walidacji
         if rect is not None and box is not None:
             # Oblicz centrum i corners z prostokąta dla wizualizacji
@@ -219,16 +226,11 @@ def box_detector(*, frame, camera_config, config):
                 depth_image,
                 {**config["depth"], "center_point": config["center_point"]},
             )
-            failed_validation_viz = create_detection_visualization(
-                color_image,
-                temp_center,
-                temp_corners,
-                temp_angle,
-                f"{timestamp}_FAILED_VALIDATION",
-                debug_dir,
-            )
+            debug_data["box_failed_center"] = temp_center
+            debug_data["box_failed_corners"] = temp_corners
+            debug_data["box_failed_angle"] = temp_angle
             print(
-                f"DEBUG: Wizualizacja nieudanej walidacji - Center: {temp_center}, Corners: {temp_corners}"
+                f"DEBUG: Nieudana walidacja - Center: {temp_center}, Corners: {temp_corners}"
             )
         return None, None, None, None, detect_image, debug_data
 
@@ -244,11 +246,6 @@ def box_detector(*, frame, camera_config, config):
         debug_data["box_angle"] = angle
         debug_data["box_z"] = z
 
-    # Stwórz wizualizację wykrytego pudła
-    detection_visualization = create_detection_visualization(
-        color_image, center, sorted_corners, angle, timestamp, debug_dir
-    )
-
     print(
         f"t1: {t1.t * 1_000:.1f}ms t2: {t2.t * 1_000:.1f}ms t3: {t3.t * 1_000:.1f}ms t4: {t4.t * 1_000:.1f}ms t5: {t5.t * 1_000:.1f}ms t6: {t6.t * 1_000:.1f}ms t7: {t7.t * 1_000:.1f}ms t8: {t8.t * 1_000:.1f}ms t9: {t9.t * 1_000:.1f}ms t10: {t10.t * 1_000:.1f}ms t11: {t11.t * 1_000:.1f}ms t12: {t12.t * 1_000:.1f}ms t13: {t13.t * 1_000:.1f}ms t14: {t14.t * 1_000:.1f}ms t15: {t15.t * 1_000:.1f}ms"
     )
@@ -256,7 +253,7 @@ def box_detector(*, frame, camera_config, config):
 
 
 def create_detection_visualization(
-    color_image, center, corners, angle, timestamp, debug_dir
+    color_image, center, corners, angle, timestamp=None, debug_dir=None
 ):
     """
     Tworzy wizualizację wykrytego pudła na obrazie kolorowym.
@@ -270,7 +267,7 @@ def create_detection_visualization(
         corners: Lista 4 punktów narożnych pudła [(x1,y1), (x2,y2), (x3,y3), (x4,y4)]
         angle: Kąt obrotu pudła w stopniach
         timestamp: Znacznik czasu dla nazwy pliku
-        debug_dir: Katalog do zapisu plików debug
+        debug_dir: Katalog do zapisu plików debug (None - bez zapisu na dysk)
 
     Returns:
         numpy.ndarray: Obraz z naniesioną wizualizacją zawierającą:
@@ -434,9 +431,9 @@ def create_detection_visualization(
         )
 
     # Zapisz wizualizację
-    vis_filename = f"{debug_dir}/detection_visualization_{timestamp}.jpg"
-    cv2.imwrite(vis_filename, vis_image)
-
-    print(f"DEBUG: Wizualizacja zapisana do {vis_filename}")
+    if debug_dir is not None:
+        vis_filename = f"{debug_dir}/detection_visualization_{timestamp}.jpg"
+        cv2.imwrite(vis_filename, vis_image)
+        print(f"DEBUG: Wizualizacja zapisana do {vis_filename}")
 
     return vis_image
@@ -0,0 +1,147 @@
+"""Zwarte wyniki detektorów przesyłane między procesami (bez danych debug).
+
+`qr_detector` i `box_detector` zwracają obok wykryć słownik `debug_data`
+z obrazami pośrednimi w pełnej rozdzielczości (undistort, maski, wizualizacja).
+Zadania puli procesów workera kamery pikowały go z powrotem przy każdej
+ramce, choć worker używa tylko pozycji, narożników, identyfikatorów i ocen.
+
+`run_compact_detector` uruchamia detektor w procesie puli i zwraca
+`DetectorResult`: tagi QR (`QrTag` - atrybuty jak w detekcji AprilTag, więc
+sortowanie, łączenie, śledzenie i PnP działają bez zmian) albo pudełko
+(`BoxDetection`). Dane debug wybranej ramki worker kamery liczy ponownie na
+żądanie (GET_DEBUG_DATA z numerem ramki).
+
+Przykład::
+
+    future = executor.submit(
+        run_compact_detector, qr_detector,
+        frame=frame, camera_config=camera_config, config=config,
+    )
+    tags = future.result().tags
+"""
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class QrTag:
+    """Wykryty tag AprilTag bez obiektu detektora i obrazów debug.
+
+    Attributes:
+        tag_id: Identyfikator tagu.
+        center: Środek tagu (x, y) w pikselach po undistort.
+        corners: Narożniki tagu, tablica 4x2.
+        decision_margin: Ocena pewności dekodowania.
+        hamming: Liczba poprawionych bitów.
+        z: Głębia tagu w metrach (0.0 - brak).
+        pose_R: Macierz obrotu z estymacji pozy (None - bez estymacji).
+        pose_t: Wektor translacji z estymacji pozy.
+        pose_err: Błąd estymacji pozy.
+    """
+
+    tag_id: int
+    center: np.ndarray
+    corners: np.ndarray
+    decision_margin: float
+    hamming: int = 0
+    z: float = 0.0
+    pose_R: Optional[np.ndarray] = None
+    pose_t: Optional[np.ndarray] = None
+    pose_err: Optional[float] = None
+
+    @classmethod
+    def from_detection(cls, detection: Any) -> "QrTag":
+        """Tworzy tag z detekcji `pupil_apriltags` (z polem 'z' z qr_detector)."""
+        return cls(
+            tag_id=int(detection.tag_id),
+            center=np.asarray(detection.center, dtype=np.float64),
+            corners=np.asarray(detection.corners, dtype=np.float64),
+            decision_margin=float(detection.decision_margin),
+            hamming=int(getattr(detection, "hamming", 0)),
+            z=float(getattr(detection, "z", 0.0)),
+            pose_R=getattr(detection, "pose_R", None),
+            pose_t=getattr(detection, "pose_t", None),
+            pose_err=getattr(detection, "pose_err", None),
+        )
+
+
+@dataclass(frozen=True)
+class BoxDetection:
+    """Wykryte pudełko: środek, narożniki, kąt i głębia (jak z box_detector)."""
+
+    center: Tuple[float, float]
+    corners: List[Tuple[float, float]]
+    angle: float
+    z: float
+
+
+@dataclass(frozen=True)
+class DetectorResult:
+    """Wynik detektora z procesu puli: tagi QR albo pudełko.
+
+    Attributes:
+        tags: Tagi z `qr_detector` (None - brak wykryć).
+        box: Pudełko z `box_detector` (None - brak wykrycia).
+    """
+
+    tags: Optional[List[QrTag]] = None
+    box: Optional[BoxDetection] = None
+
+
+def compact_result(result: Any) -> Any:
+    """Zamienia wynik detektora na `DetectorResult` (bez `debug_data`).
+
+    Args:
+        result: Krotka `(detections, debug_data)` z `qr_detector` albo
+            `(center, corners, angle, z, detect_image, debug_data)`
+            z `box_detector`.
+
+    Returns:
+        DetectorResult | Any: Zwarty wynik; inne wyniki bez zmian.
+    """
+    if not isinstance(result, tuple):
+        return result
+    if len(result) == 2:
+        detections = result[0]
+        if detections is None:
+            return DetectorResult()
+        return DetectorResult(tags=[QrTag.from_detection(d) for d in detections])
+    if len(result) == 6:
+        center, corners, angle, z = result[:4]
+        if center is None:
+            return DetectorResult()
+        return DetectorResult(
+            box=BoxDetection(
+                center=tuple(float(v) for v in center),
+                corners=[tuple(float(v) for v in corner) for corner in corners],
+                angle=float(angle),
+                z=float(z),
+            )
+        )
+    return result
+
+
+def run_compact_detector(
+    detector: Callable,
+    *,
+    frame: Dict[str, Any],
+    camera_config: Dict[str, Any],
+    config: Dict[str, Any],
+) -> Any:
+    """Uruchamia detektor i zwraca zwarty wynik (funkcja dla procesów puli).
+
+    Args:
+        detector (Callable): Funkcja detektora (np. `qr_detector`).
+        frame (dict): Ramki 'color' i 'depth'.
+        camera_config (dict): Konfiguracja kamery.
+        config (dict): Konfiguracja detektora.
+
+    Returns:
+        DetectorResult | Any: Wynik `compact_result`.
+    """
+    return compact_result(
+        detector(frame=frame, camera_config=camera_config, config=config)
+    )
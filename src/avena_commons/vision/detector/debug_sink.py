@@ -0,0 +1,281 @@
+"""Asynchroniczny zapis artefaktów debug detektorów (ramki, głębia, wizualizacje).
+
+Detektory nie zapisują już plików w ścieżce detekcji. Każde wywołanie
+przechodzi przez `DebugSink.sample`, który według polityki próbkowania decyduje,
+czy ramka trafi na dysk. Wybrane artefakty są kopiowane do ograniczonej kolejki,
+a zapis (JPEG dla obrazów uint8, `.npy` dla pozostałych tablic) i pilnowanie
+limitu miejsca na dysku odbywa się w wątku w tle. Przy przepełnionej kolejce
+artefakty są odrzucane, a nie blokują detekcji.
+
+Konfiguracja pochodzi z klucza 'debug_artifacts' konfiguracji kamery::
+
+    "debug_artifacts": {
+        "enabled": true,
+        "directory": "temp/debug_frames",
+        "sampling": ["every_nth", "on_failure", "on_anomaly"],
+        "every_n": 30,
+        "anomaly_ms": 500,
+        "queue_size": 8,
+        "max_bytes": 524288000
+    }
+"""
+
+import os
+import queue
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional
+
+import cv2
+import numpy as np
+
+from avena_commons.util.logger import error
+
+SAMPLING_POLICIES = ("always", "every_nth", "on_failure", "on_anomaly")
+
+DEFAULT_SETTINGS: Dict[str, Any] = {
+    "enabled": True,
+    "directory": "temp/debug_frames",
+    "sampling": ["every_nth", "on_failure", "on_anomaly"],
+    "every_n": 30,
+    "anomaly_ms": 500.0,
+    "queue_size": 8,
+    "max_bytes": 500 * 1024 * 1024,
+}
+
+# Sink procesu (procesy puli detektorów mają własne - wątek nie przeżywa fork)
+_SINK: Optional["DebugSink"] = None
+_SINK_SETTINGS: Optional[Dict[str, Any]] = None
+
+
+class DebugSink:
+    """Próbkujący zapis artefaktów debug w wątku w tle z limitem miejsca.
+
+    Args:
+        directory (str): Katalog artefaktów (rotowany - usuwane są najstarsze pliki).
+        sampling (Iterable[str]): Polityki łączone przez "lub": 'always',
+            'every_nth' (co `every_n` ramka), 'on_failure' (brak wykrycia),
+            'on_anomaly' (anomalia zgłoszona przez detektor lub czas > `anomaly_ms`).
+        every_n (int): Okres próbkowania dla 'every_nth'.
+        anomaly_ms (float): Czas detekcji uznawany za anomalię (0 - wyłączone).
+        queue_size (int): Pojemność kolejki zapisu (pełna kolejka odrzuca artefakty).
+        max_bytes (int): Limit rozmiaru katalogu (0 - bez limitu).
+        enabled (bool): False - nic nie jest zapisywane.
+
+    Przykład:
+        >>> sink = DebugSink(directory="temp/debug_frames", sampling=["on_failure"])
+        >>> if sink.sample(failed=True):
+        ...     sink.submit("qr", {"color_frame": color, "depth_frame": depth})
+        >>> sink.close()
+    """
+
+    def __init__(
+        self,
+        directory: str = DEFAULT_SETTINGS["directory"],
+        sampling: Iterable[str] = DEFAULT_SETTINGS["sampling"],
+        every_n: int = DEFAULT_SETTINGS["every_n"],
+        anomaly_ms: float = DEFAULT_SETTINGS["anomaly_ms"],
+        queue_size: int = DEFAULT_SETTINGS["queue_size"],
+        max_bytes: int = DEFAULT_SETTINGS["max_bytes"],
+        enabled: bool = True,
+    ):
+        self.sampling = set(sampling)
+        unknown = self.sampling - set(SAMPLING_POLICIES)
+        if unknown:
+            raise ValueError(f"Nieznane polityki próbkowania: {sorted(unknown)}")
+        self.directory = directory
+        self.every_n = max(1, int(every_n))
+        self.anomaly_ms = float(anomaly_ms)
+        self.max_bytes = int(max_bytes)
+        self.enabled = enabled
+
+        self.frames = 0
+        self.sampled = 0
+        self.dropped = 0
+        self.written_files = 0
+        self.deleted_files = 0
+
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, int(queue_size)))
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+
+    # MARK: Próbkowanie
+    def sample(
+        self, *, failed: bool = False, anomaly: bool = False, elapsed_ms: float = 0.0
+    ) -> bool:
+        """Zlicza ramkę i decyduje, czy zapisać jej artefakty.
+
+        Args:
+            failed (bool): Detektor niczego nie wykrył.
+            anomaly (bool): Detektor zgłosił nietypowy wynik.
+            elapsed_ms (float): Czas detekcji (powyżej `anomaly_ms` to anomalia).
+
+        Returns:
+            bool: True, gdy artefakty tej ramki należy przekazać do `submit`.
+        """
+        if not self.enabled:
+            return False
+        self.frames += 1
+        if self.anomaly_ms > 0 and elapsed_ms > self.anomaly_ms:
+            anomaly = True
+        selected = (
+            "always" in self.sampling
+            or ("every_nth" in self.sampling and self.frames % self.every_n == 0)
+            or ("on_failure" in self.sampling and failed)
+            or ("on_anomaly" in self.sampling and anomaly)
+        )
+        if selected:
+            self.sampled += 1
+        return selected
+
+    def submit(
+        self, prefix: str, artifacts: Dict[str, Any], timestamp: Optional[str] = None
+    ) -> bool:
+        """Kopiuje artefakty do kolejki zapisu (nie blokuje).
+
+        Tablice są kopiowane, bo ramki mogą być widokami na pamięć współdzieloną,
+        która zostanie nadpisana przed zapisem. Wartości None są pomijane.
+
+        Args:
+            prefix (str): Prefiks nazw plików (np. 'qr', 'box').
+            artifacts (dict): Nazwa artefaktu -> tablica numpy.
+            timestamp (str, optional): Znacznik czasu w nazwach plików.
+
+        Returns:
+            bool: False, gdy kolejka jest pełna i artefakty odrzucono.
+        """
+        if not self.enabled:
+            return False
+        self._ensure_thread()
+        if timestamp is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")[:-3]
+        if self._queue.full():
+            self.dropped += 1
+            return False
+        base = f"{timestamp}_{os.getpid()}_{prefix}"
+        item = [
+            (f"{base}_{name}", np.array(value, copy=True))
+            for name, value in artifacts.items()
+            if value is not None
+        ]
+        try:
+            self._queue.put_nowait(item)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    # MARK: Wątek zapisu
+    def _ensure_thread(self) -> None:
+        # Po fork (procesy puli) wątek rodzica nie istnieje - start od nowa
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self._queue = queue.Queue(maxsize=self._queue.maxsize)
+        self._thread = threading.Thread(
+            target=self._writer_loop, name="debug-sink", daemon=True
+        )
+        self._thread.start()
+
+    def _writer_loop(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                self._write(item)
+            except Exception as e:
+                error(f"DEBUG SINK: Błąd zapisu artefaktów: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _write(self, item) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        for name, value in item:
+            if value.dtype == np.uint8 and value.ndim in (2, 3):
+                cv2.imwrite(os.path.join(self.directory, f"{name}.jpg"), value)
+            else:
+                np.save(os.path.join(self.directory, f"{name}.npy"), value)
+            self.written_files += 1
+        if self.max_bytes > 0:
+            self._enforce_quota()
+
+    def _enforce_quota(self) -> None:
+        """Usuwa najstarsze pliki katalogu, aż zmieści się w `max_bytes`.
+
+        Katalog jest skanowany przy każdym zapisie, bo do tego samego katalogu
+        piszą wszystkie procesy puli detektorów.
+        """
+        files = []
+        total = 0
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.is_file(follow_symlinks=False):
+                    stat = entry.stat(follow_symlinks=False)
+                    files.append((stat.st_mtime, entry.name, stat.st_size))
+                    total += stat.st_size
+        if total <= self.max_bytes:
+            return
+        files.sort()
+        for _, name, size in files:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+                self.deleted_files += 1
+            except FileNotFoundError:
+                pass  # Usunięty przez inny proces
+            total -= size
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Czeka na zapis artefaktów z kolejki.
+
+        Returns:
+            bool: True, gdy kolejka została opróżniona przed upływem `timeout`.
+        """
+        if self._thread is None or self._pid != os.getpid():
+            return True
+        if timeout is None:
+            self._queue.join()
+            return True
+        done = threading.Event()
+
+        def wait():
+            self._queue.join()
+            done.set()
+
+        threading.Thread(target=wait, daemon=True).start()
+        return done.wait(timeout)
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Zapisuje oczekujące artefakty i kończy wątek zapisu."""
+        if self._thread is None or self._pid != os.getpid():
+            return
+        self.flush(timeout)
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout)
+        self._thread = None
+
+
+def get_debug_sink(settings: Optional[Dict[str, Any]] = None) -> DebugSink:
+    """Zwraca sink procesu dla ustawień 'debug_artifacts' (tworzy go przy zmianie).
+
+    Args:
+        settings (dict, optional): Ustawienia nadpisujące `DEFAULT_SETTINGS`.
+
+    Returns:
+        DebugSink: Sink współdzielony przez detektory w tym procesie.
+    """
+    global _SINK, _SINK_SETTINGS
+
+    settings = {**DEFAULT_SETTINGS, **(settings or {})}
+    if _SINK is not None and settings == _SINK_SETTINGS:
+        return _SINK
+    if _SINK is not None:
+        _SINK.close()
+    _SINK = DebugSink(**settings)
+    _SINK_SETTINGS = settings
+    return _SINK
@@ -0,0 +1,146 @@
+"""Kaskada trybów preprocessingu QR z kolejnością według skuteczności.
+
+Zamiast uruchamiać każdą konfigurację trybu na każdej ramce (osobne zadania
+puli procesów), tryb 'cascade' detektora `qr_detector` wykonuje kroki po
+kolei na jednym obrazie po undistort: najpierw najtańszy ('gray'), a kolejne
+('gray_with_binarization', tryby saturacji, 'tag_reconstruction') tylko wtedy,
+gdy łączna liczba różnych tagów jest mniejsza niż `expected_count`.
+
+`ModeCascade` zbiera statystyki kroków dla kamery (procesu puli): krok
+"rozwiązuje" ramkę, gdy po nim kaskada ma komplet tagów. Przy `reorder` kroki
+z co najmniej `min_runs` próbami z ostatnich `window` ramek są uruchamiane
+w kolejności malejącej skuteczności; kroki z mniejszą liczbą prób zachowują
+kolejność z konfiguracji za nimi.
+
+Konfiguracja detektora (kroki dziedziczą pozostałe klucze, np. 'qr_size')::
+
+    {
+        "mode": "cascade",
+        "qr_size": 0.026,
+        "cascade": {
+            "expected_count": 4,
+            "reorder": true,
+            "min_runs": 20,
+            "window": 200,
+            "steps": [
+                {"mode": "gray", "clahe": {"clip_limit": 4.0, "grid_size": 8}},
+                {"mode": "gray_with_binarization", "binarization": {...}},
+                {"mode": "saturation"},
+                {"mode": "tag_reconstruction"}
+            ]
+        }
+    }
+"""
+
+from collections import deque
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+DEFAULT_SETTINGS: Dict[str, Any] = {
+    "expected_count": 4,
+    "reorder": True,
+    "min_runs": 20,
+    "window": 200,
+    "steps": [
+        {"mode": "gray"},
+        {"mode": "gray_with_binarization"},
+        {"mode": "saturation"},
+        {"mode": "saturation_with_binarization"},
+        {"mode": "tag_reconstruction"},
+    ],
+}
+
+# Kaskady procesu per kamera (statystyki nie przechodzą między procesami puli)
+_CASCADES: Dict[Hashable, Tuple[Dict[str, Any], "ModeCascade"]] = {}
+
+
+class ModeCascade:
+    """Kolejność kroków kaskady trybów i ich skuteczność dla jednej kamery.
+
+    Args:
+        steps (List[dict]): Konfiguracje kroków z kluczem 'mode' (w kolejności
+            kosztu). Opcjonalny klucz 'name' nazywa krok w statystykach
+            (domyślnie "<indeks>:<tryb>").
+        expected_count (int): Liczba tagów kończąca kaskadę.
+        reorder (bool): Kolejność według skuteczności (False - z konfiguracji).
+        min_runs (int): Liczba prób kroku, od której liczy się jego skuteczność.
+        window (int): Liczba ostatnich prób kroku w statystyce.
+
+    Przykład:
+        >>> cascade = ModeCascade([{"mode": "gray"}, {"mode": "saturation"}])
+        >>> for name, step in cascade.order():
+        ...     found = detect(step)
+        ...     cascade.record(name, solved=len(found) >= cascade.expected_count)
+    """
+
+    def __init__(
+        self,
+        steps: List[Dict[str, Any]] = DEFAULT_SETTINGS["steps"],
+        expected_count: int = DEFAULT_SETTINGS["expected_count"],
+        reorder: bool = DEFAULT_SETTINGS["reorder"],
+        min_runs: int = DEFAULT_SETTINGS["min_runs"],
+        window: int = DEFAULT_SETTINGS["window"],
+    ):
+        self.steps = [
+            (str(step.get("name", f"{i}:{step['mode']}")), dict(step))
+            for i, step in enumerate(steps)
+        ]
+        self.expected_count = max(1, int(expected_count))
+        self.reorder = bool(reorder)
+        self.min_runs = max(1, int(min_runs))
+        self._outcomes = {
+            name: deque(maxlen=max(1, int(window))) for name, _ in self.steps
+        }
+
+    def order(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """Kroki w kolejności wykonania (nazwa, konfiguracja kroku)."""
+        if not self.reorder:
+            return list(self.steps)
+        measured = [
+            step for step in self.steps if self.success_rate(step[0]) is not None
+        ]
+        measured.sort(key=lambda step: -self.success_rate(step[0]))
+        return measured + [step for step in self.steps if step not in measured]
+
+    def record(self, name: str, solved: bool) -> None:
+        """Zapisz wynik uruchomienia kroku (True - kaskada ma komplet tagów)."""
+        self._outcomes[name].append(bool(solved))
+
+    def success_rate(self, name: str) -> Optional[float]:
+        """Skuteczność kroku albo None, gdy ma mniej niż `min_runs` prób."""
+        outcomes = self._outcomes[name]
+        if len(outcomes) < self.min_runs:
+            return None
+        return sum(outcomes) / len(outcomes)
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        """Statystyki kroków: liczba prób, rozwiązanych ramek i skuteczność."""
+        return {
+            name: {
+                "runs": len(self._outcomes[name]),
+                "solved": sum(self._outcomes[name]),
+                "success_rate": self.success_rate(name),
+            }
+            for name, _ in self.steps
+        }
+
+
+def get_mode_cascade(
+    camera_key: Hashable, settings: Optional[Dict[str, Any]] = None
+) -> ModeCascade:
+    """Zwraca kaskadę kamery w tym procesie (nową przy zmianie ustawień).
+
+    Args:
+        camera_key: Identyfikator kamery (np. 'camera_ip').
+        settings (dict, optional): Ustawienia 'cascade' nadpisujące
+            `DEFAULT_SETTINGS`.
+
+    Returns:
+        ModeCascade: Kaskada ze statystykami kamery.
+    """
+    settings = {**DEFAULT_SETTINGS, **(settings or {})}
+    cached = _CASCADES.get(camera_key)
+    if cached is not None and cached[0] == settings:
+        return cached[1]
+    cascade = ModeCascade(**settings)
+    _CASCADES[camera_key] = (settings, cascade)
+    return cascade
@@ -1,5 +1,3 @@
-import os
-from datetime import datetime
 from typing import Any, Dict, Optional, Tuple
 
 import cv2
@@ -11,11 +9,22 @@ import avena_commons.vision.image_preprocess as preprocess
 import avena_commons.vision.tag_reconstruction as tag_reconstruction
 from avena_commons.util.catchtime import Catchtime
 from avena_commons.util.logger import error
+from avena_commons.vision.detector.debug_sink import get_debug_sink
+from avena_commons.vision.detector.mode_cascade import get_mode_cascade
 
 # Global detector cache dla optymalizacji
 _DETECTOR_CACHE = None
 _TAG_IMAGE_CACHE = None
 
+# Przyciemnienie boków ramki przed detekcją (pełna ramka i ROI trackera)
+_DARKEN_SIDES = {
+    "top": 0.0,
+    "bottom": 0.0,
+    "left": 0.3,
+    "right": 0.3,
+    "darkness_factor": 0.0,
+}
+
 
 def _initialize_detector_safely() -> Optional[Any]:
     """Bezpieczna inicjalizacja detectora z obsługą błędów.
@@ -87,12 +96,20 @@ def qr_detector(
     """Wykryj QR/AprilTag w obrazie z robust error handling.
 
     Funkcja przetwarza obraz kamery w celu wykrycia tagów AprilTag
-    z wykorzystaniem różnych trybów preprocessingu.
+    z wykorzystaniem różnych trybów preprocessingu. Ramki wejściowe trafiają
+    na dysk tylko wtedy, gdy wybierze je sink debug (klucz 'debug_artifacts'
+    w `camera_config`) - zapis odbywa się w tle.
 
     Args:
         frame: Słownik z kluczami 'color', 'depth' zawierający ramki obrazu.
         camera_config: Konfiguracja kamery z parametrami kalibracji.
-        config: Konfiguracja detectora z trybem przetwarzania.
+        config: Konfiguracja detectora z trybem przetwarzania. Opcjonalny klucz
+            'track_rois' (lista [x0, y0, x1, y1] z `QrTracker.plan`) ogranicza
+            undistort i detekcję do tych obszarów (poza trybem
+            'tag_reconstruction'). Tryb 'cascade' wykonuje kroki z klucza
+            'cascade' po kolei, aż do znalezienia oczekiwanej liczby tagów
+            (`mode_cascade.ModeCascade`) - klucz 'expected_count' (liczba
+            tagów na bieżącym zdjęciu) nadpisuje 'cascade.expected_count'.
 
     Returns:
         Tuple[Optional[Any], Dict[str, Any]]: Krotka (detections, debug_data).
@@ -102,10 +119,39 @@ def qr_detector(
     Raises:
         Exception: Wszystkie wyjątki są przechwytywane i logowane.
     """
+    with Catchtime() as detection_time:
+        detections, debug_data = _qr_detector(
+            frame=frame, camera_config=camera_config, config=config
+        )
+
+    try:
+        sink = get_debug_sink((camera_config or {}).get("debug_artifacts"))
+        # Anomalia: tag wykryty, ale bez poprawnej głębi
+        if sink.sample(
+            failed=not detections,
+            anomaly=any(getattr(d, "z", None) == 0.0 for d in detections or []),
+            elapsed_ms=detection_time.ms,
+        ):
+            sink.submit(
+                "qr",
+                {
+                    "color_frame": (frame or {}).get("color"),
+                    "depth_frame": (frame or {}).get("depth"),
+                },
+            )
+    except Exception as e:
+        error(f"QR DETECTOR: Błąd zapisu artefaktów debug: {e}")
+
+    return detections, debug_data
+
+
+def _qr_detector(
+    *, frame: Dict[str, Any], camera_config: Dict[str, Any], config: Dict[str, Any]
+) -> Tuple[Optional[Any], Dict[str, Any]]:
+    """Właściwa detekcja tagów dla `qr_detector` (bez zapisu artefaktów)."""
     debug_data = {}
 
     color_image = frame.get("color", None)
-    depth_image = frame.get("depth", None)
 
     with Catchtime() as total_time:
         try:
@@ -131,18 +177,6 @@ def qr_detector(
 
             # debug(f"QR DETECTOR: Detector ready in {t.ms:.4f} ms")
 
-            # Zapisz ramki do debugowania
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")[:-3]
-            debug_dir = "temp/debug_frames"
-            os.makedirs(debug_dir, exist_ok=True)
-
-            # # Zapisz obraz kolorowy
-            color_filename = f"{debug_dir}/{timestamp}_qr_color_frame.jpg"
-            cv2.imwrite(color_filename, color_image)
-
-            depth_raw_filename = f"{debug_dir}/{timestamp}_qr_depth_frame_.npy"
-            np.save(depth_raw_filename, depth_image)
-
             # Przygotowanie parametrów kamery
             try:
                 camera_params = (
@@ -152,94 +186,83 @@ def qr_detector(
                     camera_config["camera_params"][3],
                 )
 
-                camera_matrix = camera.create_camera_matrix(
-                    camera_config["camera_params"]
-                )
-                camera_distortion = camera.create_camera_distortion(
-                    camera_config["distortion_coefficients"]
+                # Mapy undistort z cache procesu (liczone raz na kamerę i rozdzielczość)
+                undistort_maps = camera.get_undistort_maps(
+                    camera_config["camera_params"],
+                    camera_config["distortion_coefficients"],
+                    (color_image.shape[1], color_image.shape[0]),
                 )
             except (KeyError, IndexError, TypeError) as e:
                 # error(f"QR DETECTOR: Invalid camera parameters: {e}")
                 return None, debug_data
 
+            detections = None
+            mode = config.get("mode", "unknown")
+            process_mode = _MODE_PROCESSORS.get(mode)
+            if process_mode is None and mode != "cascade":
+                # error(f"QR DETECTOR: Invalid mode: {mode}")
+                return None, debug_data
+
+            # ROI z trackera (QrTracker) - undistort i detekcja tylko w wycinkach
+            track_rois = config.get("track_rois")
+            if mode == "tag_reconstruction":
+                track_rois = None  # podział na ROI zależy od układu całej ramki
+
             # Preprocessing obrazu
             try:
                 with Catchtime() as preprocess_time:
-                    qr_image_undistorted = preprocess.undistort(
-                        frame["color"], camera_matrix, camera_distortion
-                    )
-                    debug_data["qr_image_undistorted"] = qr_image_undistorted
-
-                    qr_image_undistorted_darkened = preprocess.darken_sides(
-                        qr_image_undistorted,
-                        top=0.0,
-                        bottom=0.0,
-                        left=0.3,
-                        right=0.3,
-                        darkness_factor=0.0,
-                    )
-                    debug_data["qr_image_undistorted_darkened"] = (
-                        qr_image_undistorted_darkened
-                    )
+                    if track_rois:
+                        debug_data["track_rois"] = track_rois
+                    else:
+                        qr_image_undistorted = preprocess.undistort_remap(
+                            frame["color"], undistort_maps
+                        )
+                        debug_data["qr_image_undistorted"] = qr_image_undistorted
+
+                        qr_image_undistorted_darkened = preprocess.darken_sides(
+                            qr_image_undistorted, **_DARKEN_SIDES
+                        )
+                        debug_data["qr_image_undistorted_darkened"] = (
+                            qr_image_undistorted_darkened
+                        )
 
             except Exception as e:
                 # error(f"QR DETECTOR: Image preprocessing failed: {e}")
                 return None, debug_data
 
-            # Wykrywanie według trybu
-            detections = None
-            mode = config.get("mode", "unknown")
+            def detect(process_mode, mode_config):
+                if track_rois:
+                    return _detect_in_rois(
+                        process_mode,
+                        frame["color"],
+                        undistort_maps,
+                        track_rois,
+                        detector,
+                        camera_params,
+                        mode_config,
+                        debug_data,
+                    )
+                return process_mode(
+                    qr_image_undistorted_darkened,
+                    detector,
+                    camera_params,
+                    mode_config,
+                    debug_data,
+                )
 
+            # Wykrywanie według trybu
             try:
                 with Catchtime() as detection_time:
-                    if mode == "gray":
-                        detections = _process_gray_mode(
-                            qr_image_undistorted_darkened,
-                            detector,
-                            camera_params,
-                            config,
-                            debug_data,
-                        )
-
-                    elif mode == "gray_with_binarization":
-                        detections = _process_gray_with_binarization_mode(
-                            qr_image_undistorted_darkened,
-                            detector,
-                            camera_params,
-                            config,
-                            debug_data,
-                        )
-
-                    elif mode == "saturation":
-                        detections = _process_saturation_mode(
-                            qr_image_undistorted_darkened,
-                            detector,
-                            camera_params,
-                            config,
-                            debug_data,
-                        )
-
-                    elif mode == "saturation_with_binarization":
-                        detections = _process_saturation_with_binarization_mode(
-                            qr_image_undistorted_darkened,
-                            detector,
-                            camera_params,
-                            config,
-                            debug_data,
-                        )
-
-                    elif mode == "tag_reconstruction":
-                        detections = _process_tag_reconstruction_mode(
-                            qr_image_undistorted_darkened,
-                            detector,
-                            camera_params,
+                    if mode == "cascade":
+                        detections = _run_mode_cascade(
+                            detect,
+                            camera_config,
                             config,
                             debug_data,
+                            full_frame=not track_rois,
                         )
-
                     else:
-                        # error(f"QR DETECTOR: Invalid mode: {mode}")
-                        return None, debug_data
+                        detections = detect(process_mode, config)
 
             except Exception as e:
                 # error(f"QR DETECTOR: Detection failed in mode '{mode}': {e}")
@@ -545,6 +568,147 @@ def _process_tag_reconstruction_mode(
         return None
 
 
+_MODE_PROCESSORS = {
+    "gray": _process_gray_mode,
+    "gray_with_binarization": _process_gray_with_binarization_mode,
+    "saturation": _process_saturation_mode,
+    "saturation_with_binarization": _process_saturation_with_binarization_mode,
+    "tag_reconstruction": _process_tag_reconstruction_mode,
+}
+
+
+def _run_mode_cascade(
+    detect: Any,
+    camera_config: Dict,
+    config: Dict,
+    debug_data: Dict,
+    *,
+    full_frame: bool = True,
+) -> list:
+    """Wykonaj kroki kaskady trybów do znalezienia oczekiwanej liczby tagów.
+
+    Wykrycia kolejnych kroków są łączone (ten sam tag z kilku trybów liczy
+    się raz - zostaje wykrycie z większym `decision_margin`). Kolejność kroków
+    i ich statystyki pochodzą z `ModeCascade` kamery.
+
+    Args:
+        detect: Funkcja (process_mode, mode_config) -> lista wykryć.
+        camera_config: Konfiguracja kamery ('camera_ip' identyfikuje kamerę).
+        config: Konfiguracja detectora z kluczem 'cascade'. Klucz
+            'expected_count' (liczba tagów na zdjęciu, przekazywana przez
+            worker kamery) ma pierwszeństwo przed 'cascade.expected_count'.
+        debug_data: Słownik debug - klucz 'cascade' dostaje przebieg kaskady.
+        full_frame: False - detekcja w ROI trackera, kroki 'tag_reconstruction'
+            są pomijane.
+
+    Returns:
+        list: Połączone wykrycia.
+    """
+    camera_key = camera_config.get("camera_ip") or tuple(camera_config["camera_params"])
+    cascade = get_mode_cascade(camera_key, config.get("cascade"))
+    base_config = {k: v for k, v in config.items() if k not in ("mode", "cascade")}
+    expected_count = config.get("expected_count") or cascade.expected_count
+
+    found = []
+    steps = []
+    for name, step in cascade.order():
+        process_mode = _MODE_PROCESSORS.get(step["mode"])
+        if process_mode is None or (
+            not full_frame and step["mode"] == "tag_reconstruction"
+        ):
+            continue
+        with Catchtime() as step_time:
+            detections = detect(process_mode, {**base_config, **step}) or []
+        found = _merge_unique_detections(found, detections)
+        solved = len(found) >= expected_count
+        cascade.record(name, solved)
+        steps.append({"step": name, "found": len(detections), "ms": step_time.ms})
+        if solved:
+            break
+
+    debug_data["cascade"] = {"steps": steps, "stats": cascade.report()}
+    return found
+
+
+def _merge_unique_detections(found: list, detections: list) -> list:
+    """Dodaj wykrycia, których środek nie leży w żadnym znanym tagu."""
+    merged = list(found)
+    for detection in detections:
+        for i, known in enumerate(merged):
+            side = np.linalg.norm(known.corners[1] - known.corners[0])
+            if np.linalg.norm(detection.center - known.center) < side / 2:
+                if detection.decision_margin > known.decision_margin:
+                    merged[i] = detection
+                break
+        else:
+            merged.append(detection)
+    return merged
+
+
+def _detect_in_rois(
+    process_mode: Any,
+    image: np.ndarray,
+    undistort_maps: Tuple,
+    rois: list,
+    detector: Any,
+    camera_params: Tuple,
+    config: Dict,
+    debug_data: Dict,
+) -> list:
+    """Wykryj tagi tylko w ROI przewidzianych przez tracker.
+
+    Każdy ROI [x0, y0, x1, y1] (w pikselach obrazu po undistort) jest
+    wyznaczany `cv2.remap` z wycinków map - piksele są takie same jak we
+    fragmencie pełnej ramki po `undistort_remap` i `darken_sides`, ale reszta
+    ramki nie jest przetwarzana. Funkcja trybu dostaje punkt główny kamery
+    przesunięty o początek wycinka, więc poza tagu jest taka sama jak przy
+    detekcji na całym obrazie. Narożniki i środki wykryć są przeliczane
+    z powrotem do współrzędnych całego obrazu.
+
+    Args:
+        process_mode: Funkcja trybu (`_process_gray_mode`, ...).
+        image: Obraz kolorowy przed undistort.
+        undistort_maps: Mapy (map1, map2) z `get_undistort_maps`.
+        rois: Lista ROI w pikselach obrazu.
+        detector: Instancja detectora.
+        camera_params: Parametry kamery (fx, fy, cx, cy).
+        config: Konfiguracja.
+        debug_data: Słownik do zapisywania obrazów debug (z ostatniego ROI).
+
+    Returns:
+        list: Wykrycia ze wszystkich ROI.
+    """
+    map1, map2 = undistort_maps
+    height, width = image.shape[:2]
+    # Kolumny zerowane przez darken_sides na pełnej ramce
+    dark_left = int(width * _DARKEN_SIDES["left"])
+    dark_right = width - int(width * _DARKEN_SIDES["right"])
+    fx, fy, cx, cy = camera_params
+    detections = []
+    for roi in rois:
+        x0, y0 = max(0, int(roi[0])), max(0, int(roi[1]))
+        x1, y1 = min(width, int(roi[2])), min(height, int(roi[3]))
+        if x1 <= x0 or y1 <= y0:
+            continue
+        crop = preprocess.undistort_remap(
+            image, (map1[y0:y1, x0:x1], map2[y0:y1, x0:x1])
+        )
+        crop[:, : max(0, dark_left - x0)] = 0
+        crop[:, max(0, dark_right - x0) :] = 0
+        found = process_mode(
+            crop,
+            detector,
+            (fx, fy, cx - x0, cy - y0),
+            config,
+            debug_data,
+        )
+        for detection in found or []:
+            detection.corners = detection.corners + (x0, y0)
+            detection.center = detection.center + (x0, y0)
+            detections.append(detection)
+    return detections
+
+
 def create_qr_detection_visualization(color_image, detections, timestamp, debug_dir):
     """Tworzy wizualizację wykrytych QR/AprilTag z numerami pozycji w siatce.
 
@@ -0,0 +1,266 @@
+"""Śledzenie tagów QR między ramkami (ROI wokół poprzednich wykryć).
+
+Pełna detekcja AprilTag w kilku trybach preprocessingu to główny koszt CPU
+kamery. Po pewnej detekcji (wszystkie tagi z `hamming == 0` i
+`decision_margin` >= progu) `QrTracker.plan` zwraca ROI wokół narożników
+poprzednich tagów, a `qr_detector` (klucz 'track_rois' konfiguracji)
+przeszukuje tylko te wycinki obrazu. Pełna detekcja uruchamiana jest, gdy
+śledzenie zgubi któryś z tagów (na tej samej ramce), co `full_frame_every`
+ramek oraz gdy nie ma jeszcze śledzenia dla klucza.
+
+Klucz śledzenia wyznacza wywołujący - kamera na robocie używa pozycji
+supervisora, więc ROI z jednego punktu fotografowania nie są używane w innym.
+Głębia (mediana z obszaru tagu) i poza tagu są wygładzane medianą z ostatnich
+`smoothing_window` ramek; historia pozycji jest zerowana, gdy narożniki tagu
+przesuną się o więcej niż `max_shift_px`.
+
+Konfiguracja pochodzi z klucza 'qr_tracking' konfiguracji kamery::
+
+    "qr_tracking": {
+        "enabled": true,
+        "full_frame_every": 10,
+        "roi_margin": 0.6,
+        "min_decision_margin": 30.0,
+        "smoothing_window": 5,
+        "max_shift_px": 8.0,
+        "max_tracks": 16
+    }
+"""
+
+from collections import OrderedDict, deque
+from typing import Any, Dict, Hashable, List, Optional
+
+import numpy as np
+
+DEFAULT_SETTINGS: Dict[str, Any] = {
+    "enabled": False,
+    "full_frame_every": 10,
+    "roi_margin": 0.6,
+    "min_decision_margin": 30.0,
+    "smoothing_window": 5,
+    "max_shift_px": 8.0,
+    "max_tracks": 16,
+}
+
+
+class QrTracker:
+    """Stan śledzenia tagów QR dla kolejnych ramek (per klucz śledzenia).
+
+    Args:
+        enabled (bool): False - zawsze pełna detekcja, bez wygładzania.
+        full_frame_every (int): Co która ramka klucza jest pełną detekcją
+            (1 - każda).
+        roi_margin (float): Margines ROI jako ułamek większego boku tagu.
+        min_decision_margin (float): Minimalny `decision_margin` pewnej detekcji.
+        smoothing_window (int): Liczba ramek mediany głębi i pozy (1 - bez
+            wygładzania).
+        max_shift_px (float): Średnie przesunięcie narożników zerujące
+            historię wygładzania pozycji.
+        max_tracks (int): Liczba pamiętanych kluczy (najdawniej używane są
+            usuwane).
+
+    Przykład:
+        >>> tracker = QrTracker.from_settings({"enabled": True})
+        >>> rois = tracker.plan(key)  # None - pełna detekcja
+        >>> results = detect(frame, track_rois=rois)
+        >>> if rois is not None and tracker.check_lost(key, results):
+        ...     results = detect(frame, track_rois=None)
+        ...     rois = None
+        >>> tracker.update(key, results, tracked=rois is not None)
+    """
+
+    def __init__(
+        self,
+        enabled: bool = DEFAULT_SETTINGS["enabled"],
+        full_frame_every: int = DEFAULT_SETTINGS["full_frame_every"],
+        roi_margin: float = DEFAULT_SETTINGS["roi_margin"],
+        min_decision_margin: float = DEFAULT_SETTINGS["min_decision_margin"],
+        smoothing_window: int = DEFAULT_SETTINGS["smoothing_window"],
+        max_shift_px: float = DEFAULT_SETTINGS["max_shift_px"],
+        max_tracks: int = DEFAULT_SETTINGS["max_tracks"],
+    ):
+        self.enabled = bool(enabled)
+        self.full_frame_every = max(1, int(full_frame_every))
+        self.roi_margin = float(roi_margin)
+        self.min_decision_margin = float(min_decision_margin)
+        self.smoothing_window = max(1, int(smoothing_window))
+        self.max_shift_px = float(max_shift_px)
+        self.max_tracks = max(1, int(max_tracks))
+        self.stats = {"full_frame": 0, "roi": 0, "lost": 0}
+        self._tracks: "OrderedDict[Hashable, Dict[str, Any]]" = OrderedDict()
+
+    @classmethod
+    def from_settings(cls, settings: Optional[Dict[str, Any]] = None) -> "QrTracker":
+        """Utwórz tracker z klucza 'qr_tracking' (brakujące pola - domyślne)."""
+        return cls(**{**DEFAULT_SETTINGS, **(settings or {})})
+
+    def plan(self, key: Hashable) -> Optional[List[List[int]]]:
+        """Zwróć ROI [x0, y0, x1, y1] dla kolejnej ramki klucza.
+
+        Returns:
+            Optional[List[List[int]]]: ROI do przeszukania albo None, gdy
+            ramka wymaga pełnej detekcji (brak śledzenia, co N-ta ramka).
+        """
+        track = self._track(key)
+        if track is None or not track["rois"]:
+            return None
+        if track["frames"] + 1 >= self.full_frame_every:
+            return None
+        return [list(roi) for roi in track["rois"]]
+
+    def check_lost(self, key: Hashable, detections: Dict[int, Any]) -> bool:
+        """Sprawdź, czy detekcja w ROI zgubiła któryś ze śledzonych tagów.
+
+        Args:
+            key: Klucz śledzenia.
+            detections: Wykrycia po pozycjach siatki {1: detection, 2: None, ...}.
+
+        Returns:
+            bool: True - trzeba powtórzyć pełną detekcję na tej ramce.
+        """
+        track = self._track(key)
+        found = {
+            position
+            for position, detection in (detections or {}).items()
+            if self._confident(detection)
+        }
+        lost = track is None or not set(track["corners"]) <= found
+        if lost:
+            self.stats["lost"] += 1
+        return lost
+
+    def update(
+        self, key: Hashable, detections: Dict[int, Any], *, tracked: bool
+    ) -> None:
+        """Zapamiętaj wynik ramki i wyznacz ROI dla następnej.
+
+        Śledzenie trwa tylko wtedy, gdy wszystkie wykryte tagi są pewne -
+        w przeciwnym razie następna ramka klucza jest pełną detekcją.
+
+        Args:
+            key: Klucz śledzenia.
+            detections: Wykrycia po pozycjach siatki.
+            tracked: True - ramka była przeszukana tylko w ROI.
+        """
+        if not self.enabled or key is None:
+            return
+        self.stats["roi" if tracked else "full_frame"] += 1
+
+        track = self._tracks.get(key)
+        if track is None:
+            track = {"corners": {}, "rois": [], "frames": 0, "history": {}}
+            self._tracks[key] = track
+            while len(self._tracks) > self.max_tracks:
+                self._tracks.popitem(last=False)
+        self._tracks.move_to_end(key)
+
+        found = {p: d for p, d in (detections or {}).items() if d is not None}
+        track["frames"] = track["frames"] + 1 if tracked else 0
+        if not found or not all(self._confident(d) for d in found.values()):
+            track["corners"], track["rois"] = {}, []
+            return
+        track["corners"] = {
+            position: np.asarray(detection.corners, dtype=np.float64)
+            for position, detection in found.items()
+        }
+        track["rois"] = _merge_rois([
+            self._roi(corners) for corners in track["corners"].values()
+        ])
+
+    def smooth_depth(self, key: Hashable, position: int, detection: Any) -> float:
+        """Wygładzona głębia tagu (mediana `detection.z` z ostatnich ramek).
+
+        Dodaje bieżącą ramkę do historii pozycji; zerowe głębie (brak pomiaru)
+        nie trafiają do historii.
+        """
+        z = detection.z
+        history = self._history(key, position, detection.corners)
+        if history is None:
+            return z
+        if z > 0:
+            history["depth"].append(z)
+        return float(np.median(history["depth"])) if history["depth"] else z
+
+    def smooth_pose(self, key: Hashable, position: int, pose: tuple) -> tuple:
+        """Wygładzona poza tagu (mediana składowych z ostatnich ramek).
+
+        Wywoływane po `smooth_depth` dla tej samej ramki i pozycji.
+        """
+        track = self._track(key)
+        history = track["history"].get(position) if track is not None else None
+        if history is None or pose is None:
+            return pose
+        history["pose"].append(tuple(pose))
+        return tuple(float(v) for v in np.median(np.array(history["pose"]), axis=0))
+
+    def reset(self, key: Optional[Hashable] = None) -> None:
+        """Usuń śledzenie klucza (None - wszystkich kluczy)."""
+        if key is None:
+            self._tracks.clear()
+        else:
+            self._tracks.pop(key, None)
+
+    def _track(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        if not self.enabled or key is None:
+            return None
+        return self._tracks.get(key)
+
+    def _history(
+        self, key: Hashable, position: int, corners: np.ndarray
+    ) -> Optional[Dict[str, Any]]:
+        """Historia wygładzania pozycji (zerowana po przesunięciu tagu)."""
+        track = self._track(key)
+        if track is None or self.smoothing_window <= 1:
+            return None
+        corners = np.asarray(corners, dtype=np.float64)
+        history = track["history"].get(position)
+        if (
+            history is None
+            or np.linalg.norm(corners - history["corners"], axis=1).mean()
+            > self.max_shift_px
+        ):
+            history = {
+                "depth": deque(maxlen=self.smoothing_window),
+                "pose": deque(maxlen=self.smoothing_window),
+            }
+            track["history"][position] = history
+        history["corners"] = corners
+        return history
+
+    def _confident(self, detection: Any) -> bool:
+        return (
+            detection is not None
+            and getattr(detection, "hamming", 0) == 0
+            and getattr(detection, "decision_margin", 0.0) >= self.min_decision_margin
+        )
+
+    def _roi(self, corners: np.ndarray) -> List[int]:
+        low, high = corners.min(axis=0), corners.max(axis=0)
+        margin = self.roi_margin * float((high - low).max())
+        x0, y0 = np.floor(low - margin).astype(int)
+        x1, y1 = np.ceil(high + margin).astype(int)
+        return [max(0, int(x0)), max(0, int(y0)), int(x1), int(y1)]
+
+
+def _merge_rois(rois: List[List[int]]) -> List[List[int]]:
+    """Połącz nachodzące na siebie ROI (tag nie jest wykrywany dwukrotnie)."""
+    merged = [list(roi) for roi in rois]
+    changed = True
+    while changed:
+        changed = False
+        for i in range(len(merged)):
+            for j in range(i + 1, len(merged)):
+                a, b = merged[i], merged[j]
+                if a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]:
+                    merged[i] = [
+                        min(a[0], b[0]),
+                        min(a[1], b[1]),
+                        max(a[2], b[2]),
+                        max(a[3], b[3]),
+                    ]
+                    del merged[j]
+                    changed = True
+                    break
+            if changed:
+                break
+    return merged
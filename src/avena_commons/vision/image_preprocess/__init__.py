@@ -10,6 +10,7 @@ from .darken_sides import darken_sides
 from .extract_saturation_channel import extract_saturation_channel
 from .to_gray import to_gray
 from .undistort import undistort
+from .undistort_remap import undistort_remap
 
 __all__ = [
     "binarize_and_clean",
@@ -19,4 +20,5 @@ __all__ = [
     "extract_saturation_channel",
     "to_gray",
     "undistort",
+    "undistort_remap",
 ]
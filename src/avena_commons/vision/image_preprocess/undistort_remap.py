@@ -0,0 +1,25 @@
+import cv2
+
+
+def undistort_remap(image, undistort_maps):  # MARK: UNDISTORT REMAP
+    """Koryguje zniekształcenia soczewki prekalkulowanymi mapami.
+
+    Daje ten sam wynik co `undistort` (interpolacja liniowa, czarne tło poza
+    obrazem), ale bez liczenia map przy każdej ramce - mapy pochodzą
+    z `avena_commons.vision.camera.get_undistort_maps`.
+
+    Args:
+        image: Obraz wejściowy ze zniekształceniami (numpy.ndarray)
+        undistort_maps: Mapy (map1, map2) z `get_undistort_maps` dla rozmiaru obrazu
+
+    Returns:
+        numpy.ndarray: Obraz bez zniekształceń soczewki
+
+    Example:
+        >>> maps = get_undistort_maps(camera_params, dist_coeffs, (1280, 800))
+        >>> corrected_image = undistort_remap(distorted_image, maps)
+    """
+    map1, map2 = undistort_maps
+    return cv2.remap(
+        image, map1, map2, cv2.INTER_LINEAR, borderMode=cv2.BORDER_CONSTANT
+    )
@@ -1,6 +1,12 @@
 import cv2
 import numpy as np
 
+# Moduły momentów Hu poniżej eps są pomijane przez cv2.matchShapes
+_HU_EPS = 1e-5
+# Zapas na różnice zaokrągleń wyników (numpy vs cv2.matchShapes) - bliżej
+# progu lub remisu decyzję podejmuje cv2.matchShapes
+_SCORE_TOLERANCE = 1e-6
+
 
 def find_similar_contours(
     scene_contours: list[np.ndarray],
@@ -57,10 +63,40 @@ def find_similar_contours(
     - Niższy wynik = lepsze dopasowanie
     - Kontury niepodobne do żadnego referencyjnego są pomijane
     - W przypadku podobieństwa do wielu konturów wybierany jest najlepszy
+    - Momenty Hu liczone są raz na kontur, a wyniki dla wszystkich par
+      wektorowo; cv2.matchShapes wywoływane jest tylko dla konturów z wynikiem
+      w pobliżu progu lub remisu - dopasowania są takie same jak przy
+      porównaniu każdej pary przez cv2.matchShapes
     """
     similar_cnts = [[] for _ in reference_contours]
+    if not scene_contours or not reference_contours:
+        return similar_cnts
+
+    # Wyniki I3 dla wszystkich par liczone wektorowo z momentów Hu (jeden
+    # cv2.moments na kontur zamiast dwóch na parę). Kontury z wynikiem
+    # wyraźnie powyżej progu są pomijane, wyraźne dopasowania przypisywane od
+    # razu - cv2.matchShapes rozstrzyga tylko przypadki graniczne (próg, remis).
+    scores, uncertain = _match_scores(scene_contours, reference_contours)
+    margin = _SCORE_TOLERANCE * (1.0 + abs(min_similarity_threshold))
+    if len(reference_contours) > 1:
+        lowest, second = np.partition(scores, 1, axis=1)[:, :2].T
+    else:
+        lowest, second = scores[:, 0], np.full(len(scene_contours), np.inf)
+    rejected = ~uncertain & (lowest >= min_similarity_threshold + margin)
+    matched = (
+        ~uncertain
+        & (lowest < min_similarity_threshold - margin)
+        & (second - lowest > _SCORE_TOLERANCE * (1.0 + lowest))
+    )
+    best_index = scores.argmin(axis=1)
+
+    for scene_index, scene_cnt in enumerate(scene_contours):
+        if rejected[scene_index]:
+            continue
+        if matched[scene_index]:
+            similar_cnts[best_index[scene_index]].append(scene_cnt)
+            continue
 
-    for scene_cnt in scene_contours:
         # Przechowujemy najlepszy wynik i indeks konturu referencyjnego.
         # Zamiast wartości '1' używam `float('inf')` jako początkowy wynik,
         # co jest bezpieczniejszym podejściem.
@@ -90,3 +126,81 @@ def find_similar_contours(
             similar_cnts[best_match["index"]].append(scene_cnt)
 
     return similar_cnts
+
+
+def _hu_moments(contours: list[np.ndarray]) -> np.ndarray:
+    """Momenty Hu konturów, macierz (n, 7).
+
+    Znormalizowane momenty centralne z `cv2.moments`, a momenty Hu liczone
+    wektorowo tymi samymi wzorami co `cv2.HuMoments`.
+    """
+    nu = np.array(
+        [
+            (
+                m["nu20"],
+                m["nu11"],
+                m["nu02"],
+                m["nu30"],
+                m["nu21"],
+                m["nu12"],
+                m["nu03"],
+            )
+            for m in map(cv2.moments, contours)
+        ],
+        dtype=np.float64,
+    )
+    nu20, nu11, nu02, nu30, nu21, nu12, nu03 = nu.T
+
+    t0, t1 = nu30 + nu12, nu21 + nu03
+    q0, q1 = t0 * t0, t1 * t1
+    n4, d = 4 * nu11, nu20 - nu02
+    p0, p1 = nu30 - 3 * nu12, 3 * nu21 - nu03
+    r0, r1 = t0 * (q0 - 3 * q1), t1 * (3 * q0 - q1)
+    return np.column_stack([
+        nu20 + nu02,
+        d * d + n4 * nu11,
+        p0 * p0 + p1 * p1,
+        q0 + q1,
+        p0 * r0 + p1 * r1,
+        d * (q0 - q1) + n4 * t0 * t1,
+        p1 * r0 - p0 * r1,
+    ])
+
+
+def _match_scores(
+    scene_contours: list[np.ndarray], reference_contours: list[np.ndarray]
+) -> tuple[np.ndarray, np.ndarray]:
+    """Wyniki cv2.matchShapes (CONTOURS_MATCH_I3) dla wszystkich par.
+
+    I3 = max_i |mA_i - mB_i| / |mA_i|, gdzie m = sign(h) * log10|h| po
+    momentach Hu o module > eps w obu konturach (A - kontur referencyjny).
+    Gdy tylko jeden z konturów ma wszystkie momenty zerowe, wynik to
+    maksymalny double (jak w OpenCV).
+
+    Returns:
+        tuple: Macierz wyników (scena, referencja) oraz maska konturów sceny,
+            dla których wynik może różnić się od OpenCV więcej niż o
+            zaokrąglenia (moment tuż przy eps, NaN) - te porównywane są
+            przez cv2.matchShapes.
+    """
+    scene_hu = _hu_moments(scene_contours)[:, None, :]
+    reference_hu = _hu_moments(reference_contours)[None, :, :]
+
+    scene_abs, reference_abs = np.abs(scene_hu), np.abs(reference_hu)
+    counted = (scene_abs > _HU_EPS) & (reference_abs > _HU_EPS)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scene_log = np.sign(scene_hu) * np.log10(scene_abs)
+        reference_log = np.sign(reference_hu) * np.log10(reference_abs)
+        terms = np.abs((reference_log - scene_log) / reference_log)
+    scores = np.where(counted, terms, 0.0).max(axis=2)
+    scores[(scene_abs > 0).any(axis=2) != (reference_abs > 0).any(axis=2)] = np.finfo(
+        np.float64
+    ).max
+
+    near_eps = np.abs(
+        np.abs(np.concatenate([scene_hu[:, 0], reference_hu[0]])) - _HU_EPS
+    )
+    near_eps = (near_eps <= _HU_EPS * _SCORE_TOLERANCE).any(axis=1)
+    uncertain = np.isnan(scores).any(axis=1) | near_eps[: len(scene_contours)]
+    uncertain |= near_eps[len(scene_contours) :].any()
+    return scores, uncertain
@@ -4,6 +4,10 @@ import avena_commons.vision.image_preprocess as preprocess
 import avena_commons.vision.tag_reconstruction as tag_reconstruction
 from avena_commons.util.catchtime import Catchtime
 
+# Cache wzorców referencyjnych tagu w obrębie procesu: (obraz źródłowy, wzorce)
+_REFERENCE_TAG_SHAPES_CACHE = []
+_REFERENCE_TAG_SHAPES_CACHE_SIZE = 4
+
 
 def reconstruct_tags(
     image: np.ndarray, tag_image: np.ndarray, config: dict = None
@@ -18,7 +22,7 @@ def reconstruct_tags(
     Zasada działania:
     ----------------
     1. Preprocessing: Konwersja obrazu tagu do skali szarości
-    2. Referencja: Tworzenie wzorców referencyjnych tagów
+    2. Referencja: Wzorce referencyjne tagów (liczone raz, potem z cache)
     3. Segmentacja: Podział obrazu na ROI (Region of Interest)
     4. Transformacja: Mapowanie tagów referencyjnych na ROI z perspektywą
     5. Integracja: Łączenie przetworzonych ROI w końcowy obraz
@@ -60,6 +64,7 @@ def reconstruct_tags(
     Uwagi:
     ------
     - Funkcja używa Catchtime do pomiaru wydajności poszczególnych etapów
+    - Wzorce referencyjne są cache'owane w procesie dla danego obrazu tagu
     - ROI są przetwarzane sekwencyjnie z mapowaniem perspektywicznym
     - Konfiguracja domyślna dzieli obraz na 4 kwadranty z 20% nakładaniem
     """
@@ -74,13 +79,9 @@ def reconstruct_tags(
         }
 
     with Catchtime() as ct1:
-        if tag_image.ndim == 3:
-            tag_image = preprocess.to_gray(tag_image)
+        ref_tag_shapes = _get_reference_tag_shapes(tag_image)
 
     with Catchtime() as ct2:
-        ref_tag_shapes = tag_reconstruction.create_reference_tag_shapes(tag_image)
-
-    with Catchtime() as ct3:
         if not config.get("central", False):
             rois = tag_reconstruction.divide_image_into_rois(
                 image, config["roi_config"]
@@ -88,17 +89,43 @@ def reconstruct_tags(
         else:
             rois = tag_reconstruction.divide_image_into_roi(image)
 
-    with Catchtime() as ct4:
+    with Catchtime() as ct3:
         # debug(f"rois: {len(rois)}")
         for i, roi in enumerate(rois):
             roi, _ = tag_reconstruction.wrap_tag_to_roi(
                 ref_tag_shapes, roi, config["scene_corners"][i]
             )
 
-    with Catchtime() as ct5:
+    with Catchtime() as ct4:
         merged_image = tag_reconstruction.merge_rois_into_image(image, rois)
 
     # debug(
-    #     f"reconstruct_tags: t1: {ct1.t * 1_000:.2f}ms t2: {ct2.t * 1_000:.2f}ms t3: {ct3.t * 1_000:.2f}ms t4: {ct4.t * 1_000:.2f}ms t5: {ct5.t * 1_000:.2f}ms"
+    #     f"reconstruct_tags: t1: {ct1.t * 1_000:.2f}ms t2: {ct2.t * 1_000:.2f}ms t3: {ct3.t * 1_000:.2f}ms t4: {ct4.t * 1_000:.2f}ms"
     # )
     return merged_image
+
+
+def _get_reference_tag_shapes(tag_image: np.ndarray) -> dict:
+    """Zwraca wzorce referencyjne tagu z cache procesu.
+
+    Konwersja do skali szarości i `create_reference_tag_shapes` wykonywane są
+    raz dla danego obrazu tagu. Trafienie sprawdzane jest porównaniem z kopią
+    obrazu źródłowego (tanie w porównaniu z wyznaczaniem konturów), więc
+    zmiana zawartości tablicy przez wywołującego nie zwróci starych wzorców.
+    Zwracany słownik jest współdzielony - tylko do odczytu.
+    """
+    for source, ref_tag_shapes in _REFERENCE_TAG_SHAPES_CACHE:
+        if (
+            source.shape == tag_image.shape
+            and source.dtype == tag_image.dtype
+            and np.array_equal(source, tag_image)
+        ):
+            return ref_tag_shapes
+
+    gray = preprocess.to_gray(tag_image) if tag_image.ndim == 3 else tag_image
+    ref_tag_shapes = tag_reconstruction.create_reference_tag_shapes(gray)
+
+    if len(_REFERENCE_TAG_SHAPES_CACHE) >= _REFERENCE_TAG_SHAPES_CACHE_SIZE:
+        _REFERENCE_TAG_SHAPES_CACHE.pop(0)
+    _REFERENCE_TAG_SHAPES_CACHE.append((tag_image.copy(), ref_tag_shapes))
+    return ref_tag_shapes
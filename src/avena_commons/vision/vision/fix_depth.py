@@ -3,7 +3,6 @@ import numpy as np
 
 from avena_commons.util.catchtime import Catchtime
 from avena_commons.vision.vision.merge_depth_lists import merge_depth_lists
-from avena_commons.vision.vision.propagate_by_shape import propagate_by_shape
 
 
 def fix_depth(depth_image, config):
@@ -84,39 +83,28 @@ def fix_depth(depth_image, config):
     #     debug_dict["zero_depth_mask"] = zero_depth_mask
     #     debug_dict["closed_zero_mask"] = closed_zero_mask
 
-    # STEP 3: SPLIT ZERO DEPTH MASK
-    # Dzieli maskę obszarów zerowych na pojedyncze, spójne komponenty
-    # Każdy obszar staje się osobną maską do przetworzenia
+    # STEP 3: LABEL ZERO DEPTH MASK
+    # Dzieli maskę obszarów zerowych na spójne komponenty (etykiety)
+    # Bounding boxy komponentów wyznaczają kierunek propagacji każdego z nich
     with Catchtime() as t3:
-        zero_depth_mask_list = []
-        n, labels = cv2.connectedComponents(closed_zero_mask, connectivity=8)
-        for i in range(1, n):
-            mask = np.zeros_like(closed_zero_mask)
-            mask[labels == i] = 255
-            zero_depth_mask_list.append(mask)
-
-    # if debug:
-    #     debug_dict["zero_depth_mask_list"] = zero_depth_mask_list
+        n, labels, stats, _ = cv2.connectedComponentsWithStats(
+            closed_zero_mask, connectivity=8
+        )
 
-    # STEP 4: PROPAGATE ZERO DEPTH MASK - #README NAJBARDZIEJ KOSZTOWNY CZASOWO KROK ~66% CZASU
-    # Dla każdego obszaru zerowego wykonuje inpainting oparty na kształcie
-    # Uzupełnia brakujące wartości głębi na podstawie otaczających pikseli
+    # STEP 4: PROPAGATE ZERO DEPTH MASK
+    # Uzupełnia wszystkie obszary zerowe naraz (operacje indeksowane etykietą)
+    # Wynik jak propagate_by_shape wywołane osobno dla każdego komponentu
     with Catchtime() as t4:
-        inpainted_depth_list = []
-        for mask in zero_depth_mask_list:
-            inpainted_depth = propagate_by_shape(
-                closed_depth_image, mask, config["r_wide"], config["r_tall"]
-            )
-            inpainted_depth_list.append(inpainted_depth)
-    # if debug:
-    #     debug_dict["inpainted_depth_list"] = inpainted_depth_list
+        inpainted_depth = _propagate_components(
+            closed_depth_image, labels, stats, config["r_wide"], config["r_tall"]
+        )
 
     # STEP 5: MERGE INPAINTED DEPTH
     # Łączy wszystkie uzupełnione obszary głębi w jeden obraz
     # Wykonuje końcową operację morfologiczną dla wygładzenia wyników
     with Catchtime() as t5:
         depth_merged = merge_depth_lists(
-            closed_depth_image, inpainted_depth_list, zero_depth_mask_list
+            closed_depth_image, inpainted_depth, closed_zero_mask
         )
         kernel = np.ones(
             (
@@ -136,3 +124,114 @@ def fix_depth(depth_image, config):
     # )
 
     return depth_merged_closed
+
+
+def _propagate_components(depth, labels, stats, r_wide, r_tall):
+    """Propaguje głębię do wszystkich komponentów dziur jednocześnie.
+
+    Odpowiada `propagate_by_shape` wywołanemu dla maski każdego komponentu:
+    kierunek wynika z proporcji bounding boxa (szeroki - poziomo, wysoki -
+    pionowo, pozostałe - średnia obu), a każdy wiersz (kolumna) komponentu
+    dostaje średnią z pierwszej niezerowej głębi na lewo od jego skrajnie
+    lewego piksela i na prawo od skrajnie prawego (analogicznie góra/dół).
+    Skrajne piksele liczone są dla par (etykieta, wiersz) przez
+    `np.minimum.at` / `np.maximum.at`, a najbliższa niezerowa głębia przez
+    `np.searchsorted` na indeksach poprawnych pikseli.
+
+    Args:
+        depth: Obraz głębi (po zamknięciu morfologicznym).
+        labels: Etykiety komponentów z `cv2.connectedComponentsWithStats`.
+        stats: Statystyki komponentów (bounding boxy) z tej samej funkcji.
+        r_wide: Próg proporcji w/h dla propagacji poziomej.
+        r_tall: Próg proporcji w/h dla propagacji pionowej.
+
+    Returns:
+        np.ndarray: Obraz float32 z wartościami uzupełnionymi w pikselach
+            komponentów (0 poza nimi).
+    """
+    painted = np.zeros(depth.shape, dtype=np.float32)
+    if stats.shape[0] <= 1:
+        return painted
+
+    height, width = depth.shape
+    left = stats[1:, cv2.CC_STAT_LEFT]
+    top = stats[1:, cv2.CC_STAT_TOP]
+    box_w = stats[1:, cv2.CC_STAT_WIDTH]
+    box_h = stats[1:, cv2.CC_STAT_HEIGHT]
+    ratio = box_w / box_h
+    horizontal = ratio > r_wide
+    vertical = ~horizontal & (ratio < r_tall)
+
+    # flatnonzero + divmod jest kilkukrotnie szybsze niż np.nonzero dla 2D
+    pixels = np.flatnonzero(labels)
+    ys, xs = np.divmod(pixels, width)
+    component = labels.ravel()[pixels] - 1
+
+    valid = depth != 0
+    if np.issubdtype(depth.dtype, np.floating):
+        valid &= ~np.isnan(depth)
+    depth_flat = depth.ravel()
+
+    def nearest_values(positions, rows, line, flat_valid, step):
+        """Głębia najbliższego poprawnego piksela przed/za pozycją w linii."""
+        if flat_valid.size == 0:
+            return np.zeros(rows.size, dtype=bool), rows
+        if step < 0:
+            index = np.searchsorted(flat_valid, rows * line + positions) - 1
+            found = index >= 0
+            index = np.maximum(index, 0)
+            found &= flat_valid[index] >= rows * line
+        else:
+            index = np.searchsorted(flat_valid, rows * line + positions, "right")
+            found = index < flat_valid.size
+            index = np.minimum(index, flat_valid.size - 1)
+            found &= flat_valid[index] < (rows + 1) * line
+        return found, flat_valid[index]
+
+    def line_fill(along, across, start, extent, line, flat_valid, to_flat):
+        """Średnia z wartości na obu końcach każdej linii każdego komponentu."""
+        offset = np.concatenate(([0], np.cumsum(extent)))
+        key = offset[component] + across - start[component]
+        first = np.full(offset[-1], line, dtype=np.intp)
+        last = np.full(offset[-1], -1, dtype=np.intp)
+        np.minimum.at(first, key, along)
+        np.maximum.at(last, key, along)
+        rows = np.repeat(start - offset[:-1], extent) + np.arange(offset[-1])
+
+        before = np.zeros(offset[-1], dtype=np.float32)
+        after = np.zeros(offset[-1], dtype=np.float32)
+        found, index = nearest_values(first, rows, line, flat_valid, -1)
+        before[found] = depth_flat[to_flat(index[found])]
+        found, index = nearest_values(last, rows, line, flat_valid, 1)
+        after[found] = depth_flat[to_flat(index[found])]
+        return ((before + after) / 2)[key]
+
+    values = np.zeros(ys.size, dtype=np.float32)
+    row_values = col_values = values
+    row_labels = ~vertical[component]
+    col_labels = ~horizontal[component]
+    if row_labels.any():
+        row_values = line_fill(
+            xs, ys, top, box_h, width, np.flatnonzero(valid), lambda i: i
+        )
+    if col_labels.any():
+        # Indeksy w kolejności kolumnowej: x * height + y
+        col_values = line_fill(
+            ys,
+            xs,
+            left,
+            box_w,
+            height,
+            np.flatnonzero(valid.T),
+            lambda i: (i % height) * width + i // height,
+        )
+
+    square = row_labels & col_labels
+    only_rows = row_labels & ~col_labels
+    only_cols = col_labels & ~row_labels
+    values[only_rows] = row_values[only_rows]
+    values[only_cols] = col_values[only_cols]
+    values[square] = (row_values[square] + col_values[square]) / 2
+
+    painted.ravel()[pixels] = values
+    return painted
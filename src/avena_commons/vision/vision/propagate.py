@@ -24,106 +24,89 @@ def propagate(depth, mask, direction):
         >>> filled = propagate(depth, mask, "horizontal")
     """
     # Wczesne sprawdzenie czy są dziury - główna optymalizacja wydajnościowa
-    if not np.any(mask == 255):
+    holes = mask == 255
+    if not np.any(holes):
         return depth.copy()
 
-    def propagate_logic(
-        depth: np.ndarray, mask: np.ndarray, direction: str = "left"
-    ) -> np.ndarray:
-        """Wewnętrzna funkcja propagacji w jednym kierunku z podstawowymi optymalizacjami."""
+    valid = depth != 0
+    if np.issubdtype(depth.dtype, np.floating):
+        valid &= ~np.isnan(depth)
+
+    # Wszystkie kierunki liczone są tylko w pikselach dziur (poza nimi wynik to 0)
+    hole_index = np.flatnonzero(holes)
+    height, width = depth.shape
+    lines_cache = {}
+
+    def hole_lines(axis: int):
+        """Wiersze (axis=1) lub kolumny (axis=0) z dziurami, ułożone jako wiersze."""
+        if axis not in lines_cache:
+            line_of_hole = hole_index // width if axis == 1 else hole_index % width
+            lines = np.flatnonzero(np.any(holes, axis=axis))
+            if axis == 1:
+                line_holes, line_valid = holes[lines], valid[lines]
+                line_depth = depth[lines]
+            else:
+                line_holes, line_valid = holes[:, lines].T, valid[:, lines].T
+                line_depth = depth[:, lines].T
+            lookup = np.zeros(depth.shape[1 - axis], dtype=np.intp)
+            lookup[lines] = np.arange(lines.size)
+            lines_cache[axis] = (
+                line_holes,
+                line_valid,
+                line_depth,
+                lookup[line_of_hole],
+            )
+        return lines_cache[axis]
+
+    def propagate_logic(direction: str = "left") -> np.ndarray:
+        """Wartości propagacji w jednym kierunku dla każdego piksela dziury.
+
+        Skrajna dziura linii i pierwsza poprawna głębia za nią wyznaczane są
+        przez argmax na całych liniach (bez pętli po wierszach i kolumnach).
+        """
         if direction not in {"left", "right", "up", "down"}:
             raise ValueError("direction must be 'left', 'right', 'up', or 'down'")
 
-        h, w = depth.shape
-        painted = np.zeros_like(depth, dtype=np.float32)
-        holes_equal = mask == 255  # pre-compute for speed
-
-        if direction in {"left", "right"}:
-            # Optymalizacja: znajdź rzędy z dziurami raz na początku
-            rows_with_holes = np.any(holes_equal, axis=1)
-            if not np.any(rows_with_holes):
-                return painted  # nie ma dziur w rzędach
-
-            for y in range(h):
-                if not rows_with_holes[y]:
-                    continue  # skip rows without holes
-
-                row = depth[y]
-                if direction == "left":
-                    # first hole from the left → walk left
-                    start_x = np.argmax(holes_equal[y])
-                    search_range = range(start_x - 1, -1, -1)  # ←
-                else:  # "right"
-                    # first hole from the right → walk right
-                    start_x = w - 1 - np.argmax(holes_equal[y][::-1])
-                    search_range = range(start_x + 1, w)  # →
-
-                # find first valid depth along search_range
-                val = next(
-                    (
-                        row[x]
-                        for x in search_range
-                        if (row[x] != 0) and (not np.isnan(row[x]))
-                    ),
-                    np.nan,
-                )
-                if not np.isnan(val):
-                    painted[y, holes_equal[y]] = val
-
-        else:  # "up" or "down"
-            # Optymalizacja: znajdź kolumny z dziurami raz na początku
-            cols_with_holes = np.any(holes_equal, axis=0)
-            if not np.any(cols_with_holes):
-                return painted  # nie ma dziur w kolumnach
-
-            for x in range(w):
-                if not cols_with_holes[x]:
-                    continue  # skip columns without holes
-
-                col_mask = holes_equal[:, x]
-                if not col_mask.any():
-                    continue  # no hole in this column
-
-                col = depth[:, x]
-                if direction == "up":
-                    # first hole from the top → walk up
-                    start_y = np.argmax(col_mask)
-                    search_range = range(start_y - 1, -1, -1)  # ↑
-                else:  # "down"
-                    # first hole from the bottom → walk down
-                    start_y = h - 1 - np.argmax(col_mask[::-1])
-                    search_range = range(start_y + 1, h)  # ↓
-
-                val = next(
-                    (
-                        col[y]
-                        for y in search_range
-                        if (col[y] != 0) and (not np.isnan(col[y]))
-                    ),
-                    np.nan,
-                )
-                if not np.isnan(val):
-                    painted[col_mask, x] = val
-
-        return painted
+        axis = 1 if direction in {"left", "right"} else 0
+        line_holes, line_valid, line_depth, line_of_hole = hole_lines(axis)
+        length = line_holes.shape[1]
+        positions = np.arange(length)
+
+        if direction in {"left", "up"}:
+            # first hole → walk towards the start of the line
+            start = np.argmax(line_holes, axis=1)
+            candidates = line_valid & (positions < start[:, None])
+            source = length - 1 - np.argmax(candidates[:, ::-1], axis=1)
+        else:
+            # last hole → walk towards the end of the line
+            start = length - 1 - np.argmax(line_holes[:, ::-1], axis=1)
+            candidates = line_valid & (positions > start[:, None])
+            source = np.argmax(candidates, axis=1)
+
+        values = line_depth[np.arange(source.size), source].astype(np.float32)
+        values[~candidates.any(axis=1)] = 0
+        return values[line_of_hole]
 
     if direction == "horizontal":
-        left_propagation = propagate_logic(depth, mask, "left")
-        right_propagation = propagate_logic(depth, mask, "right")
-
-        return (left_propagation + right_propagation) / 2
+        left_propagation = propagate_logic("left")
+        right_propagation = propagate_logic("right")
+        values = (left_propagation + right_propagation) / 2
     elif direction == "vertical":
-        top_propagation = propagate_logic(depth, mask, "up")
-        bottom_propagation = propagate_logic(depth, mask, "down")
-        return (top_propagation + bottom_propagation) / 2
+        top_propagation = propagate_logic("up")
+        bottom_propagation = propagate_logic("down")
+        values = (top_propagation + bottom_propagation) / 2
     elif direction == "square":
-        left_propagation = propagate_logic(depth, mask, "left")
-        right_propagation = propagate_logic(depth, mask, "right")
-        top_propagation = propagate_logic(depth, mask, "up")
-        bottom_propagation = propagate_logic(depth, mask, "down")
-        return (
+        left_propagation = propagate_logic("left")
+        right_propagation = propagate_logic("right")
+        top_propagation = propagate_logic("up")
+        bottom_propagation = propagate_logic("down")
+        values = (
             (left_propagation + right_propagation) / 2
             + (top_propagation + bottom_propagation) / 2
         ) / 2
     else:
         raise ValueError("direction must be horizontal / vertical / square")
+
+    painted = np.zeros(depth.shape, dtype=np.float32)
+    painted.ravel()[hole_index] = values
+    return painted
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Camera frame IPC benchmark - shared-memory frame ring vs. pickled frames.
+
+A `VirtualCamera` worker grabs synthetic color + depth frames at `--fps`, the
+main process polls `get_last_frame()` once per frame period and hands the
+frame to `run_postprocess_workers()` with `--configs` detector configurations.
+The detector defined here only touches the frame, so the numbers show the
+cost of moving frames between processes:
+
+- legacy (`frame_ring_slots = 0`): the frame is pickled through the pipe to
+  the main process, back to the worker and once more per detector config,
+- ring: only a `FrameHandle` crosses the pipes, detectors attach by name.
+
+Reports per-frame latency of `get_last_frame` and `run_postprocess_workers`
+and CPU time of the main process and the camera process tree (worker, its
+logger and detector pool) as % of one core.
+
+Usage:
+    python tests/camera_frame_ring_benchmark.py
+    python tests/camera_frame_ring_benchmark.py --width 640 --height 400 --seconds 5
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+import posix_ipc
+import psutil
+
+from avena_commons.camera.driver.virtual import VirtualCamera
+
+
+def box_detector(*, frame, camera_config, config):
+    """Detektor testowy - czyta ramkę i niczego nie wykrywa."""
+    frame["depth"][::64, ::64].mean()
+    frame["color"][::64, ::64].mean()
+    return None, None, None, None, None, {}
+
+
+def tree_cpu(process):
+    """CPU time (user + system) of a process and its live children."""
+    total = 0.0
+    for p in [process, *process.children(recursive=True)]:
+        try:
+            times = p.cpu_times()
+            total += times.user + times.system
+        except psutil.NoSuchProcess:
+            pass
+    return total
+
+
+def run(args, slots):
+    camera = VirtualCamera(core=args.core)
+    worker = psutil.Process(camera._process.pid)
+    ring_name = None
+    try:
+        camera.init({
+            "color": {"width": args.width, "height": args.height, "fps": args.fps},
+            "frame_ring_slots": slots,
+        })
+        camera.set_postprocess_configuration(
+            detector="camera_frame_ring_benchmark.box_detector",
+            configuration={
+                "configuration": {},
+                "postprocessors": {f"config_{i}": {} for i in range(args.configs)},
+            },
+        )
+        camera.start()
+        time.sleep(0.5)
+
+        get_times, post_times = [], []
+        period = 1 / args.fps
+        frames = int(args.seconds * args.fps)
+        cpu_main, cpu_tree = time.process_time(), tree_cpu(worker)
+        wall_start = next_tick = time.perf_counter()
+        for _ in range(frames):
+            start = time.perf_counter()
+            frame = camera.get_last_frame()
+            got = time.perf_counter()
+            if frame is not None:
+                ring_name = ring_name or getattr(frame.get("handle"), "ring_name", None)
+                camera.run_postprocess_workers(frame)
+                post_times.append(time.perf_counter() - got)
+            get_times.append(got - start)
+
+            next_tick += period
+            time.sleep(max(0.0, next_tick - time.perf_counter()))
+        wall = time.perf_counter() - wall_start
+        cpu_main = time.process_time() - cpu_main
+        cpu_tree = tree_cpu(worker) - cpu_tree
+        camera.stop()
+    finally:
+        # Worker nie ma komendy zakończenia - kończymy całe drzewo procesów
+        for p in [*worker.children(recursive=True), worker]:
+            try:
+                p.kill()
+            except psutil.NoSuchProcess:
+                pass
+        camera._process.join(timeout=5)
+        if ring_name:
+            try:
+                posix_ipc.unlink_shared_memory(ring_name)
+            except posix_ipc.ExistentialError:
+                pass
+
+    return {
+        "get_ms": statistics.median(get_times) * 1e3,
+        "post_ms": statistics.median(post_times) * 1e3 if post_times else 0.0,
+        "main_cpu": 100 * cpu_main / wall,
+        "tree_cpu": 100 * cpu_tree / wall,
+        "frames": len(post_times),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=800)
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--configs", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--slots", type=int, default=4)
+    parser.add_argument("--core", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)  # Worker kamery tworzy katalog temp/ na logi
+        results = {
+            "legacy": run(args, slots=0),
+            f"ring ({args.slots} slots)": run(args, slots=args.slots),
+        }
+
+    print(
+        f"{args.width}x{args.height} color + depth @ {args.fps} fps, "
+        f"{args.configs} detector configs, {args.seconds:g} s"
+    )
+    print(
+        f"{'mode':<16} {'frames':>7} {'get ms':>8} {'post ms':>8} "
+        f"{'main CPU%':>10} {'camera CPU%':>12}"
+    )
+    for mode, r in results.items():
+        print(
+            f"{mode:<16} {r['frames']:>7} {r['get_ms']:>8.2f} {r['post_ms']:>8.2f} "
+            f"{r['main_cpu']:>10.1f} {r['tree_cpu']:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
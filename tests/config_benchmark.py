@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Config read benchmark - ConfigParser.get + conversion vs compiled snapshot.
+
+Runs a 1 kHz ControlLoop that reads a set of controller parameters every tick,
+first with per-call ConfigParser.get and float/int parsing (previous
+ControllerConfig.get), then with attribute lookups on the compiled snapshot.
+Reports mean cost of one read and busy time per tick.
+
+Usage:
+    python tests/config_benchmark.py
+    python tests/config_benchmark.py --duration 5 --reads 50
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from avena_commons.config import ControllerConfig
+from avena_commons.util.control_loop import ControlLoop
+
+KEYS = [f"PARAM_{i}" for i in range(20)]
+
+
+def legacy_get(config, key):
+    element = config.config.get("CONTROLLER", key)
+    try:
+        return float(element)
+    except ValueError:
+        pass
+    try:
+        return int(element)
+    except ValueError:
+        pass
+    return element
+
+
+def run_loop(read_tick, duration: float):
+    loop = ControlLoop(
+        name="config_bench",
+        period=1 / 1000,
+        warning_printer=False,
+        auto_synchronizer=False,
+    )
+    busy_ns = 0
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end:
+        loop.loop_begin()
+        start = time.perf_counter_ns()
+        read_tick()
+        busy_ns += time.perf_counter_ns() - start
+        loop.loop_end()
+    return busy_ns / loop.loop_counter, loop.loop_counter
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--duration", type=float, default=2.0)
+    parser.add_argument("--reads", type=int, default=20, help="reads per tick")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "controller.conf")
+        with open(path, "w") as file:
+            file.write("[CONTROLLER]\n")
+            for i, key in enumerate(KEYS):
+                file.write(f"{key} = {i * 0.5}\n")
+        config = ControllerConfig(path)
+        keys = [KEYS[i % len(KEYS)] for i in range(args.reads)]
+        attributes = [key.lower() for key in keys]
+
+        def legacy_tick():
+            for key in keys:
+                legacy_get(config, key)
+
+        def get_tick():
+            for key in keys:
+                config.get(key)
+
+        def snapshot_tick():
+            snapshot = config.snapshot
+            for name in attributes:
+                getattr(snapshot, name)
+
+        def snapshot_reload_tick():
+            config.reload_if_changed()
+            snapshot_tick()
+
+        for name, tick in [
+            ("ConfigParser.get + parse", legacy_tick),
+            ("ControllerConfig.get", get_tick),
+            ("snapshot attributes", snapshot_tick),
+            ("snapshot + reload check", snapshot_reload_tick),
+        ]:
+            per_tick_ns, ticks = run_loop(tick, args.duration)
+            print(
+                f"{name:>26}: {per_tick_ns / 1000:8.2f} us/tick, "
+                f"{per_tick_ns / args.reads:8.1f} ns/read ({ticks} ticks @ 1 kHz)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+DatabaseComponent benchmark - queries per tick for database conditions.
+
+Every tick `--conditions` database lookups (`check_table_value`) are spread over
+`--tables` tables, as if that many DatabaseConditions were evaluated in one
+orchestrator tick. Variants:
+- sequential: lookups awaited one after another (one query each),
+- concurrent: lookups gathered with `batch_lookups=False` (pool parallelism),
+- batched: lookups gathered with `batch_lookups=True` (one query per table).
+Reports database queries per tick and wall time per tick.
+
+Needs a PostgreSQL server: connection parameters come from the DB_HOST,
+DB_PORT, DB_NAME, DB_USER and DB_PASSWORD environment variables. The benchmark
+creates and drops its own tables (`bench_lookup_<n>`).
+
+Usage:
+    DB_HOST=127.0.0.1 DB_PORT=5432 DB_NAME=test DB_USER=test DB_PASSWORD=test \\
+        python tests/database_component_benchmark.py --conditions 40 --tables 4
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+from avena_commons.orchestrator.components.database_component import (
+    DatabaseComponent,
+)
+
+
+def component_config(batch_lookups):
+    config = {
+        param: os.environ[param]
+        for param in ("DB_HOST", "DB_PORT", "DB_NAME", "DB_USER", "DB_PASSWORD")
+    }
+    config.update({"APS_ID": "1", "APS_NAME": "bench", "batch_lookups": batch_lookups})
+    return config
+
+
+async def create_tables(db, tables, rows):
+    for table in tables:
+        await db._pool.execute(
+            f"DROP TABLE IF EXISTS {table};"
+            f"CREATE TABLE {table} (id int PRIMARY KEY, status text);"
+            f"INSERT INTO {table} SELECT i, 'status_' || (i % 7) "
+            f"FROM generate_series(1, {rows}) i"
+        )
+
+
+async def run_variant(label, lookups, ticks):
+    db = DatabaseComponent(label, component_config(label == "batched"))
+    assert await db.initialize() and await db.connect(), "database not reachable"
+    try:
+        # Rozgrzewka - PREPARE i cache typów kolumn
+        await asyncio.gather(*[db.check_table_value(*lookup) for lookup in lookups])
+        queries_before = db.query_count
+        start = time.perf_counter()
+        for _ in range(ticks):
+            if label == "sequential":
+                for lookup in lookups:
+                    await db.check_table_value(*lookup)
+            else:
+                await asyncio.gather(*[
+                    db.check_table_value(*lookup) for lookup in lookups
+                ])
+        elapsed = time.perf_counter() - start
+        return (db.query_count - queries_before) / ticks, elapsed / ticks
+    finally:
+        await db.disconnect()
+
+
+async def main_async(args):
+    tables = [f"bench_lookup_{i}" for i in range(args.tables)]
+    lookups = [
+        (tables[i % args.tables], "status", {"id": 1 + (i * 37) % args.rows})
+        for i in range(args.conditions)
+    ]
+
+    setup = DatabaseComponent("setup", component_config(False))
+    assert await setup.initialize() and await setup.connect(), "database not reachable"
+    await create_tables(setup, tables, args.rows)
+
+    results = {}
+    try:
+        for label in ("sequential", "concurrent", "batched"):
+            results[label] = await run_variant(label, lookups, args.ticks)
+    finally:
+        for table in tables:
+            await setup._pool.execute(f"DROP TABLE IF EXISTS {table}")
+        await setup.disconnect()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--conditions", type=int, default=40)
+    parser.add_argument("--tables", type=int, default=4)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--ticks", type=int, default=200)
+    args = parser.parse_args()
+
+    results = asyncio.run(main_async(args))
+
+    print(
+        f"{args.conditions} lookups per tick over {args.tables} tables, "
+        f"{args.ticks} ticks"
+    )
+    print(f"{'variant':<12} {'queries/tick':>13} {'ms/tick':>10}")
+    for label, (queries, seconds) in results.items():
+        print(f"{label:<12} {queries:>13.1f} {seconds * 1e3:>10.3f}")
+    sequential, batched = results["sequential"], results["batched"]
+    print(
+        f"queries: {sequential[0] / batched[0]:.1f}x fewer, "
+        f"tick time: {sequential[1] / batched[1]:.1f}x faster"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Database condition cache benchmark - queries per second with and without cache_ttl.
+
+`--scenarios` DatabaseConditions watch `--rows` distinct rows (several scenarios
+per row) and are evaluated every orchestrator tick (100 Hz) in virtual time.
+The database is simulated: rows change at random (`--change-rate` changes per
+row per second) and every query is counted. Compares `cache_ttl=0` (one query
+per evaluation, as before the cache) with the given `--ttl` values and reports
+database queries per second, cache hit ratio and observed staleness - the age
+of the oldest row change not yet visible to a condition, sampled at every
+evaluation (bounded by cache_ttl).
+
+Usage:
+    python tests/database_condition_cache_benchmark.py
+    python tests/database_condition_cache_benchmark.py --scenarios 200 --rows 20 --ttl 0.1 0.5
+"""
+
+import argparse
+import asyncio
+import random
+
+from avena_commons.orchestrator.components import database_result_cache
+from avena_commons.orchestrator.components.database_result_cache import (
+    DatabaseResultCache,
+)
+from avena_commons.orchestrator.conditions.database_condition_base import (
+    DatabaseCondition,
+)
+from avena_commons.orchestrator.models.scenario_models import ScenarioContext
+
+TICK = 0.01
+
+
+class NullLogger:
+    def _noop(self, *args, **kwargs):
+        pass
+
+    debug = info = warning = error = _noop
+
+
+class VirtualClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class SimulatedDatabase:
+    is_connected = True
+
+    def __init__(self, clock, rows):
+        self.clock = clock
+        self.values = {row: 0 for row in range(rows)}
+        self.changed_at = {row: {0: 0.0} for row in range(rows)}
+        self.queries = 0
+        self.last_read = {}  # wiersz -> wartość zwrócona przez ostatnie zapytanie
+
+    def change(self, row):
+        value = self.values[row] + 1
+        self.values[row] = value
+        self.changed_at[row][value] = self.clock.now
+
+    async def check_table_value(self, table, column, where_conditions):
+        self.queries += 1
+        row = where_conditions["id"]
+        self.last_read[row] = self.values[row]
+        return self.values[row]
+
+
+async def run(n_scenarios, n_rows, change_rate, seconds, ttl, seed):
+    clock = VirtualClock()
+    rng = random.Random(seed)
+    db = SimulatedDatabase(clock, n_rows)
+    cache = DatabaseResultCache(clock=clock)
+    database_result_cache._caches[db] = cache
+    context = ScenarioContext(
+        scenario_name="bench",
+        orchestrator=None,
+        action_executor=None,
+        message_logger=None,
+        components={"main_database": db},
+    )
+    conditions = [
+        DatabaseCondition(
+            {
+                "type": "database",
+                "component": "main_database",
+                "table": "orders",
+                "column": "version",
+                "where": {"id": i % n_rows},
+                "operator": "is_not_null",
+                "cache_ttl": ttl,
+            },
+            message_logger=NullLogger(),
+        )
+        for i in range(n_scenarios)
+    ]
+
+    staleness = []
+    change_probability = change_rate * TICK
+    for tick in range(int(seconds / TICK)):
+        clock.now = tick * TICK
+        for row in range(n_rows):
+            if rng.random() < change_probability:
+                db.change(row)
+        for condition in conditions:
+            await condition.evaluate(context)
+            # Warunki jednego wiersza współdzielą zapytanie - widzą ostatni odczyt
+            row = condition.where_conditions["id"]
+            seen = db.last_read[row]
+            if seen < db.values[row]:
+                staleness.append(clock.now - db.changed_at[row][seen + 1])
+            else:
+                staleness.append(0.0)
+
+    staleness.sort()
+    lookups = cache.hits + cache.misses + cache.coalesced
+    return {
+        "queries/s": db.queries / seconds,
+        "hit %": cache.hits / lookups * 100,
+        "stale p99 ms": staleness[int(len(staleness) * 0.99)] * 1e3,
+        "stale max ms": staleness[-1] * 1e3,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scenarios", type=int, default=200)
+    parser.add_argument("--rows", type=int, default=20)
+    parser.add_argument("--seconds", type=float, default=10.0, help="virtual time")
+    parser.add_argument(
+        "--change-rate", type=float, default=0.5, help="changes per row per second"
+    )
+    parser.add_argument("--ttl", type=float, nargs="+", default=[0.1, 0.5, 1.0])
+    args = parser.parse_args()
+
+    results = {}
+    for ttl in [0.0] + args.ttl:
+        results[f"ttl={ttl:g}"] = asyncio.run(
+            run(args.scenarios, args.rows, args.change_rate, args.seconds, ttl, seed=0)
+        )
+
+    print(
+        f"{args.scenarios} database conditions over {args.rows} rows, "
+        f"{args.change_rate} changes/row/s, {args.seconds:.0f} s at 100 Hz"
+    )
+    columns = list(results["ttl=0"])
+    print(f"{'variant':<10}" + "".join(f"{c:>14}" for c in columns))
+    for label, row in results.items():
+        print(f"{label:<10}" + "".join(f"{row[c]:>14.1f}" for c in columns))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Debug artifact benchmark - synchronous per-frame writes vs. the sampled sink.
+
+Runs `qr_detector` on synthetic color + depth frames (`--size`, AprilTags
+pasted from the package data, noise so that JPEG encoding is not trivial)
+and reports per-frame detector latency (median / p95) for:
+
+- sync: the legacy behaviour - `cv2.imwrite` of the color frame and `np.save`
+  of the depth frame on the detection path for every frame,
+- disabled: `debug_artifacts.enabled = false`,
+- sampled: the default policies (every 30th frame, failures, anomalies),
+- always: every frame goes to the sink (worst case for the background thread;
+  frames are dropped when the queue is full instead of stalling detection).
+
+Usage:
+    python tests/debug_sink_benchmark.py
+    python tests/debug_sink_benchmark.py --size 640x400 --frames 300
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+import cv2
+import numpy as np
+import pkg_resources
+
+from avena_commons.vision.detector import qr_detector
+from avena_commons.vision.detector.debug_sink import get_debug_sink
+
+CONFIG = {"mode": "gray", "qr_size": 0.1, "clahe": {"clip_limit": 2.0, "grid_size": 8}}
+DISTORTION = [0.082, -0.213, 0.0011, -0.0017, 0.104]
+
+
+def make_frame(width, height, seed):
+    rng = np.random.default_rng(seed)
+    color = rng.integers(90, 140, (height, width, 3), dtype=np.uint8)
+    tag = cv2.imread(
+        pkg_resources.resource_filename("avena_commons.vision.data", "tag36h11-0.png")
+    )
+    side = height // 6
+    border = side // 8
+    tag = cv2.resize(tag, (side - 2 * border,) * 2, interpolation=cv2.INTER_NEAREST)
+    tag = cv2.copyMakeBorder(tag, *(border,) * 4, cv2.BORDER_CONSTANT, value=(255,) * 3)
+    for i in range(4):
+        x = width // 2 - side - side // 4 + (i % 2) * (side + side // 2)
+        y = height // 2 - side - side // 4 + (i // 2) * (side + side // 2)
+        color[y : y + side, x : x + side] = tag
+    depth = rng.integers(400, 600, (height, width), dtype=np.uint16)
+    return {"color": color, "depth": depth}
+
+
+def run(frames, camera_config, legacy_writes, directory):
+    samples = []
+    for i, frame in enumerate(frames):
+        start = time.perf_counter()
+        if legacy_writes:
+            cv2.imwrite(f"{directory}/{i:05d}_qr_color_frame.jpg", frame["color"])
+            np.save(f"{directory}/{i:05d}_qr_depth_frame_.npy", frame["depth"])
+        qr_detector(frame=frame, camera_config=camera_config, config=CONFIG)
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", default="1280x800", help="camera resolution WxH")
+    parser.add_argument("--frames", type=int, default=200)
+    args = parser.parse_args()
+    width, height = (int(v) for v in args.size.split("x"))
+    camera_config = {
+        "camera_params": [width * 0.7, width * 0.7, width / 2, height / 2],
+        "distortion_coefficients": DISTORTION,
+    }
+    frames = [make_frame(width, height, seed) for seed in range(8)]
+    frames = [frames[i % len(frames)] for i in range(args.frames)]
+
+    # Rozgrzewka: detektor AprilTag i mapy undistort
+    detections, _ = qr_detector(
+        frame=frames[0],
+        camera_config={**camera_config, "debug_artifacts": {"enabled": False}},
+        config=CONFIG,
+    )
+
+    variants = {
+        "sync": ({"enabled": False}, True),
+        "disabled": ({"enabled": False}, False),
+        "sampled": ({}, False),
+        "always": ({"sampling": ["always"]}, False),
+    }
+    print(f"{width}x{height}, {args.frames} frames, {len(detections or [])} tags/frame")
+    print(
+        f"{'variant':<10} {'median ms':>10} {'p95 ms':>8} {'written':>8} {'dropped':>8}"
+    )
+    for name, (settings, legacy_writes) in variants.items():
+        with tempfile.TemporaryDirectory() as directory:
+            settings = {**settings, "directory": directory}
+            config = {**camera_config, "debug_artifacts": settings}
+            samples = run(frames, config, legacy_writes, directory)
+            sink = get_debug_sink(settings)
+            sink.flush()
+            written = len(os.listdir(directory))
+            sink.close()
+        print(
+            f"{name:<10} {statistics.median(samples) * 1e3:>10.2f} "
+            f"{samples[int(len(samples) * 0.95)] * 1e3:>8.2f} "
+            f"{written:>8} {sink.dropped:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
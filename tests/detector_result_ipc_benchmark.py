@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Detector result IPC benchmark - full results with debug_data vs. DetectorResult.
+
+Runs `qr_detector` and `box_detector` on synthetic frames (`--size`; QR frames
+from debug_sink_benchmark, box frames from the vision_benchmark recording)
+and reports per frame:
+
+- bytes: pickled size of the result a pool task sends back to the camera
+  worker - the full tuple (detections plus debug_data with full-resolution
+  intermediate images) vs. the compact `DetectorResult`,
+- latency: submit-to-result wall time through a `ProcessPoolExecutor`, the
+  frame passed as a `FrameHandle` of a `FrameRing` like in the camera worker
+  (median / p95), next to the in-process detector time.
+
+Usage:
+    python tests/detector_result_ipc_benchmark.py
+    python tests/detector_result_ipc_benchmark.py --size 640x400 --frames 100
+"""
+
+import argparse
+import functools
+import os
+import pickle
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "vision_benchmark"))
+
+from avena_commons.camera.driver.frame_ring import FrameRing, run_detector_on_frame
+from avena_commons.vision.detector import box_detector, qr_detector
+from avena_commons.vision.detector.compact_result import run_compact_detector
+from debug_sink_benchmark import CONFIG, DISTORTION, make_frame
+from recording import synthetic_recording
+from stages import box_config
+
+
+def percentile(samples, share):
+    samples = sorted(samples)
+    return samples[max(0, int(len(samples) * share) - 1)]
+
+
+def run(executor, ring, detector, frames, camera_config, config):
+    samples = []
+    for frame in frames:
+        handle = ring.write(frame)
+        start = time.perf_counter()
+        executor.submit(
+            run_detector_on_frame,
+            detector,
+            frame_handle=handle,
+            camera_config=camera_config,
+            config=config,
+        ).result()
+        samples.append((time.perf_counter() - start) * 1e3)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", default="1280x800", help="camera resolution WxH")
+    parser.add_argument("--frames", type=int, default=50)
+    args = parser.parse_args()
+    width, height = (int(v) for v in args.size.split("x"))
+
+    qr_frames = [make_frame(width, height, seed) for seed in range(8)]
+    box_frames = [s.frame for s in synthetic_recording(width, height, 8).samples]
+    cases = {
+        "qr_detector": (
+            qr_detector,
+            [qr_frames[i % 8] for i in range(args.frames)],
+            {
+                "camera_params": [width * 0.7, width * 0.7, width / 2, height / 2],
+                "distortion_coefficients": DISTORTION,
+                "debug_artifacts": {"enabled": False},
+            },
+            CONFIG,
+        ),
+        "box_detector": (
+            box_detector,
+            [box_frames[i % 8] for i in range(args.frames)],
+            {
+                "camera_params": [width * 0.7, width * 0.7, width / 2, height / 2],
+                "distortion_coefficients": [0.0] * 5,
+                "debug_artifacts": {"enabled": False},
+            },
+            box_config(width, height),
+        ),
+    }
+
+    print(
+        f"{'detector':<13} {'result':<8} {'bytes/frame':>12} {'median ms':>10} "
+        f"{'p95 ms':>8} {'local ms':>9}"
+    )
+    devnull = open(os.devnull, "w")
+    for name, (detector, frames, camera_config, config) in cases.items():
+        stdout, sys.stdout = sys.stdout, devnull  # box_detector drukuje czasy
+        try:
+            full = detector(frame=frames[0], camera_config=camera_config, config=config)
+            compact = run_compact_detector(
+                detector, frame=frames[0], camera_config=camera_config, config=config
+            )
+            local = []
+            for frame in frames:
+                start = time.perf_counter()
+                detector(frame=frame, camera_config=camera_config, config=config)
+                local.append((time.perf_counter() - start) * 1e3)
+            ring = FrameRing.create(frames[0], slots=2)
+            results = {}
+            with ProcessPoolExecutor(max_workers=1) as executor:
+                for variant, task in (
+                    ("full", detector),
+                    ("compact", functools.partial(run_compact_detector, detector)),
+                ):
+                    # Rozgrzewka procesu puli: detektor, mapy undistort, pierścień
+                    run(executor, ring, task, frames[:2], camera_config, config)
+                    results[variant] = run(
+                        executor, ring, task, frames, camera_config, config
+                    )
+            ring.close()
+        finally:
+            sys.stdout = stdout
+        sizes = {"full": len(pickle.dumps(full)), "compact": len(pickle.dumps(compact))}
+        for variant, samples in results.items():
+            print(
+                f"{name:<13} {variant:<8} {sizes[variant]:>12} "
+                f"{statistics.median(samples):>10.2f} {percentile(samples, 0.95):>8.2f} "
+                f"{statistics.median(local):>9.2f}"
+            )
+        print(f"{'':<13} bytes saved {1 - sizes['compact'] / sizes['full']:.2%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+EmailComponent benchmark - orchestrator tick jitter while sending emails.
+
+A 100 Hz ticker stands in for the orchestrator loop while `--emails` alerts are
+sent to a local stub SMTP server (own thread and event loop) that answers
+every command after `--latency` ms. Variants:
+- blocking: the previous behaviour - smtplib called directly in the event loop,
+  one SMTP connection per email,
+- worker: `EmailComponent.send_email` (bounded queue, delivery worker with a
+  persistent session running smtplib in a thread).
+Reports tick lateness (p50 / p99 / max), time until all emails are delivered
+and the number of SMTP connections.
+
+Usage:
+    python tests/email_component_benchmark.py
+    python tests/email_component_benchmark.py --emails 1000 --latency 1
+"""
+
+import argparse
+import asyncio
+import smtplib
+import threading
+import time
+from email.message import EmailMessage
+
+from avena_commons.orchestrator.components.email_component import EmailComponent
+
+TICK = 0.01
+
+
+class StubSmtpServer:
+    """SMTP server answering every command after a fixed delay (own thread)."""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.messages = 0
+        self.connections = 0
+        self.loop = asyncio.new_event_loop()
+        ready = threading.Event()
+        threading.Thread(target=self._run, args=(ready,), daemon=True).start()
+        ready.wait()
+
+    def _run(self, ready):
+        asyncio.set_event_loop(self.loop)
+        server = self.loop.run_until_complete(
+            asyncio.start_server(self._handle, "127.0.0.1", 0)
+        )
+        self.port = server.sockets[0].getsockname()[1]
+        ready.set()
+        self.loop.run_forever()
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        writer.write(b"220 stub ESMTP\r\n")
+        while line := await reader.readline():
+            command = line.decode().strip().upper()
+            await asyncio.sleep(self.latency)
+            if command.startswith(("EHLO", "HELO")):
+                writer.write(b"250-stub\r\n250 8BITMIME\r\n")
+            elif command.startswith("DATA"):
+                writer.write(b"354 End data\r\n")
+                while await reader.readline() != b".\r\n":
+                    pass
+                self.messages += 1
+                writer.write(b"250 OK\r\n")
+            elif command.startswith("QUIT"):
+                writer.write(b"221 Bye\r\n")
+                await writer.drain()
+                writer.close()
+                return
+            else:
+                writer.write(b"250 OK\r\n")
+            await writer.drain()
+
+
+async def measure_ticks(stop, lateness):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lateness.append(time.perf_counter() - start - TICK)
+
+
+def send_blocking(port, subject):
+    """Previous EmailComponent.send_email body: new connection per email."""
+    message = EmailMessage()
+    message["From"] = "orchestrator@example.com"
+    message["To"] = "ops@example.com"
+    message["Subject"] = subject
+    message.set_content("body")
+    with smtplib.SMTP(host="127.0.0.1", port=port) as smtp:
+        smtp.ehlo()
+        smtp.send_message(message)
+
+
+async def run(variant, n_emails, server):
+    lateness = []
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(measure_ticks(stop, lateness))
+    await asyncio.sleep(TICK * 5)
+    delivered_before = server.messages
+    connections_before = server.connections
+    start = time.perf_counter()
+
+    if variant == "blocking":
+        for i in range(n_emails):
+            send_blocking(server.port, f"alert {i}")
+            await asyncio.sleep(0)  # scenariusz oddaje sterowanie między akcjami
+    else:
+        email = EmailComponent(
+            "email",
+            {
+                "host": "127.0.0.1",
+                "port": server.port,
+                "username": "orchestrator@example.com",
+                "password": "secret",
+                "starttls": False,
+                "enabled": True,
+                "rate_limit_count": 0,
+                "queue_size": n_emails,
+            },
+            message_logger=NullLogger(),
+        )
+        await email.initialize()
+        for i in range(n_emails):
+            await email.send_email(["ops@example.com"], f"alert {i}", "body")
+            await asyncio.sleep(0)
+        await email.disconnect(drain_timeout=600)
+
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await ticker
+    lateness.sort()
+    return {
+        "tick p50 ms": lateness[len(lateness) // 2] * 1e3,
+        "tick p99 ms": lateness[int(len(lateness) * 0.99)] * 1e3,
+        "tick max ms": lateness[-1] * 1e3,
+        "total s": elapsed,
+        "delivered": server.messages - delivered_before,
+        "connections": server.connections - connections_before,
+    }
+
+
+class NullLogger:
+    def _noop(self, *args, **kwargs):
+        pass
+
+    debug = info = warning = error = _noop
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--emails", type=int, default=1000)
+    parser.add_argument(
+        "--latency", type=float, default=1.0, help="SMTP reply delay in ms"
+    )
+    args = parser.parse_args()
+
+    server = StubSmtpServer(args.latency / 1e3)
+    results = {
+        variant: asyncio.run(run(variant, args.emails, server))
+        for variant in ("blocking", "worker")
+    }
+
+    print(f"{args.emails} emails, SMTP reply latency {args.latency} ms, 100 Hz ticker")
+    columns = list(results["blocking"])
+    print(f"{'variant':<10}" + "".join(f"{c:>14}" for c in columns))
+    for label, row in results.items():
+        print(f"{label:<10}" + "".join(f"{row[c]:>14.1f}" for c in columns))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+ErrorManager idle CPU benchmark - polling publish vs change-driven publish.
+
+Runs an idle manager (no errors set) for the given time and reports CPU usage
+of the process. The "polling" variant reproduces the previous behaviour:
+1 kHz ControlLoop that every 10th tick locks the semaphore, unpickles the
+ErrorInterface, pickles it back and deep-copies it. The "versioned" variant is
+the current ErrorManager that wakes on change or at the publish deadline and
+only checks the shared version counter.
+
+Usage:
+    python tests/error_manager_cpu_benchmark.py
+    python tests/error_manager_cpu_benchmark.py --duration 10
+"""
+
+import argparse
+import copy
+import os
+import threading
+import time
+
+import posix_ipc
+import psutil
+
+from avena_commons.connection import AvenaComm
+from avena_commons.util.control_loop import ControlLoop
+from avena_commons.util.error_level import ErrorInterface, ErrorManager
+
+
+class PollingErrorPublisher:
+    """Previous ErrorManager publish loop kept for comparison."""
+
+    def __init__(self, suffix):
+        self.interface = ErrorInterface(log=False)
+        self.comm = AvenaComm(
+            comm_name=f"error_manager_{suffix}",
+            shm_size=100_000,
+            semaphore_timeout=0.01,
+            data=self.interface,
+        )
+        self.cl = ControlLoop(
+            name="manager_loop",
+            warning_printer=False,
+            period=1 / 1000,
+            auto_synchronizer=False,
+        )
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.run)
+        self.thread.start()
+
+    def run(self):
+        while not self.stop_event.is_set():
+            self.cl.loop_begin()
+            if self.cl.loop_counter % 10 == 0:
+                check, interface = self.comm.lock_and_read()
+                if check:
+                    self.comm.save_and_unlock(interface)
+                    self.interface = copy.deepcopy(interface)
+            self.cl.loop_end()
+
+    def stop(self):
+        self.stop_event.set()
+        self.thread.join()
+
+
+def _cleanup(suffix):
+    for name in (
+        f"/error_manager_{suffix}_shm",
+        f"/error_manager_{suffix}_version_shm",
+    ):
+        try:
+            posix_ipc.unlink_shared_memory(name)
+        except posix_ipc.ExistentialError:
+            pass
+    try:
+        posix_ipc.unlink_semaphore(f"/error_manager_{suffix}_semaphore")
+    except posix_ipc.ExistentialError:
+        pass
+
+
+def measure(factory, duration: float) -> float:
+    suffix = f"bench_{os.getpid()}_{factory.__name__}"
+    process = psutil.Process()
+    manager = factory(suffix)
+    try:
+        time.sleep(0.2)  # warm-up
+        cpu_before = process.cpu_times()
+        wall_before = time.perf_counter()
+        time.sleep(duration)
+        cpu_after = process.cpu_times()
+        wall = time.perf_counter() - wall_before
+    finally:
+        manager.stop()
+        _cleanup(suffix)
+    cpu = (cpu_after.user - cpu_before.user) + (cpu_after.system - cpu_before.system)
+    return 100.0 * cpu / wall
+
+
+def polling(suffix):
+    return PollingErrorPublisher(suffix)
+
+
+def versioned(suffix):
+    return ErrorManager(suffix)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--duration", type=float, default=5.0)
+    args = parser.parse_args()
+
+    before = measure(polling, args.duration)
+    after = measure(versioned, args.duration)
+    print(f"idle ErrorManager CPU - polling (before): {before:6.2f}%")
+    print(f"idle ErrorManager CPU - versioned (after): {after:6.2f}%")
+
+
+if __name__ == "__main__":
+    main()
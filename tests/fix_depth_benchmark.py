@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+fix_depth benchmark - per-component masks vs. label-indexed propagation.
+
+Generates depth frames like the box camera sees them (floor plane, box,
+dropout noise, edge shadow and `--holes` stripes / blobs without depth) and
+times `fix_depth` with the box detector configuration against the previous
+implementation, which built one full-size mask per connected component and
+called `propagate_by_shape` on each of them.
+
+Reports ms per frame (median) for both, the number of hole components and
+checks that the outputs are identical.
+
+Usage:
+    python tests/fix_depth_benchmark.py
+    python tests/fix_depth_benchmark.py --holes 200 --repeat 5
+"""
+
+import argparse
+import statistics
+import time
+
+import cv2
+import numpy as np
+
+from avena_commons.vision.vision import (
+    fix_depth,
+    merge_depth_lists,
+    propagate_by_shape,
+)
+
+CONFIG = {
+    "closing_mask": {"kernel_size": 10, "iterations": 2},
+    "zero_mask": {"kernel_size": 10, "iterations": 2},
+    "r_wide": 2.0,
+    "r_tall": 0.5,
+    "final_closing_mask": {"kernel_size": 10, "iterations": 2},
+}
+
+
+def legacy_fix_depth(depth_image, config):
+    kernel = np.ones((config["closing_mask"]["kernel_size"],) * 2, np.uint8)
+    closed = cv2.morphologyEx(
+        depth_image,
+        cv2.MORPH_CLOSE,
+        kernel,
+        iterations=config["closing_mask"]["iterations"],
+    )
+    zero_mask = (closed == 0).astype(np.uint8) * 255
+    kernel = np.ones((config["zero_mask"]["kernel_size"],) * 2, np.uint8)
+    closed_zero_mask = cv2.morphologyEx(
+        zero_mask, cv2.MORPH_CLOSE, kernel, iterations=config["zero_mask"]["iterations"]
+    )
+    masks = []
+    n, labels = cv2.connectedComponents(closed_zero_mask, connectivity=8)
+    for i in range(1, n):
+        mask = np.zeros_like(closed_zero_mask)
+        mask[labels == i] = 255
+        masks.append(mask)
+    layers = [
+        propagate_by_shape(closed, mask, config["r_wide"], config["r_tall"])
+        for mask in masks
+    ]
+    merged = merge_depth_lists(closed, layers, masks)
+    kernel = np.ones((config["final_closing_mask"]["kernel_size"],) * 2, np.uint8)
+    return cv2.morphologyEx(
+        merged,
+        cv2.MORPH_CLOSE,
+        kernel,
+        iterations=config["final_closing_mask"]["iterations"],
+    )
+
+
+def depth_frame(width, height, seed, holes):
+    rng = np.random.default_rng(seed)
+    yy, xx = np.mgrid[0:height, 0:width]
+    depth = (900 + 0.05 * xx + 0.08 * yy).astype(np.uint16)
+    x0, y0 = width // 4, height // 4
+    depth[y0 : 3 * y0, x0 : 3 * x0] -= 180
+    depth += rng.integers(0, 6, depth.shape, dtype=np.uint16)
+    depth[rng.random(depth.shape) < 0.02] = 0
+    depth[y0 : 3 * y0, 3 * x0 : 3 * x0 + width // 40] = 0
+    for _ in range(holes):
+        cx, cy = int(rng.integers(0, width)), int(rng.integers(0, height))
+        kind = rng.integers(0, 3)
+        if kind == 0:
+            size = (int(rng.integers(20, width // 4)), int(rng.integers(2, 8)))
+        elif kind == 1:
+            size = (int(rng.integers(2, 8)), int(rng.integers(20, height // 3)))
+        else:
+            size = (int(rng.integers(3, 25)),) * 2
+        cv2.ellipse(depth, (cx, cy), size, 0, 0, 360, 0, -1)
+    return depth
+
+
+def time_per_frame(func, frames, repeat):
+    samples = []
+    for _ in range(repeat):
+        for frame in frames:
+            start = time.perf_counter()
+            func(frame, CONFIG)
+            samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1e3
+
+
+def count_components(depth):
+    closed = cv2.morphologyEx(
+        depth, cv2.MORPH_CLOSE, np.ones((10, 10), np.uint8), iterations=2
+    )
+    mask = cv2.morphologyEx(
+        (closed == 0).astype(np.uint8) * 255,
+        cv2.MORPH_CLOSE,
+        np.ones((10, 10), np.uint8),
+        iterations=2,
+    )
+    return cv2.connectedComponents(mask, connectivity=8)[0] - 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--holes", type=int, default=120)
+    parser.add_argument("--frames", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(
+        f"{'size':<10} {'components':>10} {'legacy ms':>10} {'labels ms':>10} "
+        f"{'speedup':>8}"
+    )
+    for width, height in ((640, 400), (1280, 800)):
+        frames = [
+            depth_frame(width, height, seed, args.holes) for seed in range(args.frames)
+        ]
+        for frame in frames:
+            assert np.array_equal(
+                fix_depth(frame, CONFIG), legacy_fix_depth(frame, CONFIG)
+            )
+        components = statistics.mean(count_components(f) for f in frames)
+        old = time_per_frame(legacy_fix_depth, frames, args.repeat)
+        new = time_per_frame(fix_depth, frames, args.repeat)
+        print(
+            f"{f'{width}x{height}':<10} {components:>10.0f} {old:>10.2f} "
+            f"{new:>10.2f} {old / new:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
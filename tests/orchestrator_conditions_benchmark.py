@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Orchestrator condition benchmark - per-tick ConditionFactory vs compiled trees.
+
+Builds an Orchestrator with N scenarios whose triggers are nested logic_*
+conditions over client_state leaves (all evaluating to False, so every node is
+visited and nothing is launched) and measures the time of one
+`_check_scenarios` tick. The legacy variant rebuilds the condition tree and the
+full clients_state/ScenarioContext on every tick (previous
+`_should_execute_scenario`), the compiled variant uses trees compiled at load.
+
+Usage:
+    python tests/orchestrator_conditions_benchmark.py
+    python tests/orchestrator_conditions_benchmark.py --scenarios 200 --ticks 200
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import types
+
+from avena_commons.orchestrator import Orchestrator
+from avena_commons.orchestrator.factories.condition_factory import ConditionFactory
+from avena_commons.orchestrator.models import ScenarioContext
+
+
+class NullLogger:
+    def _noop(self, *args, **kwargs):
+        pass
+
+    debug = info = warning = error = _noop
+
+
+def client_state(client, state):
+    return {"client_state": {"client": client, "state": state}}
+
+
+def scenario_conditions(i, clients):
+    a, b, c, d = (clients[(i + k) % len(clients)] for k in range(4))
+    return {
+        "or": {
+            "conditions": [
+                {
+                    "and": {
+                        "conditions": [client_state(a, "RUN"), client_state(b, "FAULT")]
+                    }
+                },
+                {"not": {"condition": client_state(c, "RUN")}},
+                {
+                    "nor": {
+                        "conditions": [
+                            client_state(d, "RUN"),
+                            client_state(a, "STOPPED"),
+                        ]
+                    }
+                },
+                {
+                    "xor": {
+                        "conditions": [client_state(a, "RUN"), client_state(b, "RUN")]
+                    }
+                },
+            ]
+        }
+    }
+
+
+async def legacy_should_execute_scenario(self, scenario):
+    """Previous implementation: full context and a new condition tree per call."""
+    scenario_name = scenario.get("name", "unknown")
+    if self.should_block_scenario_due_to_limit(
+        scenario_name, scenario.get("max_executions")
+    ):
+        return False
+    configured_clients = self._configuration.get("clients", {})
+    clients_state = {}
+    for client_name, client_config in configured_clients.items():
+        clients_state[client_name] = {
+            **client_config,
+            **self._state.get(client_name, {}),
+        }
+    scenario_context = ScenarioContext(
+        scenario_name=scenario_name,
+        orchestrator=self,
+        action_executor=self._action_executor,
+        message_logger=self._message_logger,
+        clients=clients_state,
+        components=self._components,
+        context={},
+    )
+    conditions = scenario.get("trigger", {}).get("conditions", {})
+    self.scenario_data[scenario_name] = scenario_context
+    if not conditions:
+        return True
+    condition = ConditionFactory.create_condition(conditions, self._message_logger)
+    if await condition.evaluate(self.scenario_data[scenario_name]):
+        return True
+    self.scenario_data.pop(scenario_name, None)
+    return False
+
+
+def build_orchestrator(n_scenarios, n_clients):
+    orch = Orchestrator(
+        name="bench_orch", port=5999, address="127.0.0.1", message_logger=NullLogger()
+    )
+    clients = [f"client_{i}" for i in range(n_clients)]
+    orch._configuration["clients"] = {
+        name: {"address": "127.0.0.1", "port": 9000 + i}
+        for i, name in enumerate(clients)
+    }
+    orch._configuration["builtin_scenarios_directory"] = None
+    orch._state = {name: {"fsm_state": "RUN", "error": False} for name in clients}
+    for i in range(n_scenarios):
+        name = f"scenario_{i:04d}"
+        orch._scenarios[name] = {
+            "name": name,
+            "priority": i,
+            "trigger": {
+                "type": "automatic",
+                "conditions": scenario_conditions(i, clients),
+            },
+            "actions": [{"type": "log_event", "message": name}],
+        }
+    orch._compile_scenario_conditions()
+    return orch
+
+
+async def measure(orch, ticks):
+    await orch._check_scenarios()  # rozgrzewka
+    samples = []
+    for _ in range(ticks):
+        start = time.perf_counter_ns()
+        await orch._check_scenarios()
+        samples.append(time.perf_counter_ns() - start)
+    assert not orch._running_scenarios, "benchmark scenarios must not fire"
+    samples.sort()
+    return sum(samples) / len(samples), samples[len(samples) // 2], samples[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scenarios", type=int, default=200)
+    parser.add_argument("--clients", type=int, default=10)
+    parser.add_argument("--ticks", type=int, default=100)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)  # Orchestrator tworzy katalog temp/ w bieżącym katalogu
+        orch = build_orchestrator(args.scenarios, args.clients)
+
+        compiled = asyncio.run(measure(orch, args.ticks))
+        orch._should_execute_scenario = types.MethodType(
+            legacy_should_execute_scenario, orch
+        )
+        legacy = asyncio.run(measure(orch, args.ticks))
+
+    print(
+        f"{args.scenarios} scenarios x {args.clients} clients, "
+        f"{args.ticks} ticks of _check_scenarios"
+    )
+    print(f"{'variant':<10} {'mean ms':>10} {'median ms':>10} {'max ms':>10}")
+    for label, (mean, median, worst) in (("legacy", legacy), ("compiled", compiled)):
+        print(
+            f"{label:<10} {mean / 1e6:>10.3f} {median / 1e6:>10.3f} {worst / 1e6:>10.3f}"
+        )
+    print(f"speedup: {legacy[0] / compiled[0]:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
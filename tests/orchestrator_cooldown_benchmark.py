@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Orchestrator scenario bookkeeping benchmark - `_check_scenarios` with most
+scenarios cooling down.
+
+`--scenarios` scenarios without trigger conditions fire once during warm-up
+and then sit in a long cooldown; `--unsatisfied` of them instead wait for a
+client state that never comes (event-driven evaluation skips them). A few
+running scenarios (`--running`) stay active for the whole replay, so the
+concurrency limits are checked on every tick. Scenario bodies are replaced by
+a no-op. Reports process CPU time and wall time per `_check_scenarios` tick.
+
+Usage:
+    python tests/orchestrator_cooldown_benchmark.py
+    python tests/orchestrator_cooldown_benchmark.py --scenarios 5000 --ticks 500
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from avena_commons.orchestrator import Orchestrator
+
+
+class NullLogger:
+    def _noop(self, *args, **kwargs):
+        pass
+
+    debug = info = warning = error = _noop
+
+
+def build_orchestrator(n_scenarios, n_unsatisfied, n_running):
+    orch = Orchestrator(
+        name="bench_orch", port=5999, address="127.0.0.1", message_logger=NullLogger()
+    )
+    orch._configuration["clients"] = {"io": {"address": "127.0.0.1", "port": 9000}}
+    orch._configuration["builtin_scenarios_directory"] = None
+    orch._configuration["max_concurrent_scenarios"] = n_scenarios + 1
+    orch._state = {"io": {"fsm_state": "RUN"}}
+    for i in range(n_scenarios):
+        name = f"scenario_{i:05d}"
+        scenario = {
+            "name": name,
+            "priority": i,
+            "cooldown": 3600,
+            "max_concurrent_executions": n_scenarios + 1,
+            "trigger": {"type": "automatic"},
+            "actions": [{"type": "log_event", "message": name}],
+        }
+        if i < n_unsatisfied:
+            scenario["trigger"]["conditions"] = {
+                "client_state": {"client": "io", "state": "FAULT"}
+            }
+        orch._scenarios[name] = scenario
+    orch._compile_scenario_conditions()
+
+    release = asyncio.Event()
+    running = set(list(orch._scenarios)[-n_running:]) if n_running else set()
+
+    async def execute_scenario(scenario_name):
+        if scenario_name in running:
+            await release.wait()
+        return True
+
+    orch.execute_scenario = execute_scenario
+    return orch, release
+
+
+async def replay(orch, release, ticks):
+    await orch._check_scenarios()  # rozgrzewka: wszystkie scenariusze startują
+    await asyncio.sleep(0)
+    await orch._check_scenarios()
+
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    for _ in range(ticks):
+        await orch._check_scenarios()
+    cpu = time.process_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+
+    release.set()
+    await asyncio.sleep(0.01)
+    return cpu / ticks, wall / ticks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scenarios", type=int, default=1000)
+    parser.add_argument("--unsatisfied", type=int, default=100)
+    parser.add_argument("--running", type=int, default=5)
+    parser.add_argument("--ticks", type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)  # Orchestrator tworzy katalog temp/ w bieżącym katalogu
+        orch, release = build_orchestrator(
+            args.scenarios, args.unsatisfied, args.running
+        )
+        cpu, wall = asyncio.run(replay(orch, release, args.ticks))
+
+    cooling = args.scenarios - args.unsatisfied - args.running
+    print(
+        f"{args.scenarios} scenarios ({cooling} cooling down, {args.unsatisfied} "
+        f"unsatisfied, {args.running} running), {args.ticks} ticks"
+    )
+    print(f"{'CPU us/tick':>12} {'wall us/tick':>13}")
+    print(f"{cpu * 1e6:>12.1f} {wall * 1e6:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
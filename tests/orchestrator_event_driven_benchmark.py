@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Orchestrator scenario evaluation benchmark - polling vs event-driven.
+
+Every tick all clients answer CMD_GET_STATE (as after `_check_local_data`), but
+only a few of them actually change their FSM state. The polling variant
+(`event_driven_scenarios=False`) evaluates every scenario each tick, the
+event-driven variant re-evaluates only scenarios whose clients changed.
+Reports process CPU time per tick (replies + `_check_scenarios`) and the number
+of condition evaluations.
+
+Usage:
+    python tests/orchestrator_event_driven_benchmark.py
+    python tests/orchestrator_event_driven_benchmark.py --scenarios 500 --changes 2
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+from avena_commons.event_listener.event import Event, Result
+from avena_commons.orchestrator import Orchestrator
+
+STATES = ["RUN", "STOPPED", "INITIALIZED", "PAUSE"]
+
+
+class NullLogger:
+    def _noop(self, *args, **kwargs):
+        pass
+
+    debug = info = warning = error = _noop
+
+
+def client_state(client, state):
+    return {"client_state": {"client": client, "state": state}}
+
+
+def scenario_conditions(i, clients):
+    a, b, c = (clients[(i * 7 + k) % len(clients)] for k in range(3))
+    return {
+        "and": {
+            "conditions": [
+                client_state(a, "FAULT"),
+                {
+                    "or": {
+                        "conditions": [
+                            client_state(b, "RUN"),
+                            {"not": {"condition": client_state(c, "STOPPED")}},
+                        ]
+                    }
+                },
+            ]
+        }
+    }
+
+
+def state_reply(client, fsm_state):
+    return Event(
+        source=client,
+        source_address="127.0.0.1",
+        source_port=9000,
+        destination="bench_orch",
+        destination_address="127.0.0.1",
+        destination_port=5999,
+        event_type="CMD_GET_STATE",
+        data={"fsm_state": fsm_state, "error": False, "error_message": None},
+        result=Result(result="success"),
+    )
+
+
+def build_orchestrator(n_scenarios, clients, event_driven):
+    orch = Orchestrator(
+        name="bench_orch", port=5999, address="127.0.0.1", message_logger=NullLogger()
+    )
+    orch._configuration["clients"] = {
+        name: {"address": "127.0.0.1", "port": 9000 + i}
+        for i, name in enumerate(clients)
+    }
+    orch._configuration["builtin_scenarios_directory"] = None
+    orch._configuration["event_driven_scenarios"] = event_driven
+    orch._find_and_remove_processing_event = lambda event: None
+    orch._state = {name: {"fsm_state": "RUN"} for name in clients}
+    for i in range(n_scenarios):
+        name = f"scenario_{i:04d}"
+        orch._scenarios[name] = {
+            "name": name,
+            "priority": i,
+            "trigger": {
+                "type": "automatic",
+                "conditions": scenario_conditions(i, clients),
+            },
+            "actions": [{"type": "log_event", "message": name}],
+        }
+    orch._compile_scenario_conditions()
+    return orch
+
+
+def record_trace(clients, ticks, changes, seed):
+    rng = random.Random(seed)
+    current = {client: "RUN" for client in clients}
+    trace = []
+    for _ in range(ticks):
+        for client in rng.sample(clients, changes):
+            current[client] = rng.choice(STATES)
+        trace.append([state_reply(client, current[client]) for client in clients])
+    return trace
+
+
+async def replay(orch, trace):
+    evaluations = 0
+    original = orch._should_execute_scenario
+
+    async def counting(scenario):
+        nonlocal evaluations
+        evaluations += 1
+        return await original(scenario)
+
+    orch._should_execute_scenario = counting
+    cpu_start = time.process_time()
+    for replies in trace:
+        for event in replies:
+            await orch._analyze_event(event)
+        await orch._check_scenarios()
+    cpu = time.process_time() - cpu_start
+    assert not orch._running_scenarios, "benchmark scenarios must not fire"
+    return cpu / len(trace), evaluations / len(trace)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scenarios", type=int, default=500)
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--changes", type=int, default=2, help="state changes per tick")
+    parser.add_argument("--ticks", type=int, default=200)
+    args = parser.parse_args()
+
+    clients = [f"client_{i:02d}" for i in range(args.clients)]
+    trace = record_trace(clients, args.ticks, args.changes, seed=0)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)  # Orchestrator tworzy katalog temp/ w bieżącym katalogu
+        for label, event_driven in (("polling", False), ("event", True)):
+            orch = build_orchestrator(args.scenarios, clients, event_driven)
+            results[label] = asyncio.run(replay(orch, trace))
+
+    print(
+        f"{args.scenarios} scenarios, {args.clients} clients, "
+        f"{args.changes} state changes per tick, {args.ticks} ticks"
+    )
+    print(f"{'variant':<10} {'CPU ms/tick':>12} {'evaluations/tick':>18}")
+    for label, (cpu, evaluations) in results.items():
+        print(f"{label:<10} {cpu * 1e3:>12.3f} {evaluations:>18.1f}")
+    print(f"CPU reduction: {results['polling'][0] / results['event'][0]:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
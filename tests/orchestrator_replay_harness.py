@@ -0,0 +1,589 @@
+#!/usr/bin/env python3
+"""
+Orchestrator replay harness - scenario engine cost on recorded or synthetic timelines.
+
+Loads a directory of scenario JSON files (or a synthetic set written by the
+generator below) into a real Orchestrator whose surroundings are stubs:
+- clients: commands sent by actions (`_event`) are recorded and answered with
+  the resulting FSM state on the next tick, so `send_command` + `wait_for_state`
+  sequences complete,
+- `send_sms` / `send_email` go to recording SmsComponent / EmailComponent stubs,
+- `database` conditions read a mock DatabaseComponent ("main_database").
+
+A client state timeline is replayed tick by tick in virtual time (`--tick`,
+`--speed` 0 = as fast as possible); scenario cooldowns use the virtual clock.
+The timeline is either a recorded JSONL file (`--timeline`, one change per
+line, see below) or synthetic (`--changes` state changes per tick,
+`--db-changes` mock database row changes per tick); `--record-timeline` saves
+the synthetic one for later replays.
+
+Reports:
+- `_check_scenarios` wall time per tick (p50 / p99 / max) and CPU per tick,
+- scenario start latency - from the start of the tick that launched a scenario
+  to its first action (p50 / p99),
+- scenario runs, executed actions and action throughput,
+- memory growth between 25% and 100% of the replay - peak RSS by default,
+  traced Python allocations with `--tracemalloc` (slows the replay ~2x, so
+  timings of such runs are not comparable with a baseline).
+
+`--save-baseline FILE` stores the metrics as JSON; `--baseline FILE` compares
+the run with a stored one and exits with status 1 if a cost metric grew (or
+throughput dropped) by more than `--tolerance`.
+
+Timeline JSONL lines:
+    {"t": 0.25, "client": "io", "fsm_state": "FAULT", "error_message": "feeder jam"}
+    {"t": 0.30, "row": 3, "value": "ready"}
+
+Usage:
+    python tests/orchestrator_replay_harness.py --generate 500 --depth 3
+    python tests/orchestrator_replay_harness.py --generate 2000 --depth 4 --priority random --cooldown 0.5
+    python tests/orchestrator_replay_harness.py --scenarios-dir path/to/scenarios --clients io supervisor_1 --timeline trace.jsonl
+    python tests/orchestrator_replay_harness.py --generate 500 --save-baseline base.json
+    python tests/orchestrator_replay_harness.py --generate 500 --baseline base.json --tolerance 0.25
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import resource
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from avena_commons.event_listener.event import Event, Result
+from avena_commons.orchestrator import Orchestrator
+from avena_commons.orchestrator import orchestrator as orchestrator_module
+
+STATES = ["RUN", "PAUSE", "STOPPED", "INITIALIZED", "FAULT"]
+COMMAND_STATES = {
+    "CMD_INITIALIZE": "INITIALIZED",
+    "CMD_RUN": "RUN",
+    "CMD_PAUSE": "PAUSE",
+    "CMD_RESUME": "RUN",
+    "CMD_GRACEFUL_STOP": "STOPPED",
+    "CMD_ACK": "STOPPED",
+}
+LOGIC_OPERATORS = ["and", "or", "not", "xor", "nand", "nor"]
+# Metryki kosztu (rosnące = regresja) i wydajności (malejące = regresja)
+COST_METRICS = ["check p50 ms", "check p99 ms", "check CPU ms", "start p50 ms"]
+THROUGHPUT_METRICS = ["actions/s"]
+
+
+class NullLogger:
+    def _noop(self, *args, **kwargs):
+        pass
+
+    debug = info = warning = error = _noop
+
+
+# --- Generator scenariuszy syntetycznych -------------------------------------
+
+
+def random_condition(rng, clients, depth, db_rows):
+    """Losowe drzewo warunków logicznych o zadanej głębokości."""
+    if depth <= 1:
+        if db_rows and rng.random() < 0.2:
+            return {
+                "database": {
+                    "component": "main_database",
+                    "table": "orders",
+                    "column": "status",
+                    "where": {"id": rng.randrange(db_rows)},
+                    "expected_value": "ready",
+                }
+            }
+        if rng.random() < 0.1:
+            return {"client_state": {"any_service_in_state": rng.choice(STATES)}}
+        return {
+            "client_state": {"client": rng.choice(clients), "state": rng.choice(STATES)}
+        }
+
+    operator = rng.choice(LOGIC_OPERATORS)
+    if operator == "not":
+        return {
+            "not": {"condition": random_condition(rng, clients, depth - 1, db_rows)}
+        }
+    children = [
+        random_condition(rng, clients, depth - 1, db_rows)
+        for _ in range(rng.randint(2, 3))
+    ]
+    return {operator: {"conditions": children}}
+
+
+def random_actions(rng, clients, name):
+    """Akcje typowe dla scenariuszy: log, komenda z oczekiwaniem, powiadomienia."""
+    client = rng.choice(clients)
+    command = rng.choice(list(COMMAND_STATES))
+    actions = [
+        {"type": "log_event", "level": "info", "message": f"{name}: start"},
+        {"type": "send_command", "client": client, "command": command},
+        {
+            "type": "wait_for_state",
+            "client": client,
+            "target_state": COMMAND_STATES[command],
+            "timeout": "5s",
+        },
+    ]
+    if rng.random() < 0.3:
+        actions.append({
+            "type": "send_sms",
+            "to": ["+48500000000"],
+            "text": f"{name}: {{{{ trigger.source }}}}",
+        })
+    if rng.random() < 0.3:
+        actions.append({
+            "type": "send_email",
+            "to": ["ops@example.com"],
+            "subject": f"{name}",
+            "body": "Klienci w FAULT: {{ clients_in_fault }}",
+        })
+    return actions
+
+
+def generate_scenarios(
+    out_dir, count, clients, depth, priority, cooldown, db_rows, seed=0
+):
+    """
+    Zapisuje `count` syntetycznych scenariuszy JSON do `out_dir`.
+
+    priority: "sequential" (0..count-1), "random" (0-100) lub "same" (0).
+    """
+    rng = random.Random(seed)
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for i in range(count):
+        name = f"synthetic_{i:05d}"
+        scenario = {
+            "name": name,
+            "description": f"Scenariusz syntetyczny (głębokość {depth})",
+            "priority": {
+                "sequential": i,
+                "random": rng.randint(0, 100),
+                "same": 0,
+            }[priority],
+            "cooldown": cooldown,
+            "trigger": {
+                "type": "automatic",
+                "conditions": random_condition(rng, clients, depth, db_rows),
+            },
+            "actions": random_actions(rng, clients, name),
+        }
+        (out_dir / f"{name}.json").write_text(json.dumps(scenario, indent=2))
+
+
+def synthetic_timeline(clients, ticks, tick, changes, db_rows, db_changes, seed=0):
+    """Losowy przebieg zmian stanu klientów i wierszy mock bazy."""
+    rng = random.Random(seed)
+    timeline = []
+    for n in range(ticks):
+        t = round(n * tick, 6)
+        for client in rng.sample(clients, min(changes, len(clients))):
+            state = rng.choice(STATES)
+            entry = {"t": t, "client": client, "fsm_state": state}
+            if state == "FAULT":
+                entry["error_message"] = f"{client} fault"
+            timeline.append(entry)
+        for _ in range(db_changes if db_rows else 0):
+            timeline.append({
+                "t": t,
+                "row": rng.randrange(db_rows),
+                "value": rng.choice(["ready", "new", "done"]),
+            })
+    return timeline
+
+
+# --- Otoczenie Orchestratora --------------------------------------------------
+
+
+class VirtualClock:
+    """Czas wirtualny powtórki: `datetime.now()` i `time.monotonic()` orchestratora."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.epoch = datetime(2030, 1, 1)
+        self.monotonic_start = time.monotonic()
+
+    def install(self):
+        clock = self
+
+        class VirtualDatetime(datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return clock.epoch + timedelta(seconds=clock.now)
+
+        class VirtualTime:
+            def __getattr__(self, name):
+                return getattr(time, name)
+
+            @staticmethod
+            def monotonic():
+                return clock.monotonic_start + clock.now
+
+        orchestrator_module.datetime = VirtualDatetime
+        orchestrator_module.time = VirtualTime()
+
+    @staticmethod
+    def uninstall():
+        orchestrator_module.datetime = datetime
+        orchestrator_module.time = time
+
+
+class MockDatabaseComponent:
+    is_connected = True
+
+    def __init__(self, rows):
+        self.rows = {row: "new" for row in range(rows)}
+        self.queries = 0
+
+    async def check_table_value(self, table, column, where_conditions):
+        self.queries += 1
+        return self.rows.get(where_conditions.get("id"))
+
+    async def fetch_records(self, table, columns, where_conditions, limit, order_by):
+        self.queries += 1
+        return [{"id": row, "status": value} for row, value in self.rows.items()]
+
+    async def update_table_value(self, table, column, value, where_conditions):
+        self.rows[where_conditions.get("id")] = value
+        return 1
+
+
+class _NotifierStub:
+    is_initialized = True
+    is_enabled = True
+    max_error_attempts = 0
+
+    def __init__(self):
+        self.sent = 0
+
+
+class SmsComponent(_NotifierStub):
+    """Zapisuje SMS-y zamiast wysyłać (akcje szukają komponentu po nazwie klasy)."""
+
+    async def send_sms(self, recipients, message, ignore_errors=False, wait=False):
+        self.sent += len(recipients)
+        return True, len(recipients), []
+
+
+class EmailComponent(_NotifierStub):
+    """Zapisuje e-maile zamiast wysyłać (akcje szukają komponentu po nazwie klasy)."""
+
+    def parse_recipients(self, to_field):
+        return to_field if isinstance(to_field, list) else [to_field]
+
+    async def send_email(self, recipients, subject, body, wait=False):
+        self.sent += 1
+        return True
+
+
+def state_reply(client, fsm_state, error_message=None):
+    return Event(
+        source=client,
+        source_address="127.0.0.1",
+        source_port=9000,
+        destination="replay_orch",
+        destination_address="127.0.0.1",
+        destination_port=5999,
+        event_type="CMD_GET_STATE",
+        data={
+            "fsm_state": fsm_state,
+            "error": error_message is not None,
+            "error_message": error_message,
+            "state": {},
+        },
+        result=Result(result="success"),
+    )
+
+
+class ReplayHarness:
+    """Orchestrator ze stubami klientów i komponentów oraz pomiarami powtórki."""
+
+    def __init__(self, scenarios_dir, clients, db_rows, max_concurrent):
+        self.clients = clients
+        self.clock = VirtualClock()
+        self.database = MockDatabaseComponent(db_rows)
+        self.sms = SmsComponent()
+        self.email = EmailComponent()
+        self.commands = []  # (czas wirtualny, klient, komenda)
+        self._commanded = []  # odpowiedzi klientów na następny cykl
+        self.tick_started = 0.0
+        self._launched = {}  # scenariusz -> początek cyklu uruchomienia
+        self.start_latencies = []
+        self.scenario_runs = 0
+        self.actions = 0
+
+        orch = Orchestrator(
+            name="replay_orch",
+            port=5999,
+            address="127.0.0.1",
+            message_logger=NullLogger(),
+        )
+        orch._configuration["clients"] = {
+            name: {"address": "127.0.0.1", "port": 9000 + i}
+            for i, name in enumerate(clients)
+        }
+        orch._configuration["builtin_scenarios_directory"] = None
+        orch._configuration["scenarios_directory"] = str(scenarios_dir)
+        orch._configuration["max_concurrent_scenarios"] = max_concurrent
+        orch._state = {name: {"fsm_state": "RUN"} for name in clients}
+        orch._components = {
+            "main_database": self.database,
+            "sms": self.sms,
+            "email": self.email,
+        }
+        orch._event = self._client_event
+        orch._find_and_remove_processing_event = lambda event: None
+        orch._load_actions()
+        orch._load_scenarios()
+
+        execute_with_tracking = orch._execute_scenario_with_tracking
+        execute_action = orch._action_executor.execute_action
+
+        async def tracked_scenario(scenario_name):
+            self._launched[scenario_name] = self.tick_started
+            self.scenario_runs += 1
+            return await execute_with_tracking(scenario_name)
+
+        async def tracked_action(action_config, context):
+            started = self._launched.pop(context.scenario_name, None)
+            if started is not None:
+                self.start_latencies.append(time.perf_counter() - started)
+            self.actions += 1
+            return await execute_action(action_config, context)
+
+        orch._execute_scenario_with_tracking = tracked_scenario
+        orch._action_executor.execute_action = tracked_action
+        self.orch = orch
+
+    async def _client_event(self, *, destination=None, event_type="default", **kwargs):
+        """Stub klienta: zapisuje komendę i zmienia jego stan w kolejnym cyklu."""
+        self.commands.append((self.clock.now, destination, event_type))
+        if event_type in COMMAND_STATES:
+            self._commanded.append((destination, COMMAND_STATES[event_type]))
+        return Event(
+            source="replay_orch",
+            destination=destination,
+            event_type=event_type,
+            data={},
+        )
+
+    @staticmethod
+    def _memory_used(trace_memory):
+        """Zajęta pamięć w bajtach (tracemalloc lub szczytowy RSS procesu)."""
+        if trace_memory:
+            return tracemalloc.get_traced_memory()[0]
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    async def replay(self, timeline, ticks, tick, speed, trace_memory=False):
+        orch = self.orch
+        timeline = sorted(timeline, key=lambda entry: entry["t"])
+        position = 0
+        check_wall, check_cpu = [], []
+        memory_mark = None
+
+        self.clock.install()
+        if trace_memory:
+            tracemalloc.start()
+        replay_start = time.perf_counter()
+        try:
+            for n in range(ticks):
+                self.clock.now = n * tick
+                self.tick_started = time.perf_counter()
+
+                # Odpowiedzi klientów na komendy z poprzedniego cyklu
+                commanded, self._commanded = self._commanded, []
+                for client, state in commanded:
+                    if client in orch._state:
+                        await orch._analyze_event(state_reply(client, state))
+
+                # Zmiany z przebiegu do bieżącej chwili
+                while (
+                    position < len(timeline)
+                    and timeline[position]["t"] <= self.clock.now + 1e-9
+                ):
+                    entry = timeline[position]
+                    position += 1
+                    if "row" in entry:
+                        self.database.rows[entry["row"]] = entry["value"]
+                    elif entry.get("client") in orch._state:
+                        await orch._analyze_event(
+                            state_reply(
+                                entry["client"],
+                                entry["fsm_state"],
+                                entry.get("error_message"),
+                            )
+                        )
+
+                wall_start, cpu_start = time.perf_counter(), time.process_time()
+                await orch._check_scenarios()
+                check_wall.append(time.perf_counter() - wall_start)
+                check_cpu.append(time.process_time() - cpu_start)
+
+                # Pozwól uruchomionym scenariuszom wykonać kolejne akcje
+                await asyncio.sleep(tick / speed if speed else 0)
+                if n == ticks // 4:
+                    memory_mark = self._memory_used(trace_memory)
+
+            running = [task for task in orch._running_scenarios.values()]
+            if running:
+                await asyncio.wait(running, timeout=10)
+            memory_end = self._memory_used(trace_memory)
+        finally:
+            if trace_memory:
+                tracemalloc.stop()
+            self.clock.uninstall()
+
+        check_wall.sort()
+        latencies = sorted(self.start_latencies) or [0.0]
+        total_wall = time.perf_counter() - replay_start
+        return {
+            "scenarios": len(orch._scenarios),
+            "ticks": ticks,
+            "check p50 ms": check_wall[len(check_wall) // 2] * 1e3,
+            "check p99 ms": check_wall[int(len(check_wall) * 0.99)] * 1e3,
+            "check max ms": check_wall[-1] * 1e3,
+            "check CPU ms": statistics.fmean(check_cpu) * 1e3,
+            "start p50 ms": latencies[len(latencies) // 2] * 1e3,
+            "start p99 ms": latencies[int(len(latencies) * 0.99)] * 1e3,
+            "scenario runs": self.scenario_runs,
+            "actions": self.actions,
+            "actions/s": self.actions / total_wall if total_wall else 0.0,
+            "commands": len(self.commands),
+            "db queries": self.database.queries,
+            "memory growth kB": (memory_end - (memory_mark or memory_end)) / 1024,
+        }
+
+
+def load_timeline(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def compare_with_baseline(results, baseline, tolerance):
+    """Zwraca listę opisów regresji względem zapisanych wyników."""
+    regressions = []
+    for metric in COST_METRICS:
+        old, new = baseline.get(metric), results[metric]
+        if old and new > old * (1 + tolerance):
+            regressions.append(f"{metric}: {old:.3f} -> {new:.3f}")
+    for metric in THROUGHPUT_METRICS:
+        old, new = baseline.get(metric), results[metric]
+        if old and new < old * (1 - tolerance):
+            regressions.append(f"{metric}: {old:.1f} -> {new:.1f}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--scenarios-dir", help="directory with scenario JSON files")
+    source.add_argument(
+        "--generate", type=int, metavar="N", help="generate N synthetic scenarios"
+    )
+    parser.add_argument("--clients", nargs="+", help="client names (default: 50)")
+    parser.add_argument("--depth", type=int, default=3, help="condition nesting depth")
+    parser.add_argument(
+        "--priority", choices=["sequential", "random", "same"], default="sequential"
+    )
+    parser.add_argument("--cooldown", type=float, default=1.0, help="seconds")
+    parser.add_argument("--db-rows", type=int, default=20, help="mock database rows")
+    parser.add_argument("--timeline", help="recorded timeline (JSONL)")
+    parser.add_argument("--record-timeline", help="save the synthetic timeline (JSONL)")
+    parser.add_argument("--changes", type=int, default=2, help="state changes per tick")
+    parser.add_argument(
+        "--db-changes", type=int, default=1, help="row changes per tick"
+    )
+    parser.add_argument("--ticks", type=int, default=1000)
+    parser.add_argument("--tick", type=float, default=0.01, help="virtual tick [s]")
+    parser.add_argument(
+        "--speed", type=float, default=0.0, help="time acceleration (0 = max)"
+    )
+    parser.add_argument("--max-concurrent", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--tracemalloc", action="store_true", help="trace Python allocations"
+    )
+    parser.add_argument("--save-baseline")
+    parser.add_argument("--baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    clients = args.clients or [f"client_{i:02d}" for i in range(50)]
+    if args.timeline:
+        timeline = load_timeline(args.timeline)
+    else:
+        timeline = synthetic_timeline(
+            clients,
+            args.ticks,
+            args.tick,
+            args.changes,
+            args.db_rows,
+            args.db_changes,
+            seed=args.seed,
+        )
+        if args.record_timeline:
+            with open(args.record_timeline, "w") as f:
+                f.writelines(json.dumps(entry) + "\n" for entry in timeline)
+
+    save_baseline = args.save_baseline and os.path.abspath(args.save_baseline)
+    baseline = args.baseline and os.path.abspath(args.baseline)
+    scenarios_dir = args.scenarios_dir and os.path.abspath(args.scenarios_dir)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)  # Orchestrator tworzy katalog temp/ w bieżącym katalogu
+        if args.generate:
+            scenarios_dir = Path(tmp) / "scenarios"
+            generate_scenarios(
+                scenarios_dir,
+                args.generate,
+                clients,
+                args.depth,
+                args.priority,
+                args.cooldown,
+                args.db_rows,
+                seed=args.seed,
+            )
+        harness = ReplayHarness(
+            scenarios_dir, clients, args.db_rows, args.max_concurrent
+        )
+        results = asyncio.run(
+            harness.replay(
+                timeline, args.ticks, args.tick, args.speed, args.tracemalloc
+            )
+        )
+
+    print(
+        f"{results['scenarios']} scenarios, {len(clients)} clients, "
+        f"{args.ticks} ticks of {args.tick * 1e3:g} ms"
+    )
+    for metric, value in results.items():
+        print(
+            f"  {metric:<18} {value:>12.3f}"
+            if isinstance(value, float)
+            else f"  {metric:<18} {value:>12}"
+        )
+
+    if save_baseline:
+        with open(save_baseline, "w") as f:
+            json.dump(results, f, indent=2)
+    if baseline:
+        with open(baseline) as f:
+            regressions = compare_with_baseline(results, json.load(f), args.tolerance)
+        if regressions:
+            print(f"REGRESSION (tolerance {args.tolerance:.0%}):")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"No regressions against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
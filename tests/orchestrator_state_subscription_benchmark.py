@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Client state transport benchmark - CMD_GET_STATE polling vs state subscription.
+
+Simulates N clients (default 50) talking to a real Orchestrator in virtual time.
+Every message crosses a simulated network with one tick of latency in each
+direction and is counted with its JSON size (`Event.to_dict()`). Clients change
+one field of their state at random (`--change-rate` changes per client per
+second). The polling variant (`state_subscription=False`) sends CMD_GET_STATE
+to every client each tick and receives the full state back, the subscription
+variant receives a snapshot once and then only STATE_UPDATE diffs and
+STATE_KEEPALIVE messages (`StatePublisher` on the client side).
+
+Reports messages/s, bytes/s and state staleness - the age of the oldest client
+change not yet reflected in `Orchestrator._state`, sampled every tick.
+
+Usage:
+    python tests/orchestrator_state_subscription_benchmark.py
+    python tests/orchestrator_state_subscription_benchmark.py --clients 50 --seconds 20
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+
+import avena_commons.orchestrator.orchestrator as orchestrator_module
+from avena_commons.event_listener.event import Event, Result
+from avena_commons.event_listener.state_subscription import (
+    StatePublisher,
+    apply_state_diff,
+)
+from avena_commons.orchestrator import Orchestrator
+
+
+class NullLogger:
+    def _noop(self, *args, **kwargs):
+        pass
+
+    debug = info = warning = error = _noop
+
+
+class VirtualTime:
+    """Replaces the `time` module of the orchestrator with a virtual clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+
+class Network:
+    """Delivers messages sent during a tick at the beginning of the next tick."""
+
+    def __init__(self):
+        self.in_flight = []
+        self.messages = 0
+        self.bytes = 0
+
+    def send(self, event):
+        self.messages += 1
+        self.bytes += len(json.dumps(event.to_dict(), default=str))
+        self.in_flight.append(event)
+
+    def take(self):
+        delivered, self.in_flight = self.in_flight, []
+        return delivered
+
+
+class SimulatedClient:
+    """Client answering CMD_GET_STATE and CMD_SUBSCRIBE_STATE like EventListener."""
+
+    def __init__(self, name, port, rng):
+        self.name = name
+        self.port = port
+        self.rng = rng
+        self.publisher = StatePublisher()
+        self.seq = 0
+        self.changed_at = {0: 0.0}
+        self.snapshot = {
+            "fsm_state": "RUN",
+            "error": False,
+            "error_code": 0,
+            "error_message": None,
+            "state": {
+                "seq": 0,
+                "io": {
+                    "inputs": [False] * 16,
+                    "outputs": [False] * 16,
+                    "analog": {f"ai{i}": 0.0 for i in range(8)},
+                },
+                "counters": {f"counter_{i}": 0 for i in range(10)},
+                "device": {"serial": f"SN-{port}", "firmware": "1.4.2", "mode": "auto"},
+            },
+        }
+
+    def change(self, now):
+        self.seq += 1
+        self.changed_at[self.seq] = now
+        field = self.rng.choice(["counter", "analog", "input"])
+        if field == "counter":
+            path = ["state", "counters", f"counter_{self.rng.randrange(10)}"]
+            value = self.seq
+        elif field == "analog":
+            path = ["state", "io", "analog", f"ai{self.rng.randrange(8)}"]
+            value = round(self.rng.uniform(0, 10), 3)
+        else:
+            inputs = list(self.snapshot["state"]["io"]["inputs"])
+            inputs[self.rng.randrange(16)] ^= True
+            path, value = ["state", "io", "inputs"], inputs
+        self.snapshot = apply_state_diff(
+            self.snapshot, [[path, value], [["state", "seq"], self.seq]], []
+        )
+
+    def reply(self, request, data):
+        return Event(
+            source=self.name,
+            source_address="127.0.0.1",
+            source_port=self.port,
+            destination=request.source,
+            destination_address=request.source_address,
+            destination_port=request.source_port,
+            event_type=request.event_type,
+            data=data,
+            result=Result(result="success"),
+            is_system_event=True,
+            timestamp=request.timestamp,
+        )
+
+    def handle(self, request, now):
+        if request.event_type == "CMD_GET_STATE":
+            return [self.reply(request, self.snapshot)]
+        data = self.publisher.subscribe(
+            request.source,
+            request.source_address,
+            request.source_port,
+            request.data,
+            lambda: self.snapshot,
+            now,
+        )
+        return [self.reply(request, data)]
+
+    def publish(self, now):
+        if not self.publisher.is_due(now):
+            return []
+        return [
+            Event(
+                source=self.name,
+                source_address="127.0.0.1",
+                source_port=self.port,
+                destination=subscriber.name,
+                destination_address=subscriber.address,
+                destination_port=subscriber.port,
+                event_type=event_type,
+                data=data,
+                is_system_event=True,
+            )
+            for subscriber, event_type, data in self.publisher.publish(
+                self.snapshot, now
+            )
+        ]
+
+
+def build_orchestrator(clients, subscription, network):
+    orch = Orchestrator(
+        name="bench_orch", port=5999, address="127.0.0.1", message_logger=NullLogger()
+    )
+    orch._configuration["clients"] = {
+        client.name: {"address": "127.0.0.1", "port": client.port} for client in clients
+    }
+    orch._configuration["builtin_scenarios_directory"] = None
+    orch._configuration["state_subscription"] = subscription
+    orch._state = {client.name: {} for client in clients}
+
+    async def send_event(**kwargs):
+        event = Event(
+            source="bench_orch",
+            source_address="127.0.0.1",
+            source_port=5999,
+            destination=kwargs["destination"],
+            destination_address=kwargs["destination_address"],
+            destination_port=kwargs["destination_port"],
+            event_type=kwargs["event_type"],
+            data=kwargs["data"],
+            is_system_event=True,
+        )
+        network.send(event)
+        return event
+
+    orch._event = send_event
+    return orch
+
+
+async def simulate(n_clients, seconds, change_rate, subscription, seed):
+    clock = VirtualTime()
+    orchestrator_module.time = clock
+    rng = random.Random(seed)
+    to_clients, to_orchestrator = Network(), Network()
+    clients = [
+        SimulatedClient(f"client_{i:02d}", 9000 + i, rng) for i in range(n_clients)
+    ]
+    by_name = {client.name: client for client in clients}
+    orch = build_orchestrator(clients, subscription, to_clients)
+    period = 1 / orch.check_local_data_frequency
+    change_probability = change_rate * period
+
+    staleness = []
+    cpu = 0.0
+    for tick in range(int(seconds / period)):
+        clock.now = tick * period
+        requests, replies = to_clients.take(), to_orchestrator.take()
+        for request in requests:
+            for event in by_name[request.destination].handle(request, clock.now):
+                to_orchestrator.send(event)
+        for client in clients:
+            if rng.random() < change_probability:
+                client.change(clock.now)
+            for event in client.publish(clock.now):
+                to_orchestrator.send(event)
+
+        cpu_start = time.process_time()
+        for event in replies:
+            if event.event_type in ("STATE_UPDATE", "STATE_KEEPALIVE"):
+                await orch._handle_state_push(event)
+            else:
+                await orch._analyze_event(event)
+        await orch._check_local_data()
+        cpu += time.process_time() - cpu_start
+
+        for client in clients:
+            seen = orch._state[client.name].get("state", {}).get("seq", -1)
+            if seen < client.seq:
+                staleness.append(clock.now - client.changed_at[seen + 1])
+            else:
+                staleness.append(0.0)
+
+    orchestrator_module.time = time
+    staleness.sort()
+    return {
+        "messages/s": (to_clients.messages + to_orchestrator.messages) / seconds,
+        "bytes/s": (to_clients.bytes + to_orchestrator.bytes) / seconds,
+        "stale mean ms": sum(staleness) / len(staleness) * 1e3,
+        "stale p99 ms": staleness[int(len(staleness) * 0.99)] * 1e3,
+        "stale max ms": staleness[-1] * 1e3,
+        "orch CPU %": cpu / seconds * 100,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--seconds", type=float, default=20.0, help="virtual time")
+    parser.add_argument(
+        "--change-rate", type=float, default=2.0, help="changes per client per second"
+    )
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)  # Orchestrator tworzy katalog temp/ w bieżącym katalogu
+        for label, subscription in (("polling", False), ("subscription", True)):
+            results[label] = asyncio.run(
+                simulate(args.clients, args.seconds, args.change_rate, subscription, 0)
+            )
+
+    print(
+        f"{args.clients} clients, {args.change_rate} changes/client/s, "
+        f"{args.seconds:.0f} s of virtual time at 100 Hz"
+    )
+    columns = list(results["polling"])
+    print(f"{'variant':<13}" + "".join(f"{c:>15}" for c in columns))
+    for label, row in results.items():
+        print(f"{label:<13}" + "".join(f"{row[c]:>15.1f}" for c in columns))
+    polling, subscription = results["polling"], results["subscription"]
+    print(
+        f"messages: {polling['messages/s'] / subscription['messages/s']:.1f}x fewer, "
+        f"bytes: {polling['bytes/s'] / subscription['bytes/s']:.1f}x fewer"
+    )
+
+
+if __name__ == "__main__":
+    main()
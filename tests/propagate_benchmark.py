@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+propagate benchmark - per-row/per-column Python loops vs. vectorised numpy.
+
+Times `propagate` (all three directions) and `propagate_by_shape` on depth
+frames at 640x400 and 1280x800 against the previous implementation (kept
+below as `legacy_propagate`), for the masks it is called with:
+
+- blob: a single hole component (what `propagate_by_shape` gets per hole),
+- stripes: many wide horizontal and tall vertical holes across the frame,
+- dropout: 5% random pixels without depth (holes in almost every line).
+
+Reports median ms per call, the speedup, and checks that the outputs are
+identical.
+
+Usage:
+    python tests/propagate_benchmark.py
+    python tests/propagate_benchmark.py --repeat 10
+"""
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from avena_commons.vision.vision import propagate
+
+
+def legacy_propagate(depth, mask, direction):
+    """Previous implementation (row/column loops with generator scans)."""
+    # Wczesne sprawdzenie czy są dziury - główna optymalizacja wydajnościowa
+    if not np.any(mask == 255):
+        return depth.copy()
+
+    def propagate_logic(
+        depth: np.ndarray, mask: np.ndarray, direction: str = "left"
+    ) -> np.ndarray:
+        """Wewnętrzna funkcja propagacji w jednym kierunku z podstawowymi optymalizacjami."""
+        if direction not in {"left", "right", "up", "down"}:
+            raise ValueError("direction must be 'left', 'right', 'up', or 'down'")
+
+        h, w = depth.shape
+        painted = np.zeros_like(depth, dtype=np.float32)
+        holes_equal = mask == 255  # pre-compute for speed
+
+        if direction in {"left", "right"}:
+            # Optymalizacja: znajdź rzędy z dziurami raz na początku
+            rows_with_holes = np.any(holes_equal, axis=1)
+            if not np.any(rows_with_holes):
+                return painted  # nie ma dziur w rzędach
+
+            for y in range(h):
+                if not rows_with_holes[y]:
+                    continue  # skip rows without holes
+
+                row = depth[y]
+                if direction == "left":
+                    # first hole from the left → walk left
+                    start_x = np.argmax(holes_equal[y])
+                    search_range = range(start_x - 1, -1, -1)  # ←
+                else:  # "right"
+                    # first hole from the right → walk right
+                    start_x = w - 1 - np.argmax(holes_equal[y][::-1])
+                    search_range = range(start_x + 1, w)  # →
+
+                # find first valid depth along search_range
+                val = next(
+                    (
+                        row[x]
+                        for x in search_range
+                        if (row[x] != 0) and (not np.isnan(row[x]))
+                    ),
+                    np.nan,
+                )
+                if not np.isnan(val):
+                    painted[y, holes_equal[y]] = val
+
+        else:  # "up" or "down"
+            # Optymalizacja: znajdź kolumny z dziurami raz na początku
+            cols_with_holes = np.any(holes_equal, axis=0)
+            if not np.any(cols_with_holes):
+                return painted  # nie ma dziur w kolumnach
+
+            for x in range(w):
+                if not cols_with_holes[x]:
+                    continue  # skip columns without holes
+
+                col_mask = holes_equal[:, x]
+                if not col_mask.any():
+                    continue  # no hole in this column
+
+                col = depth[:, x]
+                if direction == "up":
+                    # first hole from the top → walk up
+                    start_y = np.argmax(col_mask)
+                    search_range = range(start_y - 1, -1, -1)  # ↑
+                else:  # "down"
+                    # first hole from the bottom → walk down
+                    start_y = h - 1 - np.argmax(col_mask[::-1])
+                    search_range = range(start_y + 1, h)  # ↓
+
+                val = next(
+                    (
+                        col[y]
+                        for y in search_range
+                        if (col[y] != 0) and (not np.isnan(col[y]))
+                    ),
+                    np.nan,
+                )
+                if not np.isnan(val):
+                    painted[col_mask, x] = val
+
+        return painted
+
+    if direction == "horizontal":
+        left_propagation = propagate_logic(depth, mask, "left")
+        right_propagation = propagate_logic(depth, mask, "right")
+
+        return (left_propagation + right_propagation) / 2
+    elif direction == "vertical":
+        top_propagation = propagate_logic(depth, mask, "up")
+        bottom_propagation = propagate_logic(depth, mask, "down")
+        return (top_propagation + bottom_propagation) / 2
+    elif direction == "square":
+        left_propagation = propagate_logic(depth, mask, "left")
+        right_propagation = propagate_logic(depth, mask, "right")
+        top_propagation = propagate_logic(depth, mask, "up")
+        bottom_propagation = propagate_logic(depth, mask, "down")
+        return (
+            (left_propagation + right_propagation) / 2
+            + (top_propagation + bottom_propagation) / 2
+        ) / 2
+    else:
+        raise ValueError("direction must be horizontal / vertical / square")
+
+
+def make_case(name, width, height, rng):
+    depth = rng.integers(800, 1200, (height, width)).astype(np.uint16)
+    mask = np.zeros((height, width), dtype=np.uint8)
+    if name == "blob":
+        mask[height // 3 : height // 2, width // 4 : width // 2] = 255
+    elif name == "stripes":
+        for _ in range(40):
+            y, x = rng.integers(0, height - 10), rng.integers(0, width - 10)
+            if rng.random() < 0.5:
+                mask[y : y + 4, x : x + width // 5] = 255
+            else:
+                mask[y : y + height // 4, x : x + 4] = 255
+    else:
+        mask[rng.random((height, width)) < 0.05] = 255
+    depth[mask == 255] = 0
+    return depth, mask
+
+
+def time_call(func, depth, mask, direction, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(depth, mask, direction)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+
+    print(
+        f"{'size':<10} {'mask':<8} {'direction':<11} {'legacy ms':>10} "
+        f"{'numpy ms':>9} {'speedup':>8}"
+    )
+    for width, height in ((640, 400), (1280, 800)):
+        for name in ("blob", "stripes", "dropout"):
+            depth, mask = make_case(name, width, height, rng)
+            for direction in ("horizontal", "vertical", "square"):
+                assert np.array_equal(
+                    legacy_propagate(depth, mask, direction),
+                    propagate(depth, mask, direction),
+                )
+                old = time_call(legacy_propagate, depth, mask, direction, args.repeat)
+                new = time_call(propagate, depth, mask, direction, args.repeat)
+                print(
+                    f"{f'{width}x{height}':<10} {name:<8} {direction:<11} "
+                    f"{old:>10.2f} {new:>9.2f} {old / new:>7.1f}x"
+                )
+
+
+if __name__ == "__main__":
+    main()
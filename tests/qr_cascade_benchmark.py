@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+QR mode cascade benchmark - every mode on every frame vs. the adaptive cascade.
+
+Runs `qr_detector` over a labelled image set and reports accuracy and CPU
+time per frame (`time.process_time`, median / p95) for:
+
+- all: every step config on every frame (the legacy pipeline with one pool
+  task per config; CPU is the sum over configs), detections merged,
+- cascade: `mode = "cascade"` in config order (`reorder = false`),
+- adaptive: the cascade reordered by per-camera success rate.
+
+Accuracy: frames with every labelled tag found and no extra tags, tag
+recall and extra detections (a detection matches a label within 10 px).
+
+The labelled set is either a directory with images and `labels.json`
+(`{"frame_0001.png": [[cx, cy], ...], ...}`, tag centers in undistorted
+pixels) or a synthetic set: high-contrast tags, tags with the same luminance
+as their white cells (only the saturation modes see them), mixed frames and
+frames without tags.
+
+Usage:
+    python tests/qr_cascade_benchmark.py
+    python tests/qr_cascade_benchmark.py --frames 200 --color-share 0.6
+    python tests/qr_cascade_benchmark.py --images recordings/qr --size 1280x800
+"""
+
+import argparse
+import json
+import os
+import statistics
+import time
+
+import cv2
+import numpy as np
+import pkg_resources
+
+from avena_commons.vision.detector import qr_detector
+
+CLAHE = {"clip_limit": 4.0, "grid_size": 8}
+BINARIZATION = {
+    "gamma": 3,
+    "binarization": {"block_size": 31, "C": 1},
+    "morph": {"kernel_size": 3, "open_iter": 1, "close_iter": 3},
+}
+STEPS = [
+    {"mode": "gray", "clahe": CLAHE},
+    {
+        "mode": "gray_with_binarization",
+        "clahe": CLAHE,
+        "binarization": BINARIZATION,
+        "merge_image_weight": 0.7,
+    },
+    {"mode": "saturation", "clahe": CLAHE},
+    {
+        "mode": "saturation_with_binarization",
+        "clahe": CLAHE,
+        "binarization": BINARIZATION,
+        "merge_image_weight": 0.7,
+    },
+    {"mode": "tag_reconstruction", "clahe": CLAHE},
+]
+CONTRAST = ((20, 20, 20), (235, 235, 235))
+ISOLUMINANT = ((0, 200, 0), (117, 117, 117))
+
+
+def synthetic_set(width, height, count, color_share):
+    tag = cv2.imread(
+        pkg_resources.resource_filename("avena_commons.vision.data", "tag36h11-0.png"),
+        cv2.IMREAD_GRAYSCALE,
+    )
+    side = height // 7
+    border = side // 8
+    tag = cv2.resize(tag, (side - 2 * border,) * 2, interpolation=cv2.INTER_NEAREST)
+    dark = cv2.copyMakeBorder(tag, *(border,) * 4, cv2.BORDER_CONSTANT, value=255) < 128
+    rng = np.random.default_rng(0)
+    samples = []
+    for i in range(count):
+        kind = rng.random()
+        if kind < 0.05:
+            styles = [None] * 4
+        elif kind < 0.10:
+            styles = [CONTRAST, ISOLUMINANT, ISOLUMINANT, CONTRAST]
+        elif kind < 0.10 + color_share * 0.9:
+            styles = [ISOLUMINANT] * 4
+        else:
+            styles = [CONTRAST] * 4
+        color = rng.integers(90, 140, (height, width, 3), dtype=np.uint8)
+        centers = []
+        for j, style in enumerate(styles):
+            if style is None:
+                continue
+            x = width // 2 - side - side // 4 + (j % 2) * (side + side // 2)
+            y = height // 2 - side - side // 4 + (j // 2) * (side + side // 2)
+            x, y = x + int(rng.integers(-20, 21)), y + int(rng.integers(-20, 21))
+            patch = np.empty((side, side, 3), dtype=np.uint8)
+            patch[dark], patch[~dark] = style
+            color[y : y + side, x : x + side] = patch
+            centers.append((x + side / 2, y + side / 2))
+        depth = np.full((height, width), 500, dtype=np.uint16)
+        samples.append(({"color": color, "depth": depth}, centers))
+    return samples
+
+
+def load_set(directory):
+    with open(os.path.join(directory, "labels.json")) as file:
+        labels = json.load(file)
+    samples = []
+    for name, centers in sorted(labels.items()):
+        color = cv2.imread(os.path.join(directory, name))
+        depth = np.full(color.shape[:2], 500, dtype=np.uint16)
+        samples.append(({"color": color, "depth": depth}, centers))
+    return samples
+
+
+def score(detections, centers):
+    found = [d.center for d in detections or []]
+    matched = sum(
+        any(np.linalg.norm(np.subtract(f, c)) < 10 for f in found) for c in centers
+    )
+    extra = max(0, len(found) - matched)
+    return matched, extra
+
+
+def merge(found, detections):
+    for detection in detections or []:
+        if all(np.linalg.norm(detection.center - f.center) >= 10 for f in found):
+            found.append(detection)
+    return found
+
+
+def run(samples, camera_config, strategy):
+    samples_ms, matched, extra, solved, labelled = [], 0, 0, 0, 0
+    for frame, centers in samples:
+        start = time.process_time()
+        if strategy == "all":
+            detections = []
+            for step in STEPS:
+                found, _ = qr_detector(
+                    frame=frame,
+                    camera_config=camera_config,
+                    config={"qr_size": 0.1, **step},
+                )
+                detections = merge(detections, found)
+        else:
+            detections, debug_data = qr_detector(
+                frame=frame,
+                camera_config=camera_config,
+                config={
+                    "mode": "cascade",
+                    "qr_size": 0.1,
+                    "cascade": {"steps": STEPS, "reorder": strategy == "adaptive"},
+                },
+            )
+        samples_ms.append((time.process_time() - start) * 1e3)
+        frame_matched, frame_extra = score(detections, centers)
+        matched += frame_matched
+        extra += frame_extra
+        labelled += len(centers)
+        solved += frame_matched == len(centers) and frame_extra == 0
+    samples_ms.sort()
+    report = {
+        "solved": solved / len(samples),
+        "recall": matched / max(1, labelled),
+        "extra": extra,
+        "median_ms": statistics.median(samples_ms),
+        "p95_ms": samples_ms[int(len(samples_ms) * 0.95) - 1],
+    }
+    if strategy != "all":
+        report["stats"] = debug_data["cascade"]["stats"]
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--images", help="directory with images and labels.json")
+    parser.add_argument("--size", default="1280x800", help="camera resolution WxH")
+    parser.add_argument("--frames", type=int, default=100)
+    parser.add_argument("--color-share", type=float, default=0.2)
+    args = parser.parse_args()
+    width, height = (int(v) for v in args.size.split("x"))
+    if args.images:
+        samples = load_set(args.images)
+        height, width = samples[0][0]["color"].shape[:2]
+    else:
+        samples = synthetic_set(width, height, args.frames, args.color_share)
+
+    print(
+        f"{'strategy':<9} {'solved':>7} {'recall':>7} {'extra':>6} "
+        f"{'median ms':>10} {'p95 ms':>8}"
+    )
+    for strategy in ("all", "cascade", "adaptive"):
+        camera_config = {
+            "camera_ip": f"benchmark-{strategy}",
+            "camera_params": [width * 0.7, width * 0.7, width / 2, height / 2],
+            "distortion_coefficients": [0.0] * 5,
+            "debug_artifacts": {"enabled": False},
+        }
+        report = run(samples, camera_config, strategy)
+        print(
+            f"{strategy:<9} {report['solved']:>7.1%} {report['recall']:>7.1%} "
+            f"{report['extra']:>6} {report['median_ms']:>10.2f} "
+            f"{report['p95_ms']:>8.2f}"
+        )
+        for name, stats in report.get("stats", {}).items():
+            rate = stats["success_rate"]
+            print(
+                f"    {name:<32} runs {stats['runs']:>4}  solved "
+                f"{stats['solved']:>4}  rate {'-' if rate is None else f'{rate:.2f}'}"
+            )
+
+
+if __name__ == "__main__":
+    main()
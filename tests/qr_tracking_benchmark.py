@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+QR tracking benchmark - full-frame detection vs. ROI tracking across frames.
+
+Runs `qr_detector` on a synthetic sequence taken from one robot position
+(`--size`, four AprilTags with a few pixels of jitter, a short occlusion of
+one tag) and reports CPU time per frame (`time.process_time`, median / p95)
+for:
+
+- full: every frame is a full-frame detection (tracking disabled),
+- tracked: `QrTracker` plans ROIs around the previous tags, falls back to a
+  full-frame pass on the same frame when a tag is lost and forces a full
+  frame every `--full-frame-every` frames.
+
+Also reports frames where tracking found fewer tags than the full-frame run
+(a tag reappearing outside the tracked ROIs is picked up by the next full
+frame).
+
+Usage:
+    python tests/qr_tracking_benchmark.py
+    python tests/qr_tracking_benchmark.py --size 640x400 --frames 300
+"""
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+import avena_commons.vision.sorter as sorter
+from avena_commons.vision.detector import qr_detector
+from avena_commons.vision.detector.qr_tracker import QrTracker
+from debug_sink_benchmark import CONFIG, DISTORTION, make_frame
+
+KEY = ("supervisor_1", 177.5, -780.0, 510.0)
+
+
+def make_sequence(width, height, count):
+    """Frames with 0-2 px jitter and one tag covered in frames 43-47."""
+    base = make_frame(width, height, 0)
+    rng = np.random.default_rng(1)
+    frames = []
+    for i in range(count):
+        dx, dy = (int(v) for v in rng.integers(-2, 3, 2))
+        color = np.roll(base["color"], (dy, dx), axis=(0, 1))
+        if 43 <= i % 100 < 48:
+            color = color.copy()
+            color[height // 2 :, width // 2 :] = 110
+        frames.append({"color": color, "depth": base["depth"]})
+    return frames
+
+
+def run(frames, camera_config, tracker):
+    samples, found = [], []
+    for frame in frames:
+        start = time.process_time()
+        rois = tracker.plan(KEY)
+        config = CONFIG if rois is None else {**CONFIG, "track_rois": rois}
+        detections, _ = qr_detector(
+            frame=frame, camera_config=camera_config, config=config
+        )
+        detections = sorter.sort_qr_by_center_position(4, detections)
+        if rois is not None and tracker.check_lost(KEY, detections):
+            detections, _ = qr_detector(
+                frame=frame, camera_config=camera_config, config=CONFIG
+            )
+            detections = sorter.sort_qr_by_center_position(4, detections)
+            rois = None
+        tracker.update(KEY, detections, tracked=rois is not None)
+        samples.append(time.process_time() - start)
+        found.append(sum(1 for d in detections.values() if d is not None))
+    samples.sort()
+    return samples, found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", default="1280x800", help="camera resolution WxH")
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--full-frame-every", type=int, default=10)
+    args = parser.parse_args()
+    width, height = (int(v) for v in args.size.split("x"))
+    camera_config = {
+        "camera_params": [width * 0.7, width * 0.7, width / 2, height / 2],
+        "distortion_coefficients": DISTORTION,
+        "debug_artifacts": {"enabled": False},
+    }
+    frames = make_sequence(width, height, args.frames)
+
+    results = {}
+    for name, tracker in (
+        ("full", QrTracker(enabled=False)),
+        (
+            "tracked",
+            QrTracker(enabled=True, full_frame_every=args.full_frame_every),
+        ),
+    ):
+        samples, found = run(frames, camera_config, tracker)
+        results[name] = (samples, found, tracker.stats)
+
+    missed = sum(
+        tracked < full
+        for full, tracked in zip(results["full"][1], results["tracked"][1])
+    )
+    full_median = statistics.median(results["full"][0])
+    print(f"{'mode':<8} {'median ms':>10} {'p95 ms':>8} {'speedup':>8}  stats")
+    for name, (samples, _, stats) in results.items():
+        median = statistics.median(samples)
+        p95 = samples[int(len(samples) * 0.95) - 1]
+        print(
+            f"{name:<8} {median * 1e3:>10.2f} {p95 * 1e3:>8.2f} "
+            f"{full_median / median:>7.1f}x  {stats}"
+        )
+    print(f"frames with fewer tags when tracked: {missed}/{len(frames)}")
+
+
+if __name__ == "__main__":
+    main()
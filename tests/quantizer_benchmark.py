@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Quantizer throughput benchmark - scalar branch cascade vs precomputed boundaries.
+
+For every quantizer reports values/s of:
+- the original scalar cascade (_quantize_cascade) called per element,
+- scalar quantize() (bisect over precomputed boundaries),
+- quantize_array() (numpy searchsorted),
+and dequantize() per element vs dequantize_array().
+
+Usage:
+    python tests/quantizer_benchmark.py
+    python tests/quantizer_benchmark.py --size 1000000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from avena_commons.util.quantizer import (
+    QuantizerLinear,
+    QuantizerLogPower,
+    QuantizerPolynomial,
+    QuantizerTanh,
+)
+
+
+def _rate(func, count: int) -> float:
+    start = time.perf_counter()
+    func()
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=200_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    x_values = rng.uniform(-7.0, 7.0, args.size)
+    x_list = x_values.tolist()
+
+    quantizers = {
+        "LogPower(33, 3)": QuantizerLogPower(num_intervals=33, power=3),
+        "Tanh(33, 2.0)": QuantizerTanh(-6.0, 6.0, 33, 2.0),
+        "Linear(33)": QuantizerLinear(-6.0, 6.0, 33),
+        "Polynomial(33, 2)": QuantizerPolynomial(-6.0, 6.0, 33, 2),
+    }
+
+    print(
+        f"{'quantizer':>18} | {'cascade':>12} {'bisect':>12} {'array':>12} | "
+        f"{'dequant':>12} {'dequant arr':>12}   [values/s]"
+    )
+    for name, quantizer in quantizers.items():
+        cascade = _rate(
+            lambda: [quantizer._quantize_cascade(x) for x in x_list], len(x_list)
+        )
+        scalar = _rate(lambda: [quantizer.quantize(x) for x in x_list], len(x_list))
+        vectorized = _rate(lambda: quantizer.quantize_array(x_values), len(x_list))
+        quants = quantizer.quantize_array(x_values)
+        quant_list = quants.tolist()
+        dequant = _rate(
+            lambda: [quantizer.dequantize(q) for q in quant_list], len(x_list)
+        )
+        dequant_array = _rate(lambda: quantizer.dequantize_array(quants), len(x_list))
+        print(
+            f"{name:>18} | {cascade:>12.3g} {scalar:>12.3g} {vectorized:>12.3g} | "
+            f"{dequant:>12.3g} {dequant_array:>12.3g}"
+        )
+
+
+if __name__ == "__main__":
+    main()
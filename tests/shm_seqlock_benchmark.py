@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+AvenaComm benchmark - pickle mode vs structured (seqlock) mode.
+
+Measures write and read operations per second for payloads from 64 B to 1 MB.
+Pickle mode serializes the whole object under a posix semaphore, seqlock mode
+copies a fixed-layout numpy record in place without semaphore and pickling.
+
+Usage:
+    python tests/shm_seqlock_benchmark.py
+    python tests/shm_seqlock_benchmark.py --duration 2.0
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+from avena_commons.connection import AvenaComm
+
+PAYLOAD_SIZES = [64, 1024, 16 * 1024, 256 * 1024, 1024 * 1024]
+
+
+def _ops_per_second(func, duration: float) -> float:
+    count = 0
+    start = time.perf_counter()
+    end = start + duration
+    while time.perf_counter() < end:
+        for _ in range(100):
+            func()
+        count += 100
+    return count / (time.perf_counter() - start)
+
+
+def bench_pickle(size: int, duration: float):
+    name = f"bench_pickle_{os.getpid()}_{size}"
+    payload = np.zeros(size // 8, dtype=np.float64)
+    comm = AvenaComm(comm_name=name, shm_size=size + 4096, data=payload)
+
+    def write():
+        comm.semaphore_lock()
+        comm.save_and_unlock(payload)
+
+    def read():
+        comm.lock_and_read()
+        comm.semaphore_unlock()
+
+    try:
+        return _ops_per_second(write, duration), _ops_per_second(read, duration)
+    finally:
+        comm.clear()
+
+
+def bench_seqlock(size: int, duration: float):
+    name = f"bench_seqlock_{os.getpid()}_{size}"
+    schema = np.dtype([("payload", np.float64, (size // 8,))])
+    payload = np.zeros(size // 8, dtype=np.float64)
+    comm = AvenaComm(comm_name=name, schema=schema)
+
+    def write():
+        comm.update_fields(payload=payload)
+
+    def read():
+        comm.lock_and_read()
+
+    try:
+        return _ops_per_second(write, duration), _ops_per_second(read, duration)
+    finally:
+        comm.clear()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--duration", type=float, default=1.0)
+    args = parser.parse_args()
+
+    print(
+        f"{'payload':>10} | {'pickle write':>14} {'pickle read':>14} | "
+        f"{'seqlock write':>14} {'seqlock read':>14} | {'read speedup':>12}"
+    )
+    for size in PAYLOAD_SIZES:
+        p_write, p_read = bench_pickle(size, args.duration)
+        s_write, s_read = bench_seqlock(size, args.duration)
+        print(
+            f"{size:>9}B | {p_write:>12.0f}/s {p_read:>12.0f}/s | "
+            f"{s_write:>12.0f}/s {s_read:>12.0f}/s | {s_read / p_read:>11.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
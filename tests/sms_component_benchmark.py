@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+SmsComponent benchmark - orchestrator tick jitter during an SMS alert storm.
+
+A 100 Hz ticker stands in for the orchestrator loop while `--messages` alerts
+(`--recipients` numbers each; every alert fires twice in a row, as a scenario
+re-triggered on the next tick would, so half are duplicates) are sent to a local stub MultiInfo gateway (aiohttp, own thread and event loop)
+that answers every request after `--latency` ms. Variants:
+- blocking: the previous behaviour - `requests.get` called in the event loop,
+  new connection per request,
+- queued: `SmsComponent.send_sms` (bounded queue, `concurrency` workers sharing
+  one aiohttp session, dedup window).
+Reports tick lateness (p50 / p99 / max), time until the gateway received every
+SMS, gateway requests and TCP connections.
+
+Usage:
+    python tests/sms_component_benchmark.py
+    python tests/sms_component_benchmark.py --messages 500 --latency 20 --concurrency 8
+"""
+
+import argparse
+import asyncio
+import threading
+import time
+
+import requests
+from aiohttp import web
+
+from avena_commons.orchestrator.components.sms_component import SmsComponent
+
+TICK = 0.01
+
+
+class StubSmsGateway:
+    """MultiInfo sendsms endpoint answering after a fixed delay (own thread)."""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.requests = 0
+        self.connections = set()
+        self.loop = asyncio.new_event_loop()
+        ready = threading.Event()
+        threading.Thread(target=self._run, args=(ready,), daemon=True).start()
+        ready.wait()
+
+    def _run(self, ready):
+        asyncio.set_event_loop(self.loop)
+        app = web.Application()
+        app.router.add_get("/sendsms.aspx", self._send)
+        runner = web.AppRunner(app, access_log=None)
+        self.loop.run_until_complete(runner.setup())
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        self.loop.run_until_complete(site.start())
+        self.url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/"
+        ready.set()
+        self.loop.run_forever()
+
+    async def _send(self, request):
+        self.connections.add(request.transport.get_extra_info("peername"))
+        await asyncio.sleep(self.latency)
+        self.requests += 1
+        return web.Response(text=f"0\n{self.requests}\n")
+
+
+class NullLogger:
+    def _noop(self, *args, **kwargs):
+        pass
+
+    debug = info = warning = error = _noop
+
+
+async def measure_ticks(stop, lateness):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lateness.append(time.perf_counter() - start - TICK)
+
+
+def send_blocking(url, dest, text):
+    """Previous SmsComponent.send_sms body for one recipient and segment."""
+    params = {"login": "l", "password": "p", "serviceId": 1, "orig": "AVENA"}
+    requests.get(
+        url + "sendsms.aspx", params={**params, "dest": dest, "text": text}, timeout=30
+    )
+
+
+async def run(variant, args, gateway):
+    lateness = []
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(measure_ticks(stop, lateness))
+    await asyncio.sleep(TICK * 5)
+    requests_before = gateway.requests
+    connections_before = len(gateway.connections)
+    alerts = [
+        (
+            [f"5000{(i // 2 + r) % 100000:05d}" for r in range(args.recipients)],
+            f"alarm {i // 2}",
+        )
+        for i in range(args.messages)
+    ]
+    start = time.perf_counter()
+
+    if variant == "blocking":
+        for numbers, text in alerts:
+            for number in numbers:
+                send_blocking(gateway.url, "48" + number, text)
+            await asyncio.sleep(0)  # scenariusz oddaje sterowanie między akcjami
+    else:
+        sms = SmsComponent(
+            "sms",
+            {
+                "url": gateway.url,
+                "login": "l",
+                "password": "p",
+                "serviceId": "1",
+                "source": "AVENA",
+                "enabled": True,
+                "concurrency": args.concurrency,
+                "queue_size": args.messages * args.recipients,
+            },
+            message_logger=NullLogger(),
+        )
+        await sms.initialize()
+        for numbers, text in alerts:
+            await sms.send_sms(numbers, text)
+            await asyncio.sleep(0)
+        await sms.disconnect(drain_timeout=600)
+
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await ticker
+    lateness.sort()
+    return {
+        "tick p50 ms": lateness[len(lateness) // 2] * 1e3,
+        "tick p99 ms": lateness[int(len(lateness) * 0.99)] * 1e3,
+        "tick max ms": lateness[-1] * 1e3,
+        "total s": elapsed,
+        "requests": gateway.requests - requests_before,
+        "connections": len(gateway.connections) - connections_before,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--recipients", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument(
+        "--latency", type=float, default=10.0, help="gateway reply delay in ms"
+    )
+    args = parser.parse_args()
+
+    gateway = StubSmsGateway(args.latency / 1e3)
+    results = {
+        variant: asyncio.run(run(variant, args, gateway))
+        for variant in ("blocking", "queued")
+    }
+
+    print(
+        f"{args.messages} alerts x {args.recipients} recipients, gateway latency "
+        f"{args.latency} ms, concurrency {args.concurrency}, 100 Hz ticker"
+    )
+    columns = list(results["blocking"])
+    print(f"{'variant':<10}" + "".join(f"{c:>14}" for c in columns))
+    for label, row in results.items():
+        print(f"{label:<10}" + "".join(f"{row[c]:>14.1f}" for c in columns))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Tag reconstruction benchmark - contour matching and reference tag shapes.
+
+Compares the legacy `find_similar_contours` (cv2.matchShapes for every
+scene/reference pair) with vectorised Hu-moment scoring on synthetic ROIs with
+hundreds of contours (noise, blobs, rectangles and pasted AprilTags), checks
+that both return the same matches, and times `reconstruct_tags` with the
+per-call `create_reference_tag_shapes` vs. the process cache.
+
+Usage:
+    python tests/tag_reconstruction_benchmark.py
+    python tests/tag_reconstruction_benchmark.py --contours 800 --repeat 50
+"""
+
+import argparse
+import importlib
+import statistics
+import time
+
+import cv2
+import numpy as np
+import pkg_resources
+
+import avena_commons.vision.tag_reconstruction as tag_reconstruction
+
+reconstruct_tags_module = importlib.import_module(
+    "avena_commons.vision.tag_reconstruction.reconstruct_tags"
+)
+
+
+def legacy_find_similar_contours(scene_contours, reference_contours, threshold=0.1):
+    similar_cnts = [[] for _ in reference_contours]
+    for scene_cnt in scene_contours:
+        best_match = {"score": float("inf"), "index": None}
+        for i, reference_cnt in enumerate(reference_contours):
+            score = cv2.matchShapes(
+                reference_cnt, scene_cnt, cv2.CONTOURS_MATCH_I3, 0.0
+            )
+            if score < best_match["score"]:
+                best_match["score"] = score
+                if score < threshold:
+                    best_match["index"] = i
+        if best_match["index"] is not None:
+            similar_cnts[best_match["index"]].append(scene_cnt)
+    return similar_cnts
+
+
+def make_scene(tag, contours, seed):
+    """Binary ROI with roughly `contours` components and two pasted tags."""
+    rng = np.random.default_rng(seed)
+    image = np.zeros((480, 640), dtype=np.uint8)
+    gray = cv2.cvtColor(cv2.resize(tag, (120, 120)), cv2.COLOR_BGR2GRAY)
+    image[40:160, 40:160] = 255 - gray
+    image[300:420, 450:570] = 255 - gray
+    for _ in range(contours):
+        x, y = int(rng.integers(0, 640)), int(rng.integers(0, 480))
+        if rng.random() < 0.5:
+            axes = tuple(int(a) for a in rng.integers(1, 10, 2))
+            cv2.ellipse(
+                image, (x, y), axes, float(rng.uniform(0, 180)), 0, 360, 255, -1
+            )
+        else:
+            box = cv2.boxPoints((
+                (x, y),
+                tuple(rng.uniform(2, 20, 2)),
+                rng.uniform(0, 90),
+            ))
+            cv2.fillPoly(image, [box.astype(np.int32)], 255)
+    return tag_reconstruction.find_scenes_contours(image)
+
+
+def timed(function, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--contours", type=int, default=400, help="blobs per ROI")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    tag = cv2.imread(
+        pkg_resources.resource_filename("avena_commons.vision.data", "tag36h11-0.png")
+    )
+    gray = cv2.cvtColor(tag, cv2.COLOR_BGR2GRAY)
+    references = tag_reconstruction.create_reference_tag_shapes(gray)["ref_cnts"]
+
+    print(f"{'scene':<8} {'contours':>9} {'legacy ms':>10} {'hu ms':>8} {'speedup':>8}")
+    for seed in range(4):
+        scene = make_scene(tag, args.contours, seed)
+        legacy = legacy_find_similar_contours(scene, references)
+        current = tag_reconstruction.find_similar_contours(scene, references)
+        assert [[id(c) for c in group] for group in legacy] == [
+            [id(c) for c in group] for group in current
+        ], "matches differ"
+        legacy_ms = timed(
+            lambda: legacy_find_similar_contours(scene, references), args.repeat
+        )
+        current_ms = timed(
+            lambda: tag_reconstruction.find_similar_contours(scene, references),
+            args.repeat,
+        )
+        print(
+            f"{seed:<8} {len(scene):>9} {legacy_ms:>10.2f} {current_ms:>8.2f} "
+            f"{legacy_ms / current_ms:>7.1f}x"
+        )
+
+    create_ms = timed(
+        lambda: tag_reconstruction.create_reference_tag_shapes(
+            cv2.cvtColor(tag, cv2.COLOR_BGR2GRAY)
+        ),
+        args.repeat,
+    )
+    reconstruct_tags_module._get_reference_tag_shapes(tag)
+    cached_ms = timed(
+        lambda: reconstruct_tags_module._get_reference_tag_shapes(tag), args.repeat
+    )
+    print(f"reference shapes: create {create_ms:.2f} ms, cached {cached_ms:.3f} ms")
+
+    rng = np.random.default_rng(0)
+    frame = rng.integers(90, 140, (800, 1280, 3), dtype=np.uint8)
+    print(
+        "reconstruct_tags 1280x800: "
+        f"{timed(lambda: tag_reconstruction.reconstruct_tags(frame, tag), args.repeat):.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
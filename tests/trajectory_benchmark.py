@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Trajectory time-scaling benchmark - util.utils limit_vel/limit_acc pipeline.
+
+Reports time of calculate_factors, ramp_smoothing, interpolate_rconfigs,
+calculate_derivative and the full limit_vel_acc() pass for trajectories with
+1k, 100k and 1M samples. With --reference the previous loop/np.append
+implementations are timed as well (only for sizes up to --reference-max, they
+are quadratic).
+
+Usage:
+    python tests/trajectory_benchmark.py
+    python tests/trajectory_benchmark.py --reference --reference-max 100000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from avena_commons.util.utils import (
+    build_pose_index,
+    calculate_derivative,
+    calculate_factor,
+    calculate_factors,
+    find_closest_pose,
+    interpolate,
+    interpolate_rconfigs,
+    limit_vel_acc,
+    ramp_smoothing,
+)
+
+DT = 0.004
+SIZES = [1_000, 100_000, 1_000_000]
+
+
+def reference_calculate_factors(times, data, dt, limit, power):
+    _time = times[-1] - times[0]
+    _begin = times[0]
+    _current_time = _begin
+    _factors = np.empty(shape=[0, 1], dtype=np.float64)
+    while _begin + _time > _current_time:
+        if times[-1] < _current_time:
+            break
+        _factor = min(1.0, calculate_factor(times, data, _current_time, limit, power))
+        _current_time += dt
+        _factors = np.append(_factors, _factor)
+    return _factors
+
+
+def reference_interpolate_rconfigs(times, rconfigs, factors, dt):
+    duration = dt * len(rconfigs)
+    _current_time = 0.0
+    o_times = np.empty(shape=[0, 1], dtype=np.float64)
+    o_rconfigs = np.empty(shape=[0, 6], dtype=np.float64)
+    while duration > _current_time:
+        o_rconfigs = np.append(
+            o_rconfigs, [interpolate(times, rconfigs, _current_time)], axis=0
+        )
+        o_times = np.append(o_times, len(o_times) * dt)
+        _current_time = _current_time + dt * interpolate(times, factors, _current_time)
+    return o_times, o_rconfigs
+
+
+def _timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def _trajectory(samples):
+    times = np.arange(samples) * DT
+    rconfigs = np.sin(times[:, None] * np.linspace(0.5, 3.0, 6))
+    return times, rconfigs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--reference", action="store_true")
+    parser.add_argument("--reference-max", type=int, default=10_000)
+    args = parser.parse_args()
+
+    for samples in SIZES:
+        times, rconfigs = _trajectory(samples)
+        ang_vel, t_deriv = _timed(calculate_derivative, rconfigs, DT)
+        factors, t_factors = _timed(calculate_factors, times, ang_vel, DT, 1.0, 1)
+        ramp, t_ramp = _timed(ramp_smoothing, factors, 0.005)
+        ramp = np.append(ramp, 1.0)
+        _, t_interp = _timed(interpolate_rconfigs, times, rconfigs, ramp, DT)
+        _, t_full = _timed(limit_vel_acc, times, rconfigs, DT, 1.0, 2.0)
+        index, t_index = _timed(build_pose_index, rconfigs)
+        queries = rconfigs[:: max(samples // 100, 1)]
+        _, t_query = _timed(
+            lambda: [find_closest_pose(q, rconfigs, index) for q in queries]
+        )
+
+        print(f"samples={samples}")
+        print(
+            f"  calculate_derivative {t_deriv:9.2f} ms | calculate_factors {t_factors:9.2f} ms | "
+            f"ramp_smoothing {t_ramp:9.2f} ms | interpolate_rconfigs {t_interp:9.2f} ms"
+        )
+        print(
+            f"  limit_vel_acc {t_full:9.2f} ms | KD-tree build {t_index:9.2f} ms, "
+            f"{len(queries)} queries {t_query:9.2f} ms"
+        )
+
+        if args.reference and samples <= args.reference_max:
+            _, r_factors = _timed(
+                reference_calculate_factors, times, ang_vel, DT, 1.0, 1
+            )
+            _, r_interp = _timed(
+                reference_interpolate_rconfigs, times, rconfigs, ramp, DT
+            )
+            print(
+                f"  reference: calculate_factors {r_factors:9.2f} ms | "
+                f"interpolate_rconfigs {r_interp:9.2f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
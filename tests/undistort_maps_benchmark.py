@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Undistort benchmark - per-frame `cv2.undistort` vs. cached maps + `cv2.remap`.
+
+Runs both variants the way the QR and box detectors do it for every frame on
+the PNG images in `resources/` (color frames and their binary masks), at the
+native size and resized to the camera resolution (`--size`):
+
+- legacy: build the camera matrix and distortion array, then `cv2.undistort`
+  (which recomputes the undistortion maps internally),
+- cached: `get_undistort_maps` (process cache hit) and `undistort_remap`.
+
+Also reports the one-off cost of computing the maps (cache miss) and checks
+that both variants give identical pixels.
+
+Usage:
+    python tests/undistort_maps_benchmark.py
+    python tests/undistort_maps_benchmark.py --size 640x400 --repeat 50
+"""
+
+import argparse
+import statistics
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from avena_commons.vision.camera import (
+    create_camera_distortion,
+    create_camera_matrix,
+    get_undistort_maps,
+)
+from avena_commons.vision.image_preprocess import undistort, undistort_remap
+
+RESOURCES = Path(__file__).resolve().parents[1] / "resources"
+DISTORTION = [0.082, -0.213, 0.0011, -0.0017, 0.104]
+
+
+def camera_params_for(width, height):
+    return [width * 0.7, width * 0.7, width / 2, height / 2]
+
+
+def legacy(image, camera_params):
+    camera_matrix = create_camera_matrix(camera_params)
+    camera_distortion = create_camera_distortion(DISTORTION)
+    return undistort(image, camera_matrix, camera_distortion)
+
+
+def cached(image, camera_params):
+    height, width = image.shape[:2]
+    maps = get_undistort_maps(camera_params, DISTORTION, (width, height))
+    return undistort_remap(image, maps)
+
+
+def time_per_frame(func, images, camera_params, repeat):
+    samples = []
+    for _ in range(repeat):
+        for image in images:
+            start = time.perf_counter()
+            func(image, camera_params)
+            samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1e3
+
+
+def load_images(size):
+    paths = sorted(RESOURCES.rglob("*.png"))
+    colors = [cv2.imread(str(p)) for p in paths]
+    colors = [c for c in colors if c is not None]
+    if size is not None:
+        colors = [cv2.resize(c, size, interpolation=cv2.INTER_LINEAR) for c in colors]
+    masks = [
+        np.where(cv2.cvtColor(c, cv2.COLOR_BGR2GRAY) > 100, 255, 0).astype(np.uint8)
+        for c in colors
+    ]
+    return colors, masks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", default="1280x800", help="camera resolution WxH")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    camera_size = tuple(int(v) for v in args.size.split("x"))
+
+    print(f"{'images':<22} {'n':>3} {'legacy ms':>10} {'cached ms':>10} {'speedup':>8}")
+    for label, size in (("native", None), (args.size, camera_size)):
+        colors, masks = load_images(size)
+        height, width = colors[0].shape[:2]
+        camera_params = camera_params_for(width, height)
+
+        start = time.perf_counter()
+        get_undistort_maps(camera_params, DISTORTION, (width, height))
+        miss_ms = (time.perf_counter() - start) * 1e3
+
+        for kind, images in (("color", colors), ("mask", masks)):
+            for image in images:
+                assert np.array_equal(
+                    legacy(image, camera_params), cached(image, camera_params)
+                )
+            old = time_per_frame(legacy, images, camera_params, args.repeat)
+            new = time_per_frame(cached, images, camera_params, args.repeat)
+            name = f"{kind} {width}x{height} ({label})"
+            print(
+                f"{name:<22} {len(images):>3} {old:>10.3f} {new:>10.3f} {old / new:>7.1f}x"
+            )
+        print(f"{'maps (cache miss)':<22} {'':>3} {'':>10} {miss_ms:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
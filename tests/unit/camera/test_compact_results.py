@@ -0,0 +1,126 @@
+"""
+Testy zwartych wyników zadań puli i danych debug na żądanie w workerze kamery.
+
+Zakres:
+- zadania puli zwracają `DetectorResult`, pozycje QR takie same jak
+  z pełnymi wynikami (`compact_results = False`),
+- pudełko ze zwartego wyniku daje tę samą pozę co pełny wynik,
+- GET_DEBUG_DATA: pełne wyniki z `debug_data` dla zachowanej ramki (także
+  z ROI trackera), brak danych dla ramki spoza `debug_frames_limit`,
+  numery ramek z kamery lub kolejne numery workera, domyślnie brak
+  zachowanych ramek (`debug_frames = 0`).
+"""
+
+import asyncio
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from avena_commons.camera.driver.general import GeneralCameraWorker
+from avena_commons.vision.detector import qr_detector
+from avena_commons.vision.detector.compact_result import DetectorResult
+from avena_commons.vision.detector.qr_tracker import QrTracker
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "vision"))
+from test_qr_tracker import CAMERA_CONFIG, CONFIG, tag_frame  # noqa: E402
+
+KEY = (1, 177.5, -780.0, 510.0, 180.0, 0.0, 180.0)
+BOX_CORNERS = [[220.0, 280.0], [420.0, 280.0], [420.0, 130.0], [220.0, 130.0]]
+
+
+def box_detector(*, frame, camera_config, config):
+    """Detektor testowy w formacie wyniku box_detector."""
+    image = frame["color"].copy()
+    return (320.0, 205.0), BOX_CORNERS, 0.0, 0.8, image, {"box_mask": image}
+
+
+def make_worker(detector=qr_detector, detector_name="qr_detector", **settings):
+    results = []
+    worker = GeneralCameraWorker()
+    worker.detector_name = detector_name
+    worker.executor = ThreadPoolExecutor(max_workers=1)
+    worker.camera_configuration = CAMERA_CONFIG
+    worker.postprocess_configuration = {"a": CONFIG}
+    worker.image_processing_workers = [{"detector": detector, "config": CONFIG}]
+    worker.qr_tracker = QrTracker.from_settings(settings.pop("qr_tracking", {}))
+    for name, value in settings.items():
+        setattr(worker, name, value)
+    submit = worker.executor.submit
+
+    # Wyniki zadań puli w postaci, w jakiej wracają do workera
+    def capture(*args, **kwargs):
+        future = submit(*args, **kwargs)
+        future.add_done_callback(lambda f: results.append(f.result()))
+        return future
+
+    worker.executor.submit = capture
+    return worker, results
+
+
+def run(worker, frame, track_key=None):
+    asyncio.run(worker._run_image_processing_workers(frame, track_key=track_key))
+    return worker.last_result
+
+
+def test_pool_returns_compact_qr_results():
+    compact, results = make_worker()
+    full, full_results = make_worker(compact_results=False)
+
+    positions = run(compact, tag_frame())
+    expected = run(full, tag_frame())
+
+    assert isinstance(results[0], DetectorResult) and len(results[0].tags) == 4
+    assert isinstance(full_results[0], tuple) and full_results[0][1]
+    assert positions.keys() == expected.keys()
+    for position, pose in expected.items():
+        assert positions[position] == pytest.approx(pose)
+
+
+def test_compact_box_pose_matches_full_result():
+    compact, results = make_worker(box_detector, "box_detector")
+    full, _ = make_worker(box_detector, "box_detector", compact_results=False)
+
+    pose = run(compact, tag_frame())
+
+    assert results[0].box.corners[0] == tuple(BOX_CORNERS[0])
+    assert pose == pytest.approx(run(full, tag_frame()))
+
+
+def test_debug_data_on_request():
+    worker, _ = make_worker(debug_frames_limit=2)
+    frames = [{**tag_frame(seed=seed), "number": 10 + seed} for seed in range(3)]
+    for frame in frames:
+        run(worker, frame)
+
+    debug_data = asyncio.run(worker._fetch_debug_data())
+    older = asyncio.run(worker._fetch_debug_data(11))
+
+    assert debug_data["frame_id"] == worker.last_frame_id == 12
+    detections, data = debug_data["results"][0]
+    assert len(detections) == 4 and "qr_image_undistorted" in data
+    assert older["frame_id"] == 11
+    assert asyncio.run(worker._fetch_debug_data(10)) is None
+    assert list(worker.debug_frames) == [11, 12]
+
+
+def test_debug_data_uses_tracker_rois():
+    worker, _ = make_worker(qr_tracking={"enabled": True}, debug_frames_limit=1)
+    for _ in range(2):
+        run(worker, tag_frame(), track_key=KEY)
+
+    _, data = asyncio.run(worker._fetch_debug_data())["results"][0]
+
+    assert data["track_rois"] == worker.debug_frames[worker.last_frame_id][1]
+    assert "qr_image_undistorted" not in data
+
+
+def test_frame_numbers_without_camera_number_and_store_disabled_by_default():
+    worker, _ = make_worker()
+    run(worker, tag_frame())
+    run(worker, tag_frame())
+
+    assert worker.last_frame_id == 1
+    assert not worker.debug_frames
+    assert asyncio.run(worker._fetch_debug_data()) is None
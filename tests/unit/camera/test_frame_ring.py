@@ -0,0 +1,215 @@
+"""
+Testy jednostkowe pierścienia ramek kamery w pamięci współdzielonej.
+
+Zakres:
+- zapis i odczyt ramek przez uchwyt (widoki tylko do odczytu i kopie),
+- liczniki referencji: zajęte sloty nie są nadpisywane, pełny pierścień odrzuca ramkę,
+- wykrywanie nadpisanych slotów i usuniętego pierścienia (StaleFrameError),
+- worker kamery: przypinanie ramki dla GET_LAST_FRAME i detektory w puli procesów,
+- wirtualna kamera w osobnym procesie: GET_LAST_FRAME zwraca uchwyt, a nie obrazy.
+"""
+
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import posix_ipc
+import psutil
+import pytest
+
+from avena_commons.camera.driver.frame_ring import (
+    FrameHandle,
+    FrameRing,
+    StaleFrameError,
+    run_detector_on_frame,
+)
+from avena_commons.camera.driver.virtual import VirtualCamera, VirtualCameraWorker
+
+SETTINGS = {"color": {"width": 64, "height": 40, "fps": 0}}
+
+
+def make_frames(number, height=40, width=64):
+    return {
+        "timestamp": 1000.0 + number,
+        "number": number,
+        "color": np.full((height, width, 3), number % 256, dtype=np.uint8),
+        "depth": np.full((height, width), number, dtype=np.uint16),
+    }
+
+
+def mean_depth(*, frame, camera_config, config):
+    """Detektor testowy - zwraca numer ramki i średnią głębię."""
+    return frame["number"], float(frame["depth"].mean()), config["id"]
+
+
+@pytest.fixture
+def ring():
+    ring = FrameRing.create(make_frames(0), slots=3, prefix="test_frames")
+    yield ring
+    ring.close()
+
+
+def test_write_and_read_roundtrip(ring):
+    """Odczyt przez uchwyt zwraca zapisane ramki i metadane."""
+    handle = ring.write(make_frames(7))
+
+    frame = FrameRing.attach_cached(handle).read(handle)
+
+    assert frame["number"] == 7
+    assert frame["timestamp"] == 1007.0
+    assert frame["color"].shape == (40, 64, 3)
+    np.testing.assert_array_equal(frame["depth"], make_frames(7)["depth"])
+    assert not frame["depth"].flags.writeable
+    copied = ring.read(handle, copy=True)
+    assert copied["depth"].flags.writeable
+
+
+def test_handle_is_small_when_pickled(ring):
+    """Przez pipe idzie uchwyt, a nie obrazy."""
+    frames = make_frames(1)
+    handle = ring.write(frames)
+
+    assert len(pickle.dumps(handle)) < 1024
+    assert len(pickle.dumps(frames)) > frames["color"].nbytes
+
+
+def test_referenced_slot_is_not_overwritten(ring):
+    """Slot z referencją jest pomijany, a pełny pierścień odrzuca ramkę."""
+    held = ring.write(make_frames(1))
+    assert ring.acquire(held)
+
+    handles = [ring.write(make_frames(n)) for n in range(2, 6)]
+
+    assert all(h.slot != held.slot for h in handles)
+    assert ring.read(held)["number"] == 1
+    assert ring.refcount(held.slot) == 1
+
+    for h in handles[-2:]:
+        assert ring.acquire(h)
+    assert ring.write(make_frames(6)) is None
+    assert ring.dropped_frames == 1
+
+    ring.release(held)
+    assert ring.refcount(held.slot) == 0
+    assert ring.write(make_frames(7)).slot == held.slot
+
+
+def test_overwritten_slot_is_stale(ring):
+    """Uchwyt nadpisanego slotu nie daje się odczytać ani przypiąć."""
+    old = ring.write(make_frames(1))
+    for n in range(2, 5):
+        ring.write(make_frames(n))
+
+    with pytest.raises(StaleFrameError):
+        ring.read(old)
+    assert not ring.acquire(old)
+
+
+def test_closed_ring_cannot_be_attached():
+    """Po zamknięciu przez właściciela uchwyt wskazuje nieistniejący segment."""
+    ring = FrameRing.create(make_frames(0), slots=2, prefix="test_frames")
+    handle = ring.write(make_frames(1))
+    ring.close()
+
+    with pytest.raises(StaleFrameError):
+        FrameRing.attach_cached(handle)
+
+
+def test_detector_reads_frame_in_pool_process(ring):
+    """Procesy puli czytają ramkę z pierścienia po nazwie."""
+    handle = ring.write(make_frames(3))
+
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        futures = [
+            executor.submit(
+                run_detector_on_frame,
+                mean_depth,
+                frame_handle=handle,
+                camera_config={},
+                config={"id": i},
+            )
+            for i in range(4)
+        ]
+        results = sorted(f.result(timeout=30) for f in futures)
+
+    assert results == [(3, 3.0, i) for i in range(4)]
+
+
+@pytest.mark.asyncio
+async def test_worker_pins_lent_frame_and_releases_after_detectors():
+    """GET_LAST_FRAME przypina slot, a zadania detektorów trzymają go do końca."""
+    worker = VirtualCameraWorker()
+    assert await worker.init_camera(SETTINGS)
+    await worker.start_camera()
+    worker.camera_configuration = SETTINGS
+    try:
+        worker.last_frame = worker._publish_frame(
+            await worker.grab_frames_from_camera()
+        )
+        lent = worker._lend_last_frame()
+        assert isinstance(lent, FrameHandle)
+        assert worker.frame_ring.refcount(lent.slot) == 1
+
+        # Kolejne ramki omijają przypięty slot
+        for _ in range(5):
+            worker.last_frame = worker._publish_frame(
+                await worker.grab_frames_from_camera()
+            )
+        assert worker.frame_ring.read(lent)["number"] == lent.number
+
+        worker.executor = ProcessPoolExecutor(max_workers=2)
+        futures = [
+            worker._submit_detector({"detector": mean_depth, "config": {"id": i}}, lent)
+            for i in range(4)
+        ]
+        results = [f.result(timeout=30) for f in futures]
+        assert {r[0] for r in results} == {lent.number}
+        worker.executor.shutdown(wait=True)
+        assert worker.frame_ring.refcount(lent.slot) == 1
+
+        # Następny GET_LAST_FRAME zwalnia poprzednio pożyczony slot
+        assert worker._lend_last_frame() != lent
+        assert worker.frame_ring.refcount(lent.slot) == 0
+    finally:
+        worker._close_frame_ring()
+
+
+@pytest.mark.asyncio
+async def test_worker_without_ring_passes_frames():
+    """frame_ring_slots = 0 zachowuje przesyłanie ramek przez pipe."""
+    worker = VirtualCameraWorker()
+    await worker.init_camera({**SETTINGS, "frame_ring_slots": 0})
+    await worker.start_camera()
+
+    frames = await worker.grab_frames_from_camera()
+
+    assert worker._publish_frame(frames) is frames
+    assert worker.frame_ring is None
+
+
+def test_virtual_camera_returns_frames_through_ring():
+    """Konektor odczytuje ramki z pierścienia i przekazuje uchwyt do postprocessu."""
+    camera = VirtualCamera(core=0)
+    frame = None
+    try:
+        assert camera.init({"color": {"width": 64, "height": 40, "fps": 100}})
+        assert camera.start()
+        deadline = time.monotonic() + 10
+        while frame is None and time.monotonic() < deadline:
+            frame = camera.get_last_frame()
+            time.sleep(0.01)
+
+        assert isinstance(frame["handle"], FrameHandle)
+        assert frame["color"].shape == (40, 64, 3)
+        assert frame["depth"].dtype == np.uint16
+        assert frame["number"] == frame["handle"].number
+    finally:
+        camera.stop()
+        # Worker nie ma komendy zakończenia; razem z nim kończymy proces loggera
+        worker = psutil.Process(camera._process.pid)
+        for process in [*worker.children(recursive=True), worker]:
+            process.kill()
+        camera._process.join(timeout=5)
+        if frame is not None:
+            posix_ipc.unlink_shared_memory(frame["handle"].ring_name)
@@ -0,0 +1,117 @@
+"""
+Testy śledzenia tagów QR w workerze kamery na nagranych sekwencjach ramek.
+
+Zakres:
+- sekwencja: tagi nieruchome, przesunięte, zasłonięty tag, powrót tagu -
+  ROI po pierwszej pełnej detekcji, pełna detekcja tej samej ramki po zgubieniu
+  tagu, powrót do ROI po odzyskaniu śledzenia, statystyki trackera,
+- pozycje z ramek śledzonych zgodne z pozycjami bez śledzenia,
+- brak klucza śledzenia lub tracker wyłączony - zawsze pełna detekcja,
+- liczba tagów oczekiwana na zdjęciu trafia do konfiguracji detektora QR
+  ('expected_count' kaskady trybów).
+"""
+
+import asyncio
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from avena_commons.camera.driver.general import GeneralCameraWorker
+from avena_commons.vision.detector import qr_detector
+from avena_commons.vision.detector.qr_tracker import QrTracker
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "vision"))
+from test_qr_tracker import CAMERA_CONFIG, CONFIG, tag_frame  # noqa: E402
+
+KEY = (1, 177.5, -780.0, 510.0, 180.0, 0.0, 180.0)
+
+
+def make_worker(**tracking):
+    calls = []
+
+    def detector(*, frame, camera_config, config):
+        worker.last_config = config
+        calls.append("roi" if config.get("track_rois") else "full")
+        return qr_detector(frame=frame, camera_config=camera_config, config=config)
+
+    worker = GeneralCameraWorker()
+    worker.detector_name = "qr_detector"
+    worker.executor = ThreadPoolExecutor(max_workers=1)
+    worker.camera_configuration = CAMERA_CONFIG
+    worker.postprocess_configuration = {"a": CONFIG}
+    worker.image_processing_workers = [{"detector": detector, "config": CONFIG}]
+    worker.qr_tracker = QrTracker.from_settings(tracking)
+    return worker, calls
+
+
+def run_sequence(worker, calls, frames, track_key=KEY):
+    steps = []
+    for frame in frames:
+        calls.clear()
+        asyncio.run(worker._run_image_processing_workers(frame, track_key=track_key))
+        found = sum(1 for pose in worker.last_result.values() if pose is not None)
+        steps.append((list(calls), found))
+    worker.executor.shutdown(wait=True)
+    return steps
+
+
+def test_sequence_falls_back_to_full_frame_and_recovers():
+    steady, shifted = tag_frame(), tag_frame((3, 2))
+    occluded = tag_frame((3, 2), positions=(0, 1, 2))
+    frames = [steady] * 2 + [shifted] + [occluded] * 2 + [shifted] * 6
+    worker, calls = make_worker(enabled=True, full_frame_every=5)
+
+    steps = run_sequence(worker, calls, frames)
+
+    assert steps[:3] == [(["full"], 4), (["roi"], 4), (["roi"], 4)]
+    # Zasłonięty tag: ROI gubi tag, ta sama ramka w całości
+    assert steps[3] == (["roi", "full"], 3)
+    assert steps[4][0][0] == "roi" and steps[4][1] == 3
+    # Powrót tagu w ROI innego tagu (zmiana pozycji w siatce) - pełna ramka
+    assert steps[5] == (["roi", "full"], 4)
+    # Śledzenie odzyskane; co 5 ramek pełna detekcja
+    assert steps[6:] == [(["roi"], 4)] * 4 + [(["full"], 4)]
+    stats = worker.qr_tracker.stats
+    assert stats["full_frame"] + stats["roi"] == len(frames)
+    assert stats["lost"] >= 1
+    assert stats["roi"] > stats["full_frame"]
+
+
+def test_tracked_positions_match_full_frame_detection():
+    frames = [tag_frame(seed=seed % 2) for seed in range(4)]
+    tracked, calls = make_worker(enabled=True, smoothing_window=1)
+    reference, _ = make_worker(enabled=False)
+
+    for frame in frames:
+        asyncio.run(tracked._run_image_processing_workers(frame, track_key=KEY))
+        asyncio.run(reference._run_image_processing_workers(frame, track_key=KEY))
+        for position, pose in reference.last_result.items():
+            assert tracked.last_result[position] == pytest.approx(pose, abs=1.0)
+
+    assert tracked.qr_tracker.stats["roi"] == 3
+    tracked.executor.shutdown(wait=True)
+    reference.executor.shutdown(wait=True)
+
+
+@pytest.mark.parametrize(
+    "tracking, track_key",
+    [({"enabled": True}, None), ({"enabled": False}, KEY)],
+)
+def test_without_key_or_disabled_always_full_frame(tracking, track_key):
+    worker, calls = make_worker(**tracking)
+
+    steps = run_sequence(worker, calls, [tag_frame()] * 3, track_key=track_key)
+
+    assert steps == [(["full"], 4)] * 3
+
+
+def test_expected_qr_count_is_passed_to_detector():
+    worker, calls = make_worker()
+    worker.current_expected_qr = 2
+
+    run_sequence(worker, calls, [tag_frame()], track_key=None)
+
+    assert worker.last_config["expected_count"] == 2
+    assert "expected_count" not in CONFIG
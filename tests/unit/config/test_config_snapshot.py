@@ -0,0 +1,195 @@
+"""
+Testy jednostkowe skompilowanej warstwy konfiguracji (Config, ControllerConfig).
+
+Moduł zawiera testy:
+- typowanego, niezmiennego snapshotu sekcji
+- walidacji schematu (brakujące klucze, błędne typy, odroczone błędy
+  interpolacji kluczy spoza schematu)
+- przeładowania po zmianie pliku z atomową podmianą snapshotu
+- zgodności ControllerConfig.get z poprzednią konwersją typów
+"""
+
+import os
+from configparser import InterpolationMissingOptionError, NoOptionError
+
+import pytest
+
+from avena_commons.config import (
+    Config,
+    ConfigField,
+    ConfigSchemaError,
+    ConfigSnapshot,
+    ControllerConfig,
+)
+
+
+class MotionConfig(Config):
+    """Przykładowa konfiguracja ze schematem do testów."""
+
+    SECTION = "MOTION"
+    SCHEMA = {
+        "MAX_VELOCITY": ConfigField(float),
+        "SERVO_COUNT": ConfigField(int, default=6),
+        "ENABLED": ConfigField(bool, default=False),
+        "NAME": ConfigField(str, default="robot"),
+    }
+
+    def __init__(self, config_file):
+        super().__init__(config_file, read_only=True)
+        self.read_from_file()
+
+    def __del__(self):
+        pass
+
+
+def _write(path, text):
+    path.write_text(text)
+    # wymuszenie innej daty modyfikacji niezależnie od rozdzielczości zegara
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+@pytest.fixture
+def config_path(tmp_path):
+    path = tmp_path / "motion.conf"
+    _write(path, "[MOTION]\nMAX_VELOCITY = 1.5\nSERVO_COUNT = 4\nENABLED = yes\n")
+    return path
+
+
+class TestConfigSnapshot:
+    """Testy typowanego snapshotu."""
+
+    def test_typed_values_and_defaults(self, config_path):
+        config = MotionConfig(str(config_path))
+        snapshot = config.snapshot
+
+        assert snapshot.max_velocity == 1.5
+        assert snapshot.servo_count == 4
+        assert isinstance(snapshot.servo_count, int)
+        assert snapshot.enabled is True
+        assert snapshot.name == "robot"
+        assert snapshot["MAX_VELOCITY"] == 1.5
+        assert "servo_count" in snapshot
+
+    def test_snapshot_is_read_only(self, config_path):
+        snapshot = MotionConfig(str(config_path)).snapshot
+        with pytest.raises(AttributeError):
+            snapshot.max_velocity = 2.0
+        with pytest.raises(AttributeError):
+            del snapshot.max_velocity
+
+    def test_undeclared_keys_are_inferred(self, config_path):
+        _write(config_path, "[MOTION]\nMAX_VELOCITY = 1\nEXTRA = 3\nLABEL = abc\n")
+        snapshot = MotionConfig(str(config_path)).snapshot
+
+        assert snapshot.extra == 3.0
+        assert snapshot.label == "abc"
+
+    def test_non_identifier_keys_available_by_item(self):
+        snapshot = ConfigSnapshot({"max-speed": 1.0, "class": 2})
+        assert snapshot["max-speed"] == 1.0
+        assert snapshot["class"] == 2
+
+
+class TestConfigSchemaValidation:
+    """Testy błędów schematu."""
+
+    def test_missing_required_key(self, config_path):
+        _write(config_path, "[MOTION]\nSERVO_COUNT = 4\n")
+        with pytest.raises(ConfigSchemaError) as exc_info:
+            MotionConfig(str(config_path))
+        assert exc_info.value.errors == ["max_velocity: missing required key"]
+
+    def test_invalid_types_are_all_reported(self, config_path):
+        _write(
+            config_path,
+            "[MOTION]\nMAX_VELOCITY = fast\nSERVO_COUNT = 4.5\nENABLED = maybe\n",
+        )
+        with pytest.raises(ConfigSchemaError) as exc_info:
+            MotionConfig(str(config_path))
+
+        errors = exc_info.value.errors
+        assert len(errors) == 3
+        assert errors[0].startswith("max_velocity: invalid value 'fast'")
+        assert isinstance(exc_info.value, ValueError)
+
+    def test_interpolation_error_is_reported(self, config_path):
+        _write(config_path, "[MOTION]\nMAX_VELOCITY = %(missing)s\n")
+        with pytest.raises(ConfigSchemaError):
+            MotionConfig(str(config_path))
+
+    def test_undeclared_interpolation_error_is_deferred(self, config_path):
+        _write(config_path, "[MOTION]\nMAX_VELOCITY = 1\nPATH = %(missing)s/x\n")
+        snapshot = MotionConfig(str(config_path)).snapshot
+
+        assert snapshot.max_velocity == 1.0
+        assert "path" in snapshot
+        with pytest.raises(InterpolationMissingOptionError):
+            snapshot.path
+        with pytest.raises(InterpolationMissingOptionError):
+            snapshot["PATH"]
+
+
+class TestConfigHotReload:
+    """Testy przeładowania po zmianie pliku."""
+
+    def test_unchanged_file_is_not_reloaded(self, config_path):
+        config = MotionConfig(str(config_path))
+        snapshot = config.snapshot
+
+        assert config.reload_if_changed() is False
+        assert config.snapshot is snapshot
+
+    def test_changed_file_swaps_snapshot(self, config_path):
+        config = MotionConfig(str(config_path))
+        old_snapshot = config.snapshot
+
+        _write(config_path, "[MOTION]\nMAX_VELOCITY = 3.0\n")
+
+        assert config.reload_if_changed() is True
+        assert config.snapshot.max_velocity == 3.0
+        assert config.snapshot.servo_count == 6
+        assert old_snapshot.max_velocity == 1.5  # stary snapshot niezmieniony
+
+    def test_invalid_reload_keeps_previous_snapshot(self, config_path):
+        config = MotionConfig(str(config_path))
+        snapshot = config.snapshot
+
+        _write(config_path, "[MOTION]\nMAX_VELOCITY = broken\n")
+
+        with pytest.raises(ConfigSchemaError):
+            config.reload_if_changed()
+        assert config.snapshot is snapshot
+        assert config.config.get("MOTION", "MAX_VELOCITY") == "1.5"
+        # ten sam błędny plik nie jest parsowany ponownie
+        assert config.reload_if_changed() is False
+
+
+class TestControllerConfig:
+    """Testy ControllerConfig korzystającego ze snapshotu."""
+
+    def test_get_matches_previous_conversion(self, tmp_path):
+        path = tmp_path / "controller.conf"
+        _write(
+            path,
+            "[CONTROLLER]\nCONTROLLER_PATH = /opt/ctrl\nMAX_VELOCITY = 2.5\n"
+            "SERVO_COUNT = 6\nMODE = auto\n",
+        )
+        config = ControllerConfig(str(path))
+
+        assert config.get("MAX_VELOCITY") == 2.5
+        assert config.get("SERVO_COUNT") == 6.0
+        assert config.get("MODE") == "auto"
+        assert config.get("RESOURCES_PATH") == "/opt/ctrl/resources"
+        assert config.get("LOG_LEVEL") == "INFO"
+        assert config.snapshot.max_velocity == 2.5
+        assert config.get_controller_configuration()["mode"] == "auto"
+
+    def test_get_missing_key(self, tmp_path):
+        path = tmp_path / "controller.conf"
+        _write(path, "[CONTROLLER]\nAPS = APS01\n")
+        config = ControllerConfig(str(path))
+
+        assert config.get("APS") == "APS01"
+        with pytest.raises(NoOptionError):
+            config.get("UNKNOWN")
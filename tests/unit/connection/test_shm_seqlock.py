@@ -0,0 +1,196 @@
+"""
+Testy jednostkowe trybu strukturalnego (seqlock) klasy AvenaComm.
+
+Moduł zawiera testy:
+- zapisu i odczytu rekordu o stałym układzie (numpy dtype / ctypes)
+- aktualizacji pojedynczych pól w miejscu
+- wykrywania rozdartych odczytów (torn read) przy współbieżnym zapisie
+  z innego procesu
+"""
+
+import ctypes
+import multiprocessing as mp
+import os
+import uuid
+
+import numpy as np
+import pytest
+
+from avena_commons.connection import AvenaComm
+
+PAYLOAD_LEN = 512
+SCHEMA = np.dtype([("counter", np.int64), ("payload", np.int64, (PAYLOAD_LEN,))])
+
+
+class Pose(ctypes.Structure):
+    _fields_ = [("x", ctypes.c_double), ("y", ctypes.c_double), ("id", ctypes.c_int32)]
+
+
+def _unique_name():
+    return f"test_seqlock_{os.getpid()}_{uuid.uuid4().hex[:8]}"
+
+
+@pytest.fixture
+def comm():
+    name = _unique_name()
+    writer = AvenaComm(comm_name=name, schema=SCHEMA)
+    yield name, writer
+    writer.clear()
+
+
+def _writer_process(name, iterations, start_event):
+    writer = AvenaComm(comm_name=name, schema=SCHEMA)
+    start_event.wait()
+    for i in range(1, iterations + 1):
+        writer.update_fields(counter=i, payload=i)
+
+
+def _reader_process(name, stop_event, result_queue):
+    reader = AvenaComm(comm_name=name, schema=SCHEMA, max_read_retries=100000)
+    reads = 0
+    torn = 0
+    last = 0
+    monotonic = True
+    while not stop_event.is_set():
+        ok, record = reader.lock_and_read()
+        if not ok:
+            continue
+        reads += 1
+        counter = int(record["counter"])
+        payload = record["payload"]
+        if not (payload == counter).all():
+            torn += 1
+        if counter < last:
+            monotonic = False
+        last = counter
+    result_queue.put((reads, torn, reader.retry_counter, monotonic))
+
+
+class TestAvenaCommStructured:
+    """Testy podstawowej funkcjonalności trybu strukturalnego."""
+
+    def test_initial_record_is_zeroed(self, comm):
+        """Nowy bufor zawiera wyzerowany rekord i parzysty numer sekwencji."""
+        name, writer = comm
+        ok, record = writer.lock_and_read()
+
+        assert ok
+        assert record.dtype == SCHEMA
+        assert int(record["counter"]) == 0
+        assert writer.sequence % 2 == 0
+
+    def test_save_and_read_between_instances(self, comm):
+        """Rekord zapisany przez jedną instancję jest widoczny w drugiej."""
+        name, writer = comm
+        reader = AvenaComm(comm_name=name, schema=SCHEMA)
+
+        assert writer.save_and_unlock({"counter": 7, "payload": np.arange(PAYLOAD_LEN)})
+        ok, record = reader.lock_and_read()
+
+        assert ok
+        assert int(record["counter"]) == 7
+        np.testing.assert_array_equal(record["payload"], np.arange(PAYLOAD_LEN))
+        assert writer.sequence == 2
+
+    def test_update_fields_in_place(self, comm):
+        """Aktualizacja jednego pola nie nadpisuje pozostałych."""
+        name, writer = comm
+        writer.save_and_unlock({"counter": 1, "payload": 5})
+        writer.update_fields(counter=2)
+
+        ok, record = writer.lock_and_read()
+        assert ok
+        assert int(record["counter"]) == 2
+        assert (record["payload"] == 5).all()
+
+    def test_read_returns_copy(self, comm):
+        """Odczytany rekord jest kopią niezależną od pamięci współdzielonej."""
+        name, writer = comm
+        writer.update_fields(counter=1)
+        _, record = writer.lock_and_read()
+        writer.update_fields(counter=2)
+
+        assert int(record["counter"]) == 1
+
+    def test_unknown_field_is_reported(self, comm):
+        """Zapis nieistniejącego pola zwraca False i zostawia parzystą sekwencję."""
+        name, writer = comm
+        assert writer.update_fields(unknown=1) is False
+        assert writer.error_counter == 1
+        assert writer.sequence % 2 == 0
+
+    def test_ctypes_schema(self):
+        """Schemat może być zadeklarowany jako ctypes.Structure."""
+        name = _unique_name()
+        writer = AvenaComm(comm_name=name, schema=Pose, data=Pose(1.5, -2.0, 3))
+        try:
+            ok, record = AvenaComm(comm_name=name, schema=Pose).lock_and_read()
+            assert ok
+            assert float(record["x"]) == 1.5
+            assert float(record["y"]) == -2.0
+            assert int(record["id"]) == 3
+        finally:
+            writer.clear()
+
+    def test_schema_size_mismatch(self, comm):
+        """Podłączenie z innym schematem do istniejącego bufora zgłasza błąd."""
+        name, writer = comm
+        with pytest.raises(ValueError):
+            AvenaComm(comm_name=name, schema=np.dtype([("a", np.int8)]))
+
+    def test_non_structured_schema_rejected(self):
+        """Schemat musi być strukturalnym dtype."""
+        with pytest.raises(ValueError):
+            AvenaComm(comm_name=_unique_name(), schema=np.float64)
+
+    def test_read_fails_while_writer_in_progress(self, comm):
+        """Nieparzysta sekwencja (zapis w toku) powoduje ponowienia i porażkę odczytu."""
+        name, writer = comm
+        reader = AvenaComm(comm_name=name, schema=SCHEMA, max_read_retries=10)
+        writer._seq[0] += 1
+
+        ok, record = reader.lock_and_read()
+
+        assert not ok
+        assert record is None
+        assert reader.retry_counter == 10
+        assert reader.lock_counter == 1
+        writer._seq[0] += 1
+
+
+class TestAvenaCommSeqlockStress:
+    """Wieloprocesowe testy obciążeniowe wykrywania rozdartych odczytów."""
+
+    def test_no_torn_reads_under_concurrent_writes(self, comm):
+        """Czytelnicy nigdy nie zwracają rekordu zmieszanego z dwóch zapisów."""
+        name, _ = comm
+        ctx = mp.get_context("fork")
+        start_event = ctx.Event()
+        stop_event = ctx.Event()
+        results = ctx.Queue()
+
+        readers = [
+            ctx.Process(target=_reader_process, args=(name, stop_event, results))
+            for _ in range(3)
+        ]
+        writer = ctx.Process(target=_writer_process, args=(name, 20000, start_event))
+        for p in readers:
+            p.start()
+        writer.start()
+        start_event.set()
+        writer.join(timeout=60)
+        stop_event.set()
+
+        collected = [results.get(timeout=30) for _ in readers]
+        for p in readers:
+            p.join(timeout=10)
+
+        assert writer.exitcode == 0
+        for reads, torn, _retries, monotonic in collected:
+            assert reads > 0
+            assert torn == 0
+            assert monotonic
+
+        ok, record = AvenaComm(comm_name=name, schema=SCHEMA).lock_and_read()
+        assert ok
+        assert int(record["counter"]) == 20000
@@ -0,0 +1,150 @@
+"""
+Testy jednostkowe protokołu subskrypcji stanu po stronie klienta.
+
+Zakres:
+- wyznaczanie i nakładanie różnic zagnieżdżonych snapshotów (diff_state,
+  apply_state_diff) bez modyfikacji poprzedniego snapshotu,
+- wersjonowanie zmian i snapshot przy subskrypcji (StatePublisher),
+- odnowienie subskrypcji ze znaną wersją, keepalive i wygasanie lease,
+- minimalny odstęp między aktualizacjami (min_interval).
+"""
+
+import copy
+
+from avena_commons.event_listener.state_subscription import (
+    STATE_KEEPALIVE_EVENT,
+    STATE_UPDATE_EVENT,
+    StatePublisher,
+    apply_state_diff,
+    diff_state,
+)
+
+
+def snapshot(fsm_state="RUN", **state):
+    return {"fsm_state": fsm_state, "error": False, "state": state}
+
+
+def subscribe(publisher, name="orch", now=0.0, snapshot_value=None, **data):
+    request = {"keepalive_interval": 1.0, "lease": 10.0, "min_interval": 0.0}
+    request.update(data)
+    return publisher.subscribe(
+        name,
+        "127.0.0.1",
+        5000,
+        request,
+        lambda: snapshot_value if snapshot_value is not None else snapshot(),
+        now,
+    )
+
+
+def test_diff_of_nested_state_contains_only_changed_leaves():
+    """Zmiana głęboko w `state` przesyła tylko zmienione pole."""
+    old = snapshot(io={"inputs": [0, 1], "counter": 1}, mode="auto")
+    new = snapshot(io={"inputs": [0, 1], "counter": 2}, extra=True)
+
+    changes, removed = diff_state(old, new)
+
+    assert changes == [[["state", "io", "counter"], 2], [["state", "extra"], True]]
+    assert removed == [["state", "mode"]]
+    assert diff_state(new, copy.deepcopy(new)) == ([], [])
+
+
+def test_apply_diff_reconstructs_snapshot_without_mutating_base():
+    """Nałożenie różnicy daje nowy snapshot, a poprzedni pozostaje bez zmian."""
+    old = snapshot(io={"counter": 1, "inputs": [0]}, camera={"fps": 30}, mode="auto")
+    new = snapshot("FAULT", io={"counter": 2, "inputs": [0]}, camera={"fps": 30})
+    frozen = copy.deepcopy(old)
+
+    result = apply_state_diff(old, *diff_state(old, new))
+
+    assert result == new
+    assert old == frozen
+    assert result["state"]["camera"] is old["state"]["camera"]  # gałąź bez zmian
+    assert result["state"]["io"] is not old["state"]["io"]
+
+
+def test_apply_diff_replaces_non_dict_with_nested_value():
+    """Ścieżka przez wartość niebędącą słownikiem tworzy nowy słownik."""
+    result = apply_state_diff({"state": None}, [[["state", "io", "x"], 1]], [])
+    assert result == {"state": {"io": {"x": 1}}}
+
+
+def test_subscribe_returns_snapshot_and_updates_are_versioned():
+    """Subskrypcja zwraca snapshot, kolejne zmiany mają ciągłe wersje."""
+    publisher = StatePublisher()
+    reply = subscribe(publisher, snapshot_value=snapshot(counter=0))
+    assert reply == {"version": 1, "snapshot": snapshot(counter=0)}
+
+    assert publisher.publish(snapshot(counter=0), now=0.1) == []
+
+    messages = publisher.publish(snapshot(counter=1), now=0.2)
+    assert len(messages) == 1
+    subscriber, event_type, data = messages[0]
+    assert (subscriber.name, subscriber.port) == ("orch", 5000)
+    assert event_type == STATE_UPDATE_EVENT
+    assert data == {
+        "version": 2,
+        "base_version": 1,
+        "changes": [[["state", "counter"], 1]],
+        "removed": [],
+    }
+    assert publisher.version == 2
+
+
+def test_renewal_with_known_version_skips_snapshot():
+    """Odnowienie ze znaną wersją nie przesyła ponownie snapshotu."""
+    publisher = StatePublisher()
+    subscribe(publisher)
+
+    assert subscribe(publisher, now=5.0, known_version=1) == {"version": 1}
+    assert "snapshot" in subscribe(publisher, now=6.0, known_version=0)
+    assert "snapshot" in subscribe(publisher, name="other", known_version=1)
+
+
+def test_keepalive_sent_when_state_does_not_change():
+    """Bez zmian klient wysyła keepalive co keepalive_interval."""
+    publisher = StatePublisher()
+    subscribe(publisher, keepalive_interval=0.5)
+
+    assert publisher.publish(snapshot(), now=0.4) == []
+    messages = publisher.publish(snapshot(), now=0.5)
+    assert [(m[1], m[2]) for m in messages] == [(STATE_KEEPALIVE_EVENT, {"version": 1})]
+    assert publisher.publish(snapshot(), now=0.9) == []
+
+    # Zmiana stanu zastępuje keepalive i przesuwa jego termin
+    publisher.publish(snapshot("FAULT"), now=1.0)
+    assert publisher.publish(snapshot("FAULT"), now=1.4) == []
+
+
+def test_subscription_expires_without_renewal():
+    """Nieodnowiona subskrypcja wygasa po lease - klient przestaje wysyłać."""
+    publisher = StatePublisher()
+    subscribe(publisher, lease=2.0)
+
+    assert publisher.publish(snapshot("FAULT"), now=1.0)
+    assert publisher.publish(snapshot("RUN"), now=2.0) == []
+    assert not publisher.subscribers
+    assert not publisher.is_due(3.0)
+
+
+def test_resubscribe_after_idle_period_refreshes_snapshot():
+    """Bez subskrybentów zmiany nie są śledzone - nowa subskrypcja dostaje aktualny stan."""
+    publisher = StatePublisher()
+    subscribe(publisher, lease=1.0, snapshot_value=snapshot(counter=0))
+    publisher.publish(snapshot(counter=0), now=1.0)  # lease wygasa
+
+    reply = subscribe(publisher, now=5.0, snapshot_value=snapshot(counter=7))
+    assert reply == {"version": 2, "snapshot": snapshot(counter=7)}
+
+
+def test_min_interval_limits_publication_rate():
+    """is_due respektuje najkrótszy min_interval subskrybentów."""
+    publisher = StatePublisher()
+    assert not publisher.is_due(0.0)
+    subscribe(publisher, min_interval=0.1)
+
+    assert not publisher.is_due(0.05)
+    assert publisher.is_due(0.1)
+    publisher.publish(snapshot(), now=0.1)
+    assert not publisher.is_due(0.15)
+    assert publisher.is_due(0.2)
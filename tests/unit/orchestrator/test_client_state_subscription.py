@@ -0,0 +1,263 @@
+"""
+Testy jednostkowe subskrypcji stanu klientów w Orchestratorze.
+
+Zakres:
+- zastąpienie odpytywania CMD_GET_STATE subskrypcją po potwierdzeniu przez klienta,
+- nakładanie zmian (STATE_UPDATE) na _state i powiadamianie zależnych scenariuszy,
+- ponowny snapshot po nieciągłości wersji,
+- wykrywanie utraty klienta (keepalive) i powrót do odpytywania,
+- klienci bez obsługi subskrypcji (legacy) odpytywani jak dotychczas.
+"""
+
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from avena_commons.event_listener.event import Event, Result
+from avena_commons.event_listener.state_subscription import StatePublisher
+from avena_commons.orchestrator import Orchestrator
+from avena_commons.util.logger import MessageLogger
+
+CLIENTS = ["io", "munchies"]
+
+
+def client_snapshot(fsm_state="RUN", **state):
+    return {
+        "fsm_state": fsm_state,
+        "error": False,
+        "error_code": 0,
+        "error_message": None,
+        "state": state,
+    }
+
+
+@pytest.fixture
+def orchestrator(tmp_path, monkeypatch):
+    """Orchestrator z dwoma klientami, wysyłane zdarzenia trafiają do listy `sent`."""
+    monkeypatch.chdir(tmp_path)
+    orch = Orchestrator(
+        name="test_orch",
+        port=5000,
+        address="127.0.0.1",
+        message_logger=MagicMock(spec=MessageLogger),
+    )
+    orch._configuration["clients"] = {
+        name: {"address": "127.0.0.1", "port": 9000 + i}
+        for i, name in enumerate(CLIENTS)
+    }
+    orch._configuration["builtin_scenarios_directory"] = None
+    orch._state = {name: {} for name in CLIENTS}
+    orch.sent = []
+
+    async def capture_event(**kwargs):
+        event = Event(
+            source="test_orch",
+            source_address="127.0.0.1",
+            source_port=5000,
+            destination=kwargs["destination"],
+            destination_port=kwargs["destination_port"],
+            event_type=kwargs["event_type"],
+            data=kwargs["data"],
+            is_system_event=kwargs["is_system_event"],
+        )
+        orch.sent.append(event)
+        return event
+
+    orch._event = capture_event
+    return orch
+
+
+def sent_types(orch, client):
+    """Zwraca i czyści typy zdarzeń wysłanych do klienta."""
+    types = [e.event_type for e in orch.sent if e.destination == client]
+    orch.sent = [e for e in orch.sent if e.destination != client]
+    return types
+
+
+def reply(request, data, result="success"):
+    """Odpowiedź klienta na zdarzenie Orchestratora."""
+    return Event(
+        source=request.destination,
+        source_port=request.destination_port,
+        destination=request.source,
+        destination_port=request.source_port,
+        event_type=request.event_type,
+        data=data,
+        result=Result(result=result),
+        timestamp=request.timestamp,
+    )
+
+
+def push(client, event_type, data):
+    return Event(
+        source=client, destination="test_orch", event_type=event_type, data=data
+    )
+
+
+async def subscribe_client(orch, client, publisher, snapshot):
+    """Przeprowadza handshake CMD_SUBSCRIBE_STATE z symulowanym klientem.
+
+    Używa wcześniej wysłanego żądania, jeśli Orchestrator już je wysłał.
+    """
+    await orch._check_local_data()
+    request = next(
+        e
+        for e in orch.sent
+        if e.destination == client and e.event_type == "CMD_SUBSCRIBE_STATE"
+    )
+    data = publisher.subscribe(
+        client, "127.0.0.1", 5000, request.data, lambda: snapshot, time.monotonic()
+    )
+    await orch._analyze_event(reply(request, data))
+    orch.sent.clear()
+
+
+@pytest.mark.asyncio
+async def test_subscribed_client_is_not_polled(orchestrator):
+    """Po potwierdzeniu subskrypcji klient nie dostaje CMD_GET_STATE."""
+    await orchestrator._check_local_data()
+    assert [e.event_type for e in orchestrator.sent if e.destination == "io"] == [
+        "CMD_SUBSCRIBE_STATE",
+        "CMD_GET_STATE",
+    ]
+
+    publisher = StatePublisher()
+    await subscribe_client(orchestrator, "io", publisher, client_snapshot(counter=1))
+
+    assert orchestrator._state["io"]["fsm_state"] == "RUN"
+    assert orchestrator._state["io"]["state"] == {"counter": 1}
+    for _ in range(3):
+        await orchestrator._check_local_data()
+    assert sent_types(orchestrator, "io") == []
+    assert sent_types(orchestrator, "munchies") == ["CMD_GET_STATE"] * 3
+
+
+@pytest.mark.asyncio
+async def test_state_updates_are_applied_and_wake_scenarios(orchestrator):
+    """STATE_UPDATE aktualizuje _state i zgłasza tylko zmienione pola."""
+    publisher = StatePublisher()
+    await subscribe_client(orchestrator, "io", publisher, client_snapshot(counter=1))
+    previous_state = orchestrator._state["io"]["state"]
+    notified = []
+
+    def record_notification(client, fields):
+        notified.append((client, fields))
+
+    orchestrator._notify_client_state_changed = record_notification
+
+    for _, event_type, data in publisher.publish(
+        client_snapshot("FAULT", counter=1), time.monotonic()
+    ):
+        await orchestrator._handle_state_push(push("io", event_type, data))
+    for _, event_type, data in publisher.publish(
+        client_snapshot("FAULT", counter=2), time.monotonic()
+    ):
+        await orchestrator._handle_state_push(push("io", event_type, data))
+
+    assert orchestrator._state["io"]["fsm_state"] == "FAULT"
+    assert orchestrator._state["io"]["state"] == {"counter": 2}
+    assert previous_state == {"counter": 1}  # kontekst scenariusza nie jest zmieniany
+    assert notified == [("io", {"fsm_state"}), ("io", {"state"})]
+    assert orchestrator._client_state_sync["io"].version == 3
+
+
+@pytest.mark.asyncio
+async def test_version_gap_requests_snapshot(orchestrator):
+    """Utracona zmiana wymusza ponowny snapshot, kolejne zmiany są pomijane."""
+    publisher = StatePublisher()
+    await subscribe_client(orchestrator, "io", publisher, client_snapshot())
+
+    publisher.publish(client_snapshot("PAUSE"), time.monotonic())  # zgubiona
+    [(_, event_type, data)] = publisher.publish(
+        client_snapshot("FAULT"), time.monotonic()
+    )
+    await orchestrator._handle_state_push(push("io", event_type, data))
+
+    assert orchestrator._state["io"]["fsm_state"] == "RUN"
+    [request] = orchestrator.sent
+    assert request.event_type == "CMD_SUBSCRIBE_STATE"
+    assert request.data["known_version"] is None
+
+    data = publisher.subscribe(
+        "io", "127.0.0.1", 5000, request.data, client_snapshot, time.monotonic()
+    )
+    await orchestrator._analyze_event(reply(request, data))
+    assert orchestrator._state["io"]["fsm_state"] == "FAULT"
+    assert orchestrator._client_state_sync["io"].version == publisher.version
+
+
+@pytest.mark.asyncio
+async def test_keepalive_timeout_falls_back_to_polling(orchestrator):
+    """Brak wiadomości przez state_keepalive_timeout przywraca CMD_GET_STATE."""
+    publisher = StatePublisher()
+    await subscribe_client(orchestrator, "io", publisher, client_snapshot())
+    sync = orchestrator._client_state_sync["io"]
+
+    await orchestrator._handle_state_push(
+        push("io", "STATE_KEEPALIVE", {"version": sync.version})
+    )
+    await orchestrator._check_local_data()
+    assert sent_types(orchestrator, "io") == []
+
+    sync.last_seen -= orchestrator._configuration["state_keepalive_timeout"] + 1
+    await orchestrator._check_local_data()
+
+    assert sent_types(orchestrator, "io") == ["CMD_SUBSCRIBE_STATE", "CMD_GET_STATE"]
+    assert not orchestrator._client_state_sync["io"].subscribed
+
+
+@pytest.mark.asyncio
+async def test_subscription_renewed_before_lease_expires(orchestrator):
+    """Aktywna subskrypcja jest odnawiana ze znaną wersją co lease / 2."""
+    publisher = StatePublisher()
+    await subscribe_client(orchestrator, "io", publisher, client_snapshot())
+    sync = orchestrator._client_state_sync["io"]
+    sync.requested_at -= orchestrator._configuration["state_subscription_lease"] / 2
+
+    await orchestrator._check_local_data()
+    [request] = [e for e in orchestrator.sent if e.destination == "io"]
+    assert request.event_type == "CMD_SUBSCRIBE_STATE"
+    assert request.data["known_version"] == sync.version
+
+    data = publisher.subscribe(
+        "io", "127.0.0.1", 5000, request.data, client_snapshot, time.monotonic()
+    )
+    assert "snapshot" not in data
+    await orchestrator._analyze_event(reply(request, data))
+    assert sync.subscribed
+
+
+@pytest.mark.asyncio
+async def test_legacy_client_stays_polled(orchestrator):
+    """Odpowiedź bez numeru wersji pozostawia odpytywanie CMD_GET_STATE."""
+    orchestrator._configuration["state_subscription_retry_interval"] = 3600
+    await orchestrator._check_local_data()
+    request = next(
+        e
+        for e in orchestrator.sent
+        if e.destination == "io" and e.event_type == "CMD_SUBSCRIBE_STATE"
+    )
+    # Stary EventListener w stanie STOPPED odrzuca nieznane zdarzenie
+    await orchestrator._analyze_event(reply(request, request.data, result="error"))
+    orchestrator.sent.clear()
+
+    await orchestrator._check_local_data()
+    assert sent_types(orchestrator, "io") == ["CMD_GET_STATE"]
+    assert not orchestrator._client_state_sync["io"].subscribed
+
+    await orchestrator._analyze_event(
+        reply(
+            Event(destination="io", destination_port=9000, event_type="CMD_GET_STATE"),
+            client_snapshot("INITIALIZED"),
+        )
+    )
+    assert orchestrator._state["io"]["fsm_state"] == "INITIALIZED"
+
+
+@pytest.mark.asyncio
+async def test_subscription_disabled_polls_all_clients(orchestrator):
+    """state_subscription=False zachowuje odpytywanie wszystkich klientów."""
+    orchestrator._configuration["state_subscription"] = False
+    await orchestrator._check_local_data()
+    assert [e.event_type for e in orchestrator.sent] == ["CMD_GET_STATE"] * 2
@@ -0,0 +1,310 @@
+"""
+Testy jednostkowe kompilacji warunków scenariuszy w Orchestratorze.
+
+Zakres:
+- drzewo warunków budowane raz i współdzielone między ewaluacjami,
+- wyznaczanie klientów czytanych przez warunki (get_referenced_clients),
+- kontekst ewaluacji zawierający tylko potrzebnych klientów,
+- zgodność wyników z ewaluacją warunków tworzonych od nowa,
+- przeładowanie i rekompilacja po zmianie plików scenariuszy.
+"""
+
+import json
+import os
+from unittest.mock import MagicMock
+
+import pytest
+
+from avena_commons.orchestrator import Orchestrator
+from avena_commons.orchestrator.base import BaseCondition
+from avena_commons.orchestrator.factories.condition_factory import ConditionFactory
+from avena_commons.orchestrator.models import ScenarioContext
+from avena_commons.util.logger import MessageLogger
+
+CLIENTS = {
+    "io": {"address": "127.0.0.1", "port": 8001},
+    "munchies": {"address": "127.0.0.1", "port": 8002},
+    "supervisor": {"address": "127.0.0.1", "port": 8003},
+}
+
+
+def nested_conditions():
+    """Zwraca zagnieżdżone warunki logiczne odwołujące się do dwóch klientów."""
+    return {
+        "and": {
+            "conditions": [
+                {"client_state": {"client": "io", "state": "RUN"}},
+                {
+                    "or": {
+                        "conditions": [
+                            {"client_state": {"client": "munchies", "state": "RUN"}},
+                            {
+                                "not": {
+                                    "condition": {
+                                        "client_state": {
+                                            "client": "munchies",
+                                            "state": "FAULT",
+                                        }
+                                    }
+                                }
+                            },
+                        ]
+                    }
+                },
+            ]
+        }
+    }
+
+
+def make_scenario(name, conditions, priority=0):
+    """Tworzy minimalny scenariusz z podanymi warunkami."""
+    return {
+        "name": name,
+        "priority": priority,
+        "trigger": {"type": "automatic", "conditions": conditions},
+        "actions": [{"type": "log_event", "level": "info", "message": name}],
+    }
+
+
+@pytest.fixture
+def orchestrator(tmp_path, monkeypatch):
+    """Orchestrator bez scenariuszy systemowych, z trzema klientami."""
+    monkeypatch.chdir(tmp_path)
+    orch = Orchestrator(
+        name="test_orch",
+        port=5000,
+        address="127.0.0.1",
+        message_logger=MagicMock(spec=MessageLogger),
+    )
+    orch._configuration["clients"] = {k: dict(v) for k, v in CLIENTS.items()}
+    orch._configuration["builtin_scenarios_directory"] = None
+    orch._state = {
+        "io": {"fsm_state": "RUN"},
+        "munchies": {"fsm_state": "RUN"},
+        "supervisor": {"fsm_state": "STOPPED"},
+    }
+    return orch
+
+
+def write_scenario(directory, scenario):
+    """Zapisuje scenariusz do pliku JSON w katalogu."""
+    path = directory / f"{scenario['name']}.json"
+    path.write_text(json.dumps(scenario), encoding="utf-8")
+    return path
+
+
+def test_referenced_clients_of_nested_logic():
+    """Warunki logiczne sumują klientów z pod-warunków."""
+    condition = ConditionFactory.create_condition(nested_conditions())
+    assert condition.get_referenced_clients() == {"io", "munchies"}
+
+
+def test_referenced_clients_all_when_any_leaf_scans_clients():
+    """Tryb any_service_in_state czyta wszystkich klientów - wynik None."""
+    condition = ConditionFactory.create_condition({
+        "or": {
+            "conditions": [
+                {"client_state": {"client": "io", "state": "RUN"}},
+                {"client_state": {"any_service_in_state": "FAULT"}},
+            ]
+        }
+    })
+    assert condition.get_referenced_clients() is None
+
+
+def test_referenced_clients_of_time_condition_is_empty():
+    """Warunek czasowy nie wymaga stanu klientów."""
+    condition = ConditionFactory.create_condition({"time": {"weekdays": ["monday"]}})
+    assert condition.get_referenced_clients() == set()
+
+
+@pytest.mark.asyncio
+async def test_condition_tree_built_once(orchestrator, monkeypatch):
+    """Kolejne ewaluacje nie tworzą ponownie drzewa warunków."""
+    scenario = make_scenario("s1", nested_conditions())
+    orchestrator._scenarios["s1"] = scenario
+
+    created = []
+    original = ConditionFactory.create_condition.__func__
+
+    def counting_create(cls, config, message_logger=None):
+        created.append(next(iter(config)))
+        return original(cls, config, message_logger)
+
+    monkeypatch.setattr(
+        ConditionFactory, "create_condition", classmethod(counting_create)
+    )
+
+    for _ in range(5):
+        assert await orchestrator._should_execute_scenario(scenario) is True
+    first_pass = len(created)
+    for _ in range(5):
+        await orchestrator._should_execute_scenario(scenario)
+
+    # Kompilacja buduje całe drzewo: and, 2x client_state, or, not, client_state
+    assert first_pass == 6
+    assert len(created) == first_pass
+    assert orchestrator._compiled_conditions["s1"].clients == {"io", "munchies"}
+
+
+@pytest.mark.asyncio
+async def test_evaluation_context_contains_only_referenced_clients(orchestrator):
+    """Warunek widzi tylko swoich klientów, a kontekst wykonania - wszystkich."""
+    seen = {}
+
+    class SpyCondition(BaseCondition):
+        def get_referenced_clients(self):
+            return {"io"}
+
+        async def evaluate(self, context):
+            seen.update(context.clients)
+            return True
+
+    scenario = make_scenario("s1", {"spy": {}})
+    orchestrator._scenarios["s1"] = scenario
+    ConditionFactory.register_condition_type("spy", SpyCondition)
+    try:
+        assert await orchestrator._should_execute_scenario(scenario) is True
+    finally:
+        ConditionFactory._condition_types.pop("spy", None)
+
+    assert set(seen) == {"io"}
+    assert seen["io"]["fsm_state"] == "RUN"
+    assert seen["io"]["port"] == 8001
+    context = orchestrator.scenario_data["s1"]
+    assert isinstance(context, ScenarioContext)
+    assert set(context.clients) == set(CLIENTS)
+
+
+@pytest.mark.asyncio
+async def test_results_match_freshly_created_conditions(orchestrator):
+    """Wyniki skompilowanych warunków są zgodne z tworzeniem warunków od nowa."""
+    scenario = make_scenario("s1", nested_conditions())
+    orchestrator._scenarios["s1"] = scenario
+    states = ["RUN", "FAULT", "STOPPED", "INITIALIZED"]
+
+    for io_state in states:
+        for munchies_state in states:
+            orchestrator._state["io"]["fsm_state"] = io_state
+            orchestrator._state["munchies"]["fsm_state"] = munchies_state
+
+            compiled = await orchestrator._should_execute_scenario(scenario)
+
+            reference_context = ScenarioContext(
+                scenario_name="s1",
+                orchestrator=orchestrator,
+                action_executor=None,
+                message_logger=None,
+                clients=orchestrator._build_clients_state(),
+            )
+            reference = await ConditionFactory.create_condition(
+                nested_conditions()
+            ).evaluate(reference_context)
+
+            assert compiled == reference, (io_state, munchies_state)
+            assert ("s1" in orchestrator.scenario_data) == reference
+            orchestrator.scenario_data.pop("s1", None)
+
+
+@pytest.mark.asyncio
+async def test_context_reused_until_scenario_fires(orchestrator):
+    """Kontekst niespełnionej ewaluacji jest używany ponownie, uruchomiony - nie."""
+    scenario = make_scenario("s1", {"client_state": {"client": "io", "state": "FAULT"}})
+    orchestrator._scenarios["s1"] = scenario
+
+    assert await orchestrator._should_execute_scenario(scenario) is False
+    reused = orchestrator._compiled_conditions["s1"].context
+    assert await orchestrator._should_execute_scenario(scenario) is False
+    assert orchestrator._compiled_conditions["s1"].context is reused
+
+    orchestrator._state["io"]["fsm_state"] = "FAULT"
+    assert await orchestrator._should_execute_scenario(scenario) is True
+    fired = orchestrator.scenario_data["s1"]
+    assert fired is reused
+    assert fired.clients["io"]["fsm_state"] == "FAULT"
+    assert orchestrator._compiled_conditions["s1"].context is None
+
+    orchestrator.scenario_data.pop("s1")
+    assert await orchestrator._should_execute_scenario(scenario) is True
+    assert orchestrator.scenario_data["s1"] is not fired
+
+
+@pytest.mark.asyncio
+async def test_compile_error_is_reported_and_scenario_skipped(orchestrator):
+    """Nieznany typ warunku nie uruchamia scenariusza i jest logowany."""
+    scenario = make_scenario("broken", {"no_such_condition": {}})
+    orchestrator._scenarios["broken"] = scenario
+
+    assert await orchestrator._should_execute_scenario(scenario) is False
+    assert await orchestrator._should_execute_scenario(scenario) is False
+    assert "broken" not in orchestrator.scenario_data
+    assert "no_such_condition" in orchestrator._compiled_conditions["broken"].error
+
+
+def test_reload_recompiles_only_changed_scenarios(orchestrator, tmp_path):
+    """Zmiana pliku przeładowuje scenariusze i rekompiluje tylko zmienione warunki."""
+    scenarios_dir = tmp_path / "scenarios"
+    scenarios_dir.mkdir()
+    orchestrator._configuration["scenarios_directory"] = str(scenarios_dir)
+    write_scenario(scenarios_dir, make_scenario("a", nested_conditions()))
+    changed_path = write_scenario(
+        scenarios_dir,
+        make_scenario("b", {"client_state": {"client": "io", "state": "RUN"}}),
+    )
+
+    orchestrator._load_scenarios()
+    tree_a = orchestrator._compiled_conditions["a"].condition
+    tree_b = orchestrator._compiled_conditions["b"].condition
+    assert not orchestrator._reload_scenarios_if_changed(force=True)
+
+    write_scenario(
+        scenarios_dir,
+        make_scenario("b", {"client_state": {"client": "supervisor", "state": "RUN"}}),
+    )
+    stat = changed_path.stat()
+    os.utime(changed_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert orchestrator._reload_scenarios_if_changed(force=True)
+    assert orchestrator._compiled_conditions["a"].condition is tree_a
+    assert orchestrator._compiled_conditions["b"].condition is not tree_b
+    assert orchestrator._compiled_conditions["b"].clients == {"supervisor"}
+
+
+def test_reload_drops_removed_scenarios_and_keeps_manual_flag(orchestrator, tmp_path):
+    """Usunięty plik usuwa scenariusz, a flaga manual_run_requested przetrwa reload."""
+    scenarios_dir = tmp_path / "scenarios"
+    scenarios_dir.mkdir()
+    orchestrator._configuration["scenarios_directory"] = str(scenarios_dir)
+    manual = make_scenario("manual", {})
+    manual["trigger"] = {"type": "manual"}
+    write_scenario(scenarios_dir, manual)
+    removed_path = write_scenario(
+        scenarios_dir, make_scenario("gone", nested_conditions())
+    )
+
+    orchestrator._load_scenarios()
+    assert orchestrator.set_manual_scenario_run_requested("manual")
+    assert "gone" in orchestrator._compiled_conditions
+
+    removed_path.unlink()
+    assert orchestrator._reload_scenarios_if_changed(force=True)
+
+    assert "gone" not in orchestrator._scenarios
+    assert "gone" not in orchestrator._compiled_conditions
+    assert orchestrator._scenarios["manual"]["_internal"]["manual_run_requested"]
+
+
+def test_reload_is_throttled_by_interval(orchestrator, tmp_path):
+    """Pliki sprawdzane są nie częściej niż scenarios_reload_interval."""
+    scenarios_dir = tmp_path / "scenarios"
+    scenarios_dir.mkdir()
+    orchestrator._configuration["scenarios_directory"] = str(scenarios_dir)
+    orchestrator._configuration["scenarios_reload_interval"] = 3600
+    write_scenario(scenarios_dir, make_scenario("a", nested_conditions()))
+    orchestrator._load_scenarios()
+
+    write_scenario(scenarios_dir, make_scenario("b", nested_conditions()))
+    assert not orchestrator._reload_scenarios_if_changed()
+    assert "b" not in orchestrator._scenarios
+    assert orchestrator._reload_scenarios_if_changed(force=True)
+    assert "b" in orchestrator._scenarios
@@ -0,0 +1,361 @@
+"""
+Testy jednostkowe DatabaseComponent - pula połączeń, cache zapytań i batching.
+
+Zakres:
+- stały tekst SQL per kształt zapytania (cache LRU, listy jako `= ANY($n)`),
+- cache typów kolumn i jego unieważnianie po błędzie schematu,
+- łączenie współbieżnych `check_table_value` jednej tabeli w jedno zapytanie,
+  także warunków `database` wielu scenariuszy jednego cyklu orchestratora,
+- integracja z tymczasowym klastrem PostgreSQL (initdb/pg_ctl w katalogu
+  tymczasowym) - pomijana, gdy binaria PostgreSQL nie są dostępne.
+"""
+
+import asyncio
+import glob
+import os
+import shutil
+import socket
+import subprocess
+from unittest.mock import MagicMock
+
+import asyncpg
+import pytest
+
+from avena_commons.orchestrator import Orchestrator
+from avena_commons.orchestrator.components.database_component import (
+    DatabaseComponent,
+)
+from avena_commons.util.logger import MessageLogger
+
+DB_ENV = {
+    "DB_HOST": "127.0.0.1",
+    "DB_PORT": "5432",
+    "DB_NAME": "test",
+    "DB_USER": "test",
+    "DB_PASSWORD": "test",
+    "APS_ID": "1",
+    "APS_NAME": "test",
+}
+
+
+class RecordingPool:
+    """Zastępuje asyncpg.Pool - zapisuje zapytania i zwraca przygotowane wyniki."""
+
+    def __init__(self, column_types=None):
+        self.calls = []
+        self.column_types = column_types or {}
+        self.fail_with = None
+        self.expired = 0
+
+    async def _call(self, method, query, *args):
+        self.calls.append((method, query, args))
+        if self.fail_with is not None:
+            raise self.fail_with
+        if method == "fetchrow":
+            return self.column_types.get(args[1])
+        if method == "fetch" and "unnest" in query:
+            # Wiersz k.i + wartość kolumny = pierwszy parametr WHERE * 10
+            return [(i, key * 10) for i, key in zip(args[0], args[1])]
+        if method == "fetch":
+            return []
+        if method == "execute":
+            return "UPDATE 2"
+        return args[0] * 10 if args else None
+
+    async def fetchval(self, query, *args):
+        return await self._call("fetchval", query, *args)
+
+    async def fetch(self, query, *args):
+        return await self._call("fetch", query, *args)
+
+    async def fetchrow(self, query, *args):
+        return await self._call("fetchrow", query, *args)
+
+    async def execute(self, query, *args):
+        return await self._call("execute", query, *args)
+
+    async def expire_connections(self):
+        self.expired += 1
+
+    def is_closing(self):
+        return False
+
+
+def make_component(pool=None, **config):
+    component = DatabaseComponent("main_database", {**DB_ENV, **config})
+    component._pool = pool or RecordingPool({
+        "id": {"schema": "pg_catalog", "type": "int4", "typtype": "b"},
+        "status": {"schema": "public", "type": "order_status", "typtype": "e"},
+    })
+    component._is_connected = True
+    return component
+
+
+@pytest.mark.asyncio
+async def test_same_query_shape_reuses_sql_text():
+    """Różne wartości i długości list dają ten sam tekst SQL (jedno PREPARE)."""
+    db = make_component(batch_lookups=False)
+
+    await db.check_table_value("orders", "status", {"id": 1, "kind": ["a", "b"]})
+    await db.check_table_value("orders", "status", {"id": 2, "kind": ["a", "b", "c"]})
+    await db.check_table_value("orders", "status", {"id": 3, "kind": ["a"]})
+    await db.check_table_value("orders", "status", {"id": 4, "kind": []})
+
+    queries = [query for _, query, _ in db._pool.calls]
+    assert queries[0] == queries[1]
+    assert queries[0] == "SELECT status FROM orders WHERE id = $1 AND kind = ANY($2)"
+    assert db._pool.calls[1][2] == (2, ["a", "b", "c"])
+    assert queries[2] == "SELECT status FROM orders WHERE id = $1 AND kind = $2"
+    assert queries[3] == "SELECT status FROM orders WHERE id = $1 AND FALSE"
+    assert len(db._query_cache) == 3
+    assert db.query_count == 4
+
+
+@pytest.mark.asyncio
+async def test_update_uses_first_parameter_for_set_value():
+    """UPDATE przekazuje wartość SET jako $1, a warunki WHERE od $2."""
+    db = make_component()
+
+    affected = await db.update_table_value("orders", "status", "done", {"id": [1, 2]})
+
+    assert affected == 2
+    [(method, query, args)] = db._pool.calls
+    assert method == "execute"
+    assert query == "UPDATE orders SET status = $1 WHERE id = ANY($2)"
+    assert args == ("done", [1, 2])
+
+
+@pytest.mark.asyncio
+async def test_column_type_cache_invalidated_on_schema_error():
+    """Typy kolumn są pobierane raz; błąd schematu czyści cache tabeli i pulę."""
+    db = make_component()
+
+    await db.update_column_from_column("orders", "status", "status", {"id": 1})
+    await db.update_column_from_column("orders", "status", "status", {"id": 2})
+    assert [c[0] for c in db._pool.calls].count("fetchrow") == 1
+    assert "orders.status" in db._column_type_cache
+
+    db._pool.fail_with = asyncpg.exceptions.UndefinedColumnError("kolumna usunięta")
+    with pytest.raises(asyncpg.exceptions.UndefinedColumnError):
+        await db.update_column_from_column("orders", "status", "status", {"id": 3})
+
+    assert db._column_type_cache == {}
+    assert not any(key[1] == "orders" for key in db._query_cache)
+    assert db._pool.expired == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_lookups_are_batched_into_one_query():
+    """Współbieżne wyszukiwania w jednej tabeli dają jedno zapytanie z unnest."""
+    db = make_component()
+
+    values = await asyncio.gather(
+        db.check_table_value("orders", "status", {"id": 1}),
+        db.check_table_value("orders", "status", {"id": 2}),
+        db.check_table_value("orders", "status", {"id": 3}),
+    )
+
+    assert values == [10, 20, 30]
+    fetches = [call for call in db._pool.calls if call[0] == "fetch"]
+    assert len(fetches) == 1
+    _, query, args = fetches[0]
+    assert 'unnest($1::int4[], $2::"pg_catalog"."int4"[])' in query
+    assert "LEFT JOIN LATERAL (SELECT status AS v0 FROM orders" in query
+    assert args == ([0, 1, 2], [1, 2, 3])
+
+
+@pytest.mark.asyncio
+async def test_single_lookup_uses_plain_query():
+    """Pojedyncze wyszukiwanie nie płaci za zapytanie zbiorcze."""
+    db = make_component()
+
+    assert await db.check_table_value("orders", "status", {"id": 4}) == 40
+    assert [call[0] for call in db._pool.calls] == ["fetchval"]
+
+
+@pytest.mark.asyncio
+async def test_batch_with_list_values_falls_back_to_single_queries():
+    """Wyszukiwania z listami wartości nie wchodzą do zapytania zbiorczego."""
+    db = make_component()
+
+    values = await db.check_table_values(
+        "orders",
+        [("status", {"id": 1}), ("status", {"id": [5, 6]}), ("status", {"id": 2})],
+    )
+
+    assert values[0] == 10 and values[2] == 20
+    assert [call[0] for call in db._pool.calls] == ["fetchrow", "fetch", "fetchval"]
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_falls_back_to_individual_lookups():
+    """Błąd zapytania zbiorczego nie blokuje pozostałych wyszukiwań."""
+    db = make_component()
+    original_batch = db._fetch_values_batch
+
+    async def broken_batch(*args):
+        await original_batch(*args)
+        raise asyncpg.exceptions.DataError("zła wartość")
+
+    db._fetch_values_batch = broken_batch
+
+    values = await asyncio.gather(
+        db.check_table_value("orders", "status", {"id": 1}),
+        db.check_table_value("orders", "status", {"id": 2}),
+    )
+
+    assert values == [10, 20]
+    assert [call[0] for call in db._pool.calls][-2:] == ["fetchval", "fetchval"]
+
+
+def database_condition(order_id):
+    return {
+        "database": {
+            "component": "main_database",
+            "table": "orders",
+            "column": "status",
+            "where": {"id": order_id},
+            "expected_value": 0,
+        }
+    }
+
+
+@pytest.mark.asyncio
+async def test_scenario_conditions_of_one_tick_share_one_query(tmp_path, monkeypatch):
+    """Warunki `database` kilku scenariuszy (także zagnieżdżone) - jedno zapytanie."""
+    monkeypatch.chdir(tmp_path)
+    orch = Orchestrator(
+        name="test_orch",
+        port=5000,
+        address="127.0.0.1",
+        message_logger=MagicMock(spec=MessageLogger),
+    )
+    orch._configuration["builtin_scenarios_directory"] = None
+    db = make_component()
+    orch._components = {"main_database": db}
+    for i in range(1, 5):
+        orch._scenarios[f"s{i}"] = {
+            "name": f"s{i}",
+            "trigger": {"type": "automatic", "conditions": database_condition(i)},
+            "actions": [],
+        }
+    orch._scenarios["nested"] = {
+        "name": "nested",
+        "trigger": {
+            "type": "automatic",
+            "conditions": {
+                "and": {"conditions": [database_condition(5), database_condition(1)]}
+            },
+        },
+        "actions": [],
+    }
+    orch._compile_scenario_conditions()
+
+    await orch._check_scenarios()
+
+    assert [call[0] for call in db._pool.calls] == ["fetchrow", "fetch"]
+    _, _, args = db._pool.calls[1]
+    assert sorted(args[1]) == [1, 2, 3, 4, 5]
+    assert not orch._running_scenarios  # wartości 10..50 != 0
+
+
+@pytest.mark.asyncio
+async def test_not_connected_raises():
+    db = DatabaseComponent("main_database", DB_ENV)
+    with pytest.raises(RuntimeError):
+        await db.check_table_value("orders", "status", {"id": 1})
+
+
+# --- Integracja z tymczasowym klastrem PostgreSQL ---------------------------
+
+
+def _find_pg_bin():
+    for directory in [os.path.dirname(shutil.which("pg_ctl") or "")] + sorted(
+        glob.glob("/usr/lib/postgresql/*/bin"), reverse=True
+    ):
+        if directory and os.path.exists(os.path.join(directory, "pg_ctl")):
+            return directory
+    return None
+
+
+@pytest.fixture
+def postgres(tmp_path):
+    """Uruchamia tymczasowy klaster PostgreSQL i zwraca parametry połączenia."""
+    pg_bin = _find_pg_bin()
+    if pg_bin is None:
+        pytest.skip("Binaria PostgreSQL (initdb, pg_ctl) nie są dostępne")
+    if hasattr(os, "geteuid") and os.geteuid() == 0:
+        pytest.skip("initdb nie może być uruchomiony jako root")
+
+    data_dir = tmp_path / "pgdata"
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    subprocess.run(
+        [f"{pg_bin}/initdb", "-D", str(data_dir), "-U", "test", "-A", "trust"],
+        check=True,
+        capture_output=True,
+    )
+    subprocess.run(
+        [
+            f"{pg_bin}/pg_ctl",
+            "-D",
+            str(data_dir),
+            "-o",
+            f"-p {port} -k {tmp_path} -c listen_addresses=127.0.0.1",
+            "-w",
+            "start",
+        ],
+        check=True,
+        capture_output=True,
+    )
+    try:
+        yield {**DB_ENV, "DB_PORT": str(port), "DB_NAME": "postgres"}
+    finally:
+        subprocess.run(
+            [f"{pg_bin}/pg_ctl", "-D", str(data_dir), "-m", "immediate", "stop"],
+            capture_output=True,
+        )
+
+
+@pytest.mark.asyncio
+async def test_queries_against_postgres(postgres):
+    """Pula, zapytania zbiorcze i UPDATE na prawdziwej bazie."""
+    db = DatabaseComponent("main_database", postgres)
+    assert await db.initialize()
+    assert await db.connect()
+    try:
+        await db._pool.execute(
+            "CREATE TYPE order_status AS ENUM ('new', 'done');"
+            "CREATE TYPE item_status AS ENUM ('new', 'done');"
+            "CREATE TABLE orders (id int PRIMARY KEY, kind text, "
+            "status order_status, item item_status);"
+            "INSERT INTO orders SELECT i, 'k' || (i % 3), 'new', 'done' "
+            "FROM generate_series(1, 20) i"
+        )
+
+        values = await asyncio.gather(*[
+            db.check_table_value("orders", "kind", {"id": i}) for i in (1, 2, 99)
+        ])
+        assert values == ["k1", "k2", None]
+
+        assert (
+            await db.update_table_value("orders", "status", "done", {"id": [1, 2]}) == 2
+        )
+        assert await db.check_table_value("orders", "status", {"id": 2}) == "done"
+        assert (
+            await db.update_column_from_column("orders", "status", "item", {"id": 3})
+            == 1
+        )
+
+        records = await db.fetch_records(
+            "orders", ["id"], {"kind": ["k0", "k1"]}, limit=3, order_by="id"
+        )
+        assert [r["id"] for r in records] == [1, 3, 4]
+
+        await db._pool.execute("ALTER TABLE orders DROP COLUMN kind")
+        with pytest.raises(asyncpg.exceptions.UndefinedColumnError):
+            await db.check_table_value("orders", "kind", {"id": 1})
+        assert not any(key[1] == "orders" for key in db._query_cache)
+    finally:
+        await db.disconnect()
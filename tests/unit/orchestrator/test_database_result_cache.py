@@ -0,0 +1,265 @@
+"""
+Testy jednostkowe cache wyników warunków bazodanowych.
+
+Zakres:
+- jedno zapytanie dla wielu warunków czytających ten sam wiersz w okresie cache_ttl,
+- granica nieaktualności: wynik pochodzi z zapytania rozpoczętego najwyżej
+  cache_ttl sekund wcześniej,
+- łączenie identycznych zapytań w locie (także przy cache_ttl = 0), anulowanie
+  wywołującego, który rozpoczął zapytanie, nie anuluje go pozostałym,
+- unieważnianie przez akcję database_update i odrzucanie wyników zapytań
+  rozpoczętych przed unieważnieniem,
+- kopie rekordów DatabaseListCondition i walidacja cache_ttl,
+- ograniczona liczba wpisów (LRU) przy wielu różnych kluczach.
+"""
+
+import asyncio
+
+import pytest
+
+from avena_commons.orchestrator.actions.database_update_action_base import (
+    DatabaseUpdateAction,
+)
+from avena_commons.orchestrator.components import database_result_cache
+from avena_commons.orchestrator.components.database_result_cache import (
+    DatabaseResultCache,
+)
+from avena_commons.orchestrator.conditions.database_condition_base import (
+    DatabaseCondition,
+)
+from avena_commons.orchestrator.conditions.database_list_condition import (
+    DatabaseListCondition,
+)
+from avena_commons.orchestrator.models.scenario_models import ScenarioContext
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeDatabase:
+    """Komponent bazodanowy z wartością zmienianą w czasie i licznikiem zapytań."""
+
+    is_connected = True
+
+    def __init__(self, clock, latency=0.0):
+        self.clock = clock
+        self.latency = latency
+        self.value = "new"
+        self.queries = []  # chwile rozpoczęcia zapytań
+        self.release = None
+
+    async def check_table_value(self, table, column, where_conditions):
+        self.queries.append(self.clock())
+        value = self.value
+        if self.release is not None:
+            await self.release.wait()
+        return value
+
+    async def fetch_records(self, table, columns, where_conditions, limit, order_by):
+        self.queries.append(self.clock())
+        return [{"id": 1, "status": self.value}]
+
+    async def update_table_value(self, table, column, value, where_conditions):
+        self.value = value
+        return 1
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def db(clock):
+    database = FakeDatabase(clock)
+    database_result_cache._caches[database] = DatabaseResultCache(clock=clock)
+    return database
+
+
+def make_context(db):
+    return ScenarioContext(
+        scenario_name="test",
+        orchestrator=None,
+        action_executor=None,
+        message_logger=None,
+        components={"main_database": db},
+    )
+
+
+def make_condition(cache_ttl, expected_value="new"):
+    return DatabaseCondition({
+        "type": "database",
+        "component": "main_database",
+        "table": "orders",
+        "column": "status",
+        "where": {"id": 1},
+        "expected_value": expected_value,
+        "cache_ttl": cache_ttl,
+    })
+
+
+@pytest.mark.asyncio
+async def test_conditions_watching_same_row_share_one_query(db, clock):
+    """Wiele scenariuszy z tym samym warunkiem wykonuje jedno zapytanie na TTL."""
+    context = make_context(db)
+    conditions = [make_condition(0.5) for _ in range(20)]
+
+    for tick in range(100):  # 1 s przy 100 Hz
+        clock.now = tick * 0.01
+        for condition in conditions:
+            assert await condition.evaluate(context)
+
+    assert len(db.queries) == 2  # t = 0.0 oraz t = 0.51
+
+
+@pytest.mark.asyncio
+async def test_cached_value_is_never_older_than_ttl(db, clock):
+    """Każdy odczyt pochodzi z zapytania rozpoczętego w ciągu ostatnich cache_ttl s."""
+    ttl = 0.3
+    context = make_context(db)
+    condition = make_condition(ttl)
+
+    for tick in range(200):
+        clock.now = tick * 0.01
+        db.value = "new" if (tick // 7) % 2 == 0 else "done"
+        result = await condition.evaluate(context)
+        query_start = db.queries[-1]
+        assert clock.now - query_start <= ttl + 1e-9
+        # Wynik odpowiada wartości w chwili ostatniego zapytania
+        assert result == (((round(query_start / 0.01)) // 7) % 2 == 0)
+
+
+@pytest.mark.asyncio
+async def test_zero_ttl_queries_every_time_but_coalesces_in_flight(db):
+    """cache_ttl = 0 nie zapamiętuje wyników, ale łączy zapytania w locie."""
+    context = make_context(db)
+    condition = make_condition(0)
+
+    await condition.evaluate(context)
+    await condition.evaluate(context)
+    assert len(db.queries) == 2
+
+    db.release = asyncio.Event()
+    pending = asyncio.gather(*[condition.evaluate(context) for _ in range(5)])
+    await asyncio.sleep(0)
+    db.release.set()
+    assert await pending == [True] * 5
+    assert len(db.queries) == 3
+
+
+@pytest.mark.asyncio
+async def test_cancelled_origin_does_not_cancel_coalesced_waiters(db):
+    """Timeout scenariusza, który rozpoczął zapytanie, nie przerywa pozostałych."""
+    context = make_context(db)
+    condition = make_condition(60.0)
+
+    db.release = asyncio.Event()
+    origin = asyncio.ensure_future(condition.evaluate(context))
+    await asyncio.sleep(0)
+    waiters = asyncio.gather(*[condition.evaluate(context) for _ in range(3)])
+    await asyncio.sleep(0)
+    origin.cancel()
+    await asyncio.sleep(0)
+    db.release.set()
+
+    assert await waiters == [True] * 3
+    assert origin.cancelled()
+    assert await condition.evaluate(context)  # wynik zapisany w cache
+    assert len(db.queries) == 1
+
+
+@pytest.mark.asyncio
+async def test_database_update_invalidates_table(db):
+    """Zapis akcją database_update wymusza nowe zapytanie przy kolejnej ewaluacji."""
+    context = make_context(db)
+    condition = make_condition(60.0, expected_value="done")
+    action = DatabaseUpdateAction()
+    update = {
+        "component": "main_database",
+        "table": "orders",
+        "column": "status",
+        "value": "done",
+        "where": {"id": 1},
+    }
+
+    assert not await condition.evaluate(context)
+    await action.execute(update, context)
+    assert await condition.evaluate(context)
+    assert len(db.queries) == 2
+
+    db.value = "new"
+    await action.execute({**update, "value": "new", "invalidate_cache": False}, context)
+    assert await condition.evaluate(context)  # nadal wynik z cache
+    assert len(db.queries) == 2
+
+
+@pytest.mark.asyncio
+async def test_query_started_before_invalidation_is_not_cached(db):
+    """Wynik zapytania w locie podczas unieważnienia nie trafia do cache."""
+    context = make_context(db)
+    condition = make_condition(60.0)
+    cache = database_result_cache.result_cache_for(db)
+
+    db.release = asyncio.Event()
+    first = asyncio.ensure_future(condition.evaluate(context))
+    await asyncio.sleep(0)
+    cache.invalidate("orders")
+    db.release.set()
+    assert await first
+
+    await condition.evaluate(context)
+    assert len(db.queries) == 2
+
+
+@pytest.mark.asyncio
+async def test_list_condition_shares_query_but_not_records(db):
+    """DatabaseListCondition używa cache, ale każdy kontekst dostaje własne rekordy."""
+    config = {
+        "type": "database_list",
+        "component": "main_database",
+        "table": "orders",
+        "columns": ["id", "status"],
+        "where": {"status": ["new", "done"]},
+        "result_key": "orders",
+        "cache_ttl": 1.0,
+    }
+    first, second = make_context(db), make_context(db)
+
+    assert await DatabaseListCondition(config).evaluate(first)
+    assert await DatabaseListCondition(config).evaluate(second)
+    first.get("orders")[0]["status"] = "changed"
+
+    assert second.get("orders")[0]["status"] == "new"
+    assert len(db.queries) == 1
+
+
+@pytest.mark.asyncio
+async def test_many_distinct_keys_keep_cache_bounded(clock):
+    """Klucze z szablonów (np. id zamówień) nie zwiększają cache bez końca."""
+    cache = DatabaseResultCache(clock=clock, max_entries=100)
+    fetches = []
+
+    async def fetch(order_id):
+        fetches.append(order_id)
+        return order_id
+
+    for order_id in range(1000):
+        key = ("value", "orders", "status", (("id", order_id),))
+        await cache.get(key, 60.0, lambda: fetch(order_id))
+        # Często używany klucz zostaje mimo napływu nowych
+        await cache.get(("value", "orders", "status", (("id", 0),)), 60.0, None)
+
+    assert len(cache) == 100
+    assert fetches == list(range(1000))
+    assert ("value", "orders", "status", (("id", 999),)) in cache._entries
+    assert ("value", "orders", "status", (("id", 1),)) not in cache._entries
+
+
+def test_negative_cache_ttl_is_rejected():
+    with pytest.raises(ValueError):
+        make_condition(-1)
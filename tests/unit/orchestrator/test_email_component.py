@@ -0,0 +1,268 @@
+"""
+Testy jednostkowe wysyłki w tle w EmailComponent.
+
+Serwer SMTP jest prostym serwerem asyncio działającym w tej samej pętli co
+komponent - test przechodzi tylko wtedy, gdy wywołania smtplib nie blokują
+pętli zdarzeń.
+
+Zakres:
+- jedna trwała sesja SMTP dla wielu wiadomości,
+- pętla zdarzeń nie jest blokowana przy wolnym serwerze,
+- ponowienia z backoffem po błędach 4xx i zerwanym połączeniu,
+- brak ponowień przy błędach trwałych (5xx),
+- limit wiadomości na odbiorcę i ograniczona kolejka,
+- akcja send_email domyślnie czeka na dostarczenie i liczy błędy wysyłki,
+- akcja send_email nie uznaje za sukces wiadomości pominiętej przez limit.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from avena_commons.orchestrator.actions.base_action import ActionExecutionError
+from avena_commons.orchestrator.actions.send_email_action import SendEmailAction
+from avena_commons.orchestrator.components.email_component import EmailComponent
+from avena_commons.orchestrator.models.scenario_models import ScenarioContext
+
+
+class StubSmtpServer:
+    """Minimalny serwer SMTP z opóźnieniem odpowiedzi i wstrzykiwanymi błędami."""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.messages = []
+        self.connections = 0
+        self.fail_mail_codes = []  # kody kolejnych odpowiedzi na MAIL FROM
+        self.drop_next_connection_after_data = False
+        self._server = None
+
+    async def __aenter__(self):
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        writer.write(b"220 stub ESMTP\r\n")
+        while line := await reader.readline():
+            command = line.decode().strip().upper()
+            await asyncio.sleep(self.latency)
+            if command.startswith(("EHLO", "HELO")):
+                writer.write(b"250-stub\r\n250 8BITMIME\r\n")
+            elif command.startswith("MAIL") and self.fail_mail_codes:
+                code = self.fail_mail_codes.pop(0)
+                writer.write(f"{code} stub failure\r\n".encode())
+            elif command.startswith("DATA"):
+                writer.write(b"354 End data with <CR><LF>.<CR><LF>\r\n")
+                data = b""
+                while (chunk := await reader.readline()) != b".\r\n":
+                    data += chunk
+                self.messages.append(data)
+                writer.write(b"250 OK\r\n")
+                if self.drop_next_connection_after_data:
+                    self.drop_next_connection_after_data = False
+                    await writer.drain()
+                    writer.close()
+                    return
+            elif command.startswith("QUIT"):
+                writer.write(b"221 Bye\r\n")
+                await writer.drain()
+                writer.close()
+                return
+            else:  # MAIL, RCPT, RSET, NOOP
+                writer.write(b"250 OK\r\n")
+            await writer.drain()
+
+
+async def make_component(port, **config):
+    component = EmailComponent(
+        "email",
+        {
+            "host": "127.0.0.1",
+            "port": port,
+            "username": "orchestrator@example.com",
+            "password": "secret",
+            "starttls": False,
+            "enabled": True,
+            "retry_backoff": 0.01,
+            **config,
+        },
+    )
+    assert await component.initialize()
+    return component
+
+
+@pytest.mark.asyncio
+async def test_messages_share_one_smtp_session():
+    """Kolejne wiadomości idą przez jedną sesję SMTP."""
+    async with StubSmtpServer() as smtp_server:
+        email = await make_component(smtp_server.port)
+
+        for i in range(5):
+            assert await email.send_email(["ops@example.com"], f"alert {i}", "body")
+        await email.send_email(["ops@example.com"], "last", "body", wait=True)
+        await email.disconnect()
+
+        assert len(smtp_server.messages) == 6
+        assert smtp_server.connections == 1
+        assert email.get_status()["sent"] == 6
+
+
+@pytest.mark.asyncio
+async def test_slow_server_does_not_block_event_loop():
+    """Przy wolnym serwerze pętla zdarzeń nadal obsługuje inne zadania."""
+    async with StubSmtpServer() as smtp_server:
+        smtp_server.latency = 0.02
+        email = await make_component(smtp_server.port)
+        lateness = []
+
+        async def ticker():
+            for _ in range(20):
+                start = time.monotonic()
+                await asyncio.sleep(0.01)
+                lateness.append(time.monotonic() - start - 0.01)
+
+        tick_task = asyncio.create_task(ticker())
+        for i in range(10):
+            await email.send_email(["ops@example.com"], f"alert {i}", "body")
+        await tick_task
+        await email.disconnect()
+
+        assert max(lateness) < 0.05
+        assert len(smtp_server.messages) == 10
+
+
+@pytest.mark.asyncio
+async def test_transient_errors_are_retried():
+    """Odpowiedź 4xx i zerwane połączenie są ponawiane, sesja jest odnawiana."""
+    async with StubSmtpServer() as smtp_server:
+        email = await make_component(smtp_server.port)
+        smtp_server.fail_mail_codes = [451, 421]
+
+        await email.send_email(["ops@example.com"], "retried", "body", wait=True)
+        smtp_server.drop_next_connection_after_data = True
+        await email.send_email(["ops@example.com"], "first", "body", wait=True)
+        await email.send_email(["ops@example.com"], "after drop", "body", wait=True)
+        await email.disconnect()
+
+        assert len(smtp_server.messages) == 3
+        assert email.get_status()["retried"] == 2
+        assert smtp_server.connections >= 2
+
+
+@pytest.mark.asyncio
+async def test_permanent_error_is_not_retried():
+    """Odpowiedź 5xx kończy wysyłkę bez ponowień i jest zgłaszana przy wait."""
+    async with StubSmtpServer() as smtp_server:
+        email = await make_component(smtp_server.port)
+        smtp_server.fail_mail_codes = [550]
+
+        with pytest.raises(Exception, match="550"):
+            await email.send_email(["ops@example.com"], "rejected", "body", wait=True)
+        await email.send_email(["ops@example.com"], "next", "body", wait=True)
+        await email.disconnect()
+
+        status = email.get_status()
+        assert (status["failed"], status["retried"], status["sent"]) == (1, 0, 1)
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_per_recipient():
+    """Nadmiarowe wiadomości do jednego odbiorcy są pomijane."""
+    async with StubSmtpServer() as smtp_server:
+        email = await make_component(
+            smtp_server.port, rate_limit_count=2, rate_limit_window=60
+        )
+
+        results = [
+            await email.send_email(["ops@example.com", "boss@example.com"], "a", "b"),
+            await email.send_email(["ops@example.com"], "a", "b"),
+            await email.send_email(["OPS@example.com", "boss@example.com"], "a", "b"),
+            await email.send_email(["ops@example.com"], "a", "b"),
+        ]
+        await email.disconnect()
+
+        assert results == [True, True, True, False]
+        assert b"To: boss@example.com" in smtp_server.messages[2]
+        assert email.get_status()["rate_limited"] == 2
+
+
+@pytest.mark.asyncio
+async def test_full_queue_raises():
+    """Przepełniona kolejka zgłasza błąd zamiast blokować wywołującego."""
+    async with StubSmtpServer() as smtp_server:
+        smtp_server.latency = 0.05
+        email = await make_component(smtp_server.port, queue_size=2, rate_limit_count=0)
+
+        with pytest.raises(RuntimeError, match="kolejka"):
+            for i in range(5):
+                await email.send_email(["ops@example.com"], f"alert {i}", "body")
+        await email.disconnect(drain_timeout=0)
+
+
+@pytest.mark.asyncio
+async def test_action_waits_for_delivery_by_default():
+    """Błąd SMTP kończy akcję wyjątkiem i zwiększa licznik błędów akcji."""
+    async with StubSmtpServer() as smtp_server:
+        email = await make_component(smtp_server.port)
+        context = ScenarioContext(
+            scenario_name="test",
+            orchestrator=None,
+            action_executor=None,
+            message_logger=None,
+            components={"email": email},
+        )
+        action = SendEmailAction()
+        config = {"to": "ops@example.com", "subject": "alert", "body": "body"}
+        smtp_server.fail_mail_codes = [550]
+
+        try:
+            with pytest.raises(ActionExecutionError, match="550"):
+                await action.execute(config, context)
+            assert action.get_action_error_count("send_email") == 1
+
+            await action.execute(config, context)
+            assert action.get_action_error_count("send_email") == 0
+            assert len(smtp_server.messages) == 1
+        finally:
+            action.reset_action_error_count("send_email")
+            await email.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_action_rate_limited_email_is_not_success(monkeypatch):
+    """Pominięcie wszystkich odbiorców przez limit nie zeruje licznika błędów."""
+    async with StubSmtpServer() as smtp_server:
+        email = await make_component(
+            smtp_server.port, rate_limit_count=1, rate_limit_window=60
+        )
+        context = ScenarioContext(
+            scenario_name="test",
+            orchestrator=None,
+            action_executor=None,
+            message_logger=None,
+            components={"email": email},
+        )
+        action = SendEmailAction()
+        config = {"to": "ops@example.com", "subject": "alert", "body": "body"}
+        reset_calls = []
+        monkeypatch.setattr(
+            action, "reset_action_error_count", lambda name: reset_calls.append(name)
+        )
+
+        try:
+            await action.execute(config, context)
+            assert reset_calls == ["send_email"]
+
+            await action.execute(config, context)
+            assert reset_calls == ["send_email"]
+            assert action.get_action_error_count("send_email") == 0
+            assert len(smtp_server.messages) == 1
+            assert email.get_status()["rate_limited"] == 1
+        finally:
+            await email.disconnect()
@@ -0,0 +1,364 @@
+"""
+Testy jednostkowe ewaluacji scenariuszy sterowanej zmianami stanu klientów.
+
+Zakres:
+- zgodność uruchomionych scenariuszy z dotychczasowym odpytywaniem wszystkich
+  scenariuszy na nagranych przebiegach stanów klientów,
+- ponowna ewaluacja tylko scenariuszy zależnych od zmienionego klienta i pola,
+- harmonogram wybudzeń warunków czasowych i bazodanowych,
+- wyłączenie trybu (event_driven_scenarios=False).
+"""
+
+import asyncio
+import random
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import pytest
+
+from avena_commons.event_listener.event import Event, Result
+from avena_commons.orchestrator import Orchestrator
+from avena_commons.orchestrator.factories.condition_factory import ConditionFactory
+from avena_commons.util.logger import MessageLogger
+
+CLIENTS = ["io", "munchies", "supervisor", "feeder", "camera", "printer"]
+STATES = ["RUN", "FAULT", "STOPPED", "INITIALIZED"]
+
+
+def client_state(client, state):
+    return {"client_state": {"client": client, "state": state}}
+
+
+def make_scenario(name, conditions, **extra):
+    """Tworzy scenariusz bez cooldown z podanymi warunkami."""
+    scenario = {
+        "name": name,
+        "priority": extra.pop("priority", 0),
+        "cooldown": 0,
+        "trigger": {"type": "automatic"},
+        "actions": [{"type": "log_event", "message": name}],
+        **extra,
+    }
+    if conditions:
+        scenario["trigger"]["conditions"] = conditions
+    return scenario
+
+
+def trace_scenarios():
+    """Scenariusze pokrywające wszystkie rodzaje zależności warunków."""
+    return [
+        make_scenario("single", client_state("io", "RUN"), priority=1),
+        make_scenario(
+            "nested",
+            {
+                "and": {
+                    "conditions": [
+                        client_state("munchies", "RUN"),
+                        {
+                            "or": {
+                                "conditions": [
+                                    client_state("supervisor", "FAULT"),
+                                    {
+                                        "not": {
+                                            "condition": client_state("feeder", "RUN")
+                                        }
+                                    },
+                                ]
+                            }
+                        },
+                    ]
+                }
+            },
+            priority=2,
+        ),
+        make_scenario(
+            "any_fault",
+            {
+                "client_state": {
+                    "any_service_in_state": "FAULT",
+                    "exclude_clients": ["camera"],
+                }
+            },
+            priority=3,
+        ),
+        make_scenario(
+            "all_run", {"client_state": {"all_services_in_state": "RUN"}}, priority=4
+        ),
+        make_scenario(
+            "feeder_error",
+            {"error_message": {"mode": "contains", "pattern": "feeder"}},
+            priority=5,
+        ),
+        make_scenario(
+            "virtual_device",
+            {"virtual_device_error": {"client": "io", "device_pattern": "feeder"}},
+            priority=6,
+        ),
+        make_scenario(
+            "limited",
+            client_state("printer", "FAULT"),
+            priority=7,
+            max_executions=2,
+        ),
+        make_scenario(
+            "time_or_state",
+            {
+                "or": {
+                    "conditions": [
+                        {"time": {"specific_date": "2000-01-01"}},
+                        client_state("camera", "STOPPED"),
+                    ]
+                }
+            },
+            priority=8,
+        ),
+        make_scenario("always", None, priority=9),
+    ]
+
+
+def state_event(client, fsm_state, error_message=None, failed_devices=None):
+    """Buduje odpowiedź CMD_GET_STATE klienta."""
+    state = {}
+    if failed_devices is not None:
+        state = {"io_server": {"failed_virtual_devices": failed_devices}}
+    return Event(
+        source=client,
+        source_address="127.0.0.1",
+        source_port=9000,
+        destination="test_orch",
+        destination_address="127.0.0.1",
+        destination_port=5000,
+        event_type="CMD_GET_STATE",
+        data={
+            "fsm_state": fsm_state,
+            "error": error_message is not None,
+            "error_message": error_message,
+            "state": state,
+        },
+        result=Result(result="success"),
+    )
+
+
+def record_trace(seed, ticks):
+    """Generuje powtarzalny przebieg odpowiedzi klientów (lista zdarzeń na cykl)."""
+    rng = random.Random(seed)
+    current = {client: "RUN" for client in CLIENTS}
+    trace = []
+    for _ in range(ticks):
+        events = []
+        for client in rng.sample(CLIENTS, rng.randint(0, 3)):
+            if rng.random() < 0.6:
+                current[client] = rng.choice(STATES)
+            fsm_state = current[client]
+            error_message = None
+            failed = None
+            if fsm_state == "FAULT" and rng.random() < 0.5:
+                error_message = rng.choice(["feeder2 timeout", "camera lost"])
+            if client == "io":
+                failed = rng.choice([{}, {"feeder1": {"failed_physical_devices": {}}}])
+            events.append(state_event(client, fsm_state, error_message, failed))
+        trace.append(events)
+    return trace
+
+
+def create_orchestrator(event_driven):
+    orch = Orchestrator(
+        name="test_orch",
+        port=5000,
+        address="127.0.0.1",
+        message_logger=MagicMock(spec=MessageLogger),
+    )
+    orch._configuration["clients"] = {
+        name: {"address": "127.0.0.1", "port": 9000 + i}
+        for i, name in enumerate(CLIENTS)
+    }
+    orch._configuration["builtin_scenarios_directory"] = None
+    orch._configuration["max_concurrent_scenarios"] = 100
+    orch._configuration["event_driven_scenarios"] = event_driven
+    orch._state = {name: {"fsm_state": "RUN"} for name in CLIENTS}
+    return orch
+
+
+def install_scenarios(orch, scenarios):
+    for scenario in scenarios:
+        orch._scenarios[scenario["name"]] = scenario
+    orch._sort_scenarios_by_priority()
+    orch._compile_scenario_conditions()
+
+
+def install_recorder(orch):
+    """Zastępuje wykonanie scenariusza zapisem nazwy i liczy ewaluacje."""
+    fired = []
+    evaluations = []
+
+    async def fake_execute(scenario_name):
+        fired.append(scenario_name)
+        orch.increment_scenario_execution_count(scenario_name)
+        orch.scenario_data.pop(scenario_name, None)
+        orch._scenario_last_execution[scenario_name] = datetime.now()
+        return True
+
+    original_should_execute = orch._should_execute_scenario
+
+    async def counting_should_execute(scenario):
+        evaluations.append(scenario["name"])
+        return await original_should_execute(scenario)
+
+    orch._execute_scenario_with_tracking = fake_execute
+    orch._should_execute_scenario = counting_should_execute
+    return fired, evaluations
+
+
+async def replay(trace, event_driven, ack_at=None):
+    """Odtwarza przebieg i zwraca listę uruchomionych scenariuszy dla każdego cyklu."""
+    orch = create_orchestrator(event_driven)
+    install_scenarios(orch, trace_scenarios())
+    fired, evaluations = install_recorder(orch)
+    fired_per_tick = []
+    for tick, events in enumerate(trace):
+        if tick == ack_at:
+            orch.reset_all_scenario_execution_counters()
+        for event in events:
+            await orch._analyze_event(event)
+        fired.clear()
+        await orch._check_scenarios()
+        fired_per_tick.append(sorted(fired))
+    return fired_per_tick, len(evaluations)
+
+
+@pytest.fixture(autouse=True)
+def _work_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("seed", [1, 7, 42])
+async def test_fired_scenarios_match_polling_on_recorded_trace(seed):
+    """Tryb zdarzeniowy uruchamia te same scenariusze co odpytywanie wszystkich."""
+    trace = record_trace(seed, ticks=80)
+
+    polling, polling_evaluations = await replay(trace, event_driven=False, ack_at=40)
+    event_driven, driven_evaluations = await replay(trace, event_driven=True, ack_at=40)
+
+    assert event_driven == polling
+    assert sum(len(tick) for tick in polling) > len(trace)  # przebieg coś uruchamia
+    assert driven_evaluations < polling_evaluations
+
+
+@pytest.mark.asyncio
+async def test_only_scenarios_of_changed_client_are_reevaluated():
+    """Zmiana stanu innego klienta lub powtórzony stan nie budzą scenariusza."""
+    orch = create_orchestrator(event_driven=True)
+    install_scenarios(orch, [make_scenario("io_fault", client_state("io", "FAULT"))])
+    fired, evaluations = install_recorder(orch)
+
+    await orch._check_scenarios()
+    assert evaluations == ["io_fault"]
+    assert "io_fault" in orch._clean_scenarios
+
+    await orch._analyze_event(state_event("munchies", "FAULT"))
+    await orch._analyze_event(state_event("io", "RUN"))
+    await orch._check_scenarios()
+    assert evaluations == ["io_fault"]
+
+    await orch._analyze_event(state_event("io", "FAULT"))
+    await orch._check_scenarios()
+    assert evaluations == ["io_fault", "io_fault"]
+    assert fired == ["io_fault"]
+
+
+@pytest.mark.asyncio
+async def test_changed_field_must_be_read_by_condition():
+    """Zmiana pola, którego warunek nie czyta, nie wymusza ewaluacji."""
+    orch = create_orchestrator(event_driven=True)
+    install_scenarios(
+        orch,
+        [
+            make_scenario("fsm", client_state("io", "FAULT")),
+            make_scenario(
+                "errors", {"error_message": {"mode": "contains", "pattern": "x"}}
+            ),
+        ],
+    )
+    _, evaluations = install_recorder(orch)
+    await orch._check_scenarios()
+    assert orch._clean_scenarios == {"fsm", "errors"}
+
+    # error_message zmienia się przy tym samym fsm_state
+    await orch._analyze_event(state_event("io", "RUN", error_message="y"))
+    assert orch._clean_scenarios == {"fsm"}
+
+    evaluations.clear()
+    await orch._check_scenarios()
+    assert evaluations == ["errors"]
+
+
+@pytest.mark.asyncio
+async def test_time_condition_wakes_up_after_poll_interval():
+    """Warunek czasowy jest ewaluowany ponownie po upływie poll_interval."""
+    orch = create_orchestrator(event_driven=True)
+    install_scenarios(
+        orch,
+        [
+            make_scenario(
+                "timed",
+                {"time": {"specific_date": "2000-01-01", "poll_interval": 0.05}},
+            )
+        ],
+    )
+    _, evaluations = install_recorder(orch)
+
+    await orch._check_scenarios()
+    await orch._check_scenarios()
+    assert evaluations == ["timed"]
+
+    await asyncio.sleep(0.06)
+    await orch._check_scenarios()
+    assert evaluations == ["timed", "timed"]
+
+
+def test_poll_interval_of_conditions():
+    """Okresy odpytywania wynikają z rodzaju warunków."""
+    create = ConditionFactory.create_condition
+    assert create(client_state("io", "RUN")).get_poll_interval() is None
+    assert create({"time": {"weekdays": ["monday"]}}).get_poll_interval() == 1.0
+    database = create({
+        "database": {
+            "component": "db",
+            "table": "t",
+            "column": "c",
+            "where": {"id": 1},
+            "expected_value": 1,
+        }
+    })
+    assert database.get_poll_interval() == 0.0
+    nested = create({
+        "and": {
+            "conditions": [
+                client_state("io", "RUN"),
+                {"time": {"weekdays": ["monday"], "poll_interval": 5}},
+            ]
+        }
+    })
+    assert nested.get_poll_interval() == 5.0
+    assert nested.get_referenced_fields() == {"fsm_state"}
+
+
+@pytest.mark.asyncio
+async def test_polling_mode_never_skips_scenarios():
+    """event_driven_scenarios=False ewaluuje wszystkie scenariusze w każdym cyklu."""
+    orch = create_orchestrator(event_driven=False)
+    install_scenarios(orch, [make_scenario("io_fault", client_state("io", "FAULT"))])
+    _, evaluations = install_recorder(orch)
+
+    for _ in range(3):
+        await orch._check_scenarios()
+
+    assert evaluations == ["io_fault"] * 3
+    assert not orch._clean_scenarios
+
+
+def test_abstract_logic_base_is_not_registered():
+    """Abstrakcyjna klasa LogicCondition nie trafia do rejestru warunków."""
+    create_orchestrator(event_driven=True)
+    assert "logic" not in ConditionFactory.get_registered_conditions()
@@ -0,0 +1,293 @@
+"""
+Testy jednostkowe przyrostowej obsługi scenariuszy w _check_scenarios.
+
+Zakres:
+- scenariusze w cooldown i z wyczerpanym limitem wykonań są pomijane bez ewaluacji,
+- koniec cooldown z kopca terminów (także przy ponownie rozpoczętym cooldown),
+- limit wykonań: blokada, reset po ACK, zmiana limitu po przeładowaniu,
+- cleanup aktywnych scenariuszy czyści też cooldowny i wyczerpane limity,
+- licznik aktywnych scenariuszy przy sukcesie, błędzie i limitach równoległości.
+"""
+
+import asyncio
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from avena_commons.orchestrator import Orchestrator
+from avena_commons.util.logger import MessageLogger
+
+
+def create_orchestrator(max_concurrent=10):
+    orch = Orchestrator(
+        name="test_orch",
+        port=5000,
+        address="127.0.0.1",
+        message_logger=MagicMock(spec=MessageLogger),
+    )
+    orch._configuration["clients"] = {"io": {"address": "127.0.0.1", "port": 9000}}
+    orch._configuration["builtin_scenarios_directory"] = None
+    orch._configuration["max_concurrent_scenarios"] = max_concurrent
+    orch._state = {"io": {"fsm_state": "RUN"}}
+    return orch
+
+
+def install_scenario(orch, name, **extra):
+    """Scenariusz bez warunków (spełniony w każdym cyklu)."""
+    orch._scenarios[name] = {
+        "name": name,
+        "priority": extra.pop("priority", 0),
+        "cooldown": extra.pop("cooldown", 0),
+        "trigger": {"type": "automatic"},
+        "actions": [{"type": "log_event", "message": name}],
+        **extra,
+    }
+    orch._sort_scenarios_by_priority()
+    orch._compile_scenario_conditions()
+
+
+def install_recorder(orch, body=None):
+    """Zastępuje ciało scenariusza i zapisuje uruchomienia oraz ewaluacje."""
+    fired = []
+    evaluations = []
+
+    async def execute_scenario(scenario_name):
+        fired.append(scenario_name)
+        orch.increment_scenario_execution_count(scenario_name)
+        if body is not None:
+            await body(scenario_name)
+        return True
+
+    original_should_execute = orch._should_execute_scenario
+
+    async def counting_should_execute(scenario):
+        evaluations.append(scenario["name"])
+        return await original_should_execute(scenario)
+
+    orch.execute_scenario = execute_scenario
+    orch._should_execute_scenario = counting_should_execute
+    return fired, evaluations
+
+
+async def tick(orch):
+    await orch._check_scenarios()
+    await asyncio.sleep(0)
+
+
+@pytest.fixture(autouse=True)
+def _work_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+
+@pytest.mark.asyncio
+async def test_scenario_in_cooldown_is_not_evaluated():
+    """W cooldown scenariusz nie jest ewaluowany, po jego końcu startuje ponownie."""
+    orch = create_orchestrator()
+    install_scenario(orch, "cooled", cooldown=0.05)
+    fired, evaluations = install_recorder(orch)
+
+    await tick(orch)
+    assert fired == ["cooled"]
+    assert "cooled" in orch._cooldown_until
+
+    for _ in range(5):
+        await tick(orch)
+    assert fired == ["cooled"]
+    assert evaluations == ["cooled"]
+
+    await asyncio.sleep(0.06)
+    await tick(orch)
+    assert fired == ["cooled", "cooled"]
+    assert orch._scenario_last_execution["cooled"]
+
+
+@pytest.mark.asyncio
+async def test_zero_cooldown_fires_every_tick():
+    """Cooldown 0 nie trafia do kopca - scenariusz może startować w każdym cyklu."""
+    orch = create_orchestrator()
+    install_scenario(orch, "eager", cooldown=0)
+    fired, _ = install_recorder(orch)
+
+    for _ in range(3):
+        await tick(orch)
+
+    assert fired == ["eager"] * 3
+    assert orch._cooldown_heap == []
+
+
+@pytest.mark.asyncio
+async def test_legacy_cooldown_defaults_to_sixty_seconds():
+    """Bez pola cooldown obowiązuje stary format z domyślnymi 60 s."""
+    orch = create_orchestrator()
+    install_scenario(orch, "legacy")
+    del orch._scenarios["legacy"]["cooldown"]
+    fired, _ = install_recorder(orch)
+
+    await tick(orch)
+    await tick(orch)
+
+    assert fired == ["legacy"]
+    assert orch._cooldown_until["legacy"] - time.monotonic() == pytest.approx(60, abs=1)
+
+
+@pytest.mark.asyncio
+async def test_stale_heap_entry_does_not_end_restarted_cooldown():
+    """Wpis kopca z wcześniejszego cooldown nie kończy nowszego, dłuższego."""
+    orch = create_orchestrator()
+    install_scenario(orch, "restarted", cooldown=0.02)
+
+    orch._start_scenario_cooldown("restarted")
+    orch._scenarios["restarted"]["cooldown"] = 10
+    orch._start_scenario_cooldown("restarted")
+    await asyncio.sleep(0.03)
+    orch._expire_scenario_cooldowns()
+
+    assert "restarted" in orch._cooldown_until
+    assert len(orch._cooldown_heap) == 1
+
+
+@pytest.mark.asyncio
+async def test_exhausted_scenario_is_blocked_until_ack():
+    """Po osiągnięciu limitu scenariusz jest pomijany bez ewaluacji aż do ACK."""
+    orch = create_orchestrator()
+    install_scenario(orch, "limited", max_executions=2)
+    fired, evaluations = install_recorder(orch)
+
+    for _ in range(5):
+        await tick(orch)
+
+    assert fired == ["limited", "limited"]
+    assert evaluations == ["limited", "limited"]
+    assert orch.is_scenario_blocked("limited")
+
+    await orch.on_ack()
+    await tick(orch)
+    assert fired == ["limited"] * 3
+    assert not orch.is_scenario_blocked("limited")
+
+
+@pytest.mark.asyncio
+async def test_clear_running_scenarios_resets_cooldown_and_limits():
+    """Po cleanup scenariusz nie jest blokowany przez stare cooldowny ani limity."""
+    orch = create_orchestrator()
+    install_scenario(orch, "cooled", cooldown=60)
+    install_scenario(orch, "limited", max_executions=1)
+    release = asyncio.Event()
+
+    async def body(scenario_name):
+        if scenario_name == "limited":
+            await release.wait()
+
+    fired, _ = install_recorder(orch, body)
+
+    for _ in range(3):
+        await tick(orch)
+    assert sorted(fired) == ["cooled", "limited"]
+    assert orch._exhausted_scenarios == {"limited"}
+    assert "cooled" in orch._cooldown_until
+
+    orch._clear_running_scenarios()
+
+    assert orch._exhausted_scenarios == set()
+    assert orch._cooldown_until == {}
+    assert orch._cooldown_heap == []
+
+    for _ in range(2):
+        await tick(orch)
+    assert sorted(fired) == ["cooled", "cooled", "limited", "limited"]
+    release.set()
+
+
+@pytest.mark.asyncio
+async def test_raised_limit_after_reload_unblocks_scenario():
+    """Zwiększenie max_executions przy przeładowaniu odblokowuje scenariusz."""
+    orch = create_orchestrator()
+    install_scenario(orch, "limited", max_executions=1)
+    fired, _ = install_recorder(orch)
+
+    await tick(orch)
+    await tick(orch)
+    assert fired == ["limited"]
+
+    orch._scenarios["limited"]["max_executions"] = 2
+    orch._refresh_exhausted_scenarios()
+    await tick(orch)
+    await tick(orch)
+    assert fired == ["limited", "limited"]
+    assert orch._exhausted_scenarios == {"limited"}
+
+
+@pytest.mark.asyncio
+async def test_non_positive_limit_means_unlimited():
+    """max_executions 0 nie blokuje scenariusza (jak should_block_scenario_due_to_limit)."""
+    orch = create_orchestrator()
+    install_scenario(orch, "unlimited", max_executions=0)
+    fired, _ = install_recorder(orch)
+
+    for _ in range(3):
+        await tick(orch)
+
+    assert fired == ["unlimited"] * 3
+    assert orch._exhausted_scenarios == set()
+
+
+@pytest.mark.asyncio
+async def test_active_counter_tracks_running_and_failed_scenarios():
+    """Licznik aktywnych wraca do zera po sukcesie i po błędzie scenariusza."""
+    orch = create_orchestrator(max_concurrent=2)
+    for name in ("slow", "failing", "quick"):
+        install_scenario(orch, name, cooldown=10, max_concurrent_executions=5)
+    release = asyncio.Event()
+    failures = []
+
+    async def body(scenario_name):
+        if scenario_name == "slow":
+            await release.wait()
+        if scenario_name == "failing" and not failures:
+            failures.append(scenario_name)
+            raise RuntimeError("awaria")
+
+    fired, _ = install_recorder(orch, body)
+
+    await tick(orch)
+    assert fired == ["slow", "failing", "quick"]
+    assert orch._active_scenarios_count == 1
+
+    # Błąd nie rozpoczyna cooldown - scenariusz startuje w kolejnym cyklu
+    await tick(orch)
+    assert fired == ["slow", "failing", "quick", "failing"]
+    assert orch._active_scenarios_count == 1
+
+    release.set()
+    await asyncio.sleep(0)
+    await tick(orch)
+    assert orch._active_scenarios_count == 0
+    assert orch._running_scenarios == {}
+    assert orch._finished_scenarios == []
+
+
+@pytest.mark.asyncio
+async def test_global_limit_skips_evaluation():
+    """Przy osiągniętym globalnym limicie scenariusze nie są ewaluowane."""
+    orch = create_orchestrator(max_concurrent=1)
+    install_scenario(orch, "slow", priority=0, cooldown=10)
+    install_scenario(orch, "other", priority=1, cooldown=10)
+    release = asyncio.Event()
+
+    async def body(scenario_name):
+        if scenario_name == "slow":
+            await release.wait()
+
+    fired, evaluations = install_recorder(orch, body)
+
+    for _ in range(3):
+        await tick(orch)
+    assert fired == ["slow"]
+    # "other" oceniony raz w cyklu startu "slow", potem limit globalny
+    assert evaluations == ["slow", "other"]
+
+    release.set()
+    await asyncio.sleep(0)
+    await tick(orch)
+    assert fired == ["slow", "other"]
@@ -0,0 +1,255 @@
+"""
+Testy jednostkowe wysyłki w tle w SmsComponent.
+
+Bramka SMS jest lokalnym serwerem aiohttp działającym w tej samej pętli co
+komponent - test przechodzi tylko wtedy, gdy wysyłka nie blokuje pętli zdarzeń.
+
+Zakres:
+- wspólna sesja HTTP (połączenia keep-alive) i limit równoległych żądań,
+- pętla zdarzeń nie jest blokowana przy wolnej bramce,
+- ponowienia po odpowiedziach 5xx, brak ponowień przy odrzuceniu przez API,
+- deduplikacja identycznych alertów w oknie czasowym,
+- wynik wysyłki przy wait (segmenty, błędy) i ograniczona kolejka,
+- akcja send_sms domyślnie czeka na wynik bramki i liczy błędy wysyłki.
+"""
+
+import asyncio
+import time
+
+import pytest
+from aiohttp import web
+
+from avena_commons.orchestrator.actions.base_action import ActionExecutionError
+from avena_commons.orchestrator.actions.send_sms_action import SendSmsAction
+from avena_commons.orchestrator.components.sms_component import SmsComponent
+from avena_commons.orchestrator.models.scenario_models import ScenarioContext
+
+
+class StubSmsGateway:
+    """Lokalna bramka MultiInfo z opóźnieniem odpowiedzi i wstrzykiwanymi błędami."""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.messages = []  # parametry udanych żądań sendsms
+        self.responses = []  # kolejne odpowiedzi (status, treść) zamiast sukcesu
+        self.connections = set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._runner = None
+
+    async def __aenter__(self):
+        app = web.Application()
+        app.router.add_route("HEAD", "/", self._head)
+        app.router.add_get("/sendsms.aspx", self._send)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}/"
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self._runner.cleanup()
+
+    async def _head(self, request):
+        return web.Response()
+
+    async def _send(self, request):
+        self.connections.add(request.transport.get_extra_info("peername"))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.in_flight -= 1
+        if self.responses:
+            status, body = self.responses.pop(0)
+            return web.Response(status=status, text=body)
+        self.messages.append(dict(request.query))
+        return web.Response(text=f"0\n{len(self.messages)}\n")
+
+
+async def make_component(url, **config):
+    component = SmsComponent(
+        "sms",
+        {
+            "url": url,
+            "login": "login",
+            "password": "secret",
+            "serviceId": "1",
+            "source": "AVENA",
+            "enabled": True,
+            "retry_backoff": 0.01,
+            **config,
+        },
+    )
+    assert await component.initialize()
+    assert await component.connect()
+    return component
+
+
+@pytest.mark.asyncio
+async def test_requests_share_session_and_respect_concurrency():
+    """Wiele SMS-ów przez pulę najwyżej `concurrency` połączeń keep-alive."""
+    async with StubSmsGateway(latency=0.01) as gateway:
+        sms = await make_component(gateway.url, concurrency=3)
+
+        numbers = [f"500{i:06d}" for i in range(30)]
+        assert await sms.send_sms(numbers, "alarm") == (True, 30, [])
+        await sms.disconnect()
+
+        assert len(gateway.messages) == 30
+        assert gateway.messages[0]["dest"] == "48500000000"
+        assert gateway.max_in_flight == 3
+        assert len(gateway.connections) <= 3
+
+
+@pytest.mark.asyncio
+async def test_slow_gateway_does_not_block_event_loop():
+    """Przy wolnej bramce pętla zdarzeń nadal obsługuje inne zadania."""
+    async with StubSmsGateway(latency=0.05) as gateway:
+        sms = await make_component(gateway.url, concurrency=2)
+        lateness = []
+
+        async def ticker():
+            for _ in range(20):
+                start = time.monotonic()
+                await asyncio.sleep(0.01)
+                lateness.append(time.monotonic() - start - 0.01)
+
+        tick_task = asyncio.create_task(ticker())
+        for i in range(10):
+            await sms.send_sms(["500000000"], f"alarm {i}")
+        await tick_task
+        await sms.disconnect()
+
+        assert max(lateness) < 0.05
+        assert len(gateway.messages) == 10
+
+
+@pytest.mark.asyncio
+async def test_server_errors_are_retried_api_rejection_is_not():
+    """Odpowiedzi 5xx są ponawiane, ujemny kod bramki kończy wysyłkę od razu."""
+    async with StubSmsGateway() as gateway:
+        sms = await make_component(gateway.url)
+
+        gateway.responses = [(503, "busy"), (502, "bad gateway")]
+        assert await sms.send_sms(["500000000"], "retried", wait=True) == (
+            True,
+            1,
+            [],
+        )
+
+        gateway.responses = [(200, "-2\n")]
+        all_ok, sent_count, errors = await sms.send_sms(
+            ["500000001"], "rejected", wait=True
+        )
+        await sms.disconnect()
+
+        assert (all_ok, sent_count) == (False, 0)
+        assert "-2" in errors[0]
+        status = sms.get_status()
+        assert (status["sent"], status["failed"], status["retried"]) == (1, 1, 2)
+
+
+@pytest.mark.asyncio
+async def test_identical_alerts_are_deduplicated_within_window():
+    """Ten sam alert do tego samego numeru w oknie deduplikacji idzie raz."""
+    async with StubSmsGateway() as gateway:
+        sms = await make_component(gateway.url, dedup_window=60)
+
+        for _ in range(5):
+            await sms.send_sms(["+48 500 000 000", "500000000"], "awaria", wait=True)
+        await sms.send_sms(["500000000"], "inna awaria", wait=True)
+
+        sms._dedup_window = 0.05
+        await asyncio.sleep(0.06)
+        await sms.send_sms(["500000000"], "awaria", wait=True)
+        await sms.disconnect()
+
+        assert [m["text"] for m in gateway.messages] == [
+            "awaria",
+            "inna awaria",
+            "awaria",
+        ]
+        assert sms.get_status()["deduplicated"] == 9
+
+
+@pytest.mark.asyncio
+async def test_failed_alert_is_not_deduplicated():
+    """Nieudana wysyłka nie blokuje ponownej próby tej samej treści."""
+    async with StubSmsGateway() as gateway:
+        sms = await make_component(gateway.url, max_retries=0)
+
+        gateway.responses = [(500, "error")]
+        assert not (await sms.send_sms(["500000000"], "awaria", wait=True))[0]
+        assert (await sms.send_sms(["500000000"], "awaria", wait=True))[0]
+        await sms.disconnect()
+
+        assert len(gateway.messages) == 1
+
+
+@pytest.mark.asyncio
+async def test_wait_reports_segments_and_errors():
+    """Przy wait wynik zawiera liczbę odbiorców i błędy kolejnych segmentów."""
+    async with StubSmsGateway() as gateway:
+        sms = await make_component(gateway.url, max_length=5, concurrency=1)
+
+        assert await sms.send_sms(["500000000"], "abcdefghij", wait=True) == (
+            True,
+            1,
+            [],
+        )
+        assert [m["text"] for m in gateway.messages] == ["abcde", "fghij"]
+
+        gateway.responses = [(200, "-1"), (200, "-1")]
+        all_ok, sent_count, errors = await sms.send_sms(
+            ["500000001"], "0123456789", ignore_errors=True, wait=True
+        )
+        await sms.disconnect()
+
+        assert (all_ok, sent_count, len(errors)) == (False, 0, 2)
+        assert "segment 2/2" in errors[1]
+
+
+@pytest.mark.asyncio
+async def test_full_queue_raises():
+    """Przepełniona kolejka zgłasza błąd zamiast blokować wywołującego."""
+    async with StubSmsGateway(latency=0.05) as gateway:
+        sms = await make_component(gateway.url, queue_size=2, concurrency=1)
+
+        with pytest.raises(RuntimeError, match="kolejka"):
+            await sms.send_sms([f"50000000{i}" for i in range(5)], "alarm")
+        await sms.disconnect(drain_timeout=0)
+
+        assert gateway.messages == []
+
+
+@pytest.mark.asyncio
+async def test_action_waits_for_gateway_by_default():
+    """Odrzucenie przez bramkę kończy akcję wyjątkiem i zwiększa licznik błędów."""
+    async with StubSmsGateway() as gateway:
+        sms = await make_component(gateway.url, dedup_window=0)
+        context = ScenarioContext(
+            scenario_name="test",
+            orchestrator=None,
+            action_executor=None,
+            message_logger=None,
+            components={"sms": sms},
+        )
+        action = SendSmsAction()
+        config = {"to": "500000000", "text": "awaria"}
+        gateway.responses = [(200, "-2\n")]
+
+        try:
+            with pytest.raises(ActionExecutionError):
+                await action.execute(config, context)
+            assert action.get_action_error_count("send_sms") == 1
+
+            await action.execute(config, context)
+            assert action.get_action_error_count("send_sms") == 0
+            assert len(gateway.messages) == 1
+        finally:
+            action.reset_action_error_count("send_sms")
+            await sms.disconnect()
@@ -0,0 +1,146 @@
+"""
+Testy jednostkowe akcji wait_for_state sterowanej zmianami stanu klientów.
+
+Zakres:
+- reakcja w czasie poniżej 1 ms od zapisania nowego stanu klienta,
+- oczekiwanie na stan wszystkich wybranych klientów,
+- zachowanie timeoutu i wyrejestrowanie oczekujących,
+- setki równoległych oczekujących bez zużycia CPU w bezczynności.
+"""
+
+import asyncio
+import statistics
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from avena_commons.event_listener.event import Event, Result
+from avena_commons.orchestrator import Orchestrator
+from avena_commons.orchestrator.actions.base_action import ActionExecutionError
+from avena_commons.orchestrator.actions.wait_for_state_action import (
+    WaitForStateAction,
+)
+from avena_commons.orchestrator.models.scenario_models import ScenarioContext
+from avena_commons.util.logger import MessageLogger
+
+CLIENTS = ["io", "munchies", "supervisor", "feeder"]
+
+
+def create_orchestrator():
+    orch = Orchestrator(
+        name="test_orch",
+        port=5000,
+        address="127.0.0.1",
+        message_logger=MagicMock(spec=MessageLogger),
+    )
+    orch._configuration["clients"] = {
+        name: {"address": "127.0.0.1", "port": 9000 + i, "group": "base"}
+        for i, name in enumerate(CLIENTS)
+    }
+    orch._state = {name: {"fsm_state": "INITIALIZING"} for name in CLIENTS}
+    return orch
+
+
+def state_event(client, fsm_state):
+    """Buduje odpowiedź CMD_GET_STATE klienta."""
+    return Event(
+        source=client,
+        source_address="127.0.0.1",
+        source_port=9000,
+        destination="test_orch",
+        destination_address="127.0.0.1",
+        destination_port=5000,
+        event_type="CMD_GET_STATE",
+        data={"fsm_state": fsm_state, "error": False, "state": {}},
+        result=Result(result="success"),
+    )
+
+
+def make_context(orch):
+    return ScenarioContext(
+        scenario_name="test",
+        orchestrator=orch,
+        action_executor=None,
+        message_logger=None,
+    )
+
+
+def wait_for(orch, timeout="5s", **selector):
+    config = {"type": "wait_for_state", "target_state": "RUN", "timeout": timeout}
+    return asyncio.create_task(
+        WaitForStateAction().execute({**config, **selector}, make_context(orch))
+    )
+
+
+@pytest.mark.asyncio
+async def test_reacts_to_state_change_within_one_millisecond():
+    """Akcja kończy się zaraz po zapisaniu oczekiwanego stanu klienta."""
+    orch = create_orchestrator()
+    latencies = []
+
+    for _ in range(20):
+        orch._state["io"]["fsm_state"] = "INITIALIZING"
+        task = wait_for(orch, client="io")
+        await asyncio.sleep(0.005)
+        assert not task.done()
+
+        start = time.perf_counter()
+        await orch._analyze_event(state_event("io", "RUN"))
+        await task
+        latencies.append(time.perf_counter() - start)
+
+    assert statistics.median(latencies) < 0.001
+
+
+@pytest.mark.asyncio
+async def test_waits_until_all_clients_reach_state():
+    """Zmiana stanu części grupy nie kończy oczekiwania."""
+    orch = create_orchestrator()
+    task = wait_for(orch, group="base")
+
+    for client in CLIENTS[:-1]:
+        await orch._analyze_event(state_event(client, "RUN"))
+        await asyncio.sleep(0)
+    await orch._analyze_event(state_event("io", "FAULT"))
+    await orch._analyze_event(state_event(CLIENTS[-1], "RUN"))
+    await asyncio.sleep(0.01)
+    assert not task.done()
+
+    await orch._analyze_event(state_event("io", "RUN"))
+    await asyncio.wait_for(task, timeout=1)
+
+
+@pytest.mark.asyncio
+async def test_timeout_raises_and_unregisters_waiter():
+    """Timeout zgłasza błąd jak wcześniej i nie zostawia oczekujących."""
+    orch = create_orchestrator()
+
+    with pytest.raises(ActionExecutionError, match="Timeout"):
+        await wait_for(orch, timeout=0.05, client="io")
+
+    assert orch._state_waiters == {}
+
+
+@pytest.mark.asyncio
+async def test_many_idle_waiters_use_no_cpu():
+    """500 oczekujących nie jest wybudzanych, dopóki stan się nie zmieni."""
+    orch = create_orchestrator()
+    tasks = [wait_for(orch, timeout="30s", client=CLIENTS[i % 4]) for i in range(500)]
+    await asyncio.sleep(0.05)
+
+    cpu_start = time.process_time()
+    await asyncio.sleep(0.5)
+    idle_cpu = time.process_time() - cpu_start
+
+    # Zmiana jednego klienta wybudza tylko jego oczekujących
+    await orch._analyze_event(state_event("io", "RUN"))
+    await asyncio.sleep(0.01)
+    assert sum(task.done() for task in tasks) == 125
+
+    for client in CLIENTS[1:]:
+        await orch._analyze_event(state_event(client, "RUN"))
+    await asyncio.wait_for(asyncio.gather(*tasks), timeout=1)
+
+    assert idle_cpu < 0.05
+    assert orch._state_waiters == {}
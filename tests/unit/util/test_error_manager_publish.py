@@ -0,0 +1,202 @@
+"""
+Testy jednostkowe publikacji ErrorManager przez pamięć współdzieloną.
+
+Moduł zawiera testy:
+- publikacji interfejsu błędów tylko przy zmianie (licznik wersji)
+- taniego sprawdzania wersji bez deserializacji
+- propagacji błędów i potwierdzeń między instancjami
+- współbieżnych czytelników (wątki i procesy)
+"""
+
+import multiprocessing as mp
+import os
+import threading
+import time
+import uuid
+
+import posix_ipc
+import pytest
+
+from avena_commons.util.error_level import ErrorCodes, ErrorGroups, ErrorManager
+
+
+def _wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.001)
+    return predicate()
+
+
+def _cleanup_shm(suffix):
+    for name in (
+        f"/error_manager_{suffix}_shm",
+        f"/error_manager_{suffix}_version_shm",
+    ):
+        try:
+            posix_ipc.unlink_shared_memory(name)
+        except posix_ipc.ExistentialError:
+            pass
+    try:
+        posix_ipc.unlink_semaphore(f"/error_manager_{suffix}_semaphore")
+    except posix_ipc.ExistentialError:
+        pass
+
+
+@pytest.fixture
+def suffix():
+    value = f"test_{os.getpid()}_{uuid.uuid4().hex[:8]}"
+    yield value
+    _cleanup_shm(value)
+
+
+@pytest.fixture
+def managers(suffix):
+    created = []
+
+    def factory():
+        manager = ErrorManager(suffix)
+        created.append(manager)
+        return manager
+
+    yield factory
+    for manager in created:
+        manager.stop()
+
+
+def _reader_process(suffix, ready, result_queue):
+    manager = ErrorManager(suffix, publish_period=0.005)
+    ready.set()
+    seen = _wait_for(
+        lambda: manager.check_current_error(ErrorCodes.CAMERA_ERROR), timeout=5.0
+    )
+    result_queue.put((seen, manager.version))
+    manager.stop()
+
+
+class TestErrorManagerVersioning:
+    """Testy licznika wersji i publikacji tylko przy zmianie."""
+
+    def test_idle_manager_does_not_publish(self, managers):
+        """Bezczynny manager nie zwiększa wersji współdzielonej."""
+        manager = managers()
+        assert _wait_for(lambda: manager.version is not None)
+        version = manager.shared_version()
+
+        time.sleep(0.1)
+
+        assert manager.shared_version() == version
+        assert manager.version == version
+
+    def test_set_error_increments_version_once(self, managers):
+        """Każda publikacja zwiększa wersję, kilka zmian może zostać scalonych."""
+        manager = managers()
+        assert _wait_for(lambda: manager.version is not None)
+        version = manager.shared_version()
+
+        manager.set_error(ErrorCodes.CAMERA_ERROR, "camera")
+
+        assert _wait_for(lambda: manager.shared_version() == version + 1)
+        assert manager.check_current_error(ErrorCodes.CAMERA_ERROR)
+
+    def test_error_propagates_between_managers(self, managers):
+        """Błąd ustawiony w jednym managerze jest widoczny w drugim."""
+        writer = managers()
+        reader = managers()
+
+        writer.set_error(ErrorCodes.CONNECTION_ERROR, "no connection")
+
+        assert _wait_for(lambda: reader.check_current_group(ErrorGroups.CRITICAL))
+        assert reader.version == writer.shared_version()
+
+    def test_multiple_errors_are_not_lost(self, managers):
+        """Kilka błędów ustawionych między publikacjami trafia do pamięci współdzielonej."""
+        writer = managers()
+        reader = managers()
+
+        writer.set_error(ErrorCodes.CAMERA_ERROR)
+        writer.set_error(ErrorCodes.PUMP_ERROR)
+        writer.set_error(ErrorCodes.QR_WARNING)
+
+        assert _wait_for(
+            lambda: (
+                reader.check_current_error(ErrorCodes.CAMERA_ERROR)
+                and reader.check_current_error(ErrorCodes.PUMP_ERROR)
+                and reader.check_current_error(ErrorCodes.QR_WARNING)
+            )
+        )
+
+    def test_ack_errors_propagates(self, managers):
+        """Potwierdzenie błędów czyści stan we wszystkich managerach."""
+        writer = managers()
+        reader = managers()
+        writer.set_error(ErrorCodes.CAMERA_ERROR)
+        assert _wait_for(lambda: reader.check_current_error(ErrorCodes.CAMERA_ERROR))
+
+        reader.ack_error(ErrorCodes.CAMERA_ERROR)
+
+        assert _wait_for(
+            lambda: not writer.check_current_error(ErrorCodes.CAMERA_ERROR)
+        )
+
+
+class TestErrorManagerConcurrentReaders:
+    """Testy współbieżnych czytelników wersji i stanu błędów."""
+
+    def test_concurrent_thread_readers(self, managers):
+        """Wątki czytające wersję widzą wartości monotoniczne."""
+        writer = managers()
+        assert _wait_for(lambda: writer.version is not None)
+        stop = threading.Event()
+        failures = []
+
+        def read_versions():
+            last = writer.shared_version()
+            while not stop.is_set():
+                current = writer.shared_version()
+                if current < last:
+                    failures.append((last, current))
+                last = current
+                time.sleep(0.0001)
+
+        threads = [threading.Thread(target=read_versions) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        version = writer.shared_version()
+        for code in (ErrorCodes.CAMERA_ERROR, ErrorCodes.PUMP_ERROR):
+            writer.set_error(code)
+            version += 1
+            assert _wait_for(lambda: writer.shared_version() == version)
+        writer.ack_errors()
+        assert _wait_for(lambda: not writer.check_current_group(ErrorGroups.ERROR))
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        assert failures == []
+        assert writer.shared_version() == version + 1
+
+    def test_concurrent_process_readers(self, suffix, managers):
+        """Procesy czytelników otrzymują błąd opublikowany przez innego managera."""
+        writer = managers()
+        ctx = mp.get_context("fork")
+        result_queue = ctx.Queue()
+        ready_events = [ctx.Event() for _ in range(4)]
+        processes = [
+            ctx.Process(target=_reader_process, args=(suffix, ready, result_queue))
+            for ready in ready_events
+        ]
+        for process in processes:
+            process.start()
+        for ready in ready_events:
+            assert ready.wait(timeout=5.0)
+
+        writer.set_error(ErrorCodes.CAMERA_ERROR, "camera")
+
+        results = [result_queue.get(timeout=10.0) for _ in processes]
+        for process in processes:
+            process.join(timeout=5.0)
+
+        assert all(seen for seen, _ in results)
+        assert all(version == writer.shared_version() for _, version in results)
@@ -0,0 +1,135 @@
+"""
+Testy jednostkowe wektoryzowanego API kwantyzatorów.
+
+Moduł zawiera testy równoważności:
+- quantize (bisect) i quantize_array (searchsorted) względem kaskady skalarnej
+- dequantize_array względem dequantize dla wszystkich kwantów
+- dokładnych granic przedziałów (sąsiednie liczby zmiennoprzecinkowe)
+- przypadków brzegowych parzystej/nieparzystej liczby przedziałów
+"""
+
+import numpy as np
+import pytest
+
+from avena_commons.util.quantizer import (
+    QuantizerLinear,
+    QuantizerLogPower,
+    QuantizerPolynomial,
+    QuantizerTanh,
+)
+
+NUM_INTERVALS = list(range(1, 14)) + [32, 33]
+GRID = np.concatenate([
+    np.linspace(-7.0, 7.0, 20001),
+    np.linspace(-0.01, 0.01, 4001),
+    [-np.inf, -6.0, -0.0006, -0.0, 0.0, 0.0006, 6.0, np.inf],
+])
+
+
+def _make_quantizers(num_intervals):
+    quantizers = [
+        QuantizerLogPower(num_intervals=num_intervals, power=3),
+        QuantizerLogPower(num_intervals=num_intervals, power=1),
+        QuantizerPolynomial(-6.0, 6.0, num_intervals, 2),
+    ]
+    if num_intervals > 1:
+        # dla jednego przedzialu kwantyzacja liniowa dzieli przez zero
+        quantizers.append(QuantizerLinear(-6.0, 6.0, num_intervals))
+        quantizers.append(QuantizerTanh(-6.0, 6.0, num_intervals, 2.0))
+    return quantizers
+
+
+def _assert_equivalent(quantizer, x_values):
+    reference = np.array([quantizer._quantize_cascade(x) for x in x_values.tolist()])
+    scalar = np.array([quantizer.quantize(x) for x in x_values.tolist()])
+    vectorized = quantizer.quantize_array(x_values)
+
+    np.testing.assert_array_equal(scalar, reference)
+    np.testing.assert_array_equal(vectorized, reference)
+
+
+@pytest.mark.parametrize("num_intervals", NUM_INTERVALS)
+class TestQuantizeEquivalence:
+    """Testy równoważności ścieżki wektorowej i skalarnej."""
+
+    def test_dense_grid(self, num_intervals):
+        """Wyniki na gęstej siatce są identyczne z kaskadą skalarną."""
+        for quantizer in _make_quantizers(num_intervals):
+            _assert_equivalent(quantizer, GRID[np.isfinite(GRID)])
+
+    def test_exact_boundaries(self, num_intervals):
+        """Granica i poprzedzająca ją liczba dają te same kwanty co kaskada."""
+        for quantizer in _make_quantizers(num_intervals):
+            boundaries = np.array(quantizer._boundaries)
+            boundaries = boundaries[np.isfinite(boundaries)]
+            x_values = np.concatenate([
+                boundaries,
+                np.nextafter(boundaries, -np.inf),
+                np.nextafter(boundaries, np.inf),
+            ])
+            _assert_equivalent(quantizer, x_values)
+
+    def test_dequantize_array(self, num_intervals):
+        """dequantize_array zwraca te same wartości co dequantize dla każdego kwantu."""
+        for quantizer in _make_quantizers(num_intervals):
+            quants = np.arange(num_intervals)
+            expected = np.array([quantizer.dequantize(int(q)) for q in quants])
+
+            np.testing.assert_array_equal(quantizer.dequantize_array(quants), expected)
+
+    def test_shape_preserved(self, num_intervals):
+        """Kształt tablicy wejściowej jest zachowany."""
+        for quantizer in _make_quantizers(num_intervals):
+            x_values = np.linspace(-7.0, 7.0, 24).reshape(2, 3, 4)
+            assert quantizer.quantize_array(x_values).shape == (2, 3, 4)
+
+
+class TestQuantizerLogPowerTables:
+    """Testy tablic dekwantyzacji QuantizerLogPower."""
+
+    @staticmethod
+    def _scan_change_points(quantizer):
+        """Pierwotny algorytm skanowania siatki punkt po punkcie."""
+        x_values = np.linspace(quantizer.x_min, quantizer.x_max, 100000)
+        prev_value = quantizer._quantize_cascade(x_values[0])
+        change_points = []
+        for x in x_values[1:]:
+            curr_value = quantizer._quantize_cascade(x)
+            if curr_value != prev_value:
+                change_points.append(x)
+            prev_value = curr_value
+        return np.array(change_points)
+
+    @pytest.mark.parametrize("num_intervals", [5, 6, 33])
+    def test_change_points_match_scan(self, num_intervals):
+        """Punkty zmiany kwantu są takie same jak przy skanowaniu skalarnym."""
+        quantizer = QuantizerLogPower(num_intervals=num_intervals)
+        expected = self._scan_change_points(quantizer)
+        if num_intervals % 2 == 1:
+            expected = np.concatenate([[quantizer.x_min], expected])
+
+        positive = quantizer.dequantize_list[quantizer.dequantize_list > 0]
+        if num_intervals % 2 == 0:
+            positive = positive[1:]  # pomin srodek x_min / 2
+        np.testing.assert_array_equal(positive, expected)
+
+    @pytest.mark.parametrize("num_intervals", NUM_INTERVALS)
+    def test_mid_point_list_length(self, num_intervals):
+        """Tablica dekwantyzacji ma wpis dla każdego kwantu."""
+        quantizer = QuantizerLogPower(num_intervals=num_intervals)
+        assert len(quantizer.mid_point_list) == num_intervals
+
+    def test_even_power_falls_back_to_cascade(self):
+        """Dla parzystej potęgi (funkcja niemonotoniczna) używana jest kaskada."""
+        quantizer = QuantizerLogPower(num_intervals=9, power=2)
+
+        assert quantizer._boundaries is None
+        _assert_equivalent(quantizer, np.linspace(-7.0, 7.0, 2001))
+
+    def test_dequantize_array_rejects_invalid_quants(self):
+        """Ujemne lub niecałkowite kwanty zgłaszają ValueError."""
+        quantizer = QuantizerLogPower()
+        with pytest.raises(ValueError):
+            quantizer.dequantize_array(np.array([-1, 2]))
+        with pytest.raises(ValueError):
+            quantizer.dequantize_array(np.array([0.5]))
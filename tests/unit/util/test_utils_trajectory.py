@@ -0,0 +1,244 @@
+"""
+Testy jednostkowe wektoryzowanego skalowania trajektorii w util.utils.
+
+Moduł porównuje nowe implementacje z pierwotnymi wersjami pętlowymi:
+- calculate_factors, ramp_smoothing, interpolate_rconfigs, calculate_derivative
+- limit_vel, limit_acc i limit_vel_acc
+- find_closest_pose (wektorowo i z indeksem KD-tree)
+"""
+
+import numpy as np
+import pytest
+
+from avena_commons.util.utils import (
+    build_pose_index,
+    calculate_derivative,
+    calculate_factor,
+    calculate_factors,
+    find_closest_pose,
+    interpolate,
+    interpolate_rconfigs,
+    limit_acc,
+    limit_vel,
+    limit_vel_acc,
+    ramp_smoothing,
+)
+
+DT = 0.004
+
+
+# Pierwotne implementacje (pętle i np.append) jako punkt odniesienia
+def _reference_calculate_factors(times, data, dt, limit, power):
+    _time = times[-1] - times[0]
+    _begin = times[0]
+    _current_time = _begin
+    _factors = np.empty(shape=[0, 1], dtype=np.float64)
+    while _begin + _time > _current_time:
+        if times[-1] < _current_time:
+            break
+        _factor = min(1.0, calculate_factor(times, data, _current_time, limit, power))
+        _current_time += dt
+        _factors = np.append(_factors, _factor)
+    return _factors
+
+
+def _reference_ramp_smoothing(data, alpha):
+    smoothed_data = np.copy(data)
+    for i in range(1, len(data)):
+        if (smoothed_data[i] - smoothed_data[i - 1]) > alpha:
+            smoothed_data[i] = smoothed_data[i - 1] + alpha
+    for i in range(len(data) - 2, -1, -1):
+        if (smoothed_data[i] - smoothed_data[i + 1]) > alpha:
+            smoothed_data[i] = smoothed_data[i + 1] + alpha
+    return smoothed_data
+
+
+def _reference_interpolate_rconfigs(times, rconfigs, factors, dt):
+    duration = dt * len(rconfigs)
+    _current_time = 0.0
+    o_times = np.empty(shape=[0, 1], dtype=np.float64)
+    o_rconfigs = np.empty(shape=[0, 6], dtype=np.float64)
+    while duration > _current_time:
+        o_rconfigs = np.append(
+            o_rconfigs, [interpolate(times, rconfigs, _current_time)], axis=0
+        )
+        o_times = np.append(o_times, len(o_times) * dt)
+        _current_time = _current_time + dt * interpolate(times, factors, _current_time)
+    return o_times, o_rconfigs
+
+
+def _reference_calculate_derivative(arguments, dt):
+    derivatives = np.zeros_like(arguments)
+    for i in range(1, len(arguments) - 1):
+        derivatives[i] = (arguments[i + 1] - arguments[i - 1]) / (2 * dt)
+    if len(arguments) > 1:
+        derivatives[0] = (arguments[1] - arguments[0]) / dt
+        derivatives[-1] = (arguments[-1] - arguments[-2]) / dt
+    return derivatives
+
+
+def _reference_limit(times, rconfigs, data, dt, limit, power):
+    factors = _reference_calculate_factors(times, data, dt, limit, power)
+    factors = np.append(_reference_ramp_smoothing(factors, 0.005), 1.0)
+    times_1, rconfigs_1 = _reference_interpolate_rconfigs(times, rconfigs, factors, dt)
+    ang_vel_1 = _reference_calculate_derivative(rconfigs_1, dt)
+    ang_acc_1 = _reference_calculate_derivative(ang_vel_1, dt)
+    return times_1, rconfigs_1, ang_vel_1, ang_acc_1
+
+
+def _trajectory(samples, seed=0):
+    rng = np.random.default_rng(seed)
+    times = np.arange(samples) * DT
+    phases = rng.uniform(0, np.pi, 6)
+    speeds = rng.uniform(0.5, 3.0, 6)
+    rconfigs = np.sin(times[:, None] * speeds + phases)
+    return times, rconfigs
+
+
+def _assert_outputs_close(actual, expected):
+    assert len(actual) == len(expected)
+    for a, e in zip(actual, expected):
+        assert a.shape == e.shape
+        np.testing.assert_allclose(a, e, rtol=1e-9, atol=1e-9)
+
+
+class TestVectorizedPrimitives:
+    """Testy równoważności pojedynczych funkcji."""
+
+    @pytest.mark.parametrize("samples", [2, 3, 50, 997])
+    def test_calculate_factors(self, samples):
+        """Mnożniki są takie same jak w wersji z pętlą while."""
+        times, rconfigs = _trajectory(samples)
+        ang_vel = calculate_derivative(rconfigs, DT)
+        for limit, power in [(0.5, 1), (1.0, 0.5), (100.0, 1)]:
+            np.testing.assert_allclose(
+                calculate_factors(times, ang_vel, DT, limit, power),
+                _reference_calculate_factors(times, ang_vel, DT, limit, power),
+                rtol=1e-12,
+            )
+
+    def test_calculate_factors_zero_data(self):
+        """Zerowe dane dają mnożnik 1.0 bez ostrzeżeń o dzieleniu przez zero."""
+        times = np.arange(10) * DT
+        factors = calculate_factors(times, np.zeros((10, 6)), DT, 1.0, 1)
+        np.testing.assert_array_equal(
+            factors, _reference_calculate_factors(times, np.zeros((10, 6)), DT, 1.0, 1)
+        )
+
+    @pytest.mark.parametrize("alpha", [0.0, 0.005, 0.1])
+    def test_ramp_smoothing(self, alpha):
+        """Rampa odpowiada iteracji w przód i w tył."""
+        rng = np.random.default_rng(1)
+        for data in (rng.uniform(0, 1, 1000), np.repeat([1.0, 0.1, 1.0], 200)):
+            np.testing.assert_allclose(
+                ramp_smoothing(data, alpha),
+                _reference_ramp_smoothing(data, alpha),
+                rtol=0,
+                atol=1e-12,
+            )
+
+    def test_ramp_smoothing_short_input(self):
+        """Dane o długości 0 i 1 pozostają bez zmian."""
+        assert len(ramp_smoothing(np.array([]), 0.1)) == 0
+        np.testing.assert_array_equal(ramp_smoothing(np.array([0.3]), 0.1), [0.3])
+
+    def test_interpolate_rconfigs(self):
+        """Czasy i konfiguracje są identyczne z wersją używającą np.append."""
+        times, rconfigs = _trajectory(500)
+        factors = np.append(np.linspace(1.0, 0.3, 499), 1.0)
+
+        o_times, o_rconfigs = interpolate_rconfigs(times, rconfigs, factors, DT)
+        r_times, r_rconfigs = _reference_interpolate_rconfigs(
+            times, rconfigs, factors, DT
+        )
+
+        np.testing.assert_array_equal(o_times, r_times)
+        np.testing.assert_array_equal(o_rconfigs, r_rconfigs)
+
+    def test_calculate_derivative(self):
+        """Różnice centralne i krańcowe odpowiadają wersji z pętlą."""
+        _, rconfigs = _trajectory(100)
+        np.testing.assert_array_equal(
+            calculate_derivative(rconfigs, DT),
+            _reference_calculate_derivative(rconfigs, DT),
+        )
+        np.testing.assert_array_equal(calculate_derivative(rconfigs[:1], DT), [[0] * 6])
+
+
+class TestLimitVelAcc:
+    """Testy pełnych przebiegów ograniczania prędkości i przyspieszenia."""
+
+    def test_limit_vel_matches_reference(self):
+        times, rconfigs = _trajectory(800)
+        ang_vel = calculate_derivative(rconfigs, DT)
+        _assert_outputs_close(
+            limit_vel(times, rconfigs, ang_vel, DT, 1.0),
+            _reference_limit(times, rconfigs, ang_vel, DT, 1.0, 1),
+        )
+
+    def test_limit_acc_matches_reference(self):
+        times, rconfigs = _trajectory(800)
+        ang_acc = calculate_derivative(calculate_derivative(rconfigs, DT), DT)
+        _assert_outputs_close(
+            limit_acc(times, rconfigs, ang_acc, DT, 2.0),
+            _reference_limit(times, rconfigs, ang_acc, DT, 2.0, 1 / 2),
+        )
+
+    def test_limit_vel_acc_equals_two_passes(self):
+        """limit_vel_acc daje ten sam wynik co limit_vel i następnie limit_acc."""
+        times, rconfigs = _trajectory(800)
+        ang_vel = calculate_derivative(rconfigs, DT)
+        times_v, rconfigs_v, _, ang_acc_v = limit_vel(times, rconfigs, ang_vel, DT, 1.0)
+        expected = limit_acc(times_v, rconfigs_v, ang_acc_v, DT, 2.0)
+
+        _assert_outputs_close(
+            limit_vel_acc(times, rconfigs, DT, vel_limit=1.0, acc_limit=2.0), expected
+        )
+
+    def test_limits_respected_approximately(self):
+        """Po skalowaniu prędkość nie przekracza wyraźnie limitu."""
+        times, rconfigs = _trajectory(800)
+        _, _, ang_vel, _ = limit_vel_acc(times, rconfigs, DT, 1.0, 2.0)
+        assert np.abs(ang_vel).max() < 1.1
+
+
+class TestFindClosestPose:
+    """Testy wyszukiwania najbliższej pozy."""
+
+    @staticmethod
+    def _reference(searched_pose, poses):
+        min_distance = float("inf")
+        for step, pose in enumerate(poses):
+            distance = sum((searched_pose[i] - pose[i]) ** 2 for i in range(3)) ** 0.5
+            if distance < min_distance:
+                min_distance = distance
+                closest_step = step
+        return poses[closest_step], closest_step
+
+    def test_matches_loop(self):
+        rng = np.random.default_rng(2)
+        poses = [list(p) for p in rng.uniform(-1, 1, (500, 7))]
+        for searched in rng.uniform(-1.2, 1.2, (50, 7)):
+            pose, step = find_closest_pose(searched, poses)
+            expected_pose, expected_step = self._reference(searched, poses)
+            assert step == expected_step
+            assert pose is expected_pose
+
+    def test_first_of_equal_distances(self):
+        """Przy równych odległościach zwracana jest pierwsza poza."""
+        poses = [[1, 0, 0, 0, 0, 0, 1], [-1, 0, 0, 0, 0, 0, 1]]
+        assert find_closest_pose([0, 0, 0], poses)[1] == 0
+
+    def test_kd_tree_index(self):
+        rng = np.random.default_rng(3)
+        poses = rng.uniform(-1, 1, (2000, 7))
+        index = build_pose_index(poses)
+        for searched in rng.uniform(-1, 1, (50, 7)):
+            assert (
+                find_closest_pose(searched, poses, index=index)[1]
+                == (find_closest_pose(searched, poses)[1])
+            )
+
+    def test_empty_poses(self):
+        with pytest.raises(ValueError):
+            find_closest_pose([0, 0, 0], [])
@@ -0,0 +1,122 @@
+"""
+Testy jednostkowe zwartych wyników detektorów (DetectorResult, QrTag, BoxDetection).
+
+Zakres:
+- qr_detector: tagi zwartego wyniku mają te same identyfikatory, środki,
+  narożniki, głębię i pozę co detekcje AprilTag, brak wykryć,
+- rozmiar po pickle: zwarty wynik bez `debug_data` jest wielokrotnie mniejszy,
+- sortowanie, łączenie i śledzenie działają na `QrTag` jak na detekcjach,
+- box_detector: pola pudełka jako liczby float, brak wykrycia,
+- inne wyniki przechodzą bez zmian, `run_compact_detector`.
+"""
+
+import pickle
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import avena_commons.vision.merge as merge
+import avena_commons.vision.sorter as sorter
+from avena_commons.vision.detector import qr_detector
+from avena_commons.vision.detector.compact_result import (
+    BoxDetection,
+    DetectorResult,
+    QrTag,
+    compact_result,
+    run_compact_detector,
+)
+from avena_commons.vision.detector.qr_tracker import QrTracker
+
+sys.path.insert(0, str(Path(__file__).parent))
+from test_qr_tracker import CAMERA_CONFIG, CONFIG, tag_frame  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def qr_result():
+    return qr_detector(frame=tag_frame(), camera_config=CAMERA_CONFIG, config=CONFIG)
+
+
+def test_qr_tags_keep_detection_fields(qr_result):
+    detections, _ = qr_result
+
+    result = compact_result(qr_result)
+
+    assert isinstance(result, DetectorResult) and result.box is None
+    assert len(result.tags) == len(detections) == 4
+    for tag, detection in zip(result.tags, detections):
+        assert tag.tag_id == detection.tag_id
+        np.testing.assert_array_equal(tag.center, detection.center)
+        np.testing.assert_array_equal(tag.corners, detection.corners)
+        np.testing.assert_array_equal(tag.pose_t, detection.pose_t)
+        assert tag.decision_margin == pytest.approx(detection.decision_margin)
+        assert tag.z == pytest.approx(detection.z)
+
+
+def test_compact_result_is_much_smaller(qr_result):
+    full = len(pickle.dumps(qr_result))
+    compact = pickle.dumps(compact_result(qr_result))
+
+    # debug_data z obrazami po undistort zostaje w procesie detektora
+    assert len(compact) * 50 < full
+    restored = pickle.loads(compact)
+    np.testing.assert_array_equal(restored.tags[0].corners, qr_result[0][0].corners)
+
+
+def test_sort_merge_and_tracking_accept_tags(qr_result):
+    detections, _ = qr_result
+    tags = compact_result(qr_result).tags
+
+    expected = sorter.sort_qr_by_center_position(4, detections)
+    positions = merge.merge_qr_detections_with_confidence(
+        sorter.sort_qr_by_center_position(4, tags), {}
+    )
+
+    for position, detection in expected.items():
+        np.testing.assert_array_equal(positions[position].center, detection.center)
+    tracker = QrTracker(enabled=True)
+    tracker.update("a", positions, tracked=False)
+    assert len(tracker.plan("a")) == 4
+
+
+def test_qr_without_detections():
+    assert compact_result((None, {"image": np.zeros((400, 640))})) == DetectorResult()
+    assert compact_result(([], {})).tags == []
+
+
+def test_box_fields_are_plain_floats():
+    center = (320.5, 200.25)
+    corners = [[100.0, 300.0], [540.0, 300.0], [540.0, 100.0], [100.0, 100.0]]
+    image = np.zeros((400, 640, 3), dtype=np.uint8)
+
+    result = compact_result((
+        center,
+        corners,
+        1.5,
+        np.float64(0.84),
+        image,
+        {"box_mask": image},
+    ))
+
+    assert result == DetectorResult(
+        box=BoxDetection(
+            center=center, corners=[tuple(c) for c in corners], angle=1.5, z=0.84
+        )
+    )
+    assert type(result.box.z) is float
+    assert compact_result((None, None, None, None, image, {})) == DetectorResult()
+
+
+def test_other_results_pass_through():
+    assert compact_result({"x": 1}) == {"x": 1}
+    assert compact_result((1, 2, 3)) == (1, 2, 3)
+
+
+def test_run_compact_detector():
+    result = run_compact_detector(
+        qr_detector, frame=tag_frame(), camera_config=CAMERA_CONFIG, config=CONFIG
+    )
+
+    assert len(result.tags) == 4
+    assert all(isinstance(tag, QrTag) for tag in result.tags)
@@ -0,0 +1,170 @@
+"""
+Testy jednostkowe asynchronicznego zapisu artefaktów debug detektorów.
+
+Zakres:
+- polityki próbkowania (co N-ta ramka, brak wykrycia, anomalia i wolna detekcja),
+- limit miejsca: najstarsze pliki są usuwane, katalog nie przekracza max_bytes,
+- pełna kolejka odrzuca artefakty zamiast blokować detekcję,
+- zapis kopii tablic (ramka źródłowa może zostać nadpisana po submit),
+- qr_detector zapisuje ramki tylko dla ramek wybranych przez sink.
+"""
+
+import os
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from avena_commons.vision.detector import qr_detector
+from avena_commons.vision.detector.debug_sink import DebugSink, get_debug_sink
+
+CAMERA_CONFIG = {
+    "camera_params": [905.2, 904.7, 641.3, 398.9],
+    "distortion_coefficients": [0.082, -0.213, 0.0011, -0.0017, 0.104],
+}
+
+
+@pytest.fixture
+def make_sink(tmp_path):
+    sinks = []
+
+    def make(**kwargs):
+        sink = DebugSink(directory=str(tmp_path / "debug"), **kwargs)
+        sinks.append(sink)
+        return sink
+
+    yield make
+    for sink in sinks:
+        sink.close()
+
+
+def test_every_nth_samples_periodically(make_sink):
+    sink = make_sink(sampling=["every_nth"], every_n=3)
+
+    selected = [sink.sample() for _ in range(9)]
+
+    assert selected == [False, False, True] * 3
+    assert sink.frames == 9 and sink.sampled == 3
+
+
+def test_failure_and_anomaly_policies(make_sink):
+    sink = make_sink(sampling=["on_failure", "on_anomaly"], anomaly_ms=100)
+
+    assert not sink.sample()
+    assert sink.sample(failed=True)
+    assert sink.sample(anomaly=True)
+    assert sink.sample(elapsed_ms=150)
+    assert not make_sink(sampling=["on_anomaly"], anomaly_ms=0).sample(elapsed_ms=1e6)
+
+
+def test_disabled_sink_writes_nothing(make_sink, tmp_path):
+    sink = make_sink(sampling=["always"], enabled=False)
+
+    assert not sink.sample(failed=True)
+    assert not sink.submit("qr", {"color_frame": np.zeros((4, 4), np.uint8)})
+    assert not (tmp_path / "debug").exists()
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        DebugSink(sampling=["sometimes"])
+
+
+def test_artifacts_are_written_in_background(make_sink, tmp_path):
+    """Obrazy uint8 jako JPEG, pozostałe tablice jako .npy, zapis z wątku sinka."""
+    sink = make_sink(sampling=["always"])
+    color = np.full((40, 64, 3), 7, dtype=np.uint8)
+    depth = np.arange(40 * 64, dtype=np.uint16).reshape(40, 64)
+
+    assert sink.submit("box", {"color_frame": color, "depth_frame": depth, "x": None})
+    depth[:] = 0  # Kolejka trzyma kopię
+    assert sink.flush(timeout=5)
+
+    names = sorted(os.listdir(tmp_path / "debug"))
+    assert [n.rsplit("_", 2)[-2:] for n in names] == [
+        ["color", "frame.jpg"],
+        ["depth", "frame.npy"],
+    ]
+    assert f"_{os.getpid()}_box_" in names[0]
+    saved = np.load(tmp_path / "debug" / names[1])
+    assert saved[-1, -1] == 40 * 64 - 1
+    assert sink.written_files == 2
+    assert sink._thread is not threading.current_thread()
+
+
+def test_full_queue_drops_artifacts(make_sink, monkeypatch):
+    """Zablokowany zapis nie blokuje submit - nadmiarowe artefakty są odrzucane."""
+    sink = make_sink(sampling=["always"], queue_size=2)
+    gate = threading.Event()
+    original = sink._write
+    monkeypatch.setattr(sink, "_write", lambda item: (gate.wait(5), original(item)))
+    frame = {"depth_frame": np.zeros((8, 8), np.uint16)}
+
+    start = time.perf_counter()
+    accepted = [sink.submit("qr", frame) for _ in range(10)]
+    elapsed = time.perf_counter() - start
+    gate.set()
+    sink.flush(timeout=5)
+
+    assert elapsed < 1.0
+    assert 2 <= sum(accepted) <= 3  # Kolejka + element pobrany przez wątek
+    assert sink.dropped == 10 - sum(accepted)
+
+
+def test_quota_removes_oldest_files(make_sink, tmp_path):
+    """Katalog nie przekracza max_bytes, zostają najnowsze pliki."""
+    directory = tmp_path / "debug"
+    directory.mkdir()
+    stale = directory / "stale.npy"
+    stale.write_bytes(b"0" * 50_000)
+    os.utime(stale, (1, 1))
+
+    frame = np.zeros((100, 100), dtype=np.uint16)  # ~20 kB jako .npy
+    sink = make_sink(sampling=["always"], max_bytes=100_000, queue_size=64)
+    for i in range(12):
+        sink.submit("qr", {f"depth_{i:02d}": frame}, timestamp=f"t{i:02d}")
+        sink.flush(timeout=5)
+
+    names = sorted(os.listdir(directory))
+    total = sum(os.path.getsize(directory / n) for n in names)
+    assert total <= 100_000
+    assert "stale.npy" not in names
+    assert names[-1].startswith("t11_")
+    assert sink.deleted_files == 12 + 1 - len(names)
+
+
+def test_get_debug_sink_reuses_sink_for_same_settings(tmp_path):
+    settings = {"directory": str(tmp_path), "every_n": 5}
+
+    sink = get_debug_sink(settings)
+    assert get_debug_sink(dict(settings)) is sink
+    other = get_debug_sink({**settings, "every_n": 6})
+    assert other is not sink and other.every_n == 6
+
+
+def test_qr_detector_saves_only_sampled_frames(tmp_path):
+    """Brak tagów na ramce - zapis tylko z polityką on_failure."""
+    frame = {
+        "color": np.zeros((400, 640, 3), dtype=np.uint8),
+        "depth": np.zeros((400, 640), dtype=np.uint16),
+    }
+    directory = tmp_path / "debug"
+
+    for sampling in (["every_nth"], ["on_failure"]):
+        camera_config = {
+            **CAMERA_CONFIG,
+            "debug_artifacts": {
+                "directory": str(directory / sampling[0]),
+                "sampling": sampling,
+                "every_n": 100,
+            },
+        }
+        detections, _ = qr_detector(
+            frame=frame, camera_config=camera_config, config={"mode": "gray"}
+        )
+        assert not detections
+        get_debug_sink(camera_config["debug_artifacts"]).flush(timeout=5)
+
+    assert not (directory / "every_nth").exists()
+    assert len(os.listdir(directory / "on_failure")) == 2
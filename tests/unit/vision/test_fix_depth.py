@@ -0,0 +1,190 @@
+"""
+Testy jednostkowe naprawy obrazu głębi (fix_depth) z propagacją po etykietach.
+
+Zakres:
+- wynik identyczny (bit w bit) z dotychczasowym potokiem: osobna maska
+  i propagate_by_shape dla każdego komponentu, potem merge_depth_lists,
+- ramki głębi w rozdzielczościach kamery (640x400, 1280x800) z wieloma
+  dziurami: szum, pasy, cienie krawędzi, dziury przy brzegach obrazu,
+- dziury poziome, pionowe i kwadratowe oraz wiersze bez poprawnej głębi,
+- brak dziur i głębia zmiennoprzecinkowa z NaN.
+"""
+
+import cv2
+import numpy as np
+import pytest
+
+from avena_commons.vision.vision import (
+    fix_depth,
+    merge_depth_lists,
+    propagate_by_shape,
+)
+
+CONFIG = {
+    "closing_mask": {"kernel_size": 10, "iterations": 2},
+    "zero_mask": {"kernel_size": 10, "iterations": 2},
+    "r_wide": 2.0,
+    "r_tall": 0.5,
+    "final_closing_mask": {"kernel_size": 10, "iterations": 2},
+}
+
+
+def legacy_fix_depth(depth_image, config):
+    """Dotychczasowa implementacja - jedna pełna maska na komponent."""
+    kernel = np.ones((config["closing_mask"]["kernel_size"],) * 2, np.uint8)
+    closed = cv2.morphologyEx(
+        depth_image,
+        cv2.MORPH_CLOSE,
+        kernel,
+        iterations=config["closing_mask"]["iterations"],
+    )
+    zero_mask = (closed == 0).astype(np.uint8) * 255
+    kernel = np.ones((config["zero_mask"]["kernel_size"],) * 2, np.uint8)
+    closed_zero_mask = cv2.morphologyEx(
+        zero_mask, cv2.MORPH_CLOSE, kernel, iterations=config["zero_mask"]["iterations"]
+    )
+    masks = []
+    n, labels = cv2.connectedComponents(closed_zero_mask, connectivity=8)
+    for i in range(1, n):
+        mask = np.zeros_like(closed_zero_mask)
+        mask[labels == i] = 255
+        masks.append(mask)
+    layers = [
+        propagate_by_shape(closed, mask, config["r_wide"], config["r_tall"])
+        for mask in masks
+    ]
+    merged = merge_depth_lists(closed, layers, masks)
+    kernel = np.ones((config["final_closing_mask"]["kernel_size"],) * 2, np.uint8)
+    return cv2.morphologyEx(
+        merged,
+        cv2.MORPH_CLOSE,
+        kernel,
+        iterations=config["final_closing_mask"]["iterations"],
+    )
+
+
+def depth_frame(width, height, seed, holes=60):
+    """Ramka głębi jak z kamery nad pudełkiem: podłoga, pudełko i dziury."""
+    rng = np.random.default_rng(seed)
+    yy, xx = np.mgrid[0:height, 0:width]
+    depth = (900 + 0.05 * xx + 0.08 * yy).astype(np.uint16)
+    x0, y0 = width // 4, height // 4
+    depth[y0 : 3 * y0, x0 : 3 * x0] -= 180
+    depth += rng.integers(0, 6, depth.shape, dtype=np.uint16)
+
+    # Rozproszone piksele bez głębi i cień przy krawędzi pudełka
+    depth[rng.random(depth.shape) < 0.02] = 0
+    depth[y0 : 3 * y0, 3 * x0 : 3 * x0 + width // 40] = 0
+    for _ in range(holes):
+        cx, cy = rng.integers(0, width), rng.integers(0, height)
+        kind = rng.integers(0, 4)
+        if kind == 0:  # poziomy pas
+            size = (int(rng.integers(20, width // 4)), int(rng.integers(2, 8)))
+        elif kind == 1:  # pionowy pas
+            size = (int(rng.integers(2, 8)), int(rng.integers(20, height // 3)))
+        else:  # plama
+            size = (int(rng.integers(3, 25)),) * 2
+        angle = float(rng.integers(0, 180)) if kind == 3 else 0.0
+        cv2.ellipse(depth, (int(cx), int(cy)), size, angle, 0, 360, 0, -1)
+    return depth
+
+
+@pytest.mark.parametrize(
+    "width, height, seed",
+    [(640, 400, 0), (640, 400, 1), (1280, 800, 2), (1280, 800, 3)],
+)
+def test_matches_legacy_on_camera_frames(width, height, seed):
+    depth = depth_frame(width, height, seed)
+
+    result = fix_depth(depth, CONFIG)
+
+    assert result.dtype == np.float32
+    np.testing.assert_array_equal(result, legacy_fix_depth(depth, CONFIG))
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_matches_legacy_on_small_frames(seed):
+    """Małe jądra - dużo drobnych komponentów, także przy brzegach obrazu."""
+    rng = np.random.default_rng(seed)
+    depth = rng.integers(500, 700, (60, 90)).astype(np.uint16)
+    depth[rng.random(depth.shape) < 0.25] = 0
+    depth[:, :3] = 0
+    depth[rng.integers(0, 60), :] = 0  # wiersz bez poprawnej głębi
+    config = {
+        **CONFIG,
+        "closing_mask": {"kernel_size": 1, "iterations": 1},
+        "zero_mask": {"kernel_size": int(rng.integers(1, 4)), "iterations": 1},
+        "final_closing_mask": {"kernel_size": 1, "iterations": 1},
+    }
+
+    np.testing.assert_array_equal(
+        fix_depth(depth, config), legacy_fix_depth(depth, config)
+    )
+
+
+@pytest.mark.parametrize(
+    "hole, direction",
+    [
+        ((slice(20, 23), slice(10, 60)), "horizontal"),
+        ((slice(5, 45), slice(30, 33)), "vertical"),
+        ((slice(15, 30), slice(20, 35)), "square"),
+    ],
+)
+def test_direction_follows_hole_shape(hole, direction):
+    """Kierunek propagacji wynika z proporcji bounding boxa dziury."""
+    yy, xx = np.mgrid[0:50, 0:70]
+    depth = (100 + xx + 1000 * yy).astype(np.uint16)
+    depth[hole] = 0
+    config = {
+        **CONFIG,
+        "closing_mask": {"kernel_size": 1, "iterations": 1},
+        "zero_mask": {"kernel_size": 1, "iterations": 1},
+        "final_closing_mask": {"kernel_size": 1, "iterations": 1},
+    }
+
+    result = fix_depth(depth, config)
+
+    rows, cols = hole
+    y, x = rows.start, cols.start
+    left, right = depth[y, cols.start - 1], depth[y, cols.stop]
+    up, down = depth[rows.start - 1, x], depth[rows.stop, x]
+    expected = {
+        "horizontal": (float(left) + right) / 2,
+        "vertical": (float(up) + down) / 2,
+        "square": ((float(left) + right) / 2 + (float(up) + down) / 2) / 2,
+    }[direction]
+    assert result[y, x] == pytest.approx(expected)
+    np.testing.assert_array_equal(result, legacy_fix_depth(depth, config))
+
+
+def test_frame_without_holes_is_unchanged():
+    depth = np.full((40, 60), 750, dtype=np.uint16)
+
+    np.testing.assert_array_equal(fix_depth(depth, CONFIG), depth.astype(np.float32))
+
+
+def test_frame_without_depth_stays_empty():
+    depth = np.zeros((40, 60), dtype=np.uint16)
+
+    np.testing.assert_array_equal(
+        fix_depth(depth, CONFIG), legacy_fix_depth(depth, CONFIG)
+    )
+
+
+def test_float_depth_with_nan():
+    """NaN nie jest źródłem propagacji (jak w propagate)."""
+    rng = np.random.default_rng(7)
+    depth = rng.uniform(0.4, 0.6, (50, 80)).astype(np.float32)
+    depth[rng.random(depth.shape) < 0.1] = 0
+    depth[10:14, 5:40] = np.nan
+    depth[10:14, 4] = 0
+    config = {
+        **CONFIG,
+        "closing_mask": {"kernel_size": 1, "iterations": 1},
+        "zero_mask": {"kernel_size": 3, "iterations": 1},
+        "final_closing_mask": {"kernel_size": 1, "iterations": 1},
+    }
+
+    np.testing.assert_array_equal(
+        fix_depth(depth, config), legacy_fix_depth(depth, config)
+    )
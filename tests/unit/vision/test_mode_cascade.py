@@ -0,0 +1,261 @@
+"""
+Testy jednostkowe kaskady trybów preprocessingu QR (ModeCascade, tryb 'cascade').
+
+Zakres:
+- kolejność kroków: z konfiguracji do `min_runs` prób, potem według
+  skuteczności (remisy w kolejności konfiguracji), okno ostatnich prób,
+  `reorder = False`, nazwy kroków i raport statystyk,
+- kaskady procesu per kamera: ta sama kaskada dla tych samych ustawień,
+  nowa po zmianie ustawień, osobne statystyki kamer,
+- qr_detector w trybie 'cascade' na ramkach z etykietami: tagi kontrastowe
+  kończą kaskadę na 'gray', tagi o tej samej jasności co tło wymagają trybu
+  saturacji, ramka mieszana łączy wykrycia kroków bez duplikatów, ramka bez
+  tagów uruchamia wszystkie kroki,
+- 'expected_count' konfiguracji (liczba tagów na zdjęciu) kończy kaskadę
+  przy mniejszej liczbie tagów niż 'cascade.expected_count',
+- adaptacja: po serii ramek kolorowych saturacja jest uruchamiana pierwsza,
+- ROI trackera: kroki 'tag_reconstruction' są pomijane.
+"""
+
+import importlib
+
+import cv2
+import numpy as np
+import pkg_resources
+import pytest
+
+from avena_commons.vision.detector import qr_detector
+from avena_commons.vision.detector.mode_cascade import (
+    DEFAULT_SETTINGS,
+    ModeCascade,
+    get_mode_cascade,
+)
+
+mode_cascade_module = importlib.import_module(
+    "avena_commons.vision.detector.mode_cascade"
+)
+
+WIDTH, HEIGHT = 640, 400
+CLAHE = {"clip_limit": 4.0, "grid_size": 8}
+STEPS = [
+    {"mode": "gray", "clahe": CLAHE},
+    {"mode": "saturation", "clahe": CLAHE},
+    {"mode": "tag_reconstruction"},
+]
+# Kolory (BGR) czarnych i białych pól tagu
+CONTRAST = ((20, 20, 20), (235, 235, 235))
+ISOLUMINANT = ((0, 200, 0), (117, 117, 117))  # ta sama jasność, różna saturacja
+
+
+def labelled_frame(styles, seed=0):
+    """Ramka z tagami w siatce 2x2 (styl None - brak tagu) i ich środki."""
+    rng = np.random.default_rng(seed)
+    color = rng.integers(90, 140, (HEIGHT, WIDTH, 3), dtype=np.uint8)
+    tag = cv2.imread(
+        pkg_resources.resource_filename("avena_commons.vision.data", "tag36h11-0.png"),
+        cv2.IMREAD_GRAYSCALE,
+    )
+    side = HEIGHT // 5
+    border = side // 8
+    tag = cv2.resize(tag, (side - 2 * border,) * 2, interpolation=cv2.INTER_NEAREST)
+    dark = cv2.copyMakeBorder(tag, *(border,) * 4, cv2.BORDER_CONSTANT, value=255) < 128
+    centers = []
+    for i, style in enumerate(styles):
+        if style is None:
+            continue
+        x = WIDTH // 2 - side - side // 4 + (i % 2) * (side + side // 2)
+        y = HEIGHT // 2 - side - side // 4 + (i // 2) * (side + side // 2)
+        patch = np.empty((side, side, 3), dtype=np.uint8)
+        patch[dark], patch[~dark] = style
+        color[y : y + side, x : x + side] = patch
+        centers.append((x + side / 2, y + side / 2))
+    return {"color": color, "depth": np.full((HEIGHT, WIDTH), 500, np.uint16)}, centers
+
+
+def camera_config(camera_ip):
+    return {
+        "camera_ip": camera_ip,
+        "camera_params": [WIDTH * 0.7, WIDTH * 0.7, WIDTH / 2, HEIGHT / 2],
+        "distortion_coefficients": [0.0] * 5,
+        "debug_artifacts": {"enabled": False},
+    }
+
+
+def cascade_config(**settings):
+    return {
+        "mode": "cascade",
+        "qr_size": 0.1,
+        "cascade": {"steps": STEPS, "min_runs": 3, **settings},
+    }
+
+
+def assert_matches_labels(detections, centers):
+    assert len(detections) == len(centers)
+    for center in centers:
+        distances = [np.linalg.norm(d.center - center) for d in detections]
+        assert min(distances) < 3
+
+
+@pytest.fixture(autouse=True)
+def clean_cascades(monkeypatch):
+    monkeypatch.setattr(mode_cascade_module, "_CASCADES", {})
+
+
+def test_order_follows_config_until_min_runs():
+    cascade = ModeCascade(STEPS, min_runs=2)
+    names = [name for name, _ in cascade.order()]
+    assert names == ["0:gray", "1:saturation", "2:tag_reconstruction"]
+
+    cascade.record("1:saturation", True)
+    cascade.record("1:saturation", True)
+    cascade.record("0:gray", False)
+    assert [name for name, _ in cascade.order()][0] == "1:saturation"
+    assert cascade.success_rate("0:gray") is None
+
+    cascade.record("0:gray", True)
+    cascade.record("0:gray", True)
+    # Saturacja (1.0) przed gray (2/3), kroki bez min_runs prób na końcu
+    assert [name for name, _ in cascade.order()] == [
+        "1:saturation",
+        "0:gray",
+        "2:tag_reconstruction",
+    ]
+    assert cascade.report()["0:gray"] == {
+        "runs": 3,
+        "solved": 2,
+        "success_rate": pytest.approx(2 / 3),
+    }
+
+
+def test_window_and_disabled_reorder():
+    cascade = ModeCascade(
+        [{"mode": "gray", "name": "fast"}, {"mode": "saturation", "name": "slow"}],
+        min_runs=1,
+        window=2,
+    )
+    cascade.record("slow", True)
+    cascade.record("fast", True)
+    cascade.record("fast", False)
+    cascade.record("fast", False)
+
+    assert cascade.report()["fast"]["runs"] == 2
+    assert [name for name, _ in cascade.order()] == ["slow", "fast"]
+    cascade.reorder = False
+    assert [name for name, _ in cascade.order()] == ["fast", "slow"]
+
+
+def test_cascades_are_cached_per_camera_and_settings():
+    first = get_mode_cascade("cam_a", {"min_runs": 3})
+
+    assert get_mode_cascade("cam_a", {"min_runs": 3}) is first
+    assert get_mode_cascade("cam_b", {"min_runs": 3}) is not first
+    changed = get_mode_cascade("cam_a", {"min_runs": 5})
+    assert changed is not first and changed.min_runs == 5
+    assert len(get_mode_cascade("cam_c").steps) == len(DEFAULT_SETTINGS["steps"])
+
+
+def test_contrast_tags_stop_after_gray():
+    frame, centers = labelled_frame([CONTRAST] * 4)
+
+    detections, debug_data = qr_detector(
+        frame=frame, camera_config=camera_config("cam"), config=cascade_config()
+    )
+
+    assert_matches_labels(detections, centers)
+    assert [step["step"] for step in debug_data["cascade"]["steps"]] == ["0:gray"]
+
+
+def test_isoluminant_tags_escalate_to_saturation():
+    frame, centers = labelled_frame([ISOLUMINANT] * 4)
+
+    detections, debug_data = qr_detector(
+        frame=frame, camera_config=camera_config("cam"), config=cascade_config()
+    )
+
+    assert_matches_labels(detections, centers)
+    steps = debug_data["cascade"]["steps"]
+    assert [(s["step"], s["found"]) for s in steps] == [
+        ("0:gray", 0),
+        ("1:saturation", 4),
+    ]
+
+
+def test_mixed_frame_merges_steps_without_duplicates():
+    frame, centers = labelled_frame([CONTRAST, ISOLUMINANT, ISOLUMINANT, CONTRAST])
+
+    detections, debug_data = qr_detector(
+        frame=frame, camera_config=camera_config("cam"), config=cascade_config()
+    )
+
+    assert_matches_labels(detections, centers)
+    assert [s["step"] for s in debug_data["cascade"]["steps"]] == [
+        "0:gray",
+        "1:saturation",
+    ]
+
+
+def test_frame_without_tags_runs_every_step():
+    frame, _ = labelled_frame([None] * 4)
+
+    detections, debug_data = qr_detector(
+        frame=frame, camera_config=camera_config("cam"), config=cascade_config()
+    )
+
+    assert not detections
+    assert len(debug_data["cascade"]["steps"]) == len(STEPS)
+    assert all(
+        stats["runs"] == 1 and stats["solved"] == 0
+        for stats in debug_data["cascade"]["stats"].values()
+    )
+
+
+def test_expected_count_stops_cascade_for_fewer_tags():
+    frame, centers = labelled_frame([CONTRAST, None, None, CONTRAST])
+
+    detections, debug_data = qr_detector(
+        frame=frame,
+        camera_config=camera_config("cam"),
+        config={**cascade_config(), "expected_count": 2},
+    )
+
+    assert_matches_labels(detections, centers)
+    assert [s["step"] for s in debug_data["cascade"]["steps"]] == ["0:gray"]
+    assert debug_data["cascade"]["stats"]["0:gray"]["solved"] == 1
+
+
+def test_saturation_moves_first_for_color_tags():
+    frame, centers = labelled_frame([ISOLUMINANT] * 4)
+    contrast_frame, _ = labelled_frame([CONTRAST] * 4)
+
+    for _ in range(3):
+        qr_detector(
+            frame=frame, camera_config=camera_config("cam"), config=cascade_config()
+        )
+    detections, debug_data = qr_detector(
+        frame=frame, camera_config=camera_config("cam"), config=cascade_config()
+    )
+
+    assert_matches_labels(detections, centers)
+    assert [s["step"] for s in debug_data["cascade"]["steps"]] == ["1:saturation"]
+    # Inna kamera ma własne statystyki
+    _, debug_data = qr_detector(
+        frame=contrast_frame,
+        camera_config=camera_config("other"),
+        config=cascade_config(),
+    )
+    assert [s["step"] for s in debug_data["cascade"]["steps"]] == ["0:gray"]
+
+
+def test_track_rois_skip_tag_reconstruction():
+    frame, _ = labelled_frame([None] * 4)
+
+    _, debug_data = qr_detector(
+        frame=frame,
+        camera_config=camera_config("cam"),
+        config={**cascade_config(), "track_rois": [[100, 100, 300, 300]]},
+    )
+
+    assert [s["step"] for s in debug_data["cascade"]["steps"]] == [
+        "0:gray",
+        "1:saturation",
+    ]
@@ -0,0 +1,137 @@
+"""
+Testy jednostkowe wektorowej propagacji głębi (propagate, propagate_by_shape).
+
+Zakres:
+- zgodność z referencją liczoną pętlą po wierszach/kolumnach (jak dotychczasowa
+  implementacja) dla losowych masek, typów głębi i wszystkich kierunków,
+- przypadki brzegowe: brak dziur, same dziury, pojedyncze wiersze i kolumny,
+  dziury przy krawędziach, linie bez poprawnej głębi, NaN, maski bool,
+- błędny kierunek i wynik propagate_by_shape dla ramki w rozdzielczości kamery.
+"""
+
+import numpy as np
+import pytest
+
+from avena_commons.vision.vision import propagate, propagate_by_shape
+
+
+def reference_fill(depth, mask, direction):
+    """Wypełnienie w jednym kierunku pętlą po liniach (specyfikacja)."""
+    holes = mask == 255
+    painted = np.zeros(depth.shape, dtype=np.float32)
+    transpose = direction in ("up", "down")
+    if transpose:
+        depth, holes, painted = depth.T, holes.T, painted.T
+    for y in range(depth.shape[0]):
+        xs = np.flatnonzero(holes[y])
+        if xs.size == 0:
+            continue
+        if direction in ("left", "up"):
+            search = range(xs[0] - 1, -1, -1)
+        else:
+            search = range(xs[-1] + 1, depth.shape[1])
+        for x in search:
+            if depth[y, x] != 0 and not np.isnan(depth[y, x]):
+                painted[y, holes[y]] = depth[y, x]
+                break
+    return painted.T if transpose else painted
+
+
+def reference_propagate(depth, mask, direction):
+    if not np.any(mask == 255):
+        return depth.copy()
+    fill = {d: reference_fill(depth, mask, d) for d in ("left", "right", "up", "down")}
+    horizontal = (fill["left"] + fill["right"]) / 2
+    vertical = (fill["up"] + fill["down"]) / 2
+    return {
+        "horizontal": horizontal,
+        "vertical": vertical,
+        "square": (horizontal + vertical) / 2,
+    }[direction]
+
+
+def assert_same(result, expected):
+    assert result.dtype == expected.dtype
+    np.testing.assert_array_equal(result, expected)
+
+
+@pytest.mark.parametrize("direction", ["horizontal", "vertical", "square"])
+@pytest.mark.parametrize("dtype", [np.uint16, np.float32, np.float64])
+def test_random_masks_match_reference(direction, dtype):
+    rng = np.random.default_rng([ord(c) for c in direction + np.dtype(dtype).name])
+    for _ in range(300):
+        shape = tuple(rng.integers(1, 16, 2))
+        depth = rng.integers(0, 6, shape).astype(dtype)
+        if dtype != np.uint16:
+            depth[rng.random(shape) < 0.15] = np.nan
+        mask = np.where(rng.random(shape) < rng.random(), 255, 0).astype(np.uint8)
+
+        assert_same(
+            propagate(depth, mask, direction),
+            reference_propagate(depth, mask, direction),
+        )
+
+
+@pytest.mark.parametrize("direction", ["horizontal", "vertical", "square"])
+@pytest.mark.parametrize(
+    "case",
+    [
+        "no_holes",
+        "all_holes",
+        "single_pixel",
+        "border_holes",
+        "no_valid_depth",
+        "row_vector",
+        "column_vector",
+        "bool_mask",
+    ],
+)
+def test_edge_cases_match_reference(case, direction):
+    rng = np.random.default_rng(3)
+    depth = rng.integers(100, 200, (9, 13)).astype(np.uint16)
+    mask = np.zeros(depth.shape, dtype=np.uint8)
+    if case == "all_holes":
+        mask[:] = 255
+    elif case == "single_pixel":
+        mask[4, 6] = 255
+    elif case == "border_holes":
+        mask[0, :] = mask[:, 0] = mask[-1, 5:] = mask[2:, -1] = 255
+    elif case == "no_valid_depth":
+        depth[3, :] = 0
+        depth[:, 7] = 0
+        mask[3, 2:5] = mask[1:4, 7] = 255
+    elif case == "row_vector":
+        depth, mask = depth[:1], mask[:1]
+        mask[0, 4:8] = 255
+    elif case == "column_vector":
+        depth, mask = depth[:, :1], mask[:, :1]
+        mask[2:5, 0] = 255
+    elif case == "bool_mask":
+        mask = rng.random(depth.shape) < 0.5  # True != 255 - brak dziur
+
+    assert_same(
+        propagate(depth, mask, direction), reference_propagate(depth, mask, direction)
+    )
+
+
+def test_invalid_direction_raises():
+    mask = np.zeros((4, 4), dtype=np.uint8)
+    mask[1, 1] = 255
+
+    with pytest.raises(ValueError):
+        propagate(np.ones((4, 4), dtype=np.uint16), mask, "diagonal")
+
+
+def test_propagate_by_shape_on_camera_frame():
+    """Ramka 1280x800 z jedną szeroką dziurą - propagacja pozioma."""
+    rng = np.random.default_rng(5)
+    depth = rng.integers(800, 1200, (800, 1280)).astype(np.uint16)
+    depth[rng.random(depth.shape) < 0.05] = 0
+    mask = np.zeros(depth.shape, dtype=np.uint8)
+    mask[380:390, 100:700] = 255
+    depth[mask == 255] = 0
+
+    assert_same(
+        propagate_by_shape(depth, mask, 2.0, 0.5),
+        reference_propagate(depth, mask, "horizontal"),
+    )
@@ -0,0 +1,288 @@
+"""
+Testy jednostkowe śledzenia tagów QR między ramkami (QrTracker, track_rois).
+
+Zakres:
+- plan/update: pełna detekcja bez śledzenia, ROI po pewnej detekcji, pełna
+  ramka co `full_frame_every` ramek, brak śledzenia po niepewnej detekcji,
+- check_lost: zgubiony tag, tag o niskim `decision_margin`, statystyki,
+- osobne klucze śledzenia, limit kluczy (LRU), reset, tracker wyłączony,
+- łączenie nachodzących ROI,
+- wygładzanie głębi i pozy medianą oraz zerowanie historii po przesunięciu tagu,
+- qr_detector z 'track_rois': te same tagi i narożniki w układzie całego
+  obrazu co detekcja na pełnej ramce, brak tagów poza ROI, piksele ROI
+  (undistort z wycinków map, przyciemnione boki) równe wycinkom pełnej ramki.
+"""
+
+import importlib
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+import pkg_resources
+import pytest
+
+import avena_commons.vision.camera as camera
+import avena_commons.vision.sorter as sorter
+from avena_commons.vision.detector import qr_detector
+from avena_commons.vision.detector.qr_tracker import (
+    DEFAULT_SETTINGS,
+    QrTracker,
+    _merge_rois,
+)
+
+qr_detector_module = importlib.import_module(
+    "avena_commons.vision.detector.qr_detector"
+)
+
+CONFIG = {"mode": "gray", "qr_size": 0.1, "clahe": {"clip_limit": 2.0, "grid_size": 8}}
+WIDTH, HEIGHT = 640, 400
+CAMERA_CONFIG = {
+    "camera_params": [WIDTH * 0.7, WIDTH * 0.7, WIDTH / 2, HEIGHT / 2],
+    "distortion_coefficients": [0.0] * 5,
+    "debug_artifacts": {"enabled": False},
+}
+
+
+def detection(x, y, side=40, margin=80.0, hamming=0, z=0.5):
+    corners = np.array(
+        [[x, y + side], [x + side, y + side], [x + side, y], [x, y]], dtype=np.float64
+    )
+    return SimpleNamespace(
+        corners=corners,
+        center=corners.mean(axis=0),
+        hamming=hamming,
+        decision_margin=margin,
+        z=z,
+    )
+
+
+def grid(*detections):
+    return {i + 1: d for i, d in enumerate(detections)}
+
+
+def tag_frame(offset=(0, 0), positions=(0, 1, 2, 3), seed=0):
+    """Ramka z tagami w siatce 2x2 przesuniętymi o `offset` pikseli."""
+    rng = np.random.default_rng(seed)
+    color = rng.integers(90, 140, (HEIGHT, WIDTH, 3), dtype=np.uint8)
+    tag = cv2.imread(
+        pkg_resources.resource_filename("avena_commons.vision.data", "tag36h11-0.png")
+    )
+    side = HEIGHT // 5
+    border = side // 8
+    tag = cv2.resize(tag, (side - 2 * border,) * 2, interpolation=cv2.INTER_NEAREST)
+    tag = cv2.copyMakeBorder(tag, *(border,) * 4, cv2.BORDER_CONSTANT, value=(255,) * 3)
+    for i in positions:
+        x = WIDTH // 2 - side - side // 4 + (i % 2) * (side + side // 2) + offset[0]
+        y = HEIGHT // 2 - side - side // 4 + (i // 2) * (side + side // 2) + offset[1]
+        color[y : y + side, x : x + side] = tag
+    depth = np.full((HEIGHT, WIDTH), 500, dtype=np.uint16)
+    return {"color": color, "depth": depth}
+
+
+@pytest.fixture
+def tracker():
+    return QrTracker(enabled=True, full_frame_every=4, smoothing_window=3)
+
+
+def test_plan_without_track_is_full_frame(tracker):
+    assert tracker.plan("a") is None
+    assert tracker.plan(None) is None
+
+
+def test_confident_detection_starts_tracking(tracker):
+    tracker.update("a", grid(detection(100, 100), None), tracked=False)
+
+    # ROI: bounding box tagu + 0.6 boku marginesu
+    assert tracker.plan("a") == [[76, 76, 164, 164]]
+    assert tracker.plan("b") is None
+    assert tracker.stats == {"full_frame": 1, "roi": 0, "lost": 0}
+
+
+def test_full_frame_every_n_frames(tracker):
+    tags = grid(detection(100, 100), detection(300, 100))
+    tracker.update("a", tags, tracked=False)
+
+    plans = []
+    for _ in range(8):
+        rois = tracker.plan("a")
+        plans.append(rois is not None)
+        tracker.update("a", tags, tracked=rois is not None)
+
+    assert plans == [True, True, True, False] * 2
+    assert tracker.stats == {"full_frame": 3, "roi": 6, "lost": 0}
+
+
+@pytest.mark.parametrize(
+    "tags",
+    [
+        grid(detection(100, 100), detection(300, 100, margin=10.0)),
+        grid(detection(100, 100), detection(300, 100, hamming=1)),
+        grid(None, None),
+        {},
+    ],
+)
+def test_uncertain_detection_stops_tracking(tracker, tags):
+    tracker.update("a", grid(detection(100, 100)), tracked=False)
+    assert tracker.plan("a") is not None
+
+    tracker.update("a", tags, tracked=True)
+
+    assert tracker.plan("a") is None
+
+
+def test_check_lost(tracker):
+    tracker.update("a", grid(detection(100, 100), detection(300, 100)), tracked=False)
+
+    assert not tracker.check_lost("a", grid(detection(101, 100), detection(300, 101)))
+    assert tracker.check_lost("a", grid(detection(101, 100), None))
+    assert tracker.check_lost(
+        "a", grid(detection(101, 100), detection(300, 100, margin=5.0))
+    )
+    assert tracker.check_lost("b", grid(detection(101, 100)))
+    assert tracker.stats["lost"] == 3
+
+
+def test_max_tracks_evicts_least_recently_used():
+    tracker = QrTracker(enabled=True, max_tracks=2)
+    tracker.update("a", grid(detection(100, 100)), tracked=False)
+    tracker.update("b", grid(detection(100, 100)), tracked=False)
+    tracker.update("a", grid(detection(100, 100)), tracked=True)
+    tracker.update("c", grid(detection(100, 100)), tracked=False)
+
+    assert tracker.plan("a") is not None
+    assert tracker.plan("b") is None
+    assert tracker.plan("c") is not None
+
+    tracker.reset("a")
+    assert tracker.plan("a") is None
+    tracker.reset()
+    assert tracker.plan("c") is None
+
+
+def test_disabled_tracker_is_transparent():
+    tracker = QrTracker.from_settings(None)
+    tag = detection(100, 100, z=0.7)
+
+    tracker.update("a", grid(tag), tracked=False)
+
+    assert tracker.enabled is DEFAULT_SETTINGS["enabled"] is False
+    assert tracker.plan("a") is None
+    assert tracker.smooth_depth("a", 1, tag) == 0.7
+    assert tracker.smooth_pose("a", 1, (1.0, 2.0)) == (1.0, 2.0)
+    assert tracker.stats == {"full_frame": 0, "roi": 0, "lost": 0}
+
+
+def test_from_settings_fills_defaults():
+    tracker = QrTracker.from_settings({"enabled": True, "roi_margin": 1.0})
+
+    assert tracker.enabled and tracker.roi_margin == 1.0
+    assert tracker.full_frame_every == DEFAULT_SETTINGS["full_frame_every"]
+
+
+def test_overlapping_rois_are_merged():
+    rois = [[0, 0, 10, 10], [30, 0, 40, 10], [5, 5, 32, 8], [50, 50, 60, 60]]
+
+    assert _merge_rois(rois) == [[0, 0, 40, 10], [50, 50, 60, 60]]
+    assert _merge_rois([[0, 0, 10, 10], [10, 0, 20, 10]]) == [
+        [0, 0, 10, 10],
+        [10, 0, 20, 10],
+    ]
+    assert _merge_rois([]) == []
+
+
+def test_depth_and_pose_are_smoothed_until_tag_moves(tracker):
+    tracker.update("a", grid(detection(100, 100)), tracked=False)
+
+    depths, poses = [], []
+    for i, z in enumerate([0.50, 0.90, 0.0, 0.52, 0.51]):
+        tag = detection(100 + i % 2, 100, z=z)
+        depths.append(tracker.smooth_depth("a", 1, tag))
+        poses.append(tracker.smooth_pose("a", 1, (z, 10.0 * i)))
+
+    # Zero (brak głębi) nie trafia do historii; okno 3 ramek
+    assert depths == pytest.approx([0.50, 0.70, 0.70, 0.52, 0.52])
+    assert poses[2] == pytest.approx((0.5, 10.0))
+    assert poses[4] == pytest.approx((0.51, 30.0))
+
+    # Przesunięcie tagu o więcej niż max_shift_px - nowa historia
+    moved = detection(140, 100, z=0.8)
+    assert tracker.smooth_depth("a", 1, moved) == 0.8
+    assert tracker.smooth_pose("a", 1, (0.8, 0.0)) == (0.8, 0.0)
+
+
+def test_detector_in_rois_matches_full_frame():
+    frame = tag_frame(seed=1)
+    full, _ = qr_detector(frame=frame, camera_config=CAMERA_CONFIG, config=CONFIG)
+    full = sorter.sort_qr_by_center_position(expected_count=4, detections=full)
+    assert all(full.values())
+    tracker = QrTracker(enabled=True)
+    tracker.update("a", full, tracked=False)
+
+    found, debug_data = qr_detector(
+        frame=frame,
+        camera_config=CAMERA_CONFIG,
+        config={**CONFIG, "track_rois": tracker.plan("a")},
+    )
+    found = sorter.sort_qr_by_center_position(expected_count=4, detections=found)
+
+    assert debug_data["track_rois"] == tracker.plan("a")
+    assert not tracker.check_lost("a", found)
+    for position, reference in full.items():
+        np.testing.assert_allclose(found[position].corners, reference.corners, atol=1)
+        np.testing.assert_allclose(found[position].center, reference.center, atol=1)
+        assert found[position].z == pytest.approx(reference.z, abs=0.005)
+
+
+def test_detector_ignores_tags_outside_rois():
+    frame = tag_frame(positions=(0, 3))
+
+    found, _ = qr_detector(
+        frame=frame,
+        camera_config=CAMERA_CONFIG,
+        config={**CONFIG, "track_rois": [[0, 0, WIDTH // 2, HEIGHT // 2]]},
+    )
+
+    assert len(found) == 1
+    assert found[0].center[0] < WIDTH // 2 and found[0].center[1] < HEIGHT // 2
+
+
+def test_roi_preprocessing_matches_full_frame_pixels():
+    """ROI z wycinków map - te same piksele co wycinek pełnej ramki."""
+    frame = tag_frame(seed=2)
+    camera_config = {
+        **CAMERA_CONFIG,
+        "distortion_coefficients": [0.08, -0.2, 0, 0, 0.1],
+    }
+    rois = [[150, 20, 330, 200], [0, 0, 640, 400], [300, 300, 700, 500]]
+    crops = []
+
+    def capture(image, detector, camera_params, config, debug_data):
+        crops.append((image.copy(), camera_params))
+        return []
+
+    _, debug_data = qr_detector(frame=frame, camera_config=camera_config, config=CONFIG)
+    full = debug_data["qr_image_undistorted_darkened"]
+    maps = camera.get_undistort_maps(
+        camera_config["camera_params"],
+        camera_config["distortion_coefficients"],
+        (WIDTH, HEIGHT),
+    )
+    qr_detector_module._detect_in_rois(
+        capture,
+        frame["color"],
+        maps,
+        rois,
+        None,
+        (448.0, 448.0, 320.0, 200.0),
+        CONFIG,
+        {},
+    )
+
+    assert [camera_params[2:] for _, camera_params in crops] == [
+        (170.0, 180.0),
+        (320.0, 200.0),
+        (20.0, -100.0),
+    ]
+    np.testing.assert_array_equal(crops[0][0], full[20:200, 150:330])
+    np.testing.assert_array_equal(crops[1][0], full)
+    np.testing.assert_array_equal(crops[2][0], full[300:400, 300:640])
@@ -0,0 +1,217 @@
+"""
+Testy jednostkowe dopasowania konturów i cache wzorców w rekonstrukcji tagów.
+
+Zakres:
+- find_similar_contours z prefiltrem momentów Hu daje te same dopasowania
+  (te same kontury, w tej samej kolejności) co porównanie wszystkich par
+  przez cv2.matchShapes - zdjęcia z resources oraz syntetyczne sceny
+  z setkami konturów dla różnych progów,
+- wyniki równe progowi i remisy między referencjami (rozstrzygane przez
+  cv2.matchShapes),
+- kontury zdegenerowane (punkt, odcinek) i puste listy wejściowe,
+- cache wzorców referencyjnych w reconstruct_tags: jedno wyznaczenie na
+  obraz tagu, unieważnienie po zmianie zawartości obrazu.
+"""
+
+import glob
+import importlib
+import os
+
+import cv2
+import numpy as np
+import pkg_resources
+import pytest
+
+import avena_commons.vision.tag_reconstruction as tag_reconstruction
+
+reconstruct_tags_module = importlib.import_module(
+    "avena_commons.vision.tag_reconstruction.reconstruct_tags"
+)
+
+PHOTOS = sorted(
+    glob.glob(
+        os.path.join(
+            os.path.dirname(__file__), "..", "..", "..", "resources", "*photos", "*.png"
+        )
+    )
+)
+
+
+def legacy_find_similar_contours(scene_contours, reference_contours, threshold):
+    """Dotychczasowa implementacja - cv2.matchShapes dla każdej pary."""
+    similar_cnts = [[] for _ in reference_contours]
+    for scene_cnt in scene_contours:
+        best_score, best_index = float("inf"), None
+        for i, reference_cnt in enumerate(reference_contours):
+            score = cv2.matchShapes(
+                reference_cnt, scene_cnt, cv2.CONTOURS_MATCH_I3, 0.0
+            )
+            if score < best_score:
+                best_score = score
+                if score < threshold:
+                    best_index = i
+        if best_index is not None:
+            similar_cnts[best_index].append(scene_cnt)
+    return similar_cnts
+
+
+def assert_same_matches(result, expected):
+    assert len(result) == len(expected)
+    for found, reference in zip(result, expected):
+        assert [id(cnt) for cnt in found] == [id(cnt) for cnt in reference]
+
+
+@pytest.fixture(scope="module")
+def tag_image():
+    return cv2.imread(
+        pkg_resources.resource_filename("avena_commons.vision.data", "tag36h11-0.png")
+    )
+
+
+@pytest.fixture(scope="module")
+def reference_contours(tag_image):
+    gray = cv2.cvtColor(tag_image, cv2.COLOR_BGR2GRAY)
+    return tag_reconstruction.create_reference_tag_shapes(gray)["ref_cnts"]
+
+
+def synthetic_scene(seed, count=300):
+    """Scena z setkami konturów: prostokąty, elipsy, wielokąty i szum."""
+    rng = np.random.default_rng(seed)
+    image = np.zeros((600, 900), dtype=np.uint8)
+    for _ in range(count):
+        x, y = int(rng.integers(0, 900)), int(rng.integers(0, 600))
+        kind = rng.integers(0, 4)
+        if kind == 0:
+            w, h = rng.integers(2, 30, 2)
+            angle = float(rng.uniform(0, 180))
+            box = cv2.boxPoints(((x, y), (float(w), float(h)), angle))
+            cv2.fillPoly(image, [box.astype(np.int32)], 255)
+        elif kind == 1:
+            axes = tuple(int(a) for a in rng.integers(1, 15, 2))
+            cv2.ellipse(
+                image, (x, y), axes, float(rng.uniform(0, 180)), 0, 360, 255, -1
+            )
+        elif kind == 2:
+            points = rng.integers(-15, 15, (int(rng.integers(3, 7)), 2)) + (x, y)
+            cv2.fillPoly(image, [points.astype(np.int32)], 255)
+        else:
+            image[y, x] = 255
+    return tag_reconstruction.find_scenes_contours(image)
+
+
+@pytest.mark.parametrize("path", PHOTOS, ids=os.path.basename)
+def test_same_matches_on_sample_photos(path, reference_contours):
+    image = cv2.imread(path)
+    scene = tag_reconstruction.find_scenes_contours(
+        tag_reconstruction.preprocess_for_contours(image)
+    )
+
+    result = tag_reconstruction.find_similar_contours(scene, reference_contours, 0.1)
+
+    expected = legacy_find_similar_contours(scene, reference_contours, 0.1)
+    assert any(expected)
+    assert_same_matches(result, expected)
+
+
+@pytest.mark.parametrize("threshold", [0.0, 0.02, 0.1, 0.3, 1.0, 50.0])
+@pytest.mark.parametrize("seed", range(3))
+def test_same_matches_on_synthetic_scenes(seed, threshold, reference_contours):
+    scene = synthetic_scene(seed)
+    assert len(scene) > 200
+
+    assert_same_matches(
+        tag_reconstruction.find_similar_contours(scene, reference_contours, threshold),
+        legacy_find_similar_contours(scene, reference_contours, threshold),
+    )
+
+
+def test_scene_contours_as_references():
+    """Referencje z tej samej sceny - wiele remisów i wyników bliskich zeru."""
+    scene = synthetic_scene(7, count=120)
+    references = scene[::15]
+
+    assert_same_matches(
+        tag_reconstruction.find_similar_contours(scene, references, 0.05),
+        legacy_find_similar_contours(scene, references, 0.05),
+    )
+
+
+def test_borderline_scores_match_legacy(reference_contours):
+    """Próg równy wynikowi pary i zdublowane referencje (remisy)."""
+    scene = synthetic_scene(11, count=150)
+    references = [*reference_contours, reference_contours[1]]
+    scores = [
+        cv2.matchShapes(references[0], cnt, cv2.CONTOURS_MATCH_I3, 0.0)
+        for cnt in scene[:5]
+    ]
+
+    for threshold in scores:
+        assert_same_matches(
+            tag_reconstruction.find_similar_contours(scene, references, threshold),
+            legacy_find_similar_contours(scene, references, threshold),
+        )
+
+
+def test_degenerate_and_empty_contours(reference_contours):
+    scene = [
+        np.array([[[5, 5]]], dtype=np.int32),
+        np.array([[[0, 0]], [[10, 0]]], dtype=np.int32),
+        np.array([[[0, 0]], [[10, 10]], [[20, 20]]], dtype=np.int32),
+        reference_contours[0],
+    ]
+
+    assert_same_matches(
+        tag_reconstruction.find_similar_contours(scene, reference_contours, 0.1),
+        legacy_find_similar_contours(scene, reference_contours, 0.1),
+    )
+    assert tag_reconstruction.find_similar_contours([], reference_contours) == [
+        [] for _ in reference_contours
+    ]
+    assert tag_reconstruction.find_similar_contours(scene, []) == []
+
+
+def test_reference_shapes_are_cached(tag_image, monkeypatch):
+    monkeypatch.setattr(reconstruct_tags_module, "_REFERENCE_TAG_SHAPES_CACHE", [])
+    calls = []
+    create = tag_reconstruction.create_reference_tag_shapes
+    monkeypatch.setattr(
+        tag_reconstruction,
+        "create_reference_tag_shapes",
+        lambda image: calls.append(image) or create(image),
+    )
+
+    first = reconstruct_tags_module._get_reference_tag_shapes(tag_image)
+    again = reconstruct_tags_module._get_reference_tag_shapes(tag_image.copy())
+
+    assert again is first
+    assert len(calls) == 1
+    assert calls[0].ndim == 2
+    gray = cv2.cvtColor(tag_image, cv2.COLOR_BGR2GRAY)
+    expected = create(gray)
+    assert len(first["ref_cnts"]) == len(expected["ref_cnts"])
+    for cached, fresh in zip(first["ref_cnts"], expected["ref_cnts"]):
+        np.testing.assert_array_equal(cached, fresh)
+
+    # Zmiana zawartości obrazu (także w miejscu) - nowe wzorce
+    modified = tag_image.copy()
+    modified[:40] = 255
+    assert reconstruct_tags_module._get_reference_tag_shapes(modified) is not first
+    tag_image_view = tag_image.copy()
+    reconstruct_tags_module._get_reference_tag_shapes(tag_image_view)
+    tag_image_view[:40] = 255
+    assert (
+        reconstruct_tags_module._get_reference_tag_shapes(tag_image_view) is not first
+    )
+    assert len(calls) == 2
+
+
+def test_reconstruct_tags_uses_cached_shapes(tag_image, monkeypatch):
+    monkeypatch.setattr(reconstruct_tags_module, "_REFERENCE_TAG_SHAPES_CACHE", [])
+    rng = np.random.default_rng(0)
+    image = rng.integers(90, 140, (400, 640, 3), dtype=np.uint8)
+
+    first = tag_reconstruction.reconstruct_tags(image, tag_image)
+    second = tag_reconstruction.reconstruct_tags(image, tag_image)
+
+    np.testing.assert_array_equal(first, second)
+    assert len(reconstruct_tags_module._REFERENCE_TAG_SHAPES_CACHE) == 1
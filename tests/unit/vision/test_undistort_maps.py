@@ -0,0 +1,152 @@
+"""
+Testy jednostkowe cache map undistort i korekcji przez cv2.remap.
+
+Zakres:
+- undistort_remap daje piksel w piksel ten sam wynik co cv2.undistort
+  (obrazy z resources, ramki 1280x800 kolorowe i maski),
+- mapy są liczone raz na klucz (parametry, zniekształcenie, rozmiar, alpha),
+- qr_detector koryguje obraz mapami z cache.
+"""
+
+import importlib
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+
+from avena_commons.vision.camera import (
+    create_camera_distortion,
+    create_camera_matrix,
+    get_undistort_maps,
+)
+from avena_commons.vision.detector import qr_detector
+from avena_commons.vision.image_preprocess import undistort, undistort_remap
+
+# Pakiet eksportuje funkcję o tej samej nazwie co moduł
+maps_module = importlib.import_module("avena_commons.vision.camera.get_undistort_maps")
+RESOURCES = Path(__file__).resolve().parents[3] / "resources"
+CAMERA_PARAMS = [905.2, 904.7, 641.3, 398.9]
+DISTORTION = [0.082, -0.213, 0.0011, -0.0017, 0.104]
+
+
+def legacy_undistort(image, camera_params=CAMERA_PARAMS, distortion=DISTORTION):
+    return undistort(
+        image,
+        create_camera_matrix(camera_params),
+        create_camera_distortion(distortion),
+    )
+
+
+def cached_undistort(image, camera_params=CAMERA_PARAMS, distortion=DISTORTION):
+    height, width = image.shape[:2]
+    maps = get_undistort_maps(camera_params, distortion, (width, height))
+    return undistort_remap(image, maps)
+
+
+@pytest.fixture(autouse=True)
+def _empty_cache(monkeypatch):
+    monkeypatch.setattr(maps_module, "_UNDISTORT_MAPS_CACHE", {})
+
+
+@pytest.mark.parametrize(
+    "path", sorted(RESOURCES.glob("photos/*.png")), ids=lambda p: p.name
+)
+def test_resource_images_match_cv2_undistort(path):
+    """Zdjęcia z resources (z parametrami dla ich rozdzielczości)."""
+    image = cv2.imread(str(path))
+    height, width = image.shape[:2]
+    camera_params = [width * 0.9, width * 0.9, width / 2, height / 2]
+
+    np.testing.assert_array_equal(
+        cached_undistort(image, camera_params), legacy_undistort(image, camera_params)
+    )
+
+
+@pytest.mark.parametrize(
+    "shape, dtype",
+    [((800, 1280, 3), np.uint8), ((800, 1280), np.uint8), ((800, 1280), np.uint16)],
+)
+def test_camera_frames_match_cv2_undistort(shape, dtype):
+    """Ramki w rozdzielczości kamery: kolor, maska binarna i głębia."""
+    rng = np.random.default_rng(0)
+    image = rng.integers(0, np.iinfo(dtype).max, shape, dtype=dtype)
+    if len(shape) == 2 and dtype == np.uint8:
+        image = np.where(image > 127, 255, 0).astype(np.uint8)
+
+    np.testing.assert_array_equal(cached_undistort(image), legacy_undistort(image))
+
+
+def test_maps_are_computed_once_per_key(monkeypatch):
+    """Ten sam klucz zwraca te same mapy, inny rozmiar lub alpha - nowe."""
+    calls = []
+    original = cv2.initUndistortRectifyMap
+
+    def counting(*args):
+        calls.append(args[4])
+        return original(*args)
+
+    monkeypatch.setattr(cv2, "initUndistortRectifyMap", counting)
+
+    first = get_undistort_maps(CAMERA_PARAMS, DISTORTION, (1280, 800))
+    again = get_undistort_maps(
+        np.array(CAMERA_PARAMS), np.array(DISTORTION, dtype=np.float32), (1280, 800)
+    )
+    other_size = get_undistort_maps(CAMERA_PARAMS, DISTORTION, (640, 400))
+    with_alpha = get_undistort_maps(CAMERA_PARAMS, DISTORTION, (1280, 800), alpha=0)
+
+    assert again is first
+    assert other_size[0].shape[:2] == (400, 640)
+    assert with_alpha is not first
+    assert len(calls) == 3
+
+
+def test_alpha_uses_optimal_new_camera_matrix():
+    """alpha odpowiada cv2.undistort z macierzą getOptimalNewCameraMatrix."""
+    image = cv2.imread(str(sorted(RESOURCES.glob("photos/*.png"))[0]))
+    height, width = image.shape[:2]
+    camera_params = [width * 0.9, width * 0.9, width / 2, height / 2]
+    camera_matrix = create_camera_matrix(camera_params)
+    distortion = create_camera_distortion(DISTORTION)
+    new_matrix, _ = cv2.getOptimalNewCameraMatrix(
+        camera_matrix, distortion, (width, height), 1.0
+    )
+
+    maps = get_undistort_maps(camera_params, DISTORTION, (width, height), alpha=1.0)
+
+    np.testing.assert_array_equal(
+        undistort_remap(image, maps),
+        cv2.undistort(image, camera_matrix, distortion, None, new_matrix),
+    )
+
+
+def test_cache_is_bounded():
+    for width in range(100, 120):
+        get_undistort_maps(CAMERA_PARAMS, DISTORTION, (width, 80))
+
+    assert (
+        len(maps_module._UNDISTORT_MAPS_CACHE) == maps_module._UNDISTORT_MAPS_CACHE_SIZE
+    )
+
+
+def test_qr_detector_undistorts_with_cached_maps(tmp_path, monkeypatch):
+    """Obraz po korekcji w qr_detector jest identyczny jak z cv2.undistort."""
+    monkeypatch.chdir(tmp_path)
+    rng = np.random.default_rng(1)
+    frame = {
+        "color": rng.integers(0, 256, (400, 640, 3), dtype=np.uint8),
+        "depth": np.zeros((400, 640), dtype=np.uint16),
+    }
+    camera_config = {
+        "camera_params": CAMERA_PARAMS,
+        "distortion_coefficients": DISTORTION,
+    }
+
+    _, debug_data = qr_detector(
+        frame=frame, camera_config=camera_config, config={"mode": "gray"}
+    )
+
+    np.testing.assert_array_equal(
+        debug_data["qr_image_undistorted"], legacy_undistort(frame["color"])
+    )
+    assert len(maps_module._UNDISTORT_MAPS_CACHE) == 1
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Vision pipeline benchmark - recorded frames replayed stage by stage.
+
+Replays a recording (color / depth frame pairs with `labels.json`, see
+recording.py) through every vision stage on its own and end to end:
+
+- qr_detector: every QR config of the recording (the worker pool set),
+- tag_reconstruction: `reconstruct_tags` on the undistorted, darkened frame,
+- fix_depth: depth hole filling with the box detector config,
+- box_detector: the whole box detector (with fix_depth),
+- merge_sort: `sort_qr_by_center_position` + `merge_qr_detections_with_confidence`,
+- end_to_end: QR configs, sort and merge, then the box detector.
+
+For each stage reports latency percentiles (ms), tracemalloc peak and held
+allocations per frame (MB) and accuracy against the labels (QR: frames with
+all tags and no extra, recall, extra detections; merge/sort: correct grid
+positions; box: centers within 10 px and mean error; fix_depth: share of
+zero-depth pixels filled).
+
+`--save-baseline` writes the report as JSON; `--baseline` compares with it
+and exits with status 1 when a stage regresses (latency or peak allocation up
+by more than `--tolerance`, accuracy down). Without `--frames` a synthetic
+recording is generated (`--write` saves it in the recording format).
+
+Usage:
+    python tests/vision_benchmark
+    python tests/vision_benchmark --frames recordings/cell_1 --repeat 5
+    python tests/vision_benchmark --stages qr_detector merge_sort
+    python tests/vision_benchmark --save-baseline baseline.json
+    python tests/vision_benchmark --baseline baseline.json --tolerance 0.3
+"""
+
+import argparse
+import json
+import sys
+
+from recording import load_recording, save_recording, synthetic_recording
+from report import compare, measure
+from stages import STAGES
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--frames", help="recording directory with labels.json")
+    parser.add_argument("--size", default="1280x800", help="synthetic frames WxH")
+    parser.add_argument("--count", type=int, default=40, help="synthetic frames")
+    parser.add_argument("--write", help="save the synthetic recording here")
+    parser.add_argument("--stages", nargs="+", choices=list(STAGES), default=None)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--baseline", help="baseline JSON to compare with")
+    parser.add_argument("--save-baseline", help="write the report as JSON")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    if args.frames:
+        recording = load_recording(args.frames)
+    else:
+        width, height = (int(v) for v in args.size.split("x"))
+        recording = synthetic_recording(width, height, args.count)
+        if args.write:
+            save_recording(recording, args.write)
+    width, height = recording.size
+    print(f"{recording.source}: {len(recording.samples)} frames {width}x{height}")
+
+    report = {"source": recording.source, "frames": len(recording.samples)}
+    report["stages"] = {}
+    print(
+        f"{'stage':<19} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} "
+        f"{'peak MB':>8} {'held MB':>8}  accuracy"
+    )
+    for name in args.stages or STAGES:
+        result = measure(STAGES[name](), recording, args.repeat)
+        report["stages"][name] = result
+        accuracy = "  ".join(
+            f"{key} {value:.3f}" if isinstance(value, float) else f"{key} {value}"
+            for key, value in result["accuracy"].items()
+        )
+        print(
+            f"{name:<19} {result['p50_ms']:>8.2f} {result['p90_ms']:>8.2f} "
+            f"{result['p99_ms']:>8.2f} {result['peak_mb']:>8.2f} "
+            f"{result['held_mb']:>8.2f}  {accuracy}"
+        )
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as file:
+            json.dump(report, file, indent=2)
+        print(f"baseline saved: {args.save_baseline}")
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        if (baseline["source"], baseline["frames"]) != (
+            report["source"],
+            report["frames"],
+        ):
+            print(
+                f"note: baseline from {baseline['source']} "
+                f"({baseline['frames']} frames)"
+            )
+        regressions = compare(report, baseline, args.tolerance)
+        for name, messages in regressions.items():
+            print(f"REGRESSION {name}: {', '.join(messages)}")
+        if regressions:
+            sys.exit(1)
+        print(f"no regressions against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+Recorded frame sets - loading, saving and a synthetic generator.
+
+A recording is a directory with color / depth frame pairs and `labels.json`::
+
+    recordings/cell_1/
+        0001_color.png      0001_depth.npy
+        0002_color.jpg      0002_depth.npy
+        1718000000_4242_qr_color_frame.jpg   (debug sink dumps pair up too)
+        1718000000_4242_qr_depth_frame.npy
+        labels.json
+
+    {
+        "camera_config": {"camera_params": [fx, fy, cx, cy],
+                          "distortion_coefficients": [k1, k2, p1, p2, k3]},
+        "qr_config": [{...}, ...], optional, overrides stages.QR_CONFIGS
+        "box_config": {...},       optional, overrides stages.box_config()
+        "frames": {
+            "0001": {"qr": {"1": [cx, cy], "2": [cx, cy], ...},
+                     "box": {"center": [x, y]}},
+            "0002": {"qr": [[cx, cy], ...]}
+        }
+    }
+
+QR labels are tag centers in undistorted pixels, either a list or a mapping of
+grid positions (1 top-left, 2 bottom-left, 3 top-right, 4 bottom-right) to
+centers; only the mapping is scored by the merge/sort stage. Box labels are
+the box center in undistorted pixels. Frames without labels are timed but not
+scored.
+"""
+
+import json
+import os
+import re
+
+import cv2
+import numpy as np
+import pkg_resources
+
+FRAME_FILE = re.compile(r"^(?P<id>.+?)_(?P<kind>color|depth)(_frame)?\.(png|jpg|npy)$")
+
+
+class Sample:
+    """One recorded frame: `frame` dict for the detectors and its labels."""
+
+    def __init__(self, frame_id, color, depth, labels=None):
+        self.frame_id = frame_id
+        self.frame = {"color": color, "depth": depth}
+        self.labels = labels or {}
+
+    @property
+    def qr_centers(self):
+        qr = self.labels.get("qr")
+        if qr is None:
+            return None
+        return list(qr.values()) if isinstance(qr, dict) else qr
+
+    @property
+    def qr_positions(self):
+        qr = self.labels.get("qr")
+        if not isinstance(qr, dict):
+            return None
+        return {int(position): center for position, center in qr.items()}
+
+
+class Recording:
+    """Frames of one camera with the camera and detector configuration."""
+
+    def __init__(self, samples, camera_config, configs=None, source="synthetic"):
+        self.samples = samples
+        self.camera_config = camera_config
+        self.configs = configs or {}
+        self.source = source
+
+    @property
+    def size(self):
+        height, width = self.samples[0].frame["color"].shape[:2]
+        return width, height
+
+
+def load_recording(directory):
+    """Reads frame pairs and `labels.json` from `directory`."""
+    with open(os.path.join(directory, "labels.json")) as file:
+        labels = json.load(file)
+    files = {}
+    for name in sorted(os.listdir(directory)):
+        match = FRAME_FILE.match(name)
+        if match:
+            files.setdefault(match["id"], {})[match["kind"]] = name
+    samples = []
+    for frame_id, pair in sorted(files.items()):
+        if "color" not in pair:
+            continue
+        color = cv2.imread(os.path.join(directory, pair["color"]))
+        if "depth" in pair:
+            depth = np.load(os.path.join(directory, pair["depth"]))
+        else:
+            depth = np.zeros(color.shape[:2], dtype=np.uint16)
+        frame_labels = labels.get("frames", {}).get(frame_id)
+        samples.append(Sample(frame_id, color, depth, frame_labels))
+    if not samples:
+        raise ValueError(f"no color frames in {directory}")
+    configs = {key: labels[key] for key in ("qr_config", "box_config") if key in labels}
+    return Recording(samples, labels["camera_config"], configs, source=directory)
+
+
+def save_recording(recording, directory):
+    """Writes `recording` in the format read by `load_recording`."""
+    os.makedirs(directory, exist_ok=True)
+    frames = {}
+    for sample in recording.samples:
+        cv2.imwrite(
+            os.path.join(directory, f"{sample.frame_id}_color.png"),
+            sample.frame["color"],
+        )
+        np.save(
+            os.path.join(directory, f"{sample.frame_id}_depth.npy"),
+            sample.frame["depth"],
+        )
+        frames[sample.frame_id] = sample.labels
+    labels = {"camera_config": recording.camera_config, **recording.configs}
+    with open(os.path.join(directory, "labels.json"), "w") as file:
+        json.dump({**labels, "frames": frames}, file, indent=2)
+
+
+def synthetic_recording(width=1280, height=800, count=40, seed=0):
+    """Box cell seen from above: four AprilTags on the box floor, box walls.
+
+    The walls match `stages.box_config` in color (HSV) and depth, the floor
+    depth has dropout holes for `fix_depth`; every 10th frame has no tags and
+    every 7th has one tag covered. No lens distortion, so labels are exact.
+    """
+    tag = cv2.imread(
+        pkg_resources.resource_filename("avena_commons.vision.data", "tag36h11-0.png")
+    )
+    side = height // 6
+    border = side // 8
+    tag = cv2.resize(tag, (side - 2 * border,) * 2, interpolation=cv2.INTER_NEAREST)
+    tag = cv2.copyMakeBorder(tag, *(border,) * 4, cv2.BORDER_CONSTANT, value=(255,) * 3)
+    rng = np.random.default_rng(seed)
+    box_w, box_h = int(width * 0.55), int(width * 0.55 / 1.34)
+    wall = max(32, width // 40)  # fix_depth (closing) usuwa cieńsze ścianki
+    samples = []
+    for i in range(count):
+        dx, dy = (int(v) for v in rng.integers(-10, 11, 2))
+        cx, cy = width // 2 + dx, height // 2 + dy
+        color = rng.integers(60, 90, (height, width, 3), dtype=np.uint8)
+        depth = rng.integers(895, 905, (height, width)).astype(np.uint16)
+        x0, y0 = cx - box_w // 2, cy - box_h // 2
+        outer = (slice(y0, y0 + box_h), slice(x0, x0 + box_w))
+        inner = (
+            slice(y0 + wall, y0 + box_h - wall),
+            slice(x0 + wall, x0 + box_w - wall),
+        )
+        color[outer] = (200, 180, 40)
+        color[inner] = rng.integers(90, 140, (box_h - 2 * wall, box_w - 2 * wall, 3))
+        depth[outer] = 840
+        depth[inner] = 900
+        for _ in range(int(rng.integers(20, 60))):
+            hx, hy = int(rng.integers(0, width - 30)), int(rng.integers(0, height - 30))
+            depth[
+                hy : hy + int(rng.integers(2, 30)), hx : hx + int(rng.integers(2, 30))
+            ] = 0
+
+        qr = {}
+        if i % 10 != 9:
+            for j in range(4):
+                x = cx - side - side // 4 + (j // 2) * (side + side // 2)
+                y = cy - side - side // 4 + (j % 2) * (side + side // 2)
+                if i % 7 == 6 and j == 3:
+                    continue
+                color[y : y + side, x : x + side] = tag
+                qr[str(j + 1)] = [x + side / 2, y + side / 2]
+        labels = {"qr": qr, "box": {"center": [cx, cy]}}
+        samples.append(Sample(f"{i:04d}", color, depth, labels))
+    camera_config = {
+        "camera_params": [width * 0.7, width * 0.7, width / 2, height / 2],
+        "distortion_coefficients": [0.0] * 5,
+    }
+    return Recording(samples, camera_config)
@@ -0,0 +1,92 @@
+"""
+Measuring stages and comparing reports with a saved baseline.
+
+Latency is wall time of `Stage.run` per frame (`--repeat` runs each, the
+first pass over the recording warms up detector and undistort map caches and
+is not recorded). Allocations come from a separate pass under `tracemalloc`
+(tracing slows the code down, so it never overlaps the timed runs): peak
+traced memory and bytes still held after the stage returns, per frame.
+"""
+
+import contextlib
+import io
+import time
+import tracemalloc
+from collections import Counter
+
+import numpy as np
+
+PERCENTILES = (50, 90, 99)
+
+
+def measure(stage, recording, repeat=3):
+    """Runs `stage` over every frame of `recording` and returns its report."""
+    inputs = [stage.prepare(sample, recording) for sample in recording.samples]
+    samples_ms = []
+    totals = Counter()
+    # box_detector wypisuje czasy etapów na stdout - poza raportem
+    with contextlib.redirect_stdout(io.StringIO()):
+        for sample, data in zip(recording.samples, inputs):
+            totals.update(stage.score(sample, stage.run(data, recording)))
+        for _ in range(repeat):
+            for data in inputs:
+                start = time.perf_counter()
+                stage.run(data, recording)
+                samples_ms.append((time.perf_counter() - start) * 1e3)
+
+        peaks, held = [], []
+        tracemalloc.start()
+        try:
+            for data in inputs:
+                tracemalloc.reset_peak()
+                before = tracemalloc.get_traced_memory()[0]
+                output = stage.run(data, recording)
+                current, peak = tracemalloc.get_traced_memory()
+                peaks.append(peak - before)
+                held.append(current - before)
+                del output
+        finally:
+            tracemalloc.stop()
+
+    report = {f"p{p}_ms": float(np.percentile(samples_ms, p)) for p in PERCENTILES}
+    report.update({
+        "mean_ms": float(np.mean(samples_ms)),
+        "peak_mb": float(np.median(peaks)) / 2**20,
+        "held_mb": float(np.median(held)) / 2**20,
+        "accuracy": stage.summary(totals),
+    })
+    return report
+
+
+def compare(report, baseline, latency_tolerance=0.2, accuracy_tolerance=0.01):
+    """Regressions of `report` against `baseline` (stage -> list of messages).
+
+    Latency (p50, p90) and peak allocation regress when they grow by more
+    than `latency_tolerance` (relative), accuracy metrics when they drop by
+    more than `accuracy_tolerance` (absolute; for 'extra' and 'box_error_px'
+    lower is better, so any growth counts).
+    """
+    regressions = {}
+    for name, current in report["stages"].items():
+        previous = baseline["stages"].get(name)
+        if previous is None:
+            continue
+        messages = []
+        for key in ("p50_ms", "p90_ms", "peak_mb"):
+            if current[key] > previous[key] * (1 + latency_tolerance) and (
+                current[key] - previous[key] > 0.05
+            ):
+                messages.append(f"{key} {previous[key]:.2f} -> {current[key]:.2f}")
+        for key, value in current["accuracy"].items():
+            old = previous["accuracy"].get(key)
+            if old is None:
+                continue
+            if key in ("extra", "box_error_px"):
+                worse = value > old + (0.5 if key == "box_error_px" else 0)
+            else:
+                worse = value < old - accuracy_tolerance
+            if worse:
+                messages.append(f"{key} {old:.3f} -> {value:.3f}")
+        if messages:
+            regressions[name] = messages
+    return regressions
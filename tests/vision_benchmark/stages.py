@@ -0,0 +1,380 @@
+"""
+Pipeline stages replayed by the benchmark.
+
+Each stage has an untimed `prepare` (inputs produced by earlier stages, so a
+stage is measured on its own), the timed `run` and `score`, which returns
+per-frame counters compared with the labels. `summary` turns the summed
+counters into the accuracy columns of the report.
+
+Independent stages: qr_detector (every QR config, as the worker pool runs
+them), tag_reconstruction (`reconstruct_tags` on the undistorted, darkened
+frame),
+fix_depth, box_detector (including its own fix_depth) and merge_sort
+(`sort_qr_by_center_position` + `merge_qr_detections_with_confidence` over the
+per-config detections). end_to_end runs the QR path (configs, sort, merge)
+and the box detector on the same frame.
+"""
+
+import importlib
+
+import cv2
+import numpy as np
+import pkg_resources
+
+import avena_commons.vision.camera as camera
+import avena_commons.vision.image_preprocess as preprocess
+import avena_commons.vision.merge as merge
+import avena_commons.vision.sorter as sorter
+import avena_commons.vision.tag_reconstruction as tag_reconstruction
+from avena_commons.vision.detector import box_detector, qr_detector
+from avena_commons.vision.vision import fix_depth
+
+qr_detector_module = importlib.import_module(
+    "avena_commons.vision.detector.qr_detector"
+)
+
+MATCH_PX = 10.0
+CLAHE = {"clip_limit": 4.0, "grid_size": 8}
+QR_CONFIGS = [
+    {"mode": "gray", "qr_size": 0.1, "clahe": CLAHE},
+    {"mode": "saturation", "qr_size": 0.1, "clahe": CLAHE},
+]
+FIX_DEPTH_CONFIG = {
+    "closing_mask": {"kernel_size": 10, "iterations": 2},
+    "zero_mask": {"kernel_size": 10, "iterations": 2},
+    "r_wide": 2.0,
+    "r_tall": 0.5,
+    "final_closing_mask": {"kernel_size": 10, "iterations": 2},
+}
+
+
+def box_config(width, height):
+    """Box detector config for the synthetic recording (`--size`)."""
+    box_w = width * 0.55
+    return {
+        "center_point": [width // 2, height // 2],
+        "depth": {
+            "center_size": height // 8,
+            "depth_bias": 44,
+            "depth_range": 35,
+            "min_non_zero_percentage": 0.3,
+        },
+        "edge_removal": {"edge_margin": 10},
+        "fix_depth_config": FIX_DEPTH_CONFIG,
+        "fix_depth_on": True,
+        "hit_contours": {"angle_step": 10, "step_size": 1},
+        "hsv": {
+            "hsv_h_min": 70,
+            "hsv_h_max": 105,
+            "hsv_s_min": 10,
+            "hsv_s_max": 255,
+            "hsv_v_min": 120,
+            "hsv_v_max": 255,
+        },
+        "preprocess": {
+            "blur_size": 15,
+            "closed_iterations": 3,
+            "closed_kernel_type": "MORPH_ELLIPSE",
+            "closed_size": [1, 9],
+            "opened_iterations": 3,
+            "opened_kernel_type": "MORPH_RECT",
+            "opened_size": [2, 9],
+        },
+        "rect_validation": {
+            "box_ratio_range": [1.25, 1.45],
+            "max_angle": 20,
+            "max_distance": 150,
+            "side_length": {
+                "long": [box_w * 0.9, box_w * 1.1],
+                "short": [box_w / 1.34 * 0.9, box_w / 1.34 * 1.1],
+            },
+        },
+        "remove_cnts": {
+            "expected_width": int(box_w * 1.1),
+            "expected_height": int(box_w / 1.34 * 1.1),
+        },
+    }
+
+
+def _qr_configs(recording):
+    configs = recording.configs.get("qr_config", QR_CONFIGS)
+    return configs if isinstance(configs, list) else [configs]
+
+
+def _box_config(recording):
+    return recording.configs.get("box_config") or box_config(*recording.size)
+
+
+def _camera_config(recording):
+    return {**recording.camera_config, "debug_artifacts": {"enabled": False}}
+
+
+def _score_qr(sample, detections):
+    centers = sample.qr_centers
+    if centers is None:
+        return {}
+    found = [d.center for d in detections or []]
+    matched = sum(
+        any(np.linalg.norm(np.subtract(f, c)) < MATCH_PX for f in found)
+        for c in centers
+    )
+    extra = max(0, len(found) - matched)
+    return {
+        "frames": 1,
+        "solved": int(matched == len(centers) and extra == 0),
+        "tags": len(centers),
+        "matched": matched,
+        "extra": extra,
+    }
+
+
+def _summary_qr(totals):
+    if not totals.get("frames"):
+        return {}
+    return {
+        "solved": totals["solved"] / totals["frames"],
+        "recall": totals["matched"] / max(1, totals["tags"]),
+        "extra": totals["extra"],
+    }
+
+
+def _score_positions(sample, results):
+    positions = sample.qr_positions
+    if positions is None:
+        return {}
+    correct = 0
+    for position in range(1, 5):
+        detection = results.get(position)
+        label = positions.get(position)
+        if label is None:
+            correct += detection is None
+        elif detection is not None:
+            correct += np.linalg.norm(detection.center - label) < MATCH_PX
+    return {"frames": 1, "positions": 4, "correct": int(correct)}
+
+
+def _summary_positions(totals):
+    if not totals.get("frames"):
+        return {}
+    return {"positions": totals["correct"] / totals["positions"]}
+
+
+def _score_box(sample, result):
+    label = sample.labels.get("box")
+    if label is None:
+        return {}
+    center = result[0]
+    error_px = None
+    if center is not None:
+        error_px = float(np.linalg.norm(np.subtract(center, label["center"])))
+    return {
+        "box_frames": 1,
+        "box_found": int(center is not None),
+        "box_hit": int(error_px is not None and error_px < MATCH_PX),
+        "box_error_px": error_px or 0.0,
+    }
+
+
+def _summary_box(totals):
+    if not totals.get("box_frames"):
+        return {}
+    return {
+        "box_hit": totals["box_hit"] / totals["box_frames"],
+        "box_error_px": totals["box_error_px"] / max(1, totals["box_found"]),
+    }
+
+
+def _detect_configs(frame, recording):
+    camera_config = _camera_config(recording)
+    return [
+        qr_detector(frame=frame, camera_config=camera_config, config=config)[0]
+        for config in _qr_configs(recording)
+    ]
+
+
+def _sort_and_merge(detection_lists):
+    results = {}
+    for detections in detection_lists:
+        sorted_detections = sorter.sort_qr_by_center_position(
+            expected_count=4, detections=detections
+        )
+        results = merge.merge_qr_detections_with_confidence(sorted_detections, results)
+    return results
+
+
+def _unique(detection_lists):
+    unique = []
+    for detections in detection_lists:
+        for detection in detections or []:
+            if all(
+                np.linalg.norm(detection.center - u.center) >= MATCH_PX for u in unique
+            ):
+                unique.append(detection)
+    return unique
+
+
+class Stage:
+    """A timed pipeline step (see the module docstring)."""
+
+    name = ""
+
+    def prepare(self, sample, recording):
+        return sample.frame
+
+    def run(self, data, recording):
+        raise NotImplementedError
+
+    def score(self, sample, output):
+        return {}
+
+    def summary(self, totals):
+        return {}
+
+
+class QrDetectorStage(Stage):
+    name = "qr_detector"
+
+    def run(self, frame, recording):
+        return _detect_configs(frame, recording)
+
+    def score(self, sample, output):
+        return _score_qr(sample, _unique(output))
+
+    def summary(self, totals):
+        return _summary_qr(totals)
+
+
+class TagReconstructionStage(Stage):
+    name = "tag_reconstruction"
+
+    def __init__(self):
+        self.tag_image = cv2.imread(
+            pkg_resources.resource_filename(
+                "avena_commons.vision.data", "tag36h11-0.png"
+            )
+        )
+
+    def prepare(self, sample, recording):
+        height, width = sample.frame["color"].shape[:2]
+        maps = camera.get_undistort_maps(
+            recording.camera_config["camera_params"],
+            recording.camera_config["distortion_coefficients"],
+            (width, height),
+        )
+        # To samo wejście co w trybie 'tag_reconstruction' detektora QR
+        return preprocess.darken_sides(
+            preprocess.undistort_remap(sample.frame["color"], maps),
+            **qr_detector_module._DARKEN_SIDES,
+        )
+
+    def run(self, image, recording):
+        config = _qr_configs(recording)[0].get("tag_reconstruction")
+        return tag_reconstruction.reconstruct_tags(image, self.tag_image, config)
+
+    def score(self, sample, output):
+        # Tagi w obrazie po rekonstrukcji (już bez dystorsji) - poza pomiarem
+        height, width = output.shape[:2]
+        detections, _ = qr_detector(
+            frame={"color": output},
+            camera_config={
+                "camera_params": [width * 0.7, width * 0.7, width / 2, height / 2],
+                "distortion_coefficients": [0.0] * 5,
+                "debug_artifacts": {"enabled": False},
+            },
+            config={"mode": "gray", "qr_size": 0.1, "clahe": CLAHE},
+        )
+        return _score_qr(sample, detections)
+
+    def summary(self, totals):
+        return _summary_qr(totals)
+
+
+class FixDepthStage(Stage):
+    name = "fix_depth"
+
+    def prepare(self, sample, recording):
+        return sample.frame["depth"]
+
+    def run(self, depth, recording):
+        config = _box_config(recording).get("fix_depth_config", FIX_DEPTH_CONFIG)
+        return depth, fix_depth(depth, config)
+
+    def score(self, sample, output):
+        before, after = output
+        return {
+            "zero_before": int(np.count_nonzero(before == 0)),
+            "zero_after": int(np.count_nonzero(after == 0)),
+        }
+
+    def summary(self, totals):
+        if not totals.get("zero_before"):
+            return {}
+        return {"holes_filled": 1 - totals["zero_after"] / totals["zero_before"]}
+
+
+class BoxDetectorStage(Stage):
+    name = "box_detector"
+
+    def run(self, frame, recording):
+        return box_detector(
+            frame=frame,
+            camera_config=_camera_config(recording),
+            config=_box_config(recording),
+        )
+
+    def score(self, sample, output):
+        return _score_box(sample, output)
+
+    def summary(self, totals):
+        return _summary_box(totals)
+
+
+class MergeSortStage(Stage):
+    name = "merge_sort"
+
+    def prepare(self, sample, recording):
+        return _detect_configs(sample.frame, recording)
+
+    def run(self, detection_lists, recording):
+        return _sort_and_merge(detection_lists)
+
+    def score(self, sample, output):
+        return _score_positions(sample, output)
+
+    def summary(self, totals):
+        return _summary_positions(totals)
+
+
+class EndToEndStage(Stage):
+    name = "end_to_end"
+
+    def run(self, frame, recording):
+        detection_lists = _detect_configs(frame, recording)
+        return (
+            _sort_and_merge(detection_lists),
+            box_detector(
+                frame=frame,
+                camera_config=_camera_config(recording),
+                config=_box_config(recording),
+            ),
+        )
+
+    def score(self, sample, output):
+        results, box = output
+        return {**_score_positions(sample, results), **_score_box(sample, box)}
+
+    def summary(self, totals):
+        return {**_summary_positions(totals), **_summary_box(totals)}
+
+
+STAGES = {
+    stage.name: stage
+    for stage in (
+        QrDetectorStage,
+        TagReconstructionStage,
+        FixDepthStage,
+        BoxDetectorStage,
+        MergeSortStage,
+        EndToEndStage,
+    )
+}